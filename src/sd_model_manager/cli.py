@@ -0,0 +1,460 @@
+"""コマンドラインインターフェース
+
+cron 等から頻繁に起動されるため、モジュールの読み込み時には標準ライブラリ
+以外をインポートしない。各サブコマンドは必要なモジュールだけを関数内で
+インポートする（例: ``hash`` は pydantic も Web スタックも読み込まない）。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+if TYPE_CHECKING:
+    from sd_model_manager.config import Config
+    from sd_model_manager.registry.models import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CSV_COLUMNS = [
+    "filename", "file_path", "model_type", "category", "file_size", "modified_time",
+    "civitai_model_id", "civitai_version_id",
+]
+
+
+def _load_config(**overrides: Any) -> "Config":
+    """設定を読み込む（None の上書き値は無視）"""
+    from sd_model_manager.config import Config
+
+    return Config(**{key: value for key, value in overrides.items() if value is not None})
+
+
+def _setup_logging(config: "Config") -> None:
+    """設定に従ってロギングをセットアップ（標準出力を最小化）"""
+    from sd_model_manager.lib.logging_config import setup_logging
+
+    setup_logging(
+        log_level=config.log_level,
+        log_dir=config.log_dir,
+        log_max_bytes=config.log_max_bytes,
+        log_backup_count=config.log_backup_count,
+        log_format=config.log_format,
+        queue_size=config.log_queue_size,
+        overflow=config.log_overflow
+    )
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """API サーバーを起動"""
+    from sd_model_manager.ui.api.server import run_server
+
+    # ワーカープロセスも同じ設定で起動するよう、上書き値は環境変数で渡す
+    overrides = {
+        "host": getattr(args, "host", None),
+        "port": getattr(args, "port", None),
+        "server_mode": "development" if getattr(args, "reload", False) else None,
+        "server_workers": getattr(args, "workers", None),
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name.upper()] = str(value)
+
+    config = _load_config()
+    _setup_logging(config)
+
+    logger.info("=" * 60)
+    logger.info("Starting SD-Model-Manager application")
+    logger.info("=" * 60)
+
+    run_server(config)
+    return 0
+
+
+def _read_batch_inputs(args: argparse.Namespace) -> list[str]:
+    """引数・ファイル・標準入力から URL を集める"""
+    from sd_model_manager.download.batch import parse_batch_inputs
+
+    inputs = list(args.urls or [])
+    if args.file == "-":
+        inputs.extend(parse_batch_inputs(sys.stdin))
+    elif args.file:
+        inputs.extend(parse_batch_inputs(Path(args.file).read_text("utf-8").splitlines()))
+    return inputs
+
+
+class _LibraryServices:
+    """CLI 用のライブラリ関連サービス（Web アプリを構築せずに組み立てる）"""
+
+    def __init__(self, config: "Config"):
+        from sd_model_manager.download.civitai_client import CivitaiClient
+        from sd_model_manager.download.download_service import DownloadService
+        from sd_model_manager.download.history import DownloadHistoryStore
+        from sd_model_manager.registry.hash_index import HashIndex
+        from sd_model_manager.registry.model_registry import ModelRegistry
+        from sd_model_manager.registry.scanner import ModelScanner
+
+        self.scanner = ModelScanner(config)
+        self.registry = ModelRegistry()
+        self.hash_index = HashIndex(cache_path=config.data_dir / "hash_cache.json")
+        self.history = DownloadHistoryStore(config.data_dir / "download_history.db")
+        self.download_service = DownloadService(
+            download_dir=config.download_dir,
+            civitai_client=CivitaiClient(api_key=config.civitai_api_key),
+            scanner=self.scanner,
+            registry=self.registry,
+            hash_index=self.hash_index,
+            history=self.history
+        )
+
+    async def load_library(self) -> None:
+        """既存ファイルとの重複を検出できるよう、ライブラリを読み込む"""
+        from sd_model_manager.registry.scanner import ModelScanError
+
+        try:
+            models = await self.scanner.scan()
+            self.registry.replace_all(models)
+            self.hash_index.rebuild(models)
+        except ModelScanError as e:
+            logger.warning("Library not scanned before download: %s", e.message)
+
+    async def close(self) -> None:
+        await self.download_service.civitai_client.close()
+        self.history.close()
+
+
+async def _run_batch(config: "Config", inputs: list[str], args: argparse.Namespace):
+    """ライブラリを読み込んでから一括ダウンロードを実行"""
+    from sd_model_manager.download.batch import BatchImporter
+
+    services = _LibraryServices(config)
+    try:
+        await services.load_library()
+        importer = BatchImporter(
+            services.download_service,
+            resolver_concurrency=args.resolvers,
+            download_concurrency=args.parallel
+        )
+        report = importer.create_report(inputs)
+        return await importer.run(report, version_index=args.version_index)
+    finally:
+        await services.close()
+
+
+def cmd_batch_import(args: argparse.Namespace) -> int:
+    """URL リストのモデルを一括でライブラリへダウンロード"""
+    import asyncio
+
+    config = _load_config()
+    _setup_logging(config)
+
+    inputs = _read_batch_inputs(args)
+    if not inputs:
+        print("No URLs given", file=sys.stderr)
+        return 2
+
+    report = asyncio.run(_run_batch(config, inputs, args))
+
+    if args.json:
+        print(report.model_dump_json(indent=2))
+    else:
+        for item in report.items:
+            detail = item.file_path or item.error or ""
+            if item.duplicate_of is not None:
+                detail = f"same model as #{item.duplicate_of}"
+            print(f"{item.index:>4}  {item.status:<12}  {item.input}  {detail}")
+        print(f"{json.dumps(report.summary())} in {report.duration:.1f}s")
+
+    return 1 if any(item.status == "failed" for item in report.items) else 0
+
+
+async def _run_download(config: "Config", args: argparse.Namespace):
+    """ライブラリを読み込んでから 1 モデルをダウンロード"""
+    services = _LibraryServices(config)
+    try:
+        await services.load_library()
+        return await services.download_service.download_model(
+            args.url, version_index=args.version_index
+        )
+    finally:
+        await services.close()
+
+
+def cmd_download(args: argparse.Namespace) -> int:
+    """Civitai のモデルをライブラリへダウンロード"""
+    import asyncio
+
+    from sd_model_manager.lib.errors import AppError
+
+    config = _load_config()
+    _setup_logging(config)
+
+    try:
+        result = asyncio.run(_run_download(config, args))
+    except AppError as e:
+        print(f"Download failed: {e.message}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(result.model_dump_json(indent=2))
+    elif result.deduplicated:
+        print(f"Already in library ({result.dedup_method}): {result.file_path}")
+    else:
+        print(result.file_path)
+    return 0
+
+
+async def _run_enrich(config: "Config"):
+    """ライブラリを読み込み、サイドカーのないモデルを Civitai に照会"""
+    from sd_model_manager.registry.enrichment import CivitaiEnricher
+
+    services = _LibraryServices(config)
+    try:
+        await services.load_library()
+        enricher = CivitaiEnricher(
+            services.download_service.civitai_client,
+            registry=services.registry,
+            concurrency=config.enrichment_concurrency,
+            batch_size=config.enrichment_batch_size,
+            state_path=config.data_dir / "enrichment_state.json",
+            hash_index=services.hash_index
+        )
+        return await enricher.enrich(services.registry.list())
+    finally:
+        await services.close()
+
+
+def cmd_enrich(args: argparse.Namespace) -> int:
+    """サイドカーのないモデルをハッシュで Civitai に照会してサイドカーを書き込む"""
+    import asyncio
+
+    config = _load_config(model_scan_dir=args.dir)
+    _setup_logging(config)
+
+    result = asyncio.run(_run_enrich(config))
+
+    if args.json:
+        print(result.model_dump_json(indent=2))
+    else:
+        print(
+            f"{result.matched} matched, {result.not_found} not found, "
+            f"{result.skipped} skipped, {result.failed} failed "
+            f"({result.candidates} models without metadata, {result.hashed} hashed)"
+        )
+    return 1 if result.failed else 0
+
+
+def _run_streaming(config: "Config", handle, profile: Optional[str] = None) -> Optional[int]:
+    """ライブラリをスキャンし、見つかったモデルから順に ``handle`` に渡す
+
+    Args:
+        profile: 指定するとスキャンを計測し、結果を ``log_dir/profiles`` に書き出す
+            （``cprofile`` または ``sampling``）
+
+    Returns:
+        モデル数（スキャンできなかった場合は None）
+    """
+    import asyncio
+
+    from sd_model_manager.registry.scanner import ModelScanError, ModelScanner
+
+    async def run() -> int:
+        scanner = ModelScanner(config)
+        count = 0
+        async for model in scanner.iter_models():
+            handle(model)
+            count += 1
+        failed = scanner.last_failed_count
+        if failed:
+            print(f"{failed} files had errors (details in {config.log_dir})", file=sys.stderr)
+        return count
+
+    async def run_profiled() -> int:
+        from sd_model_manager.lib.profiling import Profiler
+
+        profiler = Profiler(
+            config.log_dir / "profiles",
+            sample_interval=config.profiling_sample_interval_ms / 1000
+        )
+        with profiler.profile("scan", profile) as result:
+            count = await run()
+        print(f"Profile written: {result.path}", file=sys.stderr)
+        return count
+
+    try:
+        return asyncio.run(run_profiled() if profile else run())
+    except ModelScanError as e:
+        print(f"Scan failed: {e.message}", file=sys.stderr)
+        return None
+
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    """ライブラリをスキャンして一覧を出力（--json は 1 行 1 モデルで逐次出力）"""
+    config = _load_config(model_scan_dir=args.dir)
+    _setup_logging(config)
+
+    def handle(model: "ModelInfo") -> None:
+        if args.json:
+            line = model.model_dump_json()
+        else:
+            line = (
+                f"{model.model_type:<10}  {model.category:<8}  "
+                f"{model.file_size:>14,}  {model.file_path}"
+            )
+        print(line, flush=True)
+
+    count = _run_streaming(config, handle, profile=args.profile)
+    if count is None:
+        return 1
+    if not args.json:
+        print(f"{count} models", file=sys.stderr)
+    return 0
+
+
+def _civitai_ids(model: "ModelInfo") -> tuple[Optional[int], Optional[int]]:
+    """サイドカーのモデル ID とバージョン ID"""
+    metadata = model.civitai_metadata or {}
+    return metadata.get("modelId"), metadata.get("id")
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """ライブラリの一覧を JSON Lines / CSV で書き出す"""
+    import csv
+
+    config = _load_config(model_scan_dir=args.dir)
+    _setup_logging(config)
+
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_CSV_COLUMNS)
+
+            def handle(model: "ModelInfo") -> None:
+                writer.writerow([
+                    model.filename, model.file_path, model.model_type, model.category,
+                    model.file_size, model.modified_time.isoformat(), *_civitai_ids(model)
+                ])
+        else:
+            def handle(model: "ModelInfo") -> None:
+                output.write(model.model_dump_json() + "\n")
+
+        count = _run_streaming(config, handle)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if count is None else 0
+
+
+def _iter_hash_targets(paths: list[str]) -> Iterator[Path]:
+    """ハッシュ対象のファイル（ディレクトリはモデルファイルを再帰的に列挙）"""
+    from sd_model_manager.lib.file_utils import MODEL_FILE_EXTENSIONS
+
+    for path in map(Path, paths):
+        if path.is_dir():
+            for file_path in sorted(path.rglob("*")):
+                if file_path.is_file() and file_path.suffix.lower() in MODEL_FILE_EXTENSIONS:
+                    yield file_path
+        else:
+            yield path
+
+
+def cmd_hash(args: argparse.Namespace) -> int:
+    """ファイルの SHA256 と AutoV2 を計算（複数ファイルは並列に計算）"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sd_model_manager.lib.file_utils import compute_sha256
+
+    def hash_file(path: Path) -> tuple[Path, Optional[str], Optional[str]]:
+        try:
+            return path, compute_sha256(path), None
+        except OSError as e:
+            return path, None, e.strerror or str(e)
+
+    failed = 0
+    # hashlib はハッシュ計算中に GIL を解放するため、スレッドで並列化できる
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        for path, sha256, error in executor.map(hash_file, _iter_hash_targets(args.paths)):
+            if sha256 is None:
+                failed += 1
+                print(f"{path}: {error}", file=sys.stderr)
+                continue
+            # AutoV2 は SHA256 の先頭 10 桁
+            if args.json:
+                line = json.dumps({"path": str(path), "sha256": sha256, "autov2": sha256[:10]})
+            else:
+                line = f"{sha256}  {sha256[:10]}  {path}"
+            print(line, flush=True)
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """引数パーサーを構築"""
+    parser = argparse.ArgumentParser(prog="sd-model-manager", description="SD-Model-Manager")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve = subparsers.add_parser("serve", help="start the API server (default)")
+    serve.add_argument("--host", help="bind address")
+    serve.add_argument("--port", type=int, help="bind port")
+    serve.add_argument("--workers", type=int, help="worker processes (production mode)")
+    serve.add_argument(
+        "--reload", action="store_true", help="development mode: single process, auto reload"
+    )
+    serve.set_defaults(func=cmd_serve)
+
+    scan = subparsers.add_parser("scan", help="list the models in the library")
+    scan.add_argument("--dir", help="library directory (default: MODEL_SCAN_DIR)")
+    scan.add_argument("--json", action="store_true", help="stream one JSON object per line")
+    scan.add_argument(
+        "--profile", choices=["cprofile", "sampling"],
+        help="profile the scan and write the result under LOG_DIR/profiles"
+    )
+    scan.set_defaults(func=cmd_scan)
+
+    download = subparsers.add_parser("download", help="download a Civitai model into the library")
+    download.add_argument("url", help="Civitai URL or model ID")
+    download.add_argument("--version-index", type=int, default=0)
+    download.add_argument("--json", action="store_true", help="print the result as JSON")
+    download.set_defaults(func=cmd_download)
+
+    hash_ = subparsers.add_parser("hash", help="compute SHA256/AutoV2 of model files")
+    hash_.add_argument("paths", nargs="+", help="files or directories")
+    hash_.add_argument("-j", "--jobs", type=int, default=4, help="files hashed in parallel")
+    hash_.add_argument("--json", action="store_true", help="one JSON object per line")
+    hash_.set_defaults(func=cmd_hash)
+
+    enrich = subparsers.add_parser(
+        "enrich", help="look up models without sidecars on Civitai by hash"
+    )
+    enrich.add_argument("--dir", help="library directory (default: MODEL_SCAN_DIR)")
+    enrich.add_argument("--json", action="store_true", help="print the result as JSON")
+    enrich.set_defaults(func=cmd_enrich)
+
+    export = subparsers.add_parser("export", help="export the library listing")
+    export.add_argument("--dir", help="library directory (default: MODEL_SCAN_DIR)")
+    export.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    export.add_argument("-o", "--output", help="output file (default: stdout)")
+    export.set_defaults(func=cmd_export)
+
+    batch = subparsers.add_parser(
+        "batch-import", help="download many Civitai models into the library"
+    )
+    batch.add_argument("urls", nargs="*", help="Civitai URLs or model IDs")
+    batch.add_argument("-f", "--file", help="file with one URL or ID per line ('-' for stdin)")
+    batch.add_argument("--version-index", type=int, default=0)
+    batch.add_argument("--resolvers", type=int, default=4, help="concurrent metadata lookups")
+    batch.add_argument("--parallel", type=int, default=2, help="concurrent downloads")
+    batch.add_argument("--json", action="store_true", help="print the report as JSON")
+    batch.set_defaults(func=cmd_batch_import)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI エントリポイント（サブコマンド省略時はサーバーを起動）"""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return cmd_serve(args)
+    return args.func(args)
@@ -1,7 +1,7 @@
 """設定管理モジュール"""
 
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,19 +14,89 @@ class Config(BaseSettings):
     # Download settings
     download_dir: Path = Path("./downloads")
     max_concurrent_downloads: int = 1
+    # 帯域制限（バイト/秒、未設定は無制限）
+    download_bandwidth_limit: Optional[int] = None
+    download_per_file_bandwidth_limit: Optional[int] = None
+
+    # ローカル・NAS からのインポートの同時コピー数
+    import_concurrency: int = 4
 
     # Model scanning settings
     model_scan_dir: Path = Path("./models")
+    # スキャン中の同種のエラーは最初の N 件だけ個別に（トレースバック付きで）記録し、
+    # 残りは件数とサンプルパスとしてスキャン終了時に要約する
+    scan_error_log_limit: int = 5
+    scan_error_samples: int = 5
+    # モデル ID の導出元（path: パス / inode: リネームで変わらない / hash: サイドカーの SHA256）
+    model_id_source: Literal["path", "inode", "hash"] = "path"
+
+    # アプリケーションデータ（ハッシュキャッシュ等）の保存先
+    data_dir: Path = Path("./data")
+    # スキャン後、サイドカーもキャッシュもないモデルをバックグラウンドでハッシュ化して
+    # インデックスに登録し、data_dir/hash_cache.json に保存する（同時数、0 で無効）
+    hash_index_concurrency: int = 2
+
+    # ローカルのプレビュー画像（.preview.png 等）のサムネイル
+    # （生成には Pillow が必要。data_dir/thumbnails に上限付きでキャッシュする）
+    thumbnail_size: int = 256
+    thumbnail_format: Literal["webp", "jpeg"] = "webp"
+    thumbnail_quality: int = 80
+    thumbnail_workers: int = 2
+    thumbnail_cache_max_mb: int = 512
+    thumbnail_pregenerate: bool = True  # スキャン後にバックグラウンドで生成
+
+    # リモート（Civitai）のプレビュー画像のミラー。有効時はスキャン後に取得して
+    # data_dir/previews に上限付きでキャッシュし、preview_image_url をローカルの URL にする
+    preview_mirror_enabled: bool = False
+    preview_mirror_concurrency: int = 4
+    preview_mirror_retries: int = 3
+    preview_mirror_max_mb: int = 1024
+    preview_mirror_max_file_mb: int = 50  # これより大きい画像・動画はミラーしない
+
+    # サイドカーのないモデルのハッシュによる Civitai 照会（POST /api/models/enrich、CLI の enrich）。
+    # 同時にハッシュ化するファイル数と、1 回の照会にまとめるハッシュ数
+    enrichment_concurrency: int = 4
+    enrichment_batch_size: int = 50
+
+    # 更新チェック（インストール済みモデルの新バージョン確認）
+    update_check_enabled: bool = False
+    update_check_interval_hours: float = 24.0  # モデルごとの再チェック間隔
+    update_check_poll_minutes: float = 60.0  # スケジューラーの実行間隔
+    update_check_max_requests: int = 20  # 1 回の実行で送るリクエスト数の上限
 
     # Server settings
     host: str = "127.0.0.1"
     port: int = 8188
+    # production: リロードなし・マルチワーカー / development: ファイル変更で自動リロード
+    server_mode: Literal["production", "development"] = "production"
+    server_workers: int = 1
+    server_keep_alive: int = 5  # Keep-Alive のアイドルタイムアウト（秒）
+    server_backlog: int = 2048  # listen の待ち受けキュー長
+    # この時間（ミリ秒）を超えたリクエストを slow_requests.log に記録（None で無効）
+    slow_request_threshold_ms: Optional[float] = 1000.0
+    # この大きさ（バイト）以上の JSON レスポンスを Accept-Encoding に応じて圧縮（None で無効）
+    compression_min_bytes: Optional[int] = 1024
+
+    # イベントループの遅延監視（閾値を超えて停止した場合はスタックをログに記録）
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_ms: float = 100.0
+    loop_stall_threshold_ms: Optional[float] = 250.0
+
+    # プロファイリング（既定は無効。有効時のみ管理 API と X-Profile ヘッダーを受け付け、
+    # 結果を log_dir/profiles に書き出す）
+    profiling_enabled: bool = False
+    profiling_sample_interval_ms: float = 5.0
 
     # Logging settings
     log_level: str = "INFO"
     log_dir: Path = Path("./logs")
     log_max_bytes: int = 10 * 1024 * 1024  # 10MB
     log_backup_count: int = 3
+    # text: 従来の 1 行形式 / json: JSON Lines（extra= の構造化フィールドを含む）
+    log_format: Literal["text", "json"] = "text"
+    # ログは専用スレッドが書き込む。キューが満杯のときは overflow に従う
+    log_queue_size: int = 10000
+    log_overflow: Literal["block", "drop_new", "drop_oldest"] = "drop_new"
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -34,6 +104,11 @@ class Config(BaseSettings):
         extra="ignore"
     )
 
+    @property
+    def shared_state_db(self) -> Path:
+        """マルチワーカー構成でワーカー間に共有する状態（レジストリ・バッチの進捗）の DB"""
+        return self.data_dir / "shared_state.db"
+
     def ensure_download_dir(self) -> None:
         """ダウンロードディレクトリが存在することを保証"""
         self.download_dir.mkdir(parents=True, exist_ok=True)
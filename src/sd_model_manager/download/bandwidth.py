@@ -0,0 +1,126 @@
+"""ダウンロード帯域制御"""
+
+import logging
+import weakref
+from typing import Optional
+
+from sd_model_manager.download.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# バケット容量 = 制限値 × この秒数（バーストを短く抑える）
+BURST_SECONDS = 0.1
+# チャンク 1 つ分より小さい容量にならないようにする下限（バイト）
+MIN_BURST_BYTES = 64 * 1024
+
+
+def _create_bucket(bytes_per_second: int) -> TokenBucket:
+    """帯域制御用のトークンバケットを生成（初期状態は空）"""
+    return TokenBucket(
+        rate=bytes_per_second,
+        capacity=max(bytes_per_second * BURST_SECONDS, MIN_BURST_BYTES),
+        initial_tokens=0
+    )
+
+
+class DownloadShaper:
+    """1 ダウンロード分の帯域制御
+
+    ダウンロード単位の制限を適用したうえで、全ワーカー共有の
+    グローバルバケットからもトークンを取得する。
+    """
+
+    def __init__(self, limiter: "BandwidthLimiter", bytes_per_second: Optional[int]):
+        self._limiter = limiter
+        self._bucket = _create_bucket(bytes_per_second) if bytes_per_second else None
+
+    def set_limit(self, bytes_per_second: Optional[int]) -> None:
+        """ダウンロード単位の制限を変更"""
+        if not bytes_per_second:
+            self._bucket = None
+        elif self._bucket is None:
+            self._bucket = _create_bucket(bytes_per_second)
+        else:
+            self._bucket.configure(
+                bytes_per_second, max(bytes_per_second * BURST_SECONDS, MIN_BURST_BYTES)
+            )
+
+    async def consume(self, nbytes: int) -> None:
+        """受信したバイト数分のトークンを消費（制限超過時は待機）
+
+        Args:
+            nbytes: 受信バイト数
+        """
+        bucket = self._bucket
+        if bucket is not None:
+            await bucket.acquire(nbytes)
+
+        global_bucket = self._limiter.global_bucket
+        if global_bucket is not None:
+            await global_bucket.acquire(nbytes)
+
+
+class BandwidthLimiter:
+    """全ダウンロード共有の帯域制御
+
+    制限値は実行中でも変更でき、進行中のダウンロードにも即座に反映される。
+    None または 0 は無制限を表す。
+    """
+
+    def __init__(
+        self,
+        global_limit: Optional[int] = None,
+        per_download_limit: Optional[int] = None
+    ):
+        """
+        Args:
+            global_limit: 全体の上限（バイト/秒）
+            per_download_limit: ダウンロードごとの上限（バイト/秒）
+        """
+        self.global_limit: Optional[int] = None
+        self.per_download_limit: Optional[int] = None
+        self.global_bucket: Optional[TokenBucket] = None
+        self._shapers: "weakref.WeakSet[DownloadShaper]" = weakref.WeakSet()
+        self.set_limits(global_limit, per_download_limit)
+
+    def set_limits(
+        self,
+        global_limit: Optional[int],
+        per_download_limit: Optional[int]
+    ) -> None:
+        """制限値を変更
+
+        Args:
+            global_limit: 全体の上限（バイト/秒）
+            per_download_limit: ダウンロードごとの上限（バイト/秒）
+        """
+        if (global_limit or 0) < 0 or (per_download_limit or 0) < 0:
+            raise ValueError("Bandwidth limits must not be negative")
+        global_limit = global_limit or None
+        per_download_limit = per_download_limit or None
+
+        if global_limit is None:
+            self.global_bucket = None
+        elif self.global_bucket is None:
+            self.global_bucket = _create_bucket(global_limit)
+        else:
+            self.global_bucket.configure(
+                global_limit, max(global_limit * BURST_SECONDS, MIN_BURST_BYTES)
+            )
+
+        if per_download_limit != self.per_download_limit:
+            for shaper in self._shapers:
+                shaper.set_limit(per_download_limit)
+
+        self.global_limit = global_limit
+        self.per_download_limit = per_download_limit
+        logger.info(
+            "Bandwidth limits updated: global=%s, per_download=%s",
+            global_limit, per_download_limit
+        )
+
+    def create_shaper(self) -> DownloadShaper:
+        """新しいダウンロード用の帯域制御を生成"""
+        shaper = DownloadShaper(self, self.per_download_limit)
+        self._shapers.add(shaper)
+        return shaper
@@ -0,0 +1,346 @@
+"""複数 URL の一括インポート（メタデータ解決とダウンロードのパイプライン）"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Literal, Optional
+
+from pydantic import BaseModel
+
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.lib import metrics
+from sd_model_manager.lib.errors import AppError
+
+logger = logging.getLogger(__name__)
+
+BATCH_QUEUE_DEPTH = metrics.gauge(
+    "sdmm_batch_queue_depth", "Resolved batch items waiting for a download slot"
+)
+
+BatchItemStatus = Literal["pending", "downloaded", "deduplicated", "duplicate", "failed"]
+
+
+class BatchItem(BaseModel):
+    """一括インポートの 1 件"""
+
+    index: int
+    input: str
+    model_id: Optional[str] = None
+    status: BatchItemStatus = "pending"
+    job_id: Optional[str] = None
+    file_path: Optional[str] = None
+    bytes_downloaded: int = 0
+    duplicate_of: Optional[int] = None
+    error: Optional[str] = None
+    resolve_seconds: Optional[float] = None
+    download_seconds: Optional[float] = None
+    resolved_at: Optional[datetime] = None
+    download_started_at: Optional[datetime] = None
+
+
+class BatchReport(BaseModel):
+    """一括インポートの結果（実行中は随時更新される）"""
+
+    batch_id: str
+    items: list[BatchItem]
+    finished: bool = False
+    duration: float = 0.0
+
+    def summary(self) -> dict[str, int]:
+        """ステータスごとの件数"""
+        counts: dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return counts
+
+
+class BatchReportStore:
+    """一括インポートのレポートの永続化（SQLite WAL）
+
+    マルチワーカー構成では進捗の問い合わせが別のワーカープロセスに
+    届くことがあるため、実行中のレポートを共有ストアへ書き出す。
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite データベースファイルのパス
+        """
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """接続を取得（初回はスキーマを作成）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS batch_reports "
+                "(batch_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def save_sync(self, report: BatchReport) -> None:
+        """レポートを保存（ブロッキング処理）"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO batch_reports VALUES (?, ?, ?)",
+                    (report.batch_id, report.model_dump_json(), time.time())
+                )
+
+    async def save(self, report: BatchReport) -> None:
+        """レポートを保存"""
+        await asyncio.to_thread(self.save_sync, report)
+
+    def load_sync(self, batch_id: str) -> Optional[BatchReport]:
+        """レポートを取得（ブロッキング処理。存在しなければ None）"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT data FROM batch_reports WHERE batch_id = ?", (batch_id,)
+            ).fetchone()
+        return BatchReport.model_validate_json(row[0]) if row else None
+
+    async def load(self, batch_id: str) -> Optional[BatchReport]:
+        """レポートを取得（存在しなければ None）"""
+        return await asyncio.to_thread(self.load_sync, batch_id)
+
+    def close(self) -> None:
+        """接続をクローズ"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def parse_batch_inputs(lines: Iterable[str]) -> list[str]:
+    """URL リスト（ファイルの各行等）から入力を取り出す
+
+    空行と ``#`` で始まるコメント行は無視する。
+
+    Args:
+        lines: 行のリスト
+
+    Returns:
+        URL またはモデル ID のリスト
+    """
+    inputs = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            inputs.append(line)
+    return inputs
+
+
+class BatchImporter:
+    """複数のモデルをパイプラインで一括ダウンロード
+
+    リゾルバー段がメタデータを先行して取得し（レート制限は CivitaiClient の
+    トークンバケットに従う）、ダウンロード段が解決済みのジョブを順次処理する。
+    API の待ち時間が転送時間と重なるため、全体の所要時間は転送時間の合計に
+    近づく。同じモデル ID の重複入力は 1 回だけ処理する。
+    """
+
+    def __init__(
+        self,
+        download_service: DownloadService,
+        resolver_concurrency: int = 4,
+        download_concurrency: int = 2,
+        queue_size: int = 32,
+        report_store: Optional[BatchReportStore] = None
+    ):
+        """
+        Args:
+            download_service: ダウンロードに使うサービス（CivitaiClient・スキャナー設定済み）
+            resolver_concurrency: 同時に行うメタデータ取得数
+            download_concurrency: 同時に行うダウンロード数
+            queue_size: 解決済みでダウンロード待ちのジョブの上限
+            report_store: 項目の完了ごとにレポートを書き出す共有ストア
+        """
+        self.download_service = download_service
+        self.resolver_concurrency = max(1, resolver_concurrency)
+        self.download_concurrency = max(1, download_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.report_store = report_store
+
+    def create_report(self, inputs: Iterable[str], batch_id: Optional[str] = None) -> BatchReport:
+        """入力から処理前のレポートを作成（モデル ID の抽出と重複判定）
+
+        Args:
+            inputs: Civitai URL またはモデル ID
+            batch_id: バッチ ID（省略時は自動生成）
+
+        Returns:
+            各入力が pending / duplicate / failed のいずれかになったレポート
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        client = self.download_service.civitai_client
+        first_index: dict[str, int] = {}
+        items = []
+
+        for index, value in enumerate(inputs):
+            item = BatchItem(index=index, input=value, job_id=f"{batch_id}:{index}")
+            try:
+                item.model_id = client.extract_model_id(value)
+            except AppError as e:
+                item.status = "failed"
+                item.error = e.message
+            else:
+                if item.model_id in first_index:
+                    item.status = "duplicate"
+                    item.duplicate_of = first_index[item.model_id]
+                else:
+                    first_index[item.model_id] = index
+            items.append(item)
+
+        return BatchReport(batch_id=batch_id, items=items)
+
+    async def run(self, report: BatchReport, version_index: int = 0) -> BatchReport:
+        """レポートの pending 項目を処理
+
+        Args:
+            report: ``create_report`` で作成したレポート（処理中に更新される）
+            version_index: モデルバージョンのインデックス
+
+        Returns:
+            完了したレポート
+        """
+        started = time.monotonic()
+        pending = [item for item in report.items if item.status == "pending"]
+        logger.info(
+            "Batch import started: batch_id=%s, items=%d, unique=%d",
+            report.batch_id, len(report.items), len(pending)
+        )
+
+        to_resolve: asyncio.Queue[BatchItem] = asyncio.Queue()
+        for item in pending:
+            to_resolve.put_nowait(item)
+        resolved: asyncio.Queue[Optional[tuple[BatchItem, dict[str, Any]]]] = asyncio.Queue(
+            maxsize=self.queue_size
+        )
+
+        resolvers = [
+            asyncio.create_task(self._resolve_worker(report, to_resolve, resolved))
+            for _ in range(min(self.resolver_concurrency, len(pending)) or 1)
+        ]
+        downloaders = [
+            asyncio.create_task(self._download_worker(report, resolved, version_index))
+            for _ in range(self.download_concurrency)
+        ]
+
+        try:
+            await asyncio.gather(*resolvers)
+            for _ in downloaders:
+                await resolved.put(None)
+            await asyncio.gather(*downloaders)
+        finally:
+            for task in resolvers + downloaders:
+                task.cancel()
+
+        report.finished = True
+        report.duration = time.monotonic() - started
+        await self._save(report)
+        logger.info(
+            "Batch import finished: batch_id=%s, duration=%.1fs, summary=%s",
+            report.batch_id, report.duration, report.summary()
+        )
+        return report
+
+    async def _save(self, report: BatchReport) -> None:
+        """共有ストアへレポートを書き出す（失敗してもインポートは継続）"""
+        if self.report_store is None:
+            return
+        try:
+            await self.report_store.save(report)
+        except sqlite3.Error as e:
+            logger.warning("Failed to save batch report %s: %s", report.batch_id, str(e))
+
+    async def _resolve_worker(
+        self,
+        report: BatchReport,
+        to_resolve: "asyncio.Queue[BatchItem]",
+        resolved: "asyncio.Queue[Optional[tuple[BatchItem, dict[str, Any]]]]"
+    ) -> None:
+        """メタデータを取得してダウンロード段へ渡す"""
+        client = self.download_service.civitai_client
+        while True:
+            try:
+                item = to_resolve.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            started = time.monotonic()
+            try:
+                metadata = await client.get_model_metadata(item.model_id)
+            except Exception as e:
+                # 予期しない例外でもワーカーを止めない（止まるとバッチが完了しない）
+                item.status = "failed"
+                item.error = e.message if isinstance(e, AppError) else f"{type(e).__name__}: {e}"
+                if isinstance(e, AppError):
+                    logger.warning(
+                        "Batch item resolution failed: input=%s, error=%s", item.input, e.message
+                    )
+                else:
+                    logger.exception("Unexpected error resolving batch item: input=%s", item.input)
+                await self._save(report)
+                continue
+            finally:
+                item.resolve_seconds = time.monotonic() - started
+
+            item.resolved_at = datetime.now()
+            await resolved.put((item, metadata))
+            BATCH_QUEUE_DEPTH.inc()
+
+    async def _download_worker(
+        self,
+        report: BatchReport,
+        resolved: "asyncio.Queue[Optional[tuple[BatchItem, dict[str, Any]]]]",
+        version_index: int
+    ) -> None:
+        """解決済みのジョブをダウンロード"""
+        while True:
+            job = await resolved.get()
+            if job is None:
+                return
+            BATCH_QUEUE_DEPTH.dec()
+            item, metadata = job
+
+            item.download_started_at = datetime.now()
+            started = time.monotonic()
+            try:
+                result = await self.download_service.download_model(
+                    item.model_id,
+                    version_index=version_index,
+                    job_id=item.job_id,
+                    metadata=metadata
+                )
+            except (AppError, OSError) as e:
+                # 1 件の失敗でパイプライン全体を止めない
+                item.status = "failed"
+                item.error = e.message if isinstance(e, AppError) else str(e)
+                logger.warning(
+                    "Batch item download failed: input=%s, error=%s", item.input, item.error
+                )
+            except Exception as e:
+                # 予期しない例外でもワーカーを止めない（全ワーカーが止まると
+                # リゾルバーが満杯のキューで待ち続け、バッチが完了しない）
+                item.status = "failed"
+                item.error = f"{type(e).__name__}: {e}"
+                logger.exception("Unexpected error downloading batch item: input=%s", item.input)
+            else:
+                item.status = "deduplicated" if result.deduplicated else "downloaded"
+                item.file_path = result.file_path
+                item.bytes_downloaded = result.bytes_downloaded
+            finally:
+                item.download_seconds = time.monotonic() - started
+            await self._save(report)
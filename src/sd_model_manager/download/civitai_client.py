@@ -1,28 +1,97 @@
 """Civitai API クライアント"""
 
+import asyncio
 import logging
+import random
 import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional, Any
 import httpx
 
+from sd_model_manager.lib import metrics
 from sd_model_manager.lib.errors import DownloadError
+from sd_model_manager.download.models import ModelVersionFiles, VersionFile
+from sd_model_manager.download.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+API_REQUEST_SECONDS = metrics.histogram(
+    "sdmm_civitai_request_duration_seconds", "Civitai API request latency", ("endpoint",)
+)
+API_RESPONSES = metrics.counter(
+    "sdmm_civitai_responses_total", "Civitai API responses by status code", ("status",)
+)
+API_RATE_LIMIT_WAIT = metrics.histogram(
+    "sdmm_civitai_rate_limit_wait_seconds", "Time requests waited for the local rate limiter",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60)
+)
+API_RATE_LIMITED = metrics.counter(
+    "sdmm_civitai_rate_limited_total", "429 responses received from Civitai"
+)
+
+# メトリクスのラベル用に ID・ハッシュを含むパスをまとめる
+_PATH_ID_PATTERN = re.compile(r"/(?:\d+|[0-9A-Fa-f]{10,})(?=/|$)")
+
+
+def _endpoint_label(path: str) -> str:
+    return _PATH_ID_PATTERN.sub("/{id}", path)
+
 
 class CivitaiClient:
     """Civitai API との通信クライアント"""
 
     BASE_URL = "https://civitai.com/api/v1"
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Civitai のレート制限（リクエスト/分）
+    ANONYMOUS_REQUESTS_PER_MINUTE = 10
+    AUTHENTICATED_REQUESTS_PER_MINUTE = 60
+
+    # バースト上限（秒間レートの何秒分まで蓄積するか）。容量を 1 分分にすると
+    # 最初の 1 分間に上限の約 2 倍を送って 429 を受けるため、数リクエストに抑える
+    RATE_LIMIT_BURST_SECONDS = 3.0
+
+    # /models?ids= で一度に取得できるモデル数
+    MAX_MODELS_PER_REQUEST = 100
+
+    # 429 受信時のバックオフ設定
+    BACKOFF_BASE_SECONDS = 2.0
+    BACKOFF_MAX_SECONDS = 60.0
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        max_rate_limit_retries: int = 3,
+        base_url: Optional[str] = None
+    ):
         """
         Args:
             api_key: Civitai API キー（オプション）
+            requests_per_minute: レート上限の上書き（省略時は API キーの有無で決定）
+            max_rate_limit_retries: 429 受信時の最大リトライ回数
+            base_url: API ベース URL（テスト用の代替サーバー等）
         """
         self.api_key = api_key
+        self.base_url = base_url or self.BASE_URL
         self._client: Optional[httpx.AsyncClient] = None
 
+        if requests_per_minute is None:
+            requests_per_minute = (
+                self.AUTHENTICATED_REQUESTS_PER_MINUTE if api_key
+                else self.ANONYMOUS_REQUESTS_PER_MINUTE
+            )
+        self.requests_per_minute = requests_per_minute
+        self.max_rate_limit_retries = max_rate_limit_retries
+        rate = requests_per_minute / 60.0
+        self.rate_limiter = TokenBucket(
+            rate=rate,
+            capacity=max(1.0, rate * self.RATE_LIMIT_BURST_SECONDS)
+        )
+        # 同一リクエストの合流用（キー → 実行中タスク）
+        self._inflight: dict[str, asyncio.Task] = {}
+
     def extract_model_id(self, url_or_id: str) -> str:
         """URL またはモデル ID からモデル ID を抽出
 
@@ -60,7 +129,7 @@ class CivitaiClient:
                 headers["Authorization"] = f"Bearer {self.api_key}"
 
             self._client = httpx.AsyncClient(
-                base_url=self.BASE_URL,
+                base_url=self.base_url,
                 headers=headers,
                 timeout=30.0
             )
@@ -78,14 +147,12 @@ class CivitaiClient:
         Raises:
             DownloadError: API エラー時
         """
-        client = await self._get_client()
         logger.info("Fetching model data from Civitai API: model_id=%s", model_id)
 
         try:
-            response = await client.get(f"/models/{model_id}")
-            response.raise_for_status()
+            data = await self._get_json(f"/models/{model_id}")
             logger.info("Successfully fetched model data: model_id=%s", model_id)
-            return response.json()
+            return data
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
 
@@ -127,6 +194,259 @@ class CivitaiClient:
                 details={"model_id": model_id}
             )
 
+    async def _get_json(
+        self,
+        path: str,
+        params: Optional[dict[str, Any]] = None
+    ) -> Any:
+        """GET リクエストを送信し JSON を返す（同一リクエストは合流）
+
+        同じパス・パラメータのリクエストが実行中であれば、新たに送信せず
+        その結果を共有する。返される値は呼び出し元間で共有されるため、
+        変更しないこと。
+
+        Args:
+            path: API パス
+            params: クエリパラメータ
+
+        Returns:
+            レスポンス JSON
+
+        Raises:
+            httpx.HTTPStatusError: HTTP エラー時
+            httpx.RequestError: ネットワークエラー時
+        """
+        key = self._request_key(path, params)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send_with_rate_limit("GET", path, params=params))
+            # 全呼び出し元がキャンセルされても例外が未取得にならないように
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None))
+        else:
+            logger.debug("Coalescing request onto in-flight call: %s", key)
+
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _request_key(path: str, params: Optional[dict[str, Any]]) -> str:
+        """リクエスト合流用のキーを生成"""
+        if not params:
+            return path
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{path}?{query}"
+
+    async def _send_with_rate_limit(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        json: Any = None
+    ) -> Any:
+        """レート制限に従ってリクエストを送信（429 はバックオフしてリトライ）
+
+        Args:
+            method: HTTP メソッド
+            path: API パス
+            params: クエリパラメータ
+            json: リクエストボディ（JSON）
+
+        Returns:
+            レスポンス JSON
+        """
+        response = await self._request_with_rate_limit(method, path, params=params, json=json)
+        response.raise_for_status()
+        return response.json()
+
+    async def _request_with_rate_limit(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[dict[str, str]] = None
+    ) -> httpx.Response:
+        """レート制限に従ってリクエストを送信し、レスポンスをそのまま返す
+
+        429 はバックオフしてリトライする。それ以外のステータスの扱いは
+        呼び出し側に任せる（304 等を判定する場合に使用）。
+
+        Args:
+            method: HTTP メソッド
+            path: API パス
+            params: クエリパラメータ
+            json: リクエストボディ（JSON）
+            headers: 追加のリクエストヘッダー
+
+        Returns:
+            レスポンス
+        """
+        client = await self._get_client()
+
+        for attempt in range(self.max_rate_limit_retries + 1):
+            waited = await self.rate_limiter.acquire()
+            API_RATE_LIMIT_WAIT.observe(waited)
+            if waited > 0:
+                logger.debug("Rate limiter delayed request by %.2fs: %s", waited, path)
+
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, path, params=params, json=json, headers=headers
+                )
+            except httpx.RequestError:
+                API_RESPONSES.labels("error").inc()
+                raise
+            finally:
+                API_REQUEST_SECONDS.labels(_endpoint_label(path)).observe(
+                    time.perf_counter() - started
+                )
+            API_RESPONSES.labels(str(response.status_code)).inc()
+            if response.status_code == 429:
+                API_RATE_LIMITED.inc()
+
+            if response.status_code == 429 and attempt < self.max_rate_limit_retries:
+                delay = self._retry_delay(response, attempt)
+                logger.warning(
+                    "API rate limit hit, backing off %.1fs (attempt %d/%d): path=%s",
+                    delay, attempt + 1, self.max_rate_limit_retries, path
+                )
+                # 他の待機中リクエストも含めてバケット全体を停止
+                self.rate_limiter.pause(delay)
+                continue
+
+            return response
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """429 レスポンスから待機秒数を決定
+
+        Retry-After ヘッダー（秒数または HTTP 日付）を優先し、
+        ない場合は指数バックオフを用いる。いずれもジッターを加える。
+
+        Args:
+            response: 429 レスポンス
+            attempt: 試行回数（0 始まり）
+
+        Returns:
+            待機秒数
+        """
+        delay = None
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+
+        if delay is None:
+            delay = min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+        delay = max(0.0, delay)
+        # 複数クライアントの同時再送を避けるためのジッター
+        return delay + random.uniform(0, max(delay, 1.0) * 0.1)
+
+    async def get_model_version_by_hash(self, file_hash: str) -> Optional[dict[str, Any]]:
+        """ファイルハッシュからモデルバージョンを取得
+
+        Args:
+            file_hash: SHA256 / AutoV2 等のファイルハッシュ
+
+        Returns:
+            モデルバージョンデータ（見つからない場合は None）
+
+        Raises:
+            DownloadError: API エラー時
+        """
+        try:
+            return await self._get_json(f"/model-versions/by-hash/{file_hash}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise self._lookup_error(e, {"hash": file_hash})
+        except httpx.RequestError as e:
+            raise self._lookup_error(e, {"hash": file_hash})
+
+    async def get_model_versions_by_hashes(self, file_hashes: list[str]) -> list[dict[str, Any]]:
+        """複数のファイルハッシュからモデルバージョンを一括取得
+
+        一致しなかったハッシュは結果に含まれない。各バージョンの
+        ``files[].hashes`` を参照して呼び出し側で対応付けること。
+
+        Args:
+            file_hashes: ファイルハッシュのリスト
+
+        Returns:
+            一致したモデルバージョンのリスト
+
+        Raises:
+            DownloadError: API エラー時
+        """
+        if not file_hashes:
+            return []
+
+        logger.info("Looking up %d hashes on Civitai", len(file_hashes))
+        try:
+            return await self._send_with_rate_limit(
+                "POST", "/model-versions/by-hash", json=list(file_hashes)
+            )
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            raise self._lookup_error(e, {"hash_count": len(file_hashes)})
+
+    async def get_models_by_ids(
+        self,
+        model_ids: list[int],
+        etag: Optional[str] = None
+    ) -> tuple[Optional[list[dict[str, Any]]], Optional[str]]:
+        """複数モデルのメタデータを 1 リクエストで取得（条件付きリクエスト対応）
+
+        Args:
+            model_ids: モデル ID のリスト（最大 ``MAX_MODELS_PER_REQUEST`` 件）
+            etag: 前回のレスポンスの ETag（一致すれば 304 で本文を省略）
+
+        Returns:
+            (モデルのリスト, ETag)。304 の場合モデルのリストは None
+
+        Raises:
+            DownloadError: API エラー時
+        """
+        if not model_ids:
+            return [], None
+
+        headers = {"If-None-Match": etag} if etag else None
+        params = {"ids": list(model_ids), "limit": len(model_ids)}
+        try:
+            response = await self._request_with_rate_limit(
+                "GET", "/models", params=params, headers=headers
+            )
+            if response.status_code == 304:
+                return None, etag
+            response.raise_for_status()
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            raise self._lookup_error(e, {"model_ids": list(model_ids)})
+
+        return response.json().get("items", []), response.headers.get("etag")
+
+    def _lookup_error(self, error: httpx.HTTPError, details: dict[str, Any]) -> DownloadError:
+        """ハッシュ検索失敗時の DownloadError を生成"""
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            logger.error("Hash lookup failed: status=%d, details=%s", status_code, details)
+            return DownloadError(
+                f"Failed to look up model versions by hash: HTTP {status_code}",
+                details={**details, "status_code": status_code}
+            )
+
+        logger.error("Network error during hash lookup: error=%s, details=%s", str(error), details)
+        return DownloadError(
+            f"Network error during hash lookup: {str(error)}",
+            details=details
+        )
+
     async def get_model_metadata(self, url_or_id: str) -> dict[str, Any]:
         """モデルのメタデータを取得
 
@@ -156,28 +476,99 @@ class CivitaiClient:
             DownloadError: 取得失敗時
         """
         metadata = await self.get_model_metadata(url_or_id)
+        version = self._version_at(metadata, url_or_id, version_index)
+        if "downloadUrl" not in version:
+            raise DownloadError(
+                "Download URL not found in model version",
+                details={"model_id": url_or_id, "version_index": version_index}
+            )
+
+        return version["downloadUrl"]
+
+    async def get_version_files(self, url_or_id: str, version_index: int = 0) -> ModelVersionFiles:
+        """モデルバージョンの全ファイル（サイズ・形式・ハッシュ付き）を取得
+
+        Args:
+            url_or_id: Civitai URL またはモデル ID
+            version_index: モデルバージョンのインデックス（デフォルト: 0 = 最新）
+
+        Returns:
+            ファイル一覧とプレビュー画像 URL
+
+        Raises:
+            DownloadError: 取得失敗時
+        """
+        metadata = await self.get_model_metadata(url_or_id)
+        return self.parse_version_files(metadata, url_or_id, version_index)
+
+    def parse_version_files(
+        self,
+        metadata: dict[str, Any],
+        url_or_id: str,
+        version_index: int = 0
+    ) -> ModelVersionFiles:
+        """取得済みのモデルメタデータからバージョンのファイル一覧を作成
 
-        if "modelVersions" not in metadata or not metadata["modelVersions"]:
+        Args:
+            metadata: ``get_model_metadata`` の結果
+            url_or_id: エラー表示用の Civitai URL またはモデル ID
+            version_index: モデルバージョンのインデックス
+
+        Returns:
+            ファイル一覧とプレビュー画像 URL
+
+        Raises:
+            DownloadError: バージョンが存在しない場合
+        """
+        version = self._version_at(metadata, url_or_id, version_index)
+
+        fallback_url = version.get("downloadUrl")
+        files = [
+            VersionFile.from_civitai(file, fallback_url) for file in version.get("files") or []
+        ]
+        if not files and fallback_url:
+            files = [VersionFile(
+                name=f"{version.get('id', 'model')}.safetensors",
+                download_url=fallback_url,
+                primary=True
+            )]
+
+        preview_urls = [
+            image["url"] for image in version.get("images") or []
+            if isinstance(image, dict) and image.get("url")
+            and image.get("type", "image") == "image"
+        ]
+        return ModelVersionFiles(
+            model_id=metadata.get("id"),
+            model_name=metadata.get("name"),
+            model_type=metadata.get("type"),
+            version_id=version.get("id"),
+            version_name=version.get("name"),
+            files=files,
+            preview_urls=preview_urls
+        )
+
+    @staticmethod
+    def _version_at(
+        metadata: dict[str, Any],
+        url_or_id: str,
+        version_index: int
+    ) -> dict[str, Any]:
+        """メタデータから指定インデックスのバージョンを取得"""
+        versions = metadata.get("modelVersions") or []
+        if not versions:
             raise DownloadError(
                 "No model versions found",
                 details={"model_id": url_or_id}
             )
 
-        versions = metadata["modelVersions"]
         if version_index >= len(versions):
             raise DownloadError(
                 f"Version index {version_index} out of range",
                 details={"model_id": url_or_id, "available_versions": len(versions)}
             )
 
-        version = versions[version_index]
-        if "downloadUrl" not in version:
-            raise DownloadError(
-                "Download URL not found in model version",
-                details={"model_id": url_or_id, "version_index": version_index}
-            )
-
-        return version["downloadUrl"]
+        return versions[version_index]
 
     async def close(self):
         """HTTP クライアントをクローズ"""
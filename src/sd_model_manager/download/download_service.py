@@ -1,16 +1,75 @@
 """ダウンロードサービス"""
 
 import asyncio
+import json
 import logging
+import os
+import secrets
+import sqlite3
+import time
+import uuid
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
+from urllib.parse import urlparse
 import httpx
 
-from sd_model_manager.lib.errors import DownloadError
+from sd_model_manager.lib import metrics
+from sd_model_manager.lib.errors import ConfigurationError, DownloadError
+from sd_model_manager.lib.file_utils import (
+    atomic_write_bytes,
+    atomic_write_text,
+    place_file,
+    reflink,
+)
+from sd_model_manager.download.bandwidth import BandwidthLimiter, DownloadShaper
 from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.download.history import DownloadHistoryStore, HistoryStatus, history_entry
+from sd_model_manager.download.models import (
+    DedupMethod,
+    DownloadResult,
+    FileSelection,
+    GroupDownloadResult,
+    VersionFile,
+    VersionFileResult,
+)
+from sd_model_manager.download.progress import GroupProgress, ProgressBus, ProgressTracker
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.scanner import ModelScanner, civitai_info_path
 
 logger = logging.getLogger(__name__)
 
+# Civitai のモデル種別 → ライブラリ内のサブディレクトリ（スキャナーの種別判定と対応）
+MODEL_TYPE_DIRS = {
+    "lora": "loras",
+    "locon": "loras",
+    "dora": "loras",
+    "lycoris": "loras",
+    "checkpoint": "checkpoints",
+    "vae": "vae",
+    "textualinversion": "embeddings",
+}
+# 上記以外の種別の保存先
+OTHER_MODEL_DIR = "other"
+# ダウンロード中の一時ファイルの拡張子
+PARTIAL_SUFFIX = ".part"
+# .civitai.info を保存するファイル種別（Civitai のファイル type）
+MODEL_FILE_TYPES = {"model", "pruned model"}
+
+DOWNLOAD_BYTES = metrics.counter("sdmm_download_bytes_total", "Bytes received by downloads")
+DOWNLOADS = metrics.counter("sdmm_downloads_total", "Finished downloads", ("status",))
+DOWNLOAD_RETRIES = metrics.counter("sdmm_download_retries_total", "Download attempts retried")
+DOWNLOADS_ACTIVE = metrics.gauge("sdmm_downloads_active", "Downloads currently in progress")
+DOWNLOAD_DURATION = metrics.histogram(
+    "sdmm_download_duration_seconds", "Wall time of completed downloads including retries",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600)
+)
+DOWNLOAD_THROUGHPUT = metrics.histogram(
+    "sdmm_download_throughput_mb_per_second", "Average throughput of completed downloads (MB/s)",
+    buckets=(0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
 
 class DownloadService:
     """ファイルダウンロードサービス"""
@@ -18,16 +77,36 @@ class DownloadService:
     def __init__(
         self,
         download_dir: Path,
-        civitai_client: Optional[CivitaiClient] = None
+        civitai_client: Optional[CivitaiClient] = None,
+        progress_bus: Optional[ProgressBus] = None,
+        progress_interval: float = 0.25,
+        bandwidth_limiter: Optional[BandwidthLimiter] = None,
+        scanner: Optional[ModelScanner] = None,
+        registry: Optional[ModelRegistry] = None,
+        hash_index: Optional[HashIndex] = None,
+        history: Optional[DownloadHistoryStore] = None
     ):
         """
         Args:
-            download_dir: ダウンロード先ディレクトリ
+            download_dir: ダウンロード先ディレクトリ（初回ダウンロード時に作成）
             civitai_client: Civitai API クライアント（オプション）
+            progress_bus: 進捗イベントの配信先（オプション）
+            progress_interval: 進捗のサンプリング間隔（秒）
+            bandwidth_limiter: 帯域制御（省略時は無制限）
+            scanner: ライブラリのスキャナー（download_model で使用）
+            registry: ダウンロード完了時に更新するレジストリ
+            hash_index: 重複ダウンロード検出用のハッシュインデックス
+            history: ダウンロード履歴の記録先
         """
         self.download_dir = Path(download_dir)
-        self.download_dir.mkdir(parents=True, exist_ok=True)
         self.civitai_client = civitai_client
+        self.progress_bus = progress_bus
+        self.progress_interval = progress_interval
+        self.bandwidth_limiter = bandwidth_limiter or BandwidthLimiter()
+        self.scanner = scanner
+        self.registry = registry
+        self.hash_index = hash_index
+        self.history = history
 
     async def download_file(
         self,
@@ -35,16 +114,19 @@ class DownloadService:
         filename: str,
         progress_callback: Optional[Callable[[int, int], None]] = None,
         max_retries: int = 3,
-        chunk_size: int = 8192
+        chunk_size: int = 8192,
+        job_id: Optional[str] = None
     ) -> Path:
         """ファイルをダウンロード
 
         Args:
             url: ダウンロード URL（Civitai URL または直接ダウンロード URL）
             filename: 保存ファイル名（相対パスも可）
-            progress_callback: 進捗コールバック関数 (downloaded_bytes, total_bytes)
+            progress_callback: 進捗コールバック関数 (downloaded_bytes, total_bytes)。
+                サンプリング間隔ごとと完了時に呼ばれる
             max_retries: 最大リトライ回数
             chunk_size: チャンクサイズ（バイト）
+            job_id: 進捗イベントのジョブ ID（省略時は自動生成）
 
         Returns:
             ダウンロードしたファイルのパス
@@ -67,17 +149,621 @@ class DownloadService:
             logger.info("Resolved download URL: %s", download_url)
 
         output_path = self.download_dir / filename
+        return await self._download_to_path(
+            download_url, output_path,
+            progress_callback=progress_callback,
+            max_retries=max_retries,
+            chunk_size=chunk_size,
+            job_id=job_id,
+            source_url=url
+        )
+
+    async def download_model(
+        self,
+        url_or_id: str,
+        version_index: int = 0,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_retries: int = 3,
+        chunk_size: int = 8192,
+        job_id: Optional[str] = None,
+        metadata: Optional[dict[str, Any]] = None
+    ) -> DownloadResult:
+        """Civitai のモデルをライブラリへ直接ダウンロードして登録
+
+        モデル種別から保存先（例: ``active/loras/``）を決定し、本体に加えて
+        ``.civitai.info`` とプレビュー画像を隣に保存する。完了したモデルは
+        レジストリに直接追加されるため、再スキャンなしで閲覧できる。
+
+        Civitai が提供するハッシュ（SHA256 / AutoV2）がライブラリ内の既存
+        ファイルと一致した場合は転送せず、ハードリンク・reflink・
+        レジストリ上のエイリアスのいずれかで対応する。
+
+        Args:
+            url_or_id: Civitai URL またはモデル ID
+            version_index: モデルバージョンのインデックス（デフォルト: 0 = 最新）
+            progress_callback: 進捗コールバック関数 (downloaded_bytes, total_bytes)
+            max_retries: 最大リトライ回数
+            chunk_size: チャンクサイズ（バイト）
+            job_id: 進捗イベントのジョブ ID（省略時は自動生成）
+            metadata: 取得済みのモデルメタデータ（指定時は API を呼ばない）
+
+        Returns:
+            ダウンロード結果（登録されたモデル情報と重複排除の判定）
+
+        Raises:
+            ConfigurationError: CivitaiClient またはスキャナーが未設定の場合
+            DownloadError: ダウンロード失敗時
+        """
+        if not self.civitai_client or not self.scanner:
+            raise ConfigurationError(
+                "download_model requires a CivitaiClient and a ModelScanner",
+                details={"url": url_or_id}
+            )
+
+        if metadata is None:
+            metadata = await self.civitai_client.get_model_metadata(url_or_id)
+        version = self._select_version(metadata, url_or_id, version_index)
+        model_file = self._select_primary_file(version)
+
+        filename = model_file.get("name") or f"{version.get('id', 'model')}.safetensors"
+        download_url = model_file.get("downloadUrl") or version.get("downloadUrl")
+        if not download_url:
+            raise DownloadError(
+                "Download URL not found in model version",
+                details={"model_id": url_or_id, "version_index": version_index}
+            )
+
+        output_path = self.library_path_for(metadata.get("type"), filename)
+
+        hashes = model_file.get("hashes") or {}
+        expected_hash = hashes.get("SHA256") or hashes.get("AutoV2")
+        history_fields = {"model_id": metadata.get("id"), "version_id": version.get("id")}
+        existing = self._find_existing(expected_hash)
+        if existing is not None:
+            started_at = time.time()
+            result = await self._reuse_existing(existing, output_path, metadata, version)
+            await self._record_history(
+                url_or_id, started_at, "deduplicated",
+                filename=filename, file_path=result.file_path, **history_fields
+            )
+            return result
+
+        # ハッシュが一致しない同名のファイルは別のモデルのため、上書きせずに中止する
+        if await asyncio.to_thread(output_path.exists):
+            raise self._collision_error(output_path, url_or_id)
+
+        logger.info("Downloading model into library: model=%s, path=%s", url_or_id, output_path)
+
+        await self._download_to_path(
+            download_url, output_path,
+            progress_callback=progress_callback,
+            max_retries=max_retries,
+            chunk_size=chunk_size,
+            job_id=job_id,
+            source_url=url_or_id,
+            history_fields=history_fields,
+            overwrite=False
+        )
+        await self._save_sidecars(output_path, metadata, version)
+
+        model_info = await self._register(output_path)
+        if self.hash_index is not None and hashes.get("SHA256"):
+            self.hash_index.add(hashes["SHA256"], output_path, model_info.file_size)
+        logger.info(
+            "Registered downloaded model: id=%s, path=%s", model_info.id, output_path,
+            extra={"model_id": model_info.id, "path": str(output_path)}
+        )
+        return DownloadResult(
+            model=model_info,
+            file_path=str(output_path),
+            bytes_downloaded=model_info.file_size
+        )
+
+    async def download_model_files(
+        self,
+        url_or_id: str,
+        version_index: int = 0,
+        selection: Optional[FileSelection] = None,
+        include_previews: bool = True,
+        max_previews: int = 4,
+        max_parallel: int = 4,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_retries: int = 3,
+        chunk_size: int = 8192,
+        job_id: Optional[str] = None
+    ) -> GroupDownloadResult:
+        """モデルバージョンの複数ファイルを 1 ジョブとして並行ダウンロード
+
+        バージョンのファイル一覧から ``selection`` に合うもの（省略時は全ファイル）を
+        選び、プレビュー画像とともに並行して取得する。進捗は ``job_id`` で
+        全ファイルの合計として配信され、各ファイルの進捗は ``{job_id}:{番号}``
+        のジョブとして配信される。1 ファイルの失敗で他のファイルは中断しない。
+
+        Args:
+            url_or_id: Civitai URL またはモデル ID
+            version_index: モデルバージョンのインデックス（デフォルト: 0 = 最新）
+            selection: ファイルの選択条件（種別・精度・形式）
+            include_previews: プレビュー画像も取得するか
+            max_previews: 取得するプレビュー画像の最大数
+            max_parallel: 同時にダウンロードするファイル数
+            progress_callback: 集約した進捗のコールバック (downloaded_bytes, total_bytes)
+            max_retries: ファイルごとの最大リトライ回数
+            chunk_size: チャンクサイズ（バイト）
+            job_id: グループ全体のジョブ ID（省略時は自動生成）
+
+        Returns:
+            ファイルごとの結果と登録されたモデル
+
+        Raises:
+            ConfigurationError: CivitaiClient またはスキャナーが未設定の場合
+            DownloadError: メタデータ取得失敗時、または条件に合うファイルがない場合
+        """
+        if not self.civitai_client or not self.scanner:
+            raise ConfigurationError(
+                "download_model_files requires a CivitaiClient and a ModelScanner",
+                details={"url": url_or_id}
+            )
+
+        job_id = job_id or uuid.uuid4().hex
+        metadata = await self.civitai_client.get_model_metadata(url_or_id)
+        version = self._select_version(metadata, url_or_id, version_index)
+        version_files = self.civitai_client.parse_version_files(metadata, url_or_id, version_index)
+
+        files = [
+            file for file in version_files.files
+            if file.download_url and (selection is None or selection.matches(file))
+        ]
+        if not files:
+            raise DownloadError(
+                "No files in model version match the selection",
+                details={
+                    "model_id": url_or_id,
+                    "available_files": [file.name for file in version_files.files],
+                }
+            )
+
+        paths = [self._group_file_path(metadata.get("type"), file) for file in files]
+        anchor = self._preview_anchor(files, paths)
+        progress = GroupProgress(
+            job_id=job_id,
+            filename=f"{version_files.model_name or url_or_id} ({len(files)} files)",
+            expected_sizes=[file.size_bytes for file in files],
+            bus=self.progress_bus,
+            callback=progress_callback,
+            interval=self.progress_interval
+        )
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+        history_fields = {"model_id": metadata.get("id"), "version_id": version.get("id")}
+        preview_urls = version_files.preview_urls[:max_previews] if include_previews else []
+
+        logger.info(
+            "Downloading %d files of model version: model=%s, version=%s, job_id=%s",
+            len(files), url_or_id, version.get("id"), job_id
+        )
+        *file_results, previews = await asyncio.gather(
+            *(
+                self._fetch_group_file(
+                    index, file, path, progress, semaphore,
+                    job_id=job_id,
+                    source_url=url_or_id,
+                    max_retries=max_retries,
+                    chunk_size=chunk_size,
+                    history_fields=history_fields
+                )
+                for index, (file, path) in enumerate(zip(files, paths))
+            ),
+            self._download_previews(preview_urls, anchor)
+        )
+
+        models = []
+        for file, result in zip(files, file_results):
+            if result.status == "failed":
+                continue
+            model = await self._register_group_file(
+                file, Path(result.file_path), result, metadata, version
+            )
+            if model is not None:
+                models.append(model)
+
+        failed = [result.name for result in file_results if result.status == "failed"]
+        if failed:
+            progress.finish("failed", error=f"Failed to download: {', '.join(failed)}")
+        else:
+            progress.finish("completed")
+
+        return GroupDownloadResult(
+            job_id=job_id,
+            model_id=metadata.get("id"),
+            version_id=version.get("id"),
+            files=list(file_results),
+            previews=[str(path) for path in previews],
+            models=models,
+            bytes_downloaded=sum(result.bytes_downloaded for result in file_results)
+        )
+
+    def _group_file_path(self, model_type: Optional[str], file: VersionFile) -> Path:
+        """グループ内のファイルの保存先（VAE ファイルは VAE ディレクトリへ）"""
+        civitai_type = "VAE" if file.type.lower() == "vae" else model_type
+        return self.library_path_for(civitai_type, file.name)
+
+    def _preview_anchor(self, files: list[VersionFile], paths: list[Path]) -> Path:
+        """プレビュー画像を並べるファイル（primary → モデルファイル → 先頭）"""
+        for file, path in zip(files, paths):
+            if file.primary:
+                return path
+        for file, path in zip(files, paths):
+            if file.type.lower() in MODEL_FILE_TYPES:
+                return path
+        return paths[0]
+
+    async def _fetch_group_file(
+        self,
+        index: int,
+        file: VersionFile,
+        output_path: Path,
+        progress: GroupProgress,
+        semaphore: asyncio.Semaphore,
+        job_id: str,
+        source_url: str,
+        max_retries: int,
+        chunk_size: int,
+        history_fields: dict[str, Any]
+    ) -> VersionFileResult:
+        """グループ内の 1 ファイルを取得（既存の同一ファイルがあれば再利用）"""
+        expected_hash = file.hashes.get("SHA256") or file.hashes.get("AutoV2")
+        existing = self._find_existing(expected_hash)
+        if existing is not None:
+            started_at = time.time()
+            method: DedupMethod = "alias"
+            if existing != output_path and not output_path.exists():
+                method = await asyncio.to_thread(self._link_file, existing, output_path)
+            target = output_path if method != "alias" else existing
+            progress.complete(index, file.size_bytes)
+            await self._record_history(
+                source_url, started_at, "deduplicated",
+                filename=file.name, file_path=str(target), **history_fields
+            )
+            return VersionFileResult(
+                name=file.name, type=file.type, status="deduplicated",
+                file_path=str(target), dedup_method=method
+            )
+
+        async with semaphore:
+            try:
+                if await asyncio.to_thread(output_path.exists):
+                    raise self._collision_error(output_path, source_url)
+                path = await self._download_to_path(
+                    file.download_url, output_path,
+                    progress_callback=progress.part(index),
+                    max_retries=max_retries,
+                    chunk_size=chunk_size,
+                    job_id=f"{job_id}:{index}",
+                    source_url=source_url,
+                    history_fields=history_fields,
+                    overwrite=False
+                )
+            except DownloadError as e:
+                return VersionFileResult(
+                    name=file.name, type=file.type, status="failed", error=e.message
+                )
+
+        size = (await asyncio.to_thread(path.stat)).st_size
+        progress.complete(index, size)
+        return VersionFileResult(
+            name=file.name, type=file.type, status="downloaded",
+            file_path=str(path), bytes_downloaded=size
+        )
+
+    async def _register_group_file(
+        self,
+        file: VersionFile,
+        path: Path,
+        result: VersionFileResult,
+        metadata: dict[str, Any],
+        version: dict[str, Any]
+    ) -> Optional[ModelInfo]:
+        """取得したモデルファイルにサイドカーを付けて登録（モデル以外は何もしない）"""
+        if path.suffix.lower() not in self.scanner.supported_extensions:
+            return None
+
+        if result.dedup_method == "alias" and self.registry is not None:
+            registered = self.registry.get_by_path(str(path))
+            if registered is not None:
+                return registered
+
+        if file.type.lower() in MODEL_FILE_TYPES and result.dedup_method != "alias":
+            await self._save_sidecars(path, metadata, version, include_preview=False)
+
+        model_info = await self._register(path)
+        sha256 = file.hashes.get("SHA256")
+        if self.hash_index is not None and sha256:
+            self.hash_index.add(sha256, path, model_info.file_size)
+        return model_info
+
+    @staticmethod
+    def _collision_error(output_path: Path, source_url: str) -> DownloadError:
+        """ライブラリ内に内容の異なる同名のファイルがある場合のエラー"""
+        return DownloadError(
+            f"A different file already exists in the library: {output_path}",
+            details={"url": source_url, "existing_path": str(output_path)}
+        )
+
+    def _find_existing(self, file_hash: Optional[str]) -> Optional[Path]:
+        """ハッシュが一致するライブラリ内の既存ファイルを検索"""
+        if self.hash_index is None or not file_hash:
+            return None
+        return self.hash_index.lookup(file_hash)
+
+    async def _register(self, model_path: Path) -> ModelInfo:
+        """ライブラリ内のファイルから ModelInfo を作成してレジストリに追加"""
+        model_info = await self.scanner.scan_file(model_path)
+        if self.registry is not None:
+            self.registry.upsert(model_info)
+        return model_info
+
+    async def _reuse_existing(
+        self,
+        existing: Path,
+        output_path: Path,
+        metadata: dict[str, Any],
+        version: dict[str, Any]
+    ) -> DownloadResult:
+        """既存ファイルを再利用して転送を省略
+
+        要求された場所へのハードリンク、reflink の順に試み、どちらも
+        できない場合（別デバイス等）は既存ファイルをそのまま結果とする。
+        """
+        method: DedupMethod = "alias"
+        if existing != output_path and not output_path.exists():
+            method = await asyncio.to_thread(self._link_file, existing, output_path)
+
+        if method == "alias":
+            target = existing
+            model_info = (
+                self.registry.get_by_path(str(existing)) if self.registry is not None else None
+            ) or await self._register(existing)
+        else:
+            target = output_path
+            await self._save_sidecars(output_path, metadata, version)
+            model_info = await self._register(output_path)
+
+        logger.info(
+            "Skipped download of existing model: existing=%s, requested=%s, method=%s",
+            existing, output_path, method
+        )
+        return DownloadResult(
+            model=model_info,
+            file_path=str(target),
+            deduplicated=True,
+            dedup_method=method,
+            existing_path=str(existing)
+        )
+
+    @staticmethod
+    def _link_file(existing: Path, output_path: Path) -> DedupMethod:
+        """ハードリンク → reflink の順に作成を試みる（ブロッキング処理）"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(existing, output_path)
+            return "hardlink"
+        except OSError as e:
+            logger.debug("Hardlink failed, trying reflink: %s", str(e))
+        if reflink(existing, output_path):
+            return "reflink"
+        return "alias"
+
+    def library_path_for(self, civitai_type: Optional[str], filename: str) -> Path:
+        """Civitai のモデル種別からライブラリ内の保存先を決定
+
+        Args:
+            civitai_type: Civitai の ``type``（LORA, Checkpoint 等）
+            filename: ファイル名
+
+        Returns:
+            保存先パス
+
+        Raises:
+            ConfigurationError: スキャナーが未設定の場合
+        """
+        if not self.scanner:
+            raise ConfigurationError("Library placement requires a ModelScanner")
+
+        subdir = MODEL_TYPE_DIRS.get((civitai_type or "").lower(), OTHER_MODEL_DIR)
+        # パス区切りを含むファイル名でライブラリ外に書き込まないようにする
+        return self.scanner.base_path / "active" / subdir / Path(filename).name
+
+    @staticmethod
+    def _select_version(
+        metadata: dict[str, Any],
+        url_or_id: str,
+        version_index: int
+    ) -> dict[str, Any]:
+        """モデルメタデータからバージョンを選択"""
+        versions = metadata.get("modelVersions") or []
+        if not versions:
+            raise DownloadError("No model versions found", details={"model_id": url_or_id})
+        if version_index >= len(versions):
+            raise DownloadError(
+                f"Version index {version_index} out of range",
+                details={"model_id": url_or_id, "available_versions": len(versions)}
+            )
+        return versions[version_index]
+
+    @staticmethod
+    def _select_primary_file(version: dict[str, Any]) -> dict[str, Any]:
+        """バージョン内のメインファイルを選択（primary → Model → 先頭）"""
+        files = version.get("files") or []
+        for file in files:
+            if file.get("primary"):
+                return file
+        for file in files:
+            if file.get("type") == "Model":
+                return file
+        return files[0] if files else {}
+
+    async def _save_sidecars(
+        self,
+        model_path: Path,
+        metadata: dict[str, Any],
+        version: dict[str, Any],
+        include_preview: bool = True
+    ) -> None:
+        """``.civitai.info`` とプレビュー画像をモデルの隣に保存
+
+        サイドカーは by-hash API と同じモデルバージョン形式で保存する。
+        プレビュー画像の取得失敗はダウンロード全体の失敗とはしない。
+        """
+        info = {
+            **version,
+            "modelId": metadata.get("id", version.get("modelId")),
+            "model": {
+                "name": metadata.get("name"),
+                "type": metadata.get("type"),
+                "nsfw": metadata.get("nsfw"),
+            },
+            "description": version.get("description") or metadata.get("description"),
+            "tags": metadata.get("tags", []),
+        }
+        sidecar = civitai_info_path(model_path)
+        await asyncio.to_thread(
+            atomic_write_text, sidecar, json.dumps(info, ensure_ascii=False, indent=2)
+        )
+
+        images = version.get("images") or []
+        image_url = images[0].get("url") if images and isinstance(images[0], dict) else None
+        if include_preview and image_url:
+            await self._download_previews([image_url], model_path)
+
+    async def _download_previews(self, urls: list[str], model_path: Path) -> list[Path]:
+        """プレビュー画像を並行して取得し、モデルの隣に保存
+
+        1 枚目は ``<stem>.preview.png``、2 枚目以降は ``<stem>.preview.<番号>.png``
+        として保存する。取得失敗はダウンロード全体の失敗とはしない。
+
+        Returns:
+            保存できたプレビュー画像のパス
+        """
+        if not urls:
+            return []
+
+        async def fetch(client: httpx.AsyncClient, index: int, url: str) -> Optional[Path]:
+            suffix = ".preview.png" if index == 0 else f".preview.{index}.png"
+            preview_path = model_path.with_name(f"{model_path.stem}{suffix}")
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+                await asyncio.to_thread(atomic_write_bytes, preview_path, response.content)
+                return preview_path
+            except (httpx.HTTPError, OSError) as e:
+                logger.warning("Failed to save preview image for %s: %s", model_path.name, str(e))
+                return None
+
+        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            saved = await asyncio.gather(*(fetch(client, i, url) for i, url in enumerate(urls)))
+        return [path for path in saved if path is not None]
 
+    async def _download_to_path(
+        self,
+        download_url: str,
+        output_path: Path,
+        progress_callback: Optional[Callable[[int, int], None]],
+        max_retries: int,
+        chunk_size: int,
+        job_id: Optional[str],
+        source_url: str,
+        history_fields: Optional[dict[str, Any]] = None,
+        overwrite: bool = True
+    ) -> Path:
+        """リトライ付きで指定パスへダウンロード（内部メソッド）
+
+        結果（成功・失敗）はダウンロード履歴に記録する。
+
+        Args:
+            download_url: 直接ダウンロード URL
+            output_path: 保存先パス
+            progress_callback: 進捗コールバック
+            max_retries: 最大リトライ回数
+            chunk_size: チャンクサイズ
+            job_id: 進捗イベントのジョブ ID
+            source_url: ログ・エラー・履歴用の元 URL
+            history_fields: 履歴に追加で記録する項目（model_id, version_id）
+            overwrite: False の場合、保存先に既にファイルがあれば上書きせずに失敗する
+
+        Returns:
+            ダウンロードしたファイルのパス
+
+        Raises:
+            DownloadError: ダウンロード失敗時
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        filename = output_path.name
+
+        tracker = ProgressTracker(
+            job_id=job_id or uuid.uuid4().hex,
+            filename=filename,
+            bus=self.progress_bus,
+            callback=progress_callback,
+            interval=self.progress_interval
+        )
+        shaper = self.bandwidth_limiter.create_shaper()
+        history_fields = {"filename": filename, **(history_fields or {})}
+        started_at = time.time()
+
+        DOWNLOADS_ACTIVE.inc()
+        try:
+            return await self._download_attempts(
+                download_url, output_path, tracker, shaper, max_retries, chunk_size,
+                source_url, started_at, history_fields, overwrite
+            )
+        finally:
+            DOWNLOADS_ACTIVE.dec()
+
+    async def _download_attempts(
+        self,
+        download_url: str,
+        output_path: Path,
+        tracker: ProgressTracker,
+        shaper: DownloadShaper,
+        max_retries: int,
+        chunk_size: int,
+        source_url: str,
+        started_at: float,
+        history_fields: dict[str, Any],
+        overwrite: bool = True
+    ) -> Path:
+        """ダウンロードをリトライしながら実行し、結果を履歴とメトリクスに記録"""
+        filename = output_path.name
         last_error = None
 
         for attempt in range(max_retries):
             try:
+                tracker.reset()
                 result = await self._download_with_progress(
-                    download_url, output_path, progress_callback, chunk_size
+                    download_url, output_path, tracker, chunk_size, shaper, overwrite
+                )
+                tracker.finish("completed")
+                elapsed = time.time() - started_at
+                logger.info(
+                    "Download completed: filename=%s, path=%s", filename, result,
+                    extra={
+                        "model_id": history_fields.get("model_id"), "path": str(result),
+                        "duration": elapsed, "bytes": tracker.downloaded_bytes,
+                    }
+                )
+                DOWNLOADS.labels("completed").inc()
+                DOWNLOAD_DURATION.observe(elapsed)
+                if elapsed > 0:
+                    DOWNLOAD_THROUGHPUT.observe(tracker.downloaded_bytes / 1e6 / elapsed)
+                await self._record_history(
+                    source_url, started_at, "completed",
+                    bytes_transferred=tracker.downloaded_bytes, retries=attempt,
+                    file_path=str(result), **history_fields
                 )
-                logger.info("Download completed: filename=%s, path=%s", filename, result)
                 return result
+            except FileExistsError as e:
+                # 別のダウンロードが同じパスに先に配置した（リトライしても解消しない）
+                last_error = e
+                break
             except Exception as e:
                 last_error = e
                 if attempt < max_retries - 1:
@@ -85,22 +771,47 @@ class DownloadService:
                         "Download failed (attempt %d/%d), retrying: %s",
                         attempt + 1, max_retries, str(e)
                     )
+                    DOWNLOAD_RETRIES.inc()
                     # リトライ前に少し待機
                     await asyncio.sleep(1.0 * (attempt + 1))
                     continue
                 # 最後のリトライも失敗した場合
                 logger.error(
                     "Download failed after %d attempts: url=%s, error=%s",
-                    max_retries, url, str(e)
+                    max_retries, source_url, str(e)
                 )
                 break
 
         # すべてのリトライが失敗
+        DOWNLOADS.labels("failed").inc()
+        tracker.finish("failed", error=str(last_error))
+        await self._record_history(
+            source_url, started_at, "failed",
+            bytes_transferred=tracker.downloaded_bytes, retries=max_retries - 1,
+            error=str(last_error), **history_fields
+        )
+        if isinstance(last_error, FileExistsError):
+            raise self._collision_error(output_path, source_url)
         raise DownloadError(
             f"Failed to download file after {max_retries} attempts: {str(last_error)}",
-            details={"url": url, "filename": filename, "error": str(last_error)}
+            details={"url": source_url, "filename": filename, "error": str(last_error)}
         )
 
+    async def _record_history(
+        self,
+        url: str,
+        started_at: float,
+        status: HistoryStatus,
+        **fields
+    ) -> None:
+        """ダウンロード履歴を記録（記録の失敗はダウンロード結果に影響させない）"""
+        if self.history is None:
+            return
+        try:
+            await self.history.record(history_entry(url, started_at, status, **fields))
+        except sqlite3.Error as e:
+            logger.warning("Failed to record download history: url=%s, error=%s", url, str(e))
+
     def _is_civitai_url(self, url: str) -> bool:
         """Civitai URL かどうかを判定
 
@@ -116,21 +827,26 @@ class DownloadService:
         self,
         url: str,
         output_path: Path,
-        progress_callback: Optional[Callable[[int, int], None]],
-        chunk_size: int
+        tracker: ProgressTracker,
+        chunk_size: int,
+        shaper: Optional[DownloadShaper] = None,
+        overwrite: bool = True
     ) -> Path:
         """進捗付きダウンロード（内部メソッド）
 
         Args:
             url: ダウンロード URL
             output_path: 保存先パス
-            progress_callback: 進捗コールバック
+            tracker: 進捗トラッカー
             chunk_size: チャンクサイズ
+            shaper: 帯域制御（受信量に応じて待機する）
+            overwrite: False の場合、既存のファイルを上書きしない
 
         Returns:
             ダウンロードしたファイルのパス
 
         Raises:
+            FileExistsError: overwrite が False で、保存先に既にファイルがある場合
             Exception: ダウンロード失敗時
         """
         async with httpx.AsyncClient(timeout=30.0) as client:
@@ -140,12 +856,27 @@ class DownloadService:
                 total_size = int(response.headers.get("content-length", 0))
                 downloaded_size = 0
 
-                with output_path.open("wb") as f:
-                    async for chunk in response.aiter_bytes(chunk_size):
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
+                # 一時ファイルに書き込み、完了後に配置（書きかけを公開しない）。
+                # 一時ファイル名はダウンロードごとに一意にし、同じ保存先への
+                # ダウンロードが並行しても互いの書き込みを壊さない
+                partial_path = output_path.with_name(
+                    f".{output_path.name}.{secrets.token_hex(8)}{PARTIAL_SUFFIX}"
+                )
+                try:
+                    with partial_path.open("wb") as f:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            f.write(chunk)
+                            DOWNLOAD_BYTES.inc(len(chunk))
+                            if shaper is not None:
+                                await shaper.consume(len(chunk))
 
-                        if progress_callback and total_size > 0:
-                            progress_callback(downloaded_size, total_size)
+                            downloaded_size += len(chunk)
+                            tracker.update(downloaded_size, total_size)
 
+                    if overwrite:
+                        os.replace(partial_path, output_path)
+                    else:
+                        place_file(partial_path, output_path)
+                finally:
+                    partial_path.unlink(missing_ok=True)
                 return output_path
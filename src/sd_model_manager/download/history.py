@@ -0,0 +1,232 @@
+"""ダウンロード履歴の永続化（SQLite WAL）"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+HistoryStatus = Literal["completed", "failed", "deduplicated"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS download_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    url TEXT NOT NULL,
+    model_id INTEGER,
+    version_id INTEGER,
+    filename TEXT,
+    file_path TEXT,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    duration REAL NOT NULL DEFAULT 0,
+    throughput REAL NOT NULL DEFAULT 0,
+    retries INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_started_at ON download_history (started_at);
+CREATE INDEX IF NOT EXISTS idx_history_status ON download_history (status, id);
+CREATE INDEX IF NOT EXISTS idx_history_model_id ON download_history (model_id, id);
+"""
+
+_COLUMNS = (
+    "id, started_at, finished_at, url, model_id, version_id, filename, file_path, "
+    "bytes, duration, throughput, retries, status, error"
+)
+
+
+class DownloadHistoryEntry(BaseModel):
+    """ダウンロード履歴 1 件"""
+
+    id: Optional[int] = None
+    started_at: float
+    finished_at: float
+    url: str
+    model_id: Optional[int] = None
+    version_id: Optional[int] = None
+    filename: Optional[str] = None
+    file_path: Optional[str] = None
+    bytes: int = 0
+    duration: float = 0.0
+    throughput: float = 0.0  # バイト/秒
+    retries: int = 0
+    status: HistoryStatus
+    error: Optional[str] = None
+
+
+class DownloadHistoryPage(BaseModel):
+    """履歴の 1 ページ（新しい順）
+
+    ``next_cursor`` を次回の ``cursor`` に渡すと続きを取得できる。
+    """
+
+    items: list[DownloadHistoryEntry]
+    next_cursor: Optional[int] = None
+
+
+class DownloadHistoryStore:
+    """ダウンロード履歴ストア
+
+    追記が中心のため WAL モードで書き込みと読み込みを並行させる。
+    一覧は id を使ったキーセットページネーションで取得するので、
+    件数が増えても OFFSET のような走査コストがかからない。
+    接続は初回アクセス時に開く。
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite データベースファイルのパス
+        """
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """接続を取得（初回はスキーマを作成）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.info("Download history store opened: %s", self.db_path)
+        return self._conn
+
+    def record_sync(self, entry: DownloadHistoryEntry) -> int:
+        """履歴を追加（ブロッキング処理）
+
+        Args:
+            entry: 追加する履歴
+
+        Returns:
+            採番された ID
+        """
+        data = entry.model_dump(exclude={"id"})
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                f"INSERT INTO download_history ({', '.join(data)}) "
+                f"VALUES ({', '.join('?' for _ in data)})",
+                tuple(data.values())
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    async def record(self, entry: DownloadHistoryEntry) -> int:
+        """履歴を追加
+
+        Args:
+            entry: 追加する履歴
+
+        Returns:
+            採番された ID
+        """
+        return await asyncio.to_thread(self.record_sync, entry)
+
+    def query_sync(
+        self,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        status: Optional[str] = None,
+        model_id: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> DownloadHistoryPage:
+        """履歴を新しい順に取得（ブロッキング処理）
+
+        Args:
+            limit: 取得件数
+            cursor: 前ページの ``next_cursor``（この ID より古いものを取得）
+            status: ステータスで絞り込み
+            model_id: モデル ID で絞り込み
+            since: 開始時刻（UNIX 時刻）以降
+            until: 開始時刻（UNIX 時刻）より前
+
+        Returns:
+            履歴ページ
+        """
+        conditions = []
+        params: list = []
+        if cursor is not None:
+            conditions.append("id < ?")
+            params.append(cursor)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if model_id is not None:
+            conditions.append("model_id = ?")
+            params.append(model_id)
+        if since is not None:
+            conditions.append("started_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("started_at < ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT {_COLUMNS} FROM download_history {where} ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+
+        items = [DownloadHistoryEntry(**dict(row)) for row in rows[:limit]]
+        next_cursor = items[-1].id if len(rows) > limit else None
+        return DownloadHistoryPage(items=items, next_cursor=next_cursor)
+
+    async def query(self, **filters) -> DownloadHistoryPage:
+        """履歴を新しい順に取得（引数は ``query_sync`` を参照）"""
+        return await asyncio.to_thread(self.query_sync, **filters)
+
+    def close(self) -> None:
+        """接続をクローズ"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def history_entry(
+    url: str,
+    started_at: float,
+    status: HistoryStatus,
+    bytes_transferred: int = 0,
+    retries: int = 0,
+    **fields
+) -> DownloadHistoryEntry:
+    """経過時間とスループットを計算して履歴エントリを作成
+
+    Args:
+        url: 要求された URL
+        started_at: 開始時刻（UNIX 時刻）
+        status: 結果
+        bytes_transferred: 転送バイト数
+        retries: リトライ回数
+        **fields: その他の項目（model_id, filename 等）
+
+    Returns:
+        履歴エントリ
+    """
+    finished_at = time.time()
+    duration = max(0.0, finished_at - started_at)
+    return DownloadHistoryEntry(
+        url=url,
+        started_at=started_at,
+        finished_at=finished_at,
+        status=status,
+        bytes=bytes_transferred,
+        duration=duration,
+        throughput=bytes_transferred / duration if duration > 0 else 0.0,
+        retries=retries,
+        **fields
+    )
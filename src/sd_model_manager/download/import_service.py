@@ -0,0 +1,360 @@
+"""ローカル・NAS からのモデルインポートサービス"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Iterable, Literal, Optional, Union
+
+from sd_model_manager.download.download_service import (
+    MODEL_TYPE_DIRS,
+    OTHER_MODEL_DIR,
+    PARTIAL_SUFFIX,
+)
+from sd_model_manager.download.models import (
+    ImportedFile,
+    ImportFailure,
+    ImportResult,
+    ImportSkipped,
+)
+from sd_model_manager.lib.file_utils import COPY_BUFFER_SIZE, copy_file, place_file
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.scanner import ModelScanner, civitai_info_path
+
+logger = logging.getLogger(__name__)
+
+# スキャナーのモデル種別 → ライブラリ内のサブディレクトリ
+SCANNER_TYPE_DIRS = {
+    "LoRA": "loras",
+    "Checkpoint": "checkpoints",
+    "VAE": "vae",
+    "Embedding": "embeddings",
+}
+
+# モデルの付随ファイル名のうち、モデル名（拡張子なし、または拡張子付き）に続く部分
+# （.civitai.info, .preview.png, .preview.1.png, .png, .txt, .json, .yaml 等）
+SIDECAR_SUFFIX_PATTERN = re.compile(
+    r"(?:\.preview(?:\.\d+)?)?\.(?:png|jpe?g|webp|gif|mp4|webm)"
+    r"|\.civitai\.info|\.json|\.txt|\.ya?ml",
+    re.IGNORECASE
+)
+
+ImportCategory = Literal["active", "archive"]
+ImportOutcome = Union[ImportedFile, ImportSkipped, ImportFailure]
+
+
+class ImportService:
+    """ローカルパス・ディレクトリからライブラリへモデルを取り込むサービス
+
+    ファイルは種別ごとのライブラリディレクトリ（例: ``active/loras/``）へ
+    コピーする。コピーは reflink → copy_file_range → 大きなバッファでの
+    ストリーミングの順に試し、データをユーザー空間に通さずに済む方法を
+    優先する。SHA256 はコピーと同時に計算してハッシュインデックスに登録し、
+    ``.civitai.info`` やプレビュー画像などのサイドカーも一緒に取り込む。
+    ライブラリ内にあるファイルはコピーせずにその場で登録する。
+    """
+
+    def __init__(
+        self,
+        scanner: ModelScanner,
+        registry: Optional[ModelRegistry] = None,
+        hash_index: Optional[HashIndex] = None,
+        concurrency: int = 4,
+        buffer_size: int = COPY_BUFFER_SIZE
+    ):
+        """
+        Args:
+            scanner: ライブラリのスキャナー（配置先とモデル情報の作成に使用）
+            registry: 取り込んだモデルを登録するレジストリ
+            hash_index: 重複検出と登録に使うハッシュインデックス
+            concurrency: 同時にコピーするファイル数
+            buffer_size: コピーのバッファサイズ（バイト）
+        """
+        self.scanner = scanner
+        self.registry = registry
+        self.hash_index = hash_index
+        self.concurrency = max(1, concurrency)
+        self.buffer_size = buffer_size
+
+    async def import_paths(
+        self,
+        paths: Iterable[Union[str, Path]],
+        category: ImportCategory = "active"
+    ) -> ImportResult:
+        """ファイル・ディレクトリをライブラリへ取り込む
+
+        ディレクトリは再帰的に走査し、対応する拡張子のモデルファイルを対象とする。
+        個々のファイルの失敗は結果に記録し、残りの取り込みは継続する。
+
+        Args:
+            paths: 取り込むファイルまたはディレクトリ
+            category: 取り込み先のカテゴリ（active / archive）
+
+        Returns:
+            ファイルごとの取り込み結果
+        """
+        started = time.monotonic()
+        sources, failed = await asyncio.to_thread(self._collect_sources, list(paths))
+        logger.info("Importing %d model files into library (category=%s)", len(sources), category)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(source: Path, sidecars: list[Path]) -> ImportOutcome:
+            async with semaphore:
+                try:
+                    return await self._import_file(source, sidecars, category)
+                except OSError as e:
+                    logger.error("Failed to import %s: %s", source, str(e))
+                    return ImportFailure(source_path=str(source), error=str(e))
+
+        outcomes = await asyncio.gather(*(run(source, sidecars) for source, sidecars in sources))
+
+        result = ImportResult(failed=failed)
+        for outcome in outcomes:
+            if isinstance(outcome, ImportedFile):
+                result.imported.append(outcome)
+                result.bytes_copied += outcome.bytes_copied
+            elif isinstance(outcome, ImportSkipped):
+                result.skipped.append(outcome)
+            else:
+                result.failed.append(outcome)
+        result.duration = time.monotonic() - started
+
+        logger.info(
+            "Import completed: imported=%d, skipped=%d, failed=%d, bytes=%d, duration=%.1fs",
+            len(result.imported), len(result.skipped), len(result.failed),
+            result.bytes_copied, result.duration
+        )
+        return result
+
+    def _collect_sources(
+        self,
+        paths: list[Union[str, Path]]
+    ) -> tuple[list[tuple[Path, list[Path]]], list[ImportFailure]]:
+        """取り込み対象のモデルファイルとサイドカーを列挙（ブロッキング処理）
+
+        ディレクトリの一覧はディレクトリごとに 1 回だけ取得する
+        （NAS 上ではディレクトリ一覧の取得が高価なため）。
+        """
+        listings: dict[Path, list[str]] = {}
+        selected: dict[Path, None] = {}
+        failed: list[ImportFailure] = []
+
+        for path in map(Path, paths):
+            if path.is_dir():
+                for dirpath, _, filenames in os.walk(path):
+                    directory = Path(dirpath)
+                    listings[directory] = filenames
+                    for name in sorted(filenames):
+                        if self._is_model_file(name):
+                            selected[directory / name] = None
+            elif path.is_file() and self._is_model_file(path.name):
+                if path.parent not in listings:
+                    listings[path.parent] = os.listdir(path.parent)
+                selected[path] = None
+            else:
+                failed.append(ImportFailure(
+                    source_path=str(path), error="Not a model file or directory"
+                ))
+
+        sources = [
+            (source, self._find_sidecars(source, listings[source.parent]))
+            for source in selected
+        ]
+        return sources, failed
+
+    def _is_model_file(self, name: str) -> bool:
+        return Path(name).suffix.lower() in self.scanner.supported_extensions
+
+    @staticmethod
+    def _is_sidecar_of(source: Path, name: str) -> bool:
+        """モデル名に既知のサイドカーの接尾辞が続くファイルか
+
+        ``foo.safetensors`` に対して ``foo.bar.safetensors.civitai.info`` のような
+        別モデルの付随ファイルを拾わないよう、接尾辞は完全一致で判定する。
+        """
+        for base in (source.stem, source.name):
+            if name.startswith(base) and SIDECAR_SUFFIX_PATTERN.fullmatch(name[len(base):]):
+                return True
+        return False
+
+    def _find_sidecars(self, source: Path, names: list[str]) -> list[Path]:
+        """モデルの付随ファイル（.civitai.info, .preview.png 等）"""
+        return [
+            source.parent / name for name in sorted(names)
+            if name != source.name and self._is_sidecar_of(source, name)
+        ]
+
+    async def _import_file(
+        self,
+        source: Path,
+        sidecars: list[Path],
+        category: ImportCategory
+    ) -> ImportOutcome:
+        """1 ファイルを取り込む"""
+        info = await asyncio.to_thread(self._read_sidecar, source)
+        known_hash = self._sidecar_sha256(info, source.name)
+
+        if self._is_in_library(source):
+            model = await self._register(source)
+            if self.hash_index is not None and known_hash:
+                self.hash_index.add(known_hash, source, model.file_size)
+            return ImportedFile(
+                source_path=str(source),
+                file_path=str(source),
+                method="in_place",
+                sha256=known_hash,
+                model=model
+            )
+
+        existing = self._find_duplicate(known_hash)
+        if existing is not None:
+            return ImportSkipped(
+                source_path=str(source), reason="duplicate", existing_path=str(existing)
+            )
+
+        destination = self.library_path_for(source, info, category)
+        if destination.exists():
+            return ImportSkipped(
+                source_path=str(source), reason="exists", existing_path=str(destination)
+            )
+
+        try:
+            method, sha256, size = await asyncio.to_thread(self._copy, source, destination)
+        except FileExistsError:
+            # 同じ配置先への別の取り込みが先に完了した
+            return ImportSkipped(
+                source_path=str(source), reason="exists", existing_path=str(destination)
+            )
+
+        # サイドカーにハッシュがなかった場合は、コピー後のハッシュで重複を確認
+        existing = self._find_duplicate(sha256) if known_hash is None else None
+        if existing is not None and existing != destination:
+            await asyncio.to_thread(destination.unlink)
+            return ImportSkipped(
+                source_path=str(source), reason="duplicate", existing_path=str(existing)
+            )
+
+        copied_sidecars = await asyncio.to_thread(self._copy_sidecars, sidecars, destination.parent)
+        model = await self._register(destination)
+        if self.hash_index is not None and sha256:
+            self.hash_index.add(sha256, destination, size)
+
+        logger.info("Imported %s -> %s (%s)", source, destination, method)
+        return ImportedFile(
+            source_path=str(source),
+            file_path=str(destination),
+            method=method,
+            sha256=sha256,
+            bytes_copied=size,
+            sidecars=[str(path) for path in copied_sidecars],
+            model=model
+        )
+
+    def library_path_for(
+        self,
+        source: Path,
+        info: Optional[dict[str, Any]],
+        category: ImportCategory = "active"
+    ) -> Path:
+        """取り込み先のパスを決定
+
+        ``.civitai.info`` のモデル種別を優先し、なければ取り込み元の
+        ディレクトリ名（例: ``loras``）から判定する。
+
+        Args:
+            source: 取り込み元のファイル
+            info: ``.civitai.info`` の内容
+            category: 取り込み先のカテゴリ
+
+        Returns:
+            ライブラリ内の保存先パス
+        """
+        civitai_type = ((info or {}).get("model") or {}).get("type")
+        if civitai_type:
+            subdir = MODEL_TYPE_DIRS.get(civitai_type.lower(), OTHER_MODEL_DIR)
+        else:
+            subdir = SCANNER_TYPE_DIRS.get(
+                self.scanner.detect_model_type(source), OTHER_MODEL_DIR
+            )
+        return self.scanner.base_path / category / subdir / source.name
+
+    def _is_in_library(self, source: Path) -> bool:
+        return source.resolve().is_relative_to(self.scanner.base_path.resolve())
+
+    def _find_duplicate(self, sha256: Optional[str]) -> Optional[Path]:
+        if self.hash_index is None or not sha256:
+            return None
+        return self.hash_index.lookup(sha256)
+
+    @staticmethod
+    def _read_sidecar(source: Path) -> Optional[dict[str, Any]]:
+        """取り込み元の ``.civitai.info`` を読み込む（ブロッキング処理）"""
+        try:
+            return json.loads(civitai_info_path(source).read_text("utf-8"))
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Ignoring unreadable sidecar for %s: %s", source.name, str(e))
+            return None
+
+    @staticmethod
+    def _sidecar_sha256(info: Optional[dict[str, Any]], filename: str) -> Optional[str]:
+        """サイドカーに記録された SHA256 を取得（ファイル名が一致するもの）"""
+        for file in (info or {}).get("files") or []:
+            if file.get("name") == filename:
+                return (file.get("hashes") or {}).get("SHA256")
+        return None
+
+    def _copy(self, source: Path, destination: Path) -> tuple[str, str, int]:
+        """一時ファイルへコピーしてから配置（ブロッキング処理）
+
+        一時ファイル名は取り込みごとに一意にし、配置はハードリンクで行うため、
+        同じ配置先への取り込みが並行しても互いの一時ファイルや完成したファイルを
+        上書きしない。
+
+        Raises:
+            FileExistsError: 配置先が既に存在する（別の取り込みが先に配置した）
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(
+            f".{destination.name}.{secrets.token_hex(8)}{PARTIAL_SUFFIX}"
+        )
+
+        method, sha256 = copy_file(source, partial, buffer_size=self.buffer_size)
+        try:
+            stat = source.stat()
+            os.utime(partial, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            place_file(partial, destination)
+        finally:
+            partial.unlink(missing_ok=True)
+        return method, sha256, stat.st_size
+
+    @staticmethod
+    def _copy_sidecars(sidecars: list[Path], directory: Path) -> list[Path]:
+        """サイドカーをコピー（既存のものは上書きしない。ブロッキング処理）"""
+        copied = []
+        for sidecar in sidecars:
+            target = directory / sidecar.name
+            if target.exists():
+                continue
+            try:
+                shutil.copyfile(sidecar, target)
+                copied.append(target)
+            except OSError as e:
+                logger.warning("Failed to copy sidecar %s: %s", sidecar, str(e))
+        return copied
+
+    async def _register(self, model_path: Path) -> ModelInfo:
+        """ModelInfo を作成してレジストリに追加"""
+        model = await self.scanner.scan_file(model_path)
+        if self.registry is not None:
+            self.registry.upsert(model)
+        return model
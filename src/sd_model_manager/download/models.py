@@ -0,0 +1,171 @@
+"""ダウンロード関連のデータモデル"""
+
+from typing import Any, Literal, Optional
+from pydantic import BaseModel
+
+from sd_model_manager.lib.file_utils import CopyMethod
+from sd_model_manager.registry.models import ModelInfo
+
+DedupMethod = Literal["hardlink", "reflink", "alias"]
+# ローカルインポートの方法（in_place はライブラリ内のファイルをコピーせず登録）
+ImportMethod = Literal[CopyMethod, "in_place"]
+
+
+class DownloadResult(BaseModel):
+    """ライブラリへのダウンロード結果
+
+    ライブラリに同一ハッシュのファイルが既にあった場合は転送を行わず、
+    ``dedup_method`` にその対応方法を記録する。
+    """
+
+    model: ModelInfo
+    file_path: str
+    deduplicated: bool = False
+    dedup_method: Optional[DedupMethod] = None
+    existing_path: Optional[str] = None
+    bytes_downloaded: int = 0
+
+
+class VersionFile(BaseModel):
+    """モデルバージョンに含まれる 1 ファイル
+
+    ``type`` は Civitai のファイル種別（Model, Pruned Model, VAE, Config 等）、
+    ``precision`` / ``size_variant`` / ``format`` は Civitai の ``metadata``
+    （fp, size, format）に対応する。
+    """
+
+    id: Optional[int] = None
+    name: str
+    type: str = "Model"
+    size_bytes: int = 0
+    format: Optional[str] = None
+    precision: Optional[str] = None
+    size_variant: Optional[str] = None
+    hashes: dict[str, str] = {}
+    download_url: str
+    primary: bool = False
+
+    @classmethod
+    def from_civitai(
+        cls,
+        file: dict[str, Any],
+        fallback_url: Optional[str] = None
+    ) -> "VersionFile":
+        """Civitai API のファイル情報から作成"""
+        metadata = file.get("metadata") or {}
+        return cls(
+            id=file.get("id"),
+            name=file.get("name") or f"{file.get('id', 'file')}",
+            type=file.get("type") or "Model",
+            size_bytes=int((file.get("sizeKB") or 0) * 1024),
+            format=metadata.get("format"),
+            precision=metadata.get("fp"),
+            size_variant=metadata.get("size"),
+            hashes=file.get("hashes") or {},
+            download_url=file.get("downloadUrl") or fallback_url or "",
+            primary=bool(file.get("primary"))
+        )
+
+
+class ModelVersionFiles(BaseModel):
+    """モデルバージョンのファイル一覧とプレビュー画像"""
+
+    model_id: Optional[int] = None
+    model_name: Optional[str] = None
+    model_type: Optional[str] = None
+    version_id: Optional[int] = None
+    version_name: Optional[str] = None
+    files: list[VersionFile]
+    preview_urls: list[str] = []
+
+
+class FileSelection(BaseModel):
+    """ダウンロードするファイルの選択条件（大文字小文字を区別しない）
+
+    各条件は指定されたものだけを適用し、すべて満たすファイルを選択する。
+    """
+
+    types: Optional[list[str]] = None
+    precisions: Optional[list[str]] = None
+    formats: Optional[list[str]] = None
+    primary_only: bool = False
+
+    def matches(self, file: VersionFile) -> bool:
+        """ファイルが条件を満たすか"""
+        if self.primary_only and not file.primary:
+            return False
+        criteria = (
+            (self.types, file.type),
+            (self.precisions, file.precision),
+            (self.formats, file.format),
+        )
+        for accepted, value in criteria:
+            if accepted is not None and (value or "").lower() not in {a.lower() for a in accepted}:
+                return False
+        return True
+
+
+class VersionFileResult(BaseModel):
+    """グループダウンロード内の 1 ファイルの結果"""
+
+    name: str
+    type: str
+    status: Literal["downloaded", "deduplicated", "failed"]
+    file_path: Optional[str] = None
+    dedup_method: Optional[DedupMethod] = None
+    bytes_downloaded: int = 0
+    error: Optional[str] = None
+
+
+class GroupDownloadResult(BaseModel):
+    """モデルバージョンの複数ファイルを 1 ジョブでダウンロードした結果"""
+
+    job_id: str
+    model_id: Optional[int] = None
+    version_id: Optional[int] = None
+    files: list[VersionFileResult]
+    previews: list[str] = []
+    models: list[ModelInfo] = []
+    bytes_downloaded: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        """すべてのファイルを取得できたか"""
+        return all(file.status != "failed" for file in self.files)
+
+
+class ImportedFile(BaseModel):
+    """ライブラリへ取り込んだファイル"""
+
+    source_path: str
+    file_path: str
+    method: ImportMethod
+    sha256: Optional[str] = None
+    bytes_copied: int = 0
+    sidecars: list[str] = []
+    model: ModelInfo
+
+
+class ImportSkipped(BaseModel):
+    """取り込みを省略したファイル（同名ファイルや同一ハッシュが既に存在）"""
+
+    source_path: str
+    reason: str
+    existing_path: Optional[str] = None
+
+
+class ImportFailure(BaseModel):
+    """取り込みに失敗したファイル"""
+
+    source_path: str
+    error: str
+
+
+class ImportResult(BaseModel):
+    """ローカルインポートの結果"""
+
+    imported: list[ImportedFile] = []
+    skipped: list[ImportSkipped] = []
+    failed: list[ImportFailure] = []
+    bytes_copied: int = 0
+    duration: float = 0.0
@@ -0,0 +1,302 @@
+"""ダウンロード進捗のサンプリングと配信（pub/sub）"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Callable, Literal, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ProgressStatus = Literal["downloading", "completed", "failed"]
+
+
+class ProgressEvent(BaseModel):
+    """ダウンロード進捗イベント"""
+
+    job_id: str
+    filename: str
+    status: ProgressStatus
+    downloaded_bytes: int
+    total_bytes: int
+    bytes_per_second: float = 0.0
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    timestamp: datetime
+
+
+class ProgressSubscription:
+    """進捗イベントの購読
+
+    ジョブごとに最新イベントのみを保持する（conflation）。購読側の処理が
+    遅くても古いイベントが上書きされるだけで、配信側は待たされない。
+    """
+
+    def __init__(self, bus: "ProgressBus", job_id: Optional[str] = None):
+        """
+        Args:
+            bus: 購読元のバス
+            job_id: 対象ジョブ ID（None の場合は全ジョブ）
+        """
+        self._bus = bus
+        self.job_id = job_id
+        self._pending: dict[str, ProgressEvent] = {}
+        self._ready = asyncio.Event()
+        self.conflated = 0
+
+    def offer(self, event: ProgressEvent) -> None:
+        """イベントを受け取る（ブロックしない）"""
+        if self.job_id is not None and event.job_id != self.job_id:
+            return
+        if event.job_id in self._pending:
+            self.conflated += 1
+        self._pending[event.job_id] = event
+        self._ready.set()
+
+    async def get(self) -> list[ProgressEvent]:
+        """未取得のイベントをまとめて取得（なければ待機）
+
+        Returns:
+            ジョブごとの最新イベント
+        """
+        await self._ready.wait()
+        events = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        return events
+
+    async def __aiter__(self) -> AsyncIterator[ProgressEvent]:
+        while True:
+            for event in await self.get():
+                yield event
+
+    def close(self) -> None:
+        """購読を解除"""
+        self._bus.unsubscribe(self)
+
+    def __enter__(self) -> "ProgressSubscription":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class ProgressBus:
+    """ダウンロード進捗のファンアウト配信"""
+
+    def __init__(self):
+        self._subscriptions: set[ProgressSubscription] = set()
+        # 実行中ジョブの最新状態（新規購読者への初期スナップショット）
+        self._latest: dict[str, ProgressEvent] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        """購読者数"""
+        return len(self._subscriptions)
+
+    def subscribe(self, job_id: Optional[str] = None) -> ProgressSubscription:
+        """進捗を購読
+
+        Args:
+            job_id: 対象ジョブ ID（None の場合は全ジョブ）
+
+        Returns:
+            購読オブジェクト（実行中ジョブの最新状態を受信済み）
+        """
+        subscription = ProgressSubscription(self, job_id)
+        for event in self._latest.values():
+            subscription.offer(event)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ProgressSubscription) -> None:
+        """購読を解除"""
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: ProgressEvent) -> None:
+        """全購読者にイベントを配信（ブロックしない）
+
+        Args:
+            event: 進捗イベント
+        """
+        if event.status == "downloading":
+            self._latest[event.job_id] = event
+        else:
+            self._latest.pop(event.job_id, None)
+
+        for subscription in self._subscriptions:
+            subscription.offer(event)
+
+    def snapshot(self) -> list[ProgressEvent]:
+        """実行中ジョブの最新状態一覧"""
+        return list(self._latest.values())
+
+
+class ProgressTracker:
+    """1 ジョブ分の進捗を一定間隔でサンプリング
+
+    ``update`` はチャンクごとに呼ばれるため、時刻の比較のみを行う。
+    サンプリング間隔ごとに指数移動平均でスループットと ETA を計算し、
+    バスとコールバックへ通知する。
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        filename: str,
+        bus: Optional[ProgressBus] = None,
+        callback: Optional[Callable[[int, int], None]] = None,
+        interval: float = 0.25,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            job_id: ジョブ ID
+            filename: 保存ファイル名
+            bus: 配信先のバス
+            callback: 進捗コールバック (downloaded_bytes, total_bytes)
+            interval: サンプリング間隔（秒）
+            smoothing: 指数移動平均の係数（0-1、大きいほど直近を重視）
+            clock: 単調増加する時刻関数
+        """
+        self.job_id = job_id
+        self.filename = filename
+        self.bus = bus
+        self.callback = callback
+        self.interval = interval
+        self.smoothing = smoothing
+        self._clock = clock
+
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.bytes_per_second = 0.0
+        self._next_sample_at = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """リトライ時などに計測をやり直す"""
+        now = self._clock()
+        self.downloaded_bytes = 0
+        self._sampled_bytes = 0
+        self._sampled_at = now
+        self._next_sample_at = now + self.interval
+
+    def update(self, downloaded_bytes: int, total_bytes: int) -> None:
+        """進捗を更新（サンプリング間隔に達した場合のみ通知）
+
+        Args:
+            downloaded_bytes: ダウンロード済みバイト数
+            total_bytes: 合計バイト数（不明な場合は 0）
+        """
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
+
+        now = self._clock()
+        if now < self._next_sample_at:
+            return
+        self._sample(now)
+        self._emit("downloading")
+
+    def finish(self, status: ProgressStatus = "completed", error: Optional[str] = None) -> None:
+        """ジョブ終了を通知（常に配信される）
+
+        Args:
+            status: 終了ステータス
+            error: 失敗時のエラーメッセージ
+        """
+        self._sample(self._clock())
+        self._emit(status, error)
+
+    def _sample(self, now: float) -> None:
+        """スループットを更新"""
+        elapsed = now - self._sampled_at
+        if elapsed > 0:
+            instant = (self.downloaded_bytes - self._sampled_bytes) / elapsed
+            if self.bytes_per_second == 0.0:
+                self.bytes_per_second = instant
+            else:
+                self.bytes_per_second = (
+                    self.smoothing * instant + (1 - self.smoothing) * self.bytes_per_second
+                )
+        self._sampled_bytes = self.downloaded_bytes
+        self._sampled_at = now
+        self._next_sample_at = now + self.interval
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """残り時間の推定（秒）"""
+        if self.total_bytes <= 0 or self.bytes_per_second <= 0:
+            return None
+        return max(0.0, (self.total_bytes - self.downloaded_bytes) / self.bytes_per_second)
+
+    def _emit(self, status: ProgressStatus, error: Optional[str] = None) -> None:
+        """バスとコールバックへ通知"""
+        if self.callback and self.total_bytes > 0 and status != "failed":
+            self.callback(self.downloaded_bytes, self.total_bytes)
+
+        if self.bus is not None:
+            self.bus.publish(ProgressEvent(
+                job_id=self.job_id,
+                filename=self.filename,
+                status=status,
+                downloaded_bytes=self.downloaded_bytes,
+                total_bytes=self.total_bytes,
+                bytes_per_second=self.bytes_per_second,
+                eta_seconds=self.eta_seconds if status == "downloading" else None,
+                error=error,
+                timestamp=datetime.now()
+            ))
+
+
+class GroupProgress:
+    """複数ファイルの進捗を 1 ジョブとして集約
+
+    各ファイルの進捗コールバックから合計値を計算し、集約用の
+    ``ProgressTracker`` を通じて配信する。合計サイズは事前に分かっている
+    サイズを初期値とし、実際のサイズが判明した時点で置き換える。
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        filename: str,
+        expected_sizes: list[int],
+        bus: Optional[ProgressBus] = None,
+        callback: Optional[Callable[[int, int], None]] = None,
+        interval: float = 0.25
+    ):
+        """
+        Args:
+            job_id: グループ全体のジョブ ID
+            filename: 表示名
+            expected_sizes: 各ファイルの予想サイズ（不明な場合は 0）
+            bus: 配信先のバス
+            callback: 集約した進捗のコールバック (downloaded_bytes, total_bytes)
+            interval: サンプリング間隔（秒）
+        """
+        self.tracker = ProgressTracker(job_id, filename, bus, callback, interval)
+        self._downloaded = [0] * len(expected_sizes)
+        self._totals = list(expected_sizes)
+
+    def part(self, index: int) -> Callable[[int, int], None]:
+        """``index`` 番目のファイル用の進捗コールバックを作成"""
+        def update(downloaded_bytes: int, total_bytes: int) -> None:
+            self._downloaded[index] = downloaded_bytes
+            if total_bytes > 0:
+                self._totals[index] = total_bytes
+            self.tracker.update(sum(self._downloaded), sum(self._totals))
+
+        return update
+
+    def complete(self, index: int, size: int) -> None:
+        """転送せずに完了したファイル（重複排除等）を反映"""
+        self._downloaded[index] = size
+        self._totals[index] = size
+        self.tracker.update(sum(self._downloaded), sum(self._totals))
+
+    def finish(self, status: ProgressStatus = "completed", error: Optional[str] = None) -> None:
+        """グループ全体の終了を通知"""
+        self.tracker.finish(status, error)
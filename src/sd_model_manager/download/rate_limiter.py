@@ -0,0 +1,122 @@
+"""トークンバケット方式のレートリミッター"""
+
+import asyncio
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """非同期トークンバケット
+
+    ``rate`` トークン/秒で補充され、最大 ``capacity`` トークンまで蓄積する。
+    ``acquire`` はトークンが揃うまで待機するため、呼び出し側は
+    持続可能な最大レートで自動的にペーシングされる。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        initial_tokens: float | None = None
+    ):
+        """
+        Args:
+            rate: 補充レート（トークン/秒）
+            capacity: バケット容量（バースト上限）
+            clock: 単調増加する時刻関数（テスト用に差し替え可能）
+            initial_tokens: 初期トークン数（省略時は満杯）
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+
+        self._rate = float(rate)
+        self._capacity = float(capacity)
+        self._clock = clock
+        self._tokens = float(capacity if initial_tokens is None else min(initial_tokens, capacity))
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        """補充レート（トークン/秒）"""
+        return self._rate
+
+    @property
+    def capacity(self) -> float:
+        """バケット容量"""
+        return self._capacity
+
+    def _refill(self) -> None:
+        """経過時間に応じてトークンを補充"""
+        now = self._clock()
+        elapsed = now - self._updated_at
+        # pause 中は補充の起点が未来にあるため、停止明けまで補充しない
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """指定秒数、すべての取得を停止する（Retry-After 等）
+
+        Args:
+            seconds: 停止する秒数
+        """
+        until = self._clock() + max(0.0, seconds)
+        self._paused_until = max(self._paused_until, until)
+        # 停止明けに一斉送信しないよう、蓄積済みトークンを破棄し、
+        # 停止期間の分も補充しない（補充は停止明けから始まる）
+        self._refill()
+        self._tokens = 0.0
+        self._updated_at = max(self._updated_at, self._paused_until)
+
+    def configure(self, rate: float, capacity: float | None = None) -> None:
+        """実行中にレートと容量を変更
+
+        Args:
+            rate: 新しい補充レート（トークン/秒）
+            capacity: 新しい容量（省略時は現在値を維持）
+        """
+        if rate <= 0 or (capacity is not None and capacity <= 0):
+            raise ValueError("rate and capacity must be positive")
+
+        self._refill()
+        self._rate = float(rate)
+        if capacity is not None:
+            self._capacity = float(capacity)
+            self._tokens = min(self._tokens, self._capacity)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """トークンを取得（不足時は補充されるまで待機）
+
+        容量を超える要求は容量分ずつ分割して取得する。
+
+        Args:
+            tokens: 取得するトークン数
+
+        Returns:
+            待機した合計秒数
+        """
+        waited = 0.0
+        remaining = float(tokens)
+
+        async with self._lock:
+            while remaining > 0:
+                step = min(remaining, self._capacity)
+                while True:
+                    self._refill()
+                    now = self._clock()
+                    if now < self._paused_until:
+                        delay = self._paused_until - now
+                    elif self._tokens >= step:
+                        self._tokens -= step
+                        break
+                    else:
+                        delay = (step - self._tokens) / self._rate
+
+                    await asyncio.sleep(delay)
+                    waited += delay
+                remaining -= step
+
+        return waited
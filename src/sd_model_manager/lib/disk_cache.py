@@ -0,0 +1,140 @@
+"""サイズ上限付きの LRU ディスクキャッシュ
+
+キーは内容から決まる名前（ダイジェスト等）を想定しており、同じキーの内容は
+変わらない。合計サイズが ``max_bytes`` を超えたら最も長く使われていない
+エントリから削除する。最終利用時刻はファイルの mtime に記録するため、
+再起動後も LRU の順序が保たれる。
+"""
+
+import logging
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from sd_model_manager.lib import metrics
+from sd_model_manager.lib.file_utils import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+CACHE_EVICTIONS = metrics.counter(
+    "sdmm_disk_cache_evictions_total", "Entries evicted from disk caches", ("cache",)
+)
+
+
+class DiskCache:
+    """ファイル単位のエントリを持つ LRU ディスクキャッシュ（スレッドセーフ）"""
+
+    def __init__(self, directory: Path, max_bytes: int, name: str = "cache"):
+        """
+        Args:
+            directory: 保存先ディレクトリ
+            max_bytes: 合計サイズの上限（バイト）
+            name: メトリクスのラベルに使う名前
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.name = name
+        # キー -> サイズ（先頭ほど古い）
+        self._entries: Optional[OrderedDict[str, int]] = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """キーに対応するファイルのパス（1 ディレクトリのファイル数を抑えるため 2 階層）"""
+        return self.directory / key[:2] / key
+
+    @property
+    def total_bytes(self) -> int:
+        """保存しているエントリの合計サイズ"""
+        with self._lock:
+            self._load()
+            return self._total
+
+    def _load(self) -> OrderedDict[str, int]:
+        """既存のエントリを最終利用時刻の順に読み込む（初回のみ、ロック内で呼ぶ）"""
+        if self._entries is not None:
+            return self._entries
+        found = []
+        if self.directory.is_dir():
+            for path in self.directory.glob("??/*"):
+                if path.name.startswith("."):
+                    continue  # 書き込み途中の一時ファイル
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime_ns, path.name, stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._total = sum(self._entries.values())
+        return self._entries
+
+    def get(self, key: str) -> Optional[Path]:
+        """エントリのパス（なければ None）。最終利用時刻を更新する"""
+        with self._lock:
+            entries = self._load()
+            if key not in entries:
+                return None
+            path = self.path(key)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # 外部から削除された
+                self._total -= entries.pop(key)
+                return None
+            entries.move_to_end(key)
+            return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """エントリを保存し、上限を超えた分を古い順に削除
+
+        Returns:
+            保存したファイルのパス
+        """
+        path = self.path(key)
+        atomic_write_bytes(path, data)
+        self._add(key, len(data))
+        return path
+
+    def temp_path(self, key: str) -> Path:
+        """エントリの内容を少しずつ書き込むための一時ファイルのパス
+
+        書き終えたら ``put_file`` で登録する。一時ファイルはエントリとして
+        読み込まれない（失敗時の削除は呼び出し側で行う）。
+        """
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f".{key}.{secrets.token_hex(8)}.part")
+
+    def put_file(self, key: str, source: Path) -> Path:
+        """``temp_path`` に書き込んだファイルをエントリとして登録し、上限を超えた分を古い順に削除
+
+        Returns:
+            保存したファイルのパス
+        """
+        path = self.path(key)
+        size = source.stat().st_size
+        os.replace(source, path)
+        self._add(key, size)
+        return path
+
+    def _add(self, key: str, size: int) -> None:
+        with self._lock:
+            entries = self._load()
+            self._total += size - entries.pop(key, 0)
+            entries[key] = size
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._total -= size
+            self.path(key).unlink(missing_ok=True)
+            CACHE_EVICTIONS.labels(self.name).inc()
+            logger.debug("Evicted %s from %s cache (%d bytes)", key, self.name, size)
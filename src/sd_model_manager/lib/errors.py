@@ -1,9 +1,10 @@
 """カスタム例外クラス定義とエラーハンドラー登録"""
 
 import logging
-from typing import Any, Optional
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +12,9 @@ logger = logging.getLogger(__name__)
 class AppError(Exception):
     """アプリケーション基底例外"""
 
+    # エラーハンドラーが返す HTTP ステータス
+    status_code = 400
+
     def __init__(
         self,
         message: str,
@@ -44,18 +48,31 @@ class ModelValidationError(AppError):
         super().__init__(message, code="MODEL_VALIDATION_ERROR", details=details)
 
 
-def register_error_handlers(app: FastAPI) -> None:
+class NotFoundError(AppError):
+    """対象（モデル・ファイル・バッチ等）が存在しないエラー（404）"""
+
+    status_code = 404
+
+    def __init__(self, message: str, details: Optional[dict[str, Any]] = None):
+        super().__init__(message, code="NOT_FOUND", details=details)
+
+
+def register_error_handlers(app: "FastAPI") -> None:
     """FastAPI アプリケーションにエラーハンドラーを登録"""
+    # CLI から例外クラスだけを使う場合に Web スタックを読み込まないよう遅延インポート
+    from fastapi import Request
+    from fastapi.responses import JSONResponse
 
     @app.exception_handler(AppError)
     async def app_error_handler(request: Request, exc: AppError):
         """AppError のハンドラー"""
-        logger.error(
+        logger.log(
+            logging.WARNING if isinstance(exc, NotFoundError) else logging.ERROR,
             "Application error: code=%s, message=%s, path=%s, details=%s",
             exc.code, exc.message, request.url.path, exc.details
         )
         return JSONResponse(
-            status_code=400,
+            status_code=exc.status_code,
             content={
                 "error": {
                     "code": exc.code,
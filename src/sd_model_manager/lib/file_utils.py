@@ -0,0 +1,231 @@
+"""ファイル操作ユーティリティ"""
+
+import errno
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Literal, Optional
+
+# モデルファイルとして扱う拡張子（小文字）
+MODEL_FILE_EXTENSIONS = frozenset({".safetensors", ".ckpt", ".pt", ".pth", ".bin"})
+# ハッシュ計算時の読み込みサイズ（大きいほどシステムコール回数が減る）
+HASH_CHUNK_SIZE = 1024 * 1024
+# ファイルコピー時のバッファサイズ（copy_file_range の 1 回あたりの転送量も兼ねる）
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+CopyMethod = Literal["reflink", "copy_file_range", "stream"]
+
+# copy_file_range が使えない（ファイルシステム・デバイス間等）ことを示す errno
+_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.EPERM
+}
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """一時ファイル経由でアトミックにファイルを書き込む
+
+    同じディレクトリに一時ファイルを作成してから rename するため、
+    読み手が書きかけのファイルを目にすることはない。
+
+    Args:
+        path: 書き込み先パス
+        data: 書き込むデータ
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """テキストをアトミックに書き込む
+
+    Args:
+        path: 書き込み先パス
+        text: 書き込むテキスト
+        encoding: 文字コード
+    """
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+def place_file(partial: Path, destination: Path) -> None:
+    """既存のファイルを上書きせずに一時ファイルを配置先へ移す
+
+    ハードリンクは配置先が存在すると失敗するため、存在確認と配置がアトミックになる。
+    ハードリンク非対応のファイルシステムでは確認してから rename する。
+    リンクした場合は一時ファイルが残るため、呼び出し側で削除する。
+
+    Raises:
+        FileExistsError: 配置先が既に存在する
+    """
+    try:
+        os.link(partial, destination)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        if destination.exists():
+            raise FileExistsError(errno.EEXIST, "File exists", str(destination)) from e
+        os.replace(partial, destination)
+
+
+def compute_sha256(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """ファイルの SHA256 を計算（ブロッキング処理）
+
+    Args:
+        path: 対象ファイル
+        chunk_size: 読み込みサイズ（バイト）
+
+    Returns:
+        大文字 16 進数の SHA256（Civitai の表記に合わせる）
+    """
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest().upper()
+
+
+# Linux の FICLONE ioctl（_IOW(0x94, 9, int)）
+_FICLONE = 0x40049409
+
+
+def _clone(src_fd: int, dst_fd: int) -> bool:
+    """FICLONE で ``src_fd`` の内容を ``dst_fd`` に共有させる"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    """Copy-on-write でファイルを複製（reflink）
+
+    Btrfs / XFS 等の対応ファイルシステムでのみ成功する。
+    失敗時は作成途中の ``dst`` を削除して False を返す。
+
+    Args:
+        src: 複製元
+        dst: 複製先（存在しないこと）
+
+    Returns:
+        reflink できた場合 True
+    """
+    try:
+        with Path(src).open("rb") as fsrc, Path(dst).open("xb") as fdst:
+            if _clone(fsrc.fileno(), fdst.fileno()):
+                return True
+    except OSError:
+        return False
+
+    Path(dst).unlink(missing_ok=True)
+    return False
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int, digest, buffer_size: int) -> bool:
+    """copy_file_range でカーネル内コピー
+
+    ハッシュが必要な場合は、コピーした範囲を直後に読み直して計算する
+    （ページキャッシュに載った直後のため、ディスクからの再読み込みは発生しない）。
+
+    Returns:
+        コピーできた場合 True。最初の呼び出しで未対応と判明した場合 False
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        return False
+
+    offset = 0
+    while offset < size:
+        try:
+            count = min(buffer_size, size - offset)
+            copied = copy_file_range(src_fd, dst_fd, count, offset, offset)
+        except OSError as e:
+            if offset == 0 and e.errno in _COPY_FALLBACK_ERRNOS:
+                return False
+            raise
+        if copied == 0:
+            break
+        if digest is not None:
+            position = offset
+            while position < offset + copied:
+                chunk = os.pread(src_fd, min(HASH_CHUNK_SIZE, offset + copied - position), position)
+                digest.update(chunk)
+                position += len(chunk)
+        offset += copied
+    return True
+
+
+def _stream_copy(fsrc, fdst, digest, buffer_size: int) -> None:
+    """大きなバッファでユーザー空間コピー（ハッシュも同時に計算）"""
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while read := fsrc.readinto(buffer):
+        fdst.write(view[:read])
+        if digest is not None:
+            digest.update(view[:read])
+
+
+def copy_file(
+    src: Path,
+    dst: Path,
+    compute_hash: bool = True,
+    buffer_size: int = COPY_BUFFER_SIZE
+) -> tuple[CopyMethod, Optional[str]]:
+    """最速の方法でファイルをコピーし、必要に応じて SHA256 を計算（ブロッキング処理）
+
+    reflink → copy_file_range → 大きなバッファでのストリーミングの順に試す。
+    reflink はデータを複製しないため、ハッシュは複製元を別途読んで計算する。
+    ``dst`` は新規作成され、失敗時には削除される。
+
+    Args:
+        src: コピー元
+        dst: コピー先（存在しないこと）
+        compute_hash: SHA256 を計算するか
+        buffer_size: バッファサイズ（バイト）
+
+    Returns:
+        (使用したコピー方法, 大文字 16 進数の SHA256 または None)
+    """
+    digest = hashlib.sha256() if compute_hash else None
+    with Path(src).open("rb") as fsrc:
+        fdst = Path(dst).open("xb")
+        try:
+            with fdst:
+                src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+                size = os.fstat(src_fd).st_size
+
+                if _clone(src_fd, dst_fd):
+                    method: CopyMethod = "reflink"
+                    if digest is not None:
+                        while chunk := fsrc.read(HASH_CHUNK_SIZE):
+                            digest.update(chunk)
+                elif _kernel_copy(src_fd, dst_fd, size, digest, buffer_size):
+                    method = "copy_file_range"
+                else:
+                    method = "stream"
+                    _stream_copy(fsrc, fdst, digest, buffer_size)
+
+                fdst.flush()
+                os.fsync(dst_fd)
+        except BaseException:
+            Path(dst).unlink(missing_ok=True)
+            raise
+
+    return method, digest.hexdigest().upper() if digest is not None else None
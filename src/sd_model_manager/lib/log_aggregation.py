@@ -0,0 +1,116 @@
+"""同種のエラーをまとめて記録するログ集約
+
+大量のファイルを処理すると、同じ原因のエラー（権限不足・壊れたサイドカー等）が
+ファイルごとに繰り返し発生する。``ErrorAggregator`` はエラーをシグネチャ
+（種別・例外型・パスや数値を除いたメッセージ）ごとに集計し、各シグネチャの
+最初の数件だけを個別に（トレースバック付きで）ログに出す。残りは件数と
+サンプルパスとして、処理の最後に 1 行ずつ要約する。
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Union
+
+_NUMBER = re.compile(r"\d+")
+
+
+@dataclass
+class ErrorGroup:
+    """同じシグネチャのエラーの集計"""
+
+    kind: str
+    error_type: str
+    message: str  # 最初に発生したエラーのメッセージ
+    count: int = 0
+    sample_paths: list[str] = field(default_factory=list)
+
+
+def error_signature(kind: str, error: BaseException, path: Union[str, Path]) -> tuple[str, ...]:
+    """エラーのシグネチャ（パスと数値を伏せたメッセージで同種のエラーをまとめる）"""
+    message = str(error)
+    path = Path(path)
+    for text in (str(path), path.name):
+        if text:
+            message = message.replace(text, "<path>")
+    return kind, type(error).__name__, _NUMBER.sub("N", message)
+
+
+class ErrorAggregator:
+    """エラーをシグネチャごとに集計し、ログの量を抑える
+
+    各シグネチャの最初の ``max_logged`` 件は個別にログへ出し、それ以降は
+    数えるだけにする。``log_summary`` で件数とサンプルパスを要約して出力する。
+    """
+
+    def __init__(self, logger: logging.Logger, max_logged: int = 5, max_samples: int = 5):
+        """
+        Args:
+            logger: 出力先のロガー
+            max_logged: シグネチャごとに個別に出力する件数
+            max_samples: シグネチャごとに保持するサンプルパスの数
+        """
+        self.logger = logger
+        self.max_logged = max_logged
+        self.max_samples = max_samples
+        self._groups: dict[tuple[str, ...], ErrorGroup] = {}
+
+    @property
+    def total(self) -> int:
+        """記録したエラーの総数"""
+        return sum(group.count for group in self._groups.values())
+
+    def record(
+        self,
+        kind: str,
+        path: Union[str, Path],
+        error: BaseException,
+        message: str,
+        level: int = logging.ERROR,
+        exc_info: bool = True
+    ) -> None:
+        """エラーを 1 件記録（上限までは個別にログへ出力）
+
+        Args:
+            kind: エラーの種別（例: ``process``, ``civitai_metadata``）
+            path: エラーが発生したファイル
+            error: 発生した例外
+            message: 個別のログのメッセージ（``%s`` にパスとエラーが入る）
+            level: 個別のログのレベル
+            exc_info: 個別のログにトレースバックを含めるか
+        """
+        signature = error_signature(kind, error, path)
+        group = self._groups.get(signature)
+        if group is None:
+            group = self._groups[signature] = ErrorGroup(
+                kind=kind, error_type=signature[1], message=str(error)
+            )
+        group.count += 1
+        if len(group.sample_paths) < self.max_samples:
+            group.sample_paths.append(str(path))
+        if group.count <= self.max_logged:
+            self.logger.log(
+                level, message, path, error,
+                exc_info=error if exc_info else None,
+                extra={"path": str(path), "error_kind": kind}
+            )
+            if group.count == self.max_logged:
+                self.logger.log(
+                    level, "Further %s errors like %r are summarized at the end",
+                    kind, group.message
+                )
+
+    def summary(self) -> list[ErrorGroup]:
+        """シグネチャごとの集計（件数の多い順）"""
+        return sorted(self._groups.values(), key=lambda group: group.count, reverse=True)
+
+    def log_summary(self, level: int = logging.WARNING) -> None:
+        """シグネチャごとの件数とサンプルパスを 1 行ずつ出力"""
+        for group in self.summary():
+            self.logger.log(
+                level, "%d x %s %s: %s (e.g. %s)",
+                group.count, group.kind, group.error_type, group.message,
+                ", ".join(group.sample_paths),
+                extra={"error_kind": group.kind, "count": group.count}
+            )
@@ -1,15 +1,159 @@
-"""ログ設定モジュール"""
+"""ログ設定モジュール
 
+ログの書き込みはキュー経由で専用スレッド（``QueueListener``）が行う。
+ロガーを呼んだスレッド（イベントループ等）のコストはキューへの追加のみで、
+ファイルへの書き込みやローテーションで待たされることはない。
+"""
+
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
+import queue
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Literal, Optional
+
+from sd_model_manager.lib import metrics
+
+# キューが満杯のときの扱い
+#   block: 空くまで待つ（取りこぼさないが呼び出し元が止まりうる）
+#   drop_new: 追加しようとしたレコードを捨てる
+#   drop_oldest: 最も古いレコードを捨てて追加する
+OverflowPolicy = Literal["block", "drop_new", "drop_oldest"]
+LogFormat = Literal["text", "json"]
+
+SLOW_REQUEST_LOGGER = "sd_model_manager.slow_requests"
+
+LOG_RECORDS_DROPPED = metrics.counter(
+    "sdmm_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+# LogRecord の標準属性（これ以外の属性は extra= で渡された構造化フィールド）
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "taskName",
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """1 レコード 1 行の JSON で出力するフォーマッター
+
+    ``logger.info("...", extra={"model_id": 1, "path": p, "duration": d})`` のように
+    渡した属性は、そのままフィールドとして出力する。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """上限付きキューへレコードを渡すハンドラー（満杯時は ``overflow`` に従う）"""
+
+    def __init__(self, log_queue: queue.Queue, overflow: OverflowPolicy = "drop_new"):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.overflow == "drop_oldest":
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+        self.dropped += 1
+        LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 引数の埋め込みだけをここで行う（後から変更されうる引数を固定するため）。
+        # 同一プロセス内のキューなので例外情報はそのまま渡し、書式化は書き込み側で行う
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # キューが満杯でも、書き込みスレッドが消化するのを待って停止を指示する
+        self.queue.put(self._sentinel)
+
+
+class _LoggerNameFilter(logging.Filter):
+    """指定したロガー（配下を含む）のレコードだけを通す"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name == self.name or record.name.startswith(self.name + ".")
+
+
+def _make_formatter(log_format: LogFormat) -> logging.Formatter:
+    if log_format == "json":
+        return JsonLinesFormatter()
+    return logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+def flush_logging(timeout: Optional[float] = None) -> None:
+    """キューに溜まったレコードがすべて書き込まれるまで待つ"""
+    if _queue is None:
+        return
+    if timeout is None:
+        _queue.join()
+        return
+    # Queue.join はタイムアウトを持たないため、未処理数を監視する
+    with _queue.all_tasks_done:
+        _queue.all_tasks_done.wait_for(lambda: _queue.unfinished_tasks == 0, timeout)
+
+
+def shutdown_logging() -> None:
+    """書き込みスレッドを停止（残りのレコードは書き込んでから停止する）"""
+    global _listener, _queue
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    _listener = None
+    _queue = None
+
+
+atexit.register(shutdown_logging)
 
 
 def setup_logging(
     log_level: str = "INFO",
     log_dir: Path = Path("./logs"),
     log_max_bytes: int = 10 * 1024 * 1024,  # 10MB
-    log_backup_count: int = 3
+    log_backup_count: int = 3,
+    log_format: LogFormat = "text",
+    queue_size: int = 10000,
+    overflow: OverflowPolicy = "drop_new"
 ) -> None:
     """ロギングシステムをセットアップ
 
@@ -18,7 +162,12 @@ def setup_logging(
         log_dir: ログファイル保存ディレクトリ
         log_max_bytes: ログファイルの最大サイズ（バイト）
         log_backup_count: 保持するバックアップファイル数
+        log_format: ``text``（従来の 1 行形式）または ``json``（JSON Lines）
+        queue_size: 書き込み待ちレコードの上限
+        overflow: キューが満杯のときの扱い（``block`` / ``drop_new`` / ``drop_oldest``）
     """
+    global _listener, _queue
+
     # ログディレクトリを作成
     log_dir = Path(log_dir)
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -33,10 +182,13 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
 
-    # 既存のハンドラーをクリア（重複を防ぐ）
+    # 既存のハンドラー・書き込みスレッドを停止（重複を防ぐ）
     root_logger.handlers.clear()
+    shutdown_logging()
+
+    formatter = _make_formatter(log_format)
 
-    # ファイルハンドラー（ローテーション付き）
+    # ファイルハンドラー（ローテーション付き、書き込みスレッドから呼ばれる）
     file_handler = logging.handlers.RotatingFileHandler(
         log_file,
         maxBytes=log_max_bytes,
@@ -44,26 +196,39 @@ def setup_logging(
         encoding="utf-8"
     )
     file_handler.setLevel(level)
-
-    # ログフォーマット
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
     file_handler.setFormatter(formatter)
 
-    # ハンドラーを追加
-    root_logger.addHandler(file_handler)
+    # 低速リクエストは専用ファイルにも出力（app.log にも残る）
+    slow_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "slow_requests.log",
+        maxBytes=log_max_bytes,
+        backupCount=log_backup_count,
+        encoding="utf-8"
+    )
+    slow_handler.setFormatter(formatter)
+    slow_handler.addFilter(_LoggerNameFilter(SLOW_REQUEST_LOGGER))
+
+    # ロガーからはキューに追加するだけ
+    _queue = queue.Queue(maxsize=max(1, queue_size))
+    queue_handler = BoundedQueueHandler(_queue, overflow=overflow)
+    _listener = _QueueListener(
+        _queue, file_handler, slow_handler, respect_handler_level=True
+    )
+    _listener.start()
+    root_logger.addHandler(queue_handler)
 
     # uvicorn/FastAPIのロガーもファイルに出力
     for logger_name in ["uvicorn", "uvicorn.error", "uvicorn.access", "fastapi"]:
         logger = logging.getLogger(logger_name)
         logger.setLevel(level)
         logger.handlers.clear()
-        logger.addHandler(file_handler)
+        logger.addHandler(queue_handler)
         logger.propagate = False
 
-    logging.info("Logging system initialized (log_level=%s, log_file=%s)", log_level, log_file)
+    logging.info(
+        "Logging system initialized (log_level=%s, log_file=%s, format=%s, queue_size=%d, "
+        "overflow=%s)", log_level, log_file, log_format, queue_size, overflow
+    )
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,225 @@
+"""イベントループの遅延監視とブロッキング呼び出しの検出
+
+``LoopLagMonitor`` はサーバー稼働中に常時動かす軽量な監視で、一定間隔の
+sleep が予定よりどれだけ遅れて戻ったかをループの遅延として記録する。
+閾値を超えて戻らない場合は監視スレッドがループのスレッドのスタックを
+取得し、ブロックしている処理をログに残す。
+
+``BlockingCallDetector`` はテスト用で、ループが実行するコールバック 1 回ごとの
+所要時間を計測し、閾値を超えたものをスタック付きで記録する。
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sd_model_manager.lib import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = metrics.histogram(
+    "sdmm_event_loop_lag_seconds", "Delay of event loop wake-ups behind schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+LOOP_STALLS = metrics.counter(
+    "sdmm_event_loop_stalls_total", "Event loop stalls longer than the stall threshold"
+)
+
+
+def _thread_stack(thread_id: int) -> Optional[str]:
+    """スレッドの現在のスタック（取得できなければ None）"""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    return "".join(traceback.format_stack(frame))
+
+
+def _describe_callback(callback: Any) -> str:
+    """ループのコールバックを人が読める形に（タスクならコルーチンの位置）"""
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        frame = getattr(coro, "cr_frame", None)
+        location = f" at {frame.f_code.co_filename}:{frame.f_lineno}" if frame else ""
+        name = getattr(coro, "__qualname__", repr(coro))
+        return f"task {owner.get_name()} ({name}{location})"
+    return repr(callback)
+
+
+class LoopLagMonitor:
+    """イベントループの遅延を計測し、停止（stall）時のスタックをログに残す
+
+    ループ側のタスクが ``interval`` ごとに起床して遅延をメトリクスへ記録する。
+    別スレッドの監視役が起床の遅れを見張り、``stall_threshold`` を超えた時点で
+    ループのスレッドのスタック（＝ブロックしている処理）を取得して警告する。
+    コストは ``interval`` ごとの起床 1 回のみ。
+    """
+
+    def __init__(self, interval: float = 0.1, stall_threshold: Optional[float] = 0.25):
+        """
+        Args:
+            interval: 計測間隔（秒）
+            stall_threshold: スタックを記録する遅延（秒、None でスタックを記録しない）
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._heartbeat = 0.0
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """実行中のイベントループで監視を開始"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """監視を停止"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        if self.stall_threshold is not None:
+            self._stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="sdmm-loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, loop.time() - expected)
+                self._heartbeat = time.monotonic()
+                LOOP_LAG.observe(lag)
+                self.max_lag = max(self.max_lag, lag)
+                if self.stall_threshold is not None and lag >= self.stall_threshold:
+                    self.stalls += 1
+                    LOOP_STALLS.inc()
+        finally:
+            self._stop.set()
+
+    def _watch(self) -> None:
+        """起床が遅れている間にループのスレッドのスタックを取得（監視スレッド）"""
+        reported = None
+        check = min(self.interval, self.stall_threshold) / 2
+        while not self._stop.wait(check):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.stall_threshold or reported == heartbeat:
+                continue
+            # 1 回の停止につき 1 度だけ記録
+            reported = heartbeat
+            task = asyncio.current_task(self._loop)
+            logger.warning(
+                "Event loop blocked for %.0fms+ (running: %s)\n%s",
+                overdue * 1000, task.get_name() if task else None,
+                _thread_stack(self._loop_thread) or "<stack unavailable>"
+            )
+
+
+@dataclass
+class BlockingCall:
+    """閾値を超えてループを占有したコールバック"""
+
+    duration: float
+    description: str
+    stack: Optional[str] = None
+
+    def format(self) -> str:
+        text = f"{self.duration * 1000:.0f}ms in {self.description}"
+        return f"{text}\n{self.stack}" if self.stack else text
+
+
+class BlockingCallDetector:
+    """ループのコールバック 1 回ごとの所要時間を計測（テスト用）
+
+    ``install()`` の間、全スレッドのイベントループで ``asyncio.Handle._run`` を
+    計測付きに置き換える。閾値を超えて実行中のコールバックは監視スレッドが
+    スタックを取得するため、ブロックしている呼び出し箇所まで特定できる。
+    """
+
+    def __init__(self, threshold: float):
+        """
+        Args:
+            threshold: 記録するコールバックの所要時間（秒）
+        """
+        self.threshold = threshold
+        self.blocking_calls: list[BlockingCall] = []
+        # スレッド ID -> (開始時刻, 取得したスタック)
+        self._running: dict[int, list[Any]] = {}
+        self._original_run = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def install(self) -> None:
+        """計測を開始"""
+        if self._original_run is not None:
+            return
+        original = self._original_run = asyncio.events.Handle._run
+        detector = self
+
+        def timed_run(handle: asyncio.Handle) -> None:
+            thread_id = threading.get_ident()
+            state = [time.perf_counter(), None]
+            previous = detector._running.get(thread_id)
+            detector._running[thread_id] = state
+            try:
+                original(handle)
+            finally:
+                if previous is None:
+                    detector._running.pop(thread_id, None)
+                else:
+                    detector._running[thread_id] = previous
+                duration = time.perf_counter() - state[0]
+                if duration >= detector.threshold:
+                    detector.blocking_calls.append(BlockingCall(
+                        duration, _describe_callback(handle._callback), state[1]
+                    ))
+
+        asyncio.events.Handle._run = timed_run
+        self._stop.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="sdmm-blocking-detector", daemon=True
+        )
+        self._watchdog.start()
+
+    def uninstall(self) -> None:
+        """計測を終了"""
+        if self._original_run is None:
+            return
+        asyncio.events.Handle._run = self._original_run
+        self._original_run = None
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 4):
+            now = time.perf_counter()
+            for thread_id, state in list(self._running.items()):
+                if state[1] is None and now - state[0] >= self.threshold:
+                    state[1] = _thread_stack(thread_id)
+
+    def __enter__(self) -> "BlockingCallDetector":
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.uninstall()
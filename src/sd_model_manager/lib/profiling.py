@@ -0,0 +1,216 @@
+"""オンデマンドのプロファイリング（cProfile / サンプリング）
+
+スキャン 1 回・リクエスト 1 件・一定時間の処理を計測し、``log_dir`` 配下に
+書き出す。明示的に開始したときだけ計測するため、使わない限りコストはない。
+
+- ``cprofile``: 開始したスレッド（API ではイベントループ）の全関数呼び出しを
+  決定的に計測し、``.pstats`` に保存する（``python -m pstats`` や snakeviz で閲覧）。
+- ``sampling``: 別スレッドから全スレッドのスタックを一定間隔で取得し、
+  speedscope 形式の ``.speedscope.json`` に保存する。スレッドプールで動く
+  スキャンのファイル処理も計測でき、計測対象への負荷も小さい。
+"""
+
+import cProfile
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Literal, Optional
+
+from sd_model_manager.lib.errors import AppError
+
+ProfileMode = Literal["cprofile", "sampling"]
+PROFILE_MODES: tuple[str, ...] = ("cprofile", "sampling")
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class ProfilingBusyError(AppError):
+    """別のプロファイリングが実行中"""
+
+    def __init__(self, message: str, details: Optional[dict[str, Any]] = None):
+        super().__init__(message, code="PROFILING_BUSY", details=details)
+
+
+@dataclass
+class ProfileResult:
+    """1 回のプロファイリングの結果"""
+
+    name: str
+    mode: str
+    path: Path
+    started_at: datetime = field(default_factory=datetime.now)
+    duration: float = 0.0
+    samples: int = 0
+
+
+class SamplingProfiler:
+    """全スレッドのスタックを定期的に取得するサンプリングプロファイラー"""
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Args:
+            interval: サンプリング間隔（秒）
+        """
+        self.interval = interval
+        self._frames: list[dict[str, Any]] = []
+        self._frame_index: dict[tuple[str, str, int], int] = {}
+        # スレッド ID -> (スタック（フレーム番号の列、根から葉）, 重み（秒）)
+        self._samples: dict[int, tuple[list[list[int]], list[float]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    @property
+    def sample_count(self) -> int:
+        """取得したサンプル数（全スレッドの合計）"""
+        return sum(len(stacks) for stacks, _ in self._samples.values())
+
+    def start(self) -> None:
+        """サンプリングを開始"""
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sdmm-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """サンプリングを停止"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._elapsed = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._record(ident, frame, weight)
+
+    def _record(self, ident: int, frame, weight: float) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self._frames)
+                self._frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        stacks, weights = self._samples.setdefault(ident, ([], []))
+        stacks.append(stack)
+        weights.append(weight)
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """speedscope のファイル形式（スレッドごとの sampled プロファイル）"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        profiles = [
+            {
+                "type": "sampled",
+                "name": f"{names.get(ident, 'thread')} ({ident})",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self._elapsed,
+                "samples": stacks,
+                "weights": weights,
+            }
+            for ident, (stacks, weights) in self._samples.items()
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "sd-model-manager",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self._frames},
+            "profiles": profiles,
+        }
+
+
+def _safe_name(name: str) -> str:
+    """ファイル名に使える形へ変換"""
+    return re.sub(r"[^A-Za-z0-9_.]+", "-", name).strip("-") or "profile"
+
+
+class Profiler:
+    """プロファイリングの実行と結果ファイルの書き出し
+
+    計測は同時に 1 つまで（cProfile はスレッドに 1 つしか有効にできず、
+    並行した計測は互いの結果を汚すため）。
+    """
+
+    def __init__(self, output_dir: Path, sample_interval: float = 0.005):
+        """
+        Args:
+            output_dir: 結果ファイルの保存先
+            sample_interval: サンプリングモードの間隔（秒）
+        """
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """計測中か"""
+        return self._lock.locked()
+
+    def _output_path(self, name: str, mode: str) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        suffix = ".pstats" if mode == "cprofile" else ".speedscope.json"
+        return self.output_dir / f"{stamp}-{_safe_name(name)}{suffix}"
+
+    @contextmanager
+    def profile(self, name: str, mode: ProfileMode = "cprofile") -> Iterator[ProfileResult]:
+        """ブロックの処理を計測し、終了時に結果ファイルを書き出す
+
+        出力先のパスは開始時点で決まる（レスポンスヘッダー等で先に通知できる）。
+
+        Args:
+            name: 計測の名前（ファイル名に使う）
+            mode: ``cprofile`` または ``sampling``
+
+        Raises:
+            ProfilingBusyError: 別の計測が実行中
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if not self._lock.acquire(blocking=False):
+            raise ProfilingBusyError("Another profiling session is running", {"name": name})
+        try:
+            result = ProfileResult(name=name, mode=mode, path=self._output_path(name, mode))
+            started = time.perf_counter()
+            if mode == "cprofile":
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    yield result
+                finally:
+                    profile.disable()
+                    result.duration = time.perf_counter() - started
+                    self.output_dir.mkdir(parents=True, exist_ok=True)
+                    profile.dump_stats(result.path)
+            else:
+                sampler = SamplingProfiler(self.sample_interval)
+                sampler.start()
+                try:
+                    yield result
+                finally:
+                    sampler.stop()
+                    result.duration = time.perf_counter() - started
+                    result.samples = sampler.sample_count
+                    self._write_json(result.path, sampler.speedscope(name))
+        finally:
+            self._lock.release()
+
+    def _write_json(self, path: Path, data: dict[str, Any]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
@@ -0,0 +1,261 @@
+"""Hash-based Civitai metadata enrichment for models without sidecars"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.lib.errors import DownloadError
+from sd_model_manager.lib.file_utils import atomic_write_text, compute_sha256
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.scanner import civitai_info_path, extract_preview_image_url
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentResult(BaseModel):
+    """Summary of a single enrichment run"""
+
+    candidates: int = 0  # models without sidecar metadata
+    hashed: int = 0  # files hashed in this run (not in the hash index cache)
+    matched: int = 0  # sidecars written
+    not_found: int = 0  # hashes unknown to Civitai
+    skipped: int = 0  # known misses from a previous run
+    failed: int = 0  # hashing or lookup errors
+
+
+class CivitaiEnricher:
+    """Looks up local models on Civitai by file hash and writes sidecars
+
+    Hashing runs in worker threads with bounded concurrency while a single
+    consumer batches the resulting hashes into by-hash lookups. The
+    Civitai client paces those lookups according to the API tier. File
+    hashes are taken from and added to the ``HashIndex`` cache, which is
+    saved after every batch, so an interrupted run resumes without
+    re-hashing files. Hashes that Civitai does not know are recorded in
+    an optional state file so that later runs do not query them again.
+    Runs are serialized.
+    """
+
+    def __init__(
+        self,
+        civitai_client: CivitaiClient,
+        registry: ModelRegistry | None = None,
+        concurrency: int = 4,
+        batch_size: int = 50,
+        state_path: Path | None = None,
+        hash_index: HashIndex | None = None
+    ):
+        """Initialize enricher
+
+        Args:
+            civitai_client: Client used for by-hash lookups
+            registry: Registry to update as sidecars are written
+            concurrency: Number of files hashed in parallel
+            batch_size: Number of hashes per lookup request
+            state_path: JSON file recording hashes unknown to Civitai
+            hash_index: Index whose hash cache is reused (in-memory one if None)
+        """
+        if concurrency < 1 or batch_size < 1:
+            raise ValueError("concurrency and batch_size must be positive")
+
+        self.civitai_client = civitai_client
+        self.registry = registry
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.state_path = Path(state_path) if state_path else None
+        self.hash_index = hash_index if hash_index is not None else HashIndex()
+        # File path -> size, mtime_ns and status of models already looked up
+        self._state: dict[str, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    async def enrich(self, models: Iterable[ModelInfo]) -> EnrichmentResult:
+        """Enrich models that have no Civitai metadata
+
+        Args:
+            models: Scanner output
+
+        Returns:
+            Summary of the run
+        """
+        async with self._lock:
+            return await self._enrich(models)
+
+    async def _enrich(self, models: Iterable[ModelInfo]) -> EnrichmentResult:
+        result = EnrichmentResult()
+        self._state = await asyncio.to_thread(self._load_state)
+
+        candidates = [
+            model for model in models
+            if model.civitai_metadata is None
+            and not await asyncio.to_thread(civitai_info_path(Path(model.file_path)).exists)
+        ]
+        result.candidates = len(candidates)
+        if not candidates:
+            return result
+
+        logger.info("Starting Civitai enrichment for %d models", len(candidates))
+
+        queue: asyncio.Queue[tuple[ModelInfo, str] | None] = asyncio.Queue(
+            maxsize=self.batch_size * 2
+        )
+        pending = iter(candidates)
+
+        async def hash_worker() -> None:
+            for model in pending:
+                file_hash = await self._hash_model(model, result)
+                if file_hash is not None:
+                    await queue.put((model, file_hash))
+
+        async def produce() -> None:
+            try:
+                await asyncio.gather(*(hash_worker() for _ in range(self.concurrency)))
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            batch: list[tuple[ModelInfo, str]] = []
+            while (item := await queue.get()) is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    await self._lookup_batch(batch, result)
+                    batch = []
+            if batch:
+                await self._lookup_batch(batch, result)
+            await producer
+        finally:
+            producer.cancel()
+
+        logger.info(
+            "Civitai enrichment completed: matched=%d, not_found=%d, skipped=%d, failed=%d",
+            result.matched, result.not_found, result.skipped, result.failed
+        )
+        return result
+
+    async def _hash_model(self, model: ModelInfo, result: EnrichmentResult) -> str | None:
+        """Hash a model file, reusing the hash index cache if the file is unchanged
+
+        Returns:
+            SHA256 hash, or None if the file should not be looked up
+        """
+        path = Path(model.file_path)
+        try:
+            stat = await asyncio.to_thread(path.stat)
+        except OSError as e:
+            logger.warning("Cannot stat model for enrichment %s: %s", path, str(e))
+            result.failed += 1
+            return None
+
+        entry = self._state.get(model.file_path)
+        if (entry and entry.get("status") == "not_found"
+                and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns):
+            result.skipped += 1
+            return None
+
+        file_hash = await asyncio.to_thread(self.hash_index.cached_sha256, model)
+        if file_hash is not None:
+            return file_hash.upper()
+        try:
+            file_hash = await asyncio.to_thread(compute_sha256, path)
+        except OSError as e:
+            logger.warning("Failed to hash model %s: %s", path, str(e))
+            result.failed += 1
+            return None
+
+        result.hashed += 1
+        self.hash_index.remember(model.file_path, stat, file_hash)
+        return file_hash.upper()
+
+    async def _lookup_batch(
+        self,
+        batch: list[tuple[ModelInfo, str]],
+        result: EnrichmentResult
+    ) -> None:
+        """Look up one batch of hashes and apply the matches"""
+        # Files with identical content share a hash; every copy gets the match
+        by_hash: dict[str, list[ModelInfo]] = {}
+        for model, file_hash in batch:
+            by_hash.setdefault(file_hash, []).append(model)
+
+        try:
+            versions = await self.civitai_client.get_model_versions_by_hashes(list(by_hash))
+        except DownloadError as e:
+            # Leave state untouched so the batch is retried on the next run
+            logger.error("Hash lookup failed for batch of %d: %s", len(batch), e.message)
+            result.failed += len(batch)
+            return
+
+        for version in versions:
+            for file_hash in self._version_hashes(version):
+                for model in by_hash.pop(file_hash, []):
+                    try:
+                        await self._apply_match(model, version)
+                    except OSError as e:
+                        logger.warning(
+                            "Failed to write sidecar for %s: %s", model.file_path, str(e)
+                        )
+                        result.failed += 1
+                        continue
+                    self._state.pop(model.file_path, None)
+                    result.matched += 1
+
+        for models in by_hash.values():
+            for model in models:
+                result.not_found += 1
+                try:
+                    stat = await asyncio.to_thread(os.stat, model.file_path)
+                except OSError:
+                    continue
+                self._state[model.file_path] = {
+                    "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "status": "not_found"
+                }
+
+        await self.hash_index.save()
+        await asyncio.to_thread(self._save_state)
+
+    @staticmethod
+    def _version_hashes(version: dict[str, Any]) -> set[str]:
+        """Collect all file hashes listed in a model version"""
+        hashes = set()
+        for file in version.get("files", []):
+            for value in (file.get("hashes") or {}).values():
+                if isinstance(value, str):
+                    hashes.add(value.upper())
+        return hashes
+
+    async def _apply_match(self, model: ModelInfo, version: dict[str, Any]) -> None:
+        """Write the sidecar and update the registry entry"""
+        sidecar = civitai_info_path(Path(model.file_path))
+        content = json.dumps(version, ensure_ascii=False, indent=2)
+        await asyncio.to_thread(atomic_write_text, sidecar, content)
+        logger.info("Wrote Civitai metadata sidecar: %s", sidecar)
+
+        if self.registry is not None:
+            self.registry.upsert(model.model_copy(update={
+                "civitai_metadata": version,
+                "preview_image_url": extract_preview_image_url(version),
+            }))
+
+    def _load_state(self) -> dict[str, dict[str, Any]]:
+        """Load resume state from disk"""
+        if self.state_path is None or not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text("utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Ignoring unreadable enrichment state %s: %s", self.state_path, str(e))
+            return {}
+
+    def _save_state(self) -> None:
+        """Persist resume state to disk"""
+        if self.state_path is None:
+            return
+        atomic_write_text(self.state_path, json.dumps(self._state))
@@ -0,0 +1,235 @@
+"""Local SHA256 index of the model library"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from sd_model_manager.lib.file_utils import atomic_write_text, compute_sha256
+from sd_model_manager.registry.models import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+# AutoV2 hashes are the first 10 hex digits of the SHA256
+AUTOV2_LENGTH = 10
+
+
+def sidecar_sha256(model: ModelInfo) -> str | None:
+    """Extract the SHA256 of this file from its Civitai sidecar
+
+    A version can list several files (pruned variants, VAEs, ...), so
+    the entry is matched by filename first and falls back to the
+    only file or the primary one.
+    """
+    metadata = model.civitai_metadata
+    if not metadata:
+        return None
+
+    files = [f for f in metadata.get("files") or [] if isinstance(f, dict)]
+    candidates = [f for f in files if f.get("name") == model.filename]
+    if not candidates:
+        candidates = files if len(files) == 1 else [f for f in files if f.get("primary")]
+
+    for file in candidates:
+        sha256 = (file.get("hashes") or {}).get("SHA256")
+        if sha256:
+            return sha256
+    return None
+
+
+class HashIndex:
+    """Maps file hashes to model files in the library
+
+    Hashes come from three sources, cheapest first: ``.civitai.info``
+    sidecars, a persistent cache of previously computed hashes keyed by
+    path/size/mtime, and on-demand hashing of the remaining files.
+    Lookups accept full SHA256 or AutoV2 and verify that the indexed
+    file still exists with the same size before returning it.
+    """
+
+    def __init__(self, cache_path: Path | None = None):
+        """Initialize index
+
+        Args:
+            cache_path: JSON file persisting computed hashes between runs
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._by_sha256: dict[str, tuple[str, int]] = {}
+        self._by_autov2: dict[str, str] = {}
+        self._cache: dict[str, dict[str, Any]] = {}
+        self._hash_task: asyncio.Task | None = None
+        if self.cache_path is not None and self.cache_path.exists():
+            try:
+                self._cache = json.loads(self.cache_path.read_text("utf-8"))
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning("Ignoring unreadable hash cache %s: %s", self.cache_path, str(e))
+
+    def __len__(self) -> int:
+        return len(self._by_sha256)
+
+    def add(self, sha256: str, file_path: str | Path, size: int) -> None:
+        """Register a file under its SHA256
+
+        Args:
+            sha256: SHA256 hex digest (any case)
+            file_path: Path of the file
+            size: File size in bytes
+        """
+        sha256 = sha256.upper()
+        self._by_sha256[sha256] = (str(file_path), size)
+        self._by_autov2[sha256[:AUTOV2_LENGTH]] = sha256
+
+    def remove_path(self, file_path: str | Path) -> None:
+        """Drop all entries pointing at a file"""
+        file_path = str(file_path)
+        stale = [h for h, (path, _) in self._by_sha256.items() if path == file_path]
+        for sha256 in stale:
+            del self._by_sha256[sha256]
+            self._by_autov2.pop(sha256[:AUTOV2_LENGTH], None)
+
+    def lookup(self, file_hash: str) -> Path | None:
+        """Find a library file by SHA256 or AutoV2 hash
+
+        Args:
+            file_hash: SHA256 or AutoV2 hash
+
+        Returns:
+            Path of an existing file with that hash, or None
+        """
+        file_hash = file_hash.upper()
+        if len(file_hash) == AUTOV2_LENGTH:
+            file_hash = self._by_autov2.get(file_hash, "")
+
+        entry = self._by_sha256.get(file_hash)
+        if entry is None:
+            return None
+
+        path, size = entry
+        try:
+            if os.stat(path).st_size == size:
+                return Path(path)
+        except OSError:
+            pass
+
+        logger.info("Dropping stale hash index entry: %s", path)
+        self.remove_path(path)
+        return None
+
+    def rebuild(self, models: Iterable[ModelInfo]) -> list[ModelInfo]:
+        """Rebuild the index from sidecars and the hash cache (blocking)
+
+        The new index is built aside and swapped in at the end, so this
+        can run in a worker thread while lookups keep using the old one.
+
+        Args:
+            models: Scanner output
+
+        Returns:
+            Models whose hash is still unknown (candidates for ``hash_missing``)
+        """
+        by_sha256: dict[str, tuple[str, int]] = {}
+        by_autov2: dict[str, str] = {}
+        unknown = []
+        for model in models:
+            sha256 = sidecar_sha256(model) or self.cached_sha256(model)
+            if sha256:
+                sha256 = sha256.upper()
+                by_sha256[sha256] = (model.file_path, model.file_size)
+                by_autov2[sha256[:AUTOV2_LENGTH]] = sha256
+            else:
+                unknown.append(model)
+        self._by_sha256, self._by_autov2 = by_sha256, by_autov2
+
+        logger.info("Hash index rebuilt: %d indexed, %d unknown", len(self), len(unknown))
+        return unknown
+
+    async def hash_missing(self, models: Iterable[ModelInfo], concurrency: int = 4) -> int:
+        """Hash files not covered by sidecars or cache and persist the results
+
+        Args:
+            models: Models to hash (typically the return value of ``rebuild``)
+            concurrency: Number of files hashed in parallel
+
+        Returns:
+            Number of files hashed
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        hashed = 0
+
+        async def hash_one(model: ModelInfo) -> None:
+            nonlocal hashed
+            async with semaphore:
+                try:
+                    stat = await asyncio.to_thread(os.stat, model.file_path)
+                    sha256 = await asyncio.to_thread(compute_sha256, Path(model.file_path))
+                except OSError as e:
+                    logger.warning("Failed to hash %s: %s", model.file_path, str(e))
+                    return
+            self.remember(model.file_path, stat, sha256)
+            hashed += 1
+
+        try:
+            await asyncio.gather(*(hash_one(model) for model in models))
+        finally:
+            # Persist what was hashed even if the run is cancelled by a rescan
+            if hashed:
+                await self.save()
+        if hashed:
+            logger.info("Hash index: hashed %d files without sidecars", hashed)
+        return hashed
+
+    def schedule_hash_missing(self, models: Iterable[ModelInfo], concurrency: int = 4) -> None:
+        """Start ``hash_missing`` in the background, replacing a previous run
+
+        Files hashed by the replaced run are already cached, so the new run
+        only hashes what is still unknown after the rescan.
+        """
+        if self._hash_task is not None:
+            self._hash_task.cancel()
+        self._hash_task = asyncio.create_task(self.hash_missing(list(models), concurrency))
+
+    async def close(self) -> None:
+        """Stop background hashing"""
+        if self._hash_task is not None:
+            self._hash_task.cancel()
+            try:
+                await self._hash_task
+            except asyncio.CancelledError:
+                pass
+            self._hash_task = None
+
+    def remember(self, file_path: str | Path, stat: os.stat_result, sha256: str) -> None:
+        """Cache a computed hash and index the file (persisted by ``save``)
+
+        Args:
+            file_path: Path of the hashed file
+            stat: Stat of the file taken before hashing
+            sha256: SHA256 hex digest
+        """
+        self._cache[str(file_path)] = {
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256
+        }
+        self.add(sha256, file_path, stat.st_size)
+
+    async def save(self) -> None:
+        """Persist the computed hashes to ``cache_path``"""
+        if self.cache_path is None:
+            return
+        # Serialized on the loop so that concurrent ``remember`` calls cannot
+        # change the dict while it is being written
+        content = json.dumps(self._cache)
+        await asyncio.to_thread(atomic_write_text, self.cache_path, content)
+
+    def cached_sha256(self, model: ModelInfo) -> str | None:
+        """Return the cached hash if the file is unchanged since it was hashed (blocking)"""
+        entry = self._cache.get(model.file_path)
+        if entry is None or entry.get("size") != model.file_size:
+            return None
+        try:
+            if os.stat(model.file_path).st_mtime_ns != entry.get("mtime_ns"):
+                return None
+        except OSError:
+            return None
+        return entry.get("sha256")
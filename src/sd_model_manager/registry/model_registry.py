@@ -0,0 +1,201 @@
+"""In-memory registry of discovered model files"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Iterable
+
+from sd_model_manager.registry.models import ModelInfo, model_id_for_path
+from sd_model_manager.registry.registry_store import RegistryStore
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Holds the current set of known models keyed by file path
+
+    The registry is the single place the API reads models from. Scans
+    replace its contents wholesale, while enrichment and downloads update
+    individual entries incrementally. ``version`` increases on every
+    change so that readers can cheaply detect modifications. Models are
+    indexed by file path and by ID, so both lookups are O(1).
+
+    With a ``store``, changes are written through to SQLite and reads
+    apply the rows another process (a sibling server worker) has changed,
+    so all workers serve the same library. The store is checked at most
+    once per ``sync_interval``, so reads on the event loop do not query
+    SQLite every time, and only changed rows are parsed.
+    """
+
+    # Seconds between checks of the shared store
+    SYNC_INTERVAL = 1.0
+
+    def __init__(self, store: RegistryStore | None = None, sync_interval: float | None = None):
+        """Initialize an empty registry
+
+        Args:
+            store: Shared store for multi-process servers
+            sync_interval: Seconds between checks of the store (default ``SYNC_INTERVAL``)
+        """
+        self._models: dict[str, ModelInfo] = {}
+        # Model ID -> file path (the key of ``_models``)
+        self._paths_by_id: dict[str, str] = {}
+        self.version = 0
+        self._scanned_at: datetime | None = None
+        self.store = store
+        self.sync_interval = self.SYNC_INTERVAL if sync_interval is None else sync_interval
+        # Position in the store: generation of the last full load and last applied sequence
+        self._generation = 0
+        self._seq = 0
+        self._synced_at: float | None = None
+
+    def __len__(self) -> int:
+        self._sync()
+        return len(self._models)
+
+    @property
+    def scanned_at(self) -> datetime | None:
+        """Time of the last full scan (None if never scanned)"""
+        self._sync()
+        return self._scanned_at
+
+    def _sync(self) -> None:
+        """Apply changes other processes made to the shared store (rate-limited)"""
+        if self.store is None:
+            return
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        changes = self.store.changes(self._generation, self._seq)
+        if changes is None:
+            return
+
+        if changes.full:
+            self._set_models(changes.models)
+            logger.debug("Registry reloaded from shared store: %d models", len(self._models))
+        else:
+            for model in changes.models:
+                self._put(model)
+            for file_path in changes.removed:
+                self._pop(file_path)
+        if changes.full or changes.models or changes.removed:
+            self.version += 1
+        self._generation, self._seq = changes.generation, changes.seq
+        self._scanned_at = changes.scanned_at
+
+    def _advance(self, seq: int) -> None:
+        """Record a sequence number of our own write
+
+        Only a write directly following the last applied one is skipped on
+        the next sync; otherwise another process wrote in between and its
+        rows still have to be read.
+        """
+        if seq == self._seq + 1:
+            self._seq = seq
+
+    def _set_models(self, models: Iterable[ModelInfo]) -> None:
+        """Replace the contents and rebuild the ID index"""
+        self._models = {model.file_path: model for model in models}
+        self._paths_by_id = {model.id: path for path, model in self._models.items()}
+
+    def _put(self, model: ModelInfo) -> None:
+        """Insert or replace one entry and keep the ID index in step"""
+        previous = self._models.get(model.file_path)
+        if previous is not None and self._paths_by_id.get(previous.id) == model.file_path:
+            del self._paths_by_id[previous.id]
+        self._models[model.file_path] = model
+        self._paths_by_id[model.id] = model.file_path
+
+    def _pop(self, file_path: str) -> ModelInfo | None:
+        """Remove one entry and its ID index entry"""
+        model = self._models.pop(file_path, None)
+        if model is not None and self._paths_by_id.get(model.id) == file_path:
+            del self._paths_by_id[model.id]
+        return model
+
+    def replace_all(self, models: Iterable[ModelInfo]) -> None:
+        """Replace registry contents with the result of a full scan
+
+        Args:
+            models: Models discovered by the scanner
+        """
+        self._set_models(models)
+        self.version += 1
+        self._scanned_at = datetime.now()
+        if self.store is not None:
+            self._generation, self._seq = self.store.replace_all(
+                self._models.values(), self._scanned_at
+            )
+        logger.info("Registry replaced with %d models", len(self._models))
+
+    def upsert(self, model: ModelInfo) -> None:
+        """Insert a model or replace the entry with the same file path
+
+        A model whose ID already belongs to another path (a hardlink or an
+        identical copy with inode or hash IDs) gets its path ID instead, as
+        in a full scan, so it does not take over the other entry's ID.
+
+        Args:
+            model: Model to insert or update
+        """
+        self._sync()
+        owner = self._paths_by_id.get(model.id)
+        if owner is not None and owner != model.file_path:
+            model.id = model_id_for_path(model.file_path)
+        self._put(model)
+        self.version += 1
+        if self.store is not None:
+            self._advance(self.store.upsert(model))
+        logger.debug("Registry upserted model: %s", model.file_path)
+
+    def remove(self, file_path: str) -> ModelInfo | None:
+        """Remove the model at the given file path
+
+        Args:
+            file_path: Path of the model file
+
+        Returns:
+            Removed model, or None if it was not registered
+        """
+        self._sync()
+        model = self._pop(file_path)
+        if model is not None:
+            self.version += 1
+            if self.store is not None:
+                self._advance(self.store.remove(file_path))
+        return model
+
+    def get(self, model_id: str) -> ModelInfo | None:
+        """Look up a model by ID
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Matching model or None
+        """
+        self._sync()
+        file_path = self._paths_by_id.get(model_id)
+        return self._models.get(file_path) if file_path is not None else None
+
+    def get_by_path(self, file_path: str) -> ModelInfo | None:
+        """Look up a model by file path
+
+        Args:
+            file_path: Path of the model file
+
+        Returns:
+            Matching model or None
+        """
+        self._sync()
+        return self._models.get(file_path)
+
+    def list(self) -> list[ModelInfo]:
+        """Return all registered models
+
+        Returns:
+            List of models in insertion order
+        """
+        self._sync()
+        return list(self._models.values())
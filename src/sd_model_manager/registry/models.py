@@ -1,10 +1,32 @@
 """Pydantic データモデル定義"""
 
+import os
 from datetime import datetime
 from typing import Optional, Literal
 from pydantic import BaseModel, HttpUrl, field_validator
 import uuid
 
+# Namespace of the deterministic (UUIDv5) model IDs. Changing it changes every ID.
+MODEL_ID_NAMESPACE = uuid.UUID("6f1c0e52-5b8e-4d7a-9a57-2f3c1d9e8b41")
+
+ModelIdSource = Literal["path", "inode", "hash"]
+
+
+def model_id_for_path(file_path: str) -> str:
+    """Stable model ID derived from the normalized absolute file path"""
+    normalized = os.path.normcase(os.path.abspath(file_path))
+    return str(uuid.uuid5(MODEL_ID_NAMESPACE, f"path:{normalized}"))
+
+
+def model_id_for_inode(device: int, inode: int) -> str:
+    """Stable model ID derived from the file identity (survives renames)"""
+    return str(uuid.uuid5(MODEL_ID_NAMESPACE, f"inode:{device}:{inode}"))
+
+
+def model_id_for_hash(sha256: str) -> str:
+    """Stable model ID derived from the file content (survives moves and copies)"""
+    return str(uuid.uuid5(MODEL_ID_NAMESPACE, f"sha256:{sha256.lower()}"))
+
 
 class LoraModel(BaseModel):
     """LoRA モデルのデータモデル"""
@@ -71,16 +93,21 @@ class ModelInfo(BaseModel):
         modified_time: datetime,
         created_time: Optional[datetime] = None,
         civitai_metadata: Optional[dict] = None,
-        preview_image_url: Optional[str] = None
+        preview_image_url: Optional[str] = None,
+        model_id: Optional[str] = None
     ) -> "ModelInfo":
-        """Create ModelInfo from file path and metadata"""
+        """Create ModelInfo from file path and metadata
+
+        The ID defaults to one derived from the file path, so rescanning
+        the same file yields the same ID.
+        """
         from pathlib import Path
 
         path = Path(file_path)
         filename = path.name
 
         return cls(
-            id=str(uuid.uuid4()),
+            id=model_id or model_id_for_path(str(file_path)),
             filename=filename,
             file_path=str(file_path),
             file_size=file_size,
@@ -0,0 +1,297 @@
+"""Local mirror of remote preview images"""
+
+import asyncio
+import hashlib
+import logging
+from pathlib import PurePosixPath
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+from sd_model_manager.lib import metrics
+from sd_model_manager.lib.disk_cache import DiskCache
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+# Route serving mirrored images (``ui/api/previews.py``)
+MIRROR_PATH = "/api/previews"
+
+MEDIA_TYPES: dict[str, str] = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+}
+
+PREVIEW_FETCHES = metrics.counter(
+    "sdmm_preview_mirror_fetches_total", "Remote preview image fetches per result", ("result",)
+)
+
+
+def preview_key(url: str) -> str:
+    """Cache key of a remote image: URL hash plus the extension of the URL path"""
+    suffix = PurePosixPath(urlsplit(url).path).suffix.lower()
+    digest = hashlib.sha256(url.encode()).hexdigest()[:32]
+    return digest + (suffix if suffix in MEDIA_TYPES else "")
+
+
+def media_type(key: str) -> str:
+    """Content type of a mirrored image from its key"""
+    return MEDIA_TYPES.get(PurePosixPath(key).suffix, "application/octet-stream")
+
+
+def is_remote(url: str | None) -> bool:
+    """Whether a preview URL points at a remote server (not yet mirrored)"""
+    return bool(url) and url.startswith(("http://", "https://"))
+
+
+class MirrorResult(BaseModel):
+    """Summary of a single mirror run"""
+
+    requested: int = 0  # distinct remote URLs
+    cached: int = 0  # already in the local cache
+    fetched: int = 0
+    failed: int = 0
+    rewritten: int = 0  # registry entries pointed at the local copy
+
+
+class PreviewMirror:
+    """Fetches remote preview images once and serves them locally
+
+    Images referenced by ``preview_image_url`` are downloaded with at
+    most ``concurrency`` requests in flight and streamed into a
+    size-bounded LRU disk cache keyed by the hash of the URL. Responses
+    that are not ``image/*`` or ``video/*``, or larger than
+    ``max_file_bytes``, are rejected. Transport errors, 429
+    and 5xx responses are retried with exponential backoff; other
+    errors are not. Models whose image is cached have their
+    ``preview_image_url`` rewritten to ``/api/previews/<key>``. The
+    original URL stays in ``civitai_metadata``, so an evicted image can
+    still be redirected to its source by any worker, also after a restart.
+    """
+
+    BACKOFF_MAX_SECONDS = 30.0
+
+    def __init__(
+        self,
+        cache: DiskCache,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+        backoff: float = 1.0,
+        max_file_bytes: int = 50 * 1024 * 1024
+    ):
+        """Initialize mirror
+
+        Args:
+            cache: Disk cache for the images
+            concurrency: Maximum number of concurrent fetches
+            max_retries: Retries per image after the first attempt
+            timeout: Timeout per request in seconds
+            backoff: Initial retry delay in seconds (doubled per retry)
+            max_file_bytes: Largest image or video accepted
+        """
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_file_bytes = max_file_bytes
+        self._sync_task: asyncio.Task | None = None
+        # Runs are serialized so that overlapping syncs do not fetch the same image twice
+        self._sync_lock = asyncio.Lock()
+
+    @staticmethod
+    def source_url(key: str, models: Iterable[ModelInfo]) -> str | None:
+        """Remote URL of a cache key, looked up in the models' Civitai metadata
+
+        Args:
+            key: Cache key of the image
+            models: Models to search (usually the whole registry)
+
+        Returns:
+            The first image or preview URL with that key, or None
+        """
+        for model in models:
+            images = (model.civitai_metadata or {}).get("images") or []
+            urls = [image.get("url") for image in images if isinstance(image, dict)]
+            urls.append(model.preview_image_url)
+            for url in urls:
+                if is_remote(url) and preview_key(url) == key:
+                    return url
+        return None
+
+    def local_url(self, url: str) -> str | None:
+        """Local URL of a mirrored image, or None if it is not cached (blocking)"""
+        key = preview_key(url)
+        if self.cache.get(key) is None:
+            return None
+        return f"{MIRROR_PATH}/{key}"
+
+    def rewrite(self, models: Iterable[ModelInfo]) -> list[ModelInfo]:
+        """Point the previews of models at their local copies where cached (blocking)
+
+        Returns:
+            Models with ``preview_image_url`` rewritten where possible
+        """
+        rewritten = []
+        for model in models:
+            local = is_remote(model.preview_image_url) and self.local_url(model.preview_image_url)
+            if local:
+                model = model.model_copy(update={"preview_image_url": local})
+            rewritten.append(model)
+        return rewritten
+
+    async def mirror(self, urls: Iterable[str]) -> MirrorResult:
+        """Fetch the images that are not cached yet
+
+        Args:
+            urls: Remote image URLs (duplicates are fetched once)
+
+        Returns:
+            Counts of cached, fetched and failed images
+        """
+        pending = list(dict.fromkeys(url for url in urls if is_remote(url)))
+        result = MirrorResult(requested=len(pending))
+        missing = await asyncio.to_thread(
+            lambda: [url for url in pending if self.local_url(url) is None]
+        )
+        result.cached = len(pending) - len(missing)
+        if not missing:
+            return result
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(client: httpx.AsyncClient, url: str) -> bool:
+            async with semaphore:
+                return await self._fetch(client, url)
+
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+            fetched = await asyncio.gather(*(fetch(client, url) for url in missing))
+        result.fetched = sum(fetched)
+        result.failed = len(missing) - result.fetched
+        logger.info(
+            "Preview mirror: %d requested, %d cached, %d fetched, %d failed",
+            result.requested, result.cached, result.fetched, result.failed
+        )
+        return result
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> bool:
+        """Fetch one image with retries and store it in the cache"""
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with client.stream("GET", url) as response:
+                    if response.status_code == 200:
+                        if not await self._store(response, url):
+                            break
+                        PREVIEW_FETCHES.labels("fetched").inc()
+                        return True
+                    if response.status_code != 429 and response.status_code < 500:
+                        logger.warning(
+                            "Preview not mirrored (HTTP %d): %s", response.status_code, url
+                        )
+                        break
+                    error = f"HTTP {response.status_code}"
+                    retry_after = response.headers.get("retry-after")
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                logger.warning("Preview not mirrored after %d attempts (%s): %s",
+                               attempt + 1, error, url)
+                break
+            delay = self.backoff * (2 ** attempt)
+            if retry_after is not None:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            PREVIEW_FETCHES.labels("retried").inc()
+            await asyncio.sleep(min(delay, self.BACKOFF_MAX_SECONDS))
+        PREVIEW_FETCHES.labels("failed").inc()
+        return False
+
+    async def _store(self, response: httpx.Response, url: str) -> bool:
+        """Stream an image response into the cache
+
+        Returns:
+            False if the response is not an image or video, or too large
+        """
+        content_type = response.headers.get("content-type", "").partition(";")[0].strip()
+        if not content_type.lower().startswith(("image/", "video/")):
+            logger.warning("Preview not mirrored (Content-Type %r): %s", content_type, url)
+            return False
+        length = response.headers.get("content-length", "")
+        if length.isdigit() and int(length) > self.max_file_bytes:
+            logger.warning("Preview not mirrored (%s bytes): %s", length, url)
+            return False
+
+        key = preview_key(url)
+        part = await asyncio.to_thread(self.cache.temp_path, key)
+        # File I/O runs in worker threads so that slow disks do not stall the loop
+        f = await asyncio.to_thread(part.open, "wb")
+        try:
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_file_bytes:
+                    logger.warning(
+                        "Preview not mirrored (over %d bytes): %s", self.max_file_bytes, url
+                    )
+                    return False
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(self.cache.put_file, key, part)
+            return True
+        finally:
+            # Already closed on success; on failure or cancellation only the
+            # partial file is discarded
+            f.close()
+            part.unlink(missing_ok=True)
+
+    async def sync(self, registry: ModelRegistry) -> MirrorResult:
+        """Mirror the remote previews of the registry and rewrite the entries
+
+        Args:
+            registry: Registry whose ``preview_image_url`` values to mirror
+
+        Returns:
+            Summary including the number of rewritten entries
+        """
+        async with self._sync_lock:
+            result = await self.mirror(model.preview_image_url for model in registry.list())
+            # Re-read the registry: entries may have changed while fetching
+            current = [model for model in registry.list() if is_remote(model.preview_image_url)]
+            for model in await asyncio.to_thread(self.rewrite, current):
+                if not is_remote(model.preview_image_url):
+                    registry.upsert(model)
+                    result.rewritten += 1
+            return result
+
+    def schedule_sync(self, registry: ModelRegistry) -> None:
+        """Start ``sync`` in the background, replacing a previous run
+
+        Images fetched by the replaced run stay cached, so nothing is lost
+        but the requests in flight.
+        """
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+        self._sync_task = asyncio.create_task(self.sync(registry))
+
+    async def close(self) -> None:
+        """Stop a background sync"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
@@ -0,0 +1,225 @@
+"""SQLite-backed registry contents shared between server worker processes"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from sd_model_manager.registry.models import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS registry_entries (
+    file_path TEXT PRIMARY KEY,
+    data TEXT,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS registry_entries_seq ON registry_entries (seq);
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+@dataclass
+class RegistryChanges:
+    """Changes another process committed since a reader's last position"""
+
+    generation: int
+    seq: int
+    scanned_at: datetime | None
+    # True when ``models`` is the complete contents (a full scan replaced them)
+    full: bool
+    models: list[ModelInfo] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+class RegistryStore:
+    """Persists registry entries so that every worker sees the same models
+
+    Each worker keeps its in-memory registry and writes changes through to
+    this store. Every write stamps the affected row with the next value of
+    a store-wide sequence, and removals leave a tombstone row, so a reader
+    that remembers the last sequence it applied can fetch just the rows
+    changed since. A full scan starts a new generation, which tells
+    readers to reload everything instead. ``PRAGMA data_version`` changes
+    only when another connection commits, so checking it first makes the
+    common no-change case a single cheap query. The database runs in WAL
+    mode so that readers in other processes are never blocked by a writer.
+    """
+
+    def __init__(self, db_path: Path):
+        """Initialize store
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._data_version: int | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection on first use and create the schema"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str) -> str | None:
+        row = conn.execute("SELECT value FROM registry_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection) -> int:
+        """Allocate the next sequence number (call inside a write transaction)"""
+        conn.execute(
+            "INSERT INTO registry_meta VALUES ('seq', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        return int(RegistryStore._meta(conn, "seq"))
+
+    def changes(self, generation: int, seq: int) -> RegistryChanges | None:
+        """Rows changed since a reader's position, or None if nothing was committed
+
+        Args:
+            generation: Generation the reader last loaded
+            seq: Last sequence number the reader applied
+
+        Returns:
+            The full contents if the generation changed, otherwise the
+            upserted models and removed paths with a sequence above ``seq``
+        """
+        with self._lock:
+            conn = self._connect()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return None
+            self._data_version = version
+
+            # Read everything from one snapshot: a commit landing between the
+            # row query and the sequence query would otherwise advance the
+            # reader past a row it never saw
+            conn.execute("BEGIN")
+            try:
+                current = int(self._meta(conn, "generation") or 0)
+                meta_scanned_at = self._meta(conn, "scanned_at")
+                full = current != generation
+                if full:
+                    rows = conn.execute(
+                        "SELECT file_path, data, seq FROM registry_entries "
+                        "WHERE data IS NOT NULL ORDER BY rowid"
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT file_path, data, seq FROM registry_entries "
+                        "WHERE seq > ? ORDER BY seq",
+                        (seq,)
+                    ).fetchall()
+                latest = int(self._meta(conn, "seq") or 0)
+            finally:
+                conn.commit()
+
+        changes = RegistryChanges(
+            generation=current,
+            seq=latest,
+            scanned_at=datetime.fromisoformat(meta_scanned_at) if meta_scanned_at else None,
+            full=full
+        )
+        for file_path, data, _ in rows:
+            if data is None:
+                changes.removed.append(file_path)
+            else:
+                changes.models.append(ModelInfo.model_validate_json(data))
+        return changes
+
+    def replace_all(self, models: Iterable[ModelInfo], scanned_at: datetime) -> tuple[int, int]:
+        """Replace all entries with the result of a full scan
+
+        Returns:
+            The new generation and sequence number
+        """
+        models = list(models)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                seq = self._next_seq(conn)
+                generation = int(self._meta(conn, "generation") or 0) + 1
+                conn.execute("DELETE FROM registry_entries")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO registry_entries VALUES (?, ?, ?)",
+                    [(model.file_path, model.model_dump_json(), seq) for model in models]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO registry_meta VALUES (?, ?)",
+                    [("generation", str(generation)), ("scanned_at", scanned_at.isoformat())]
+                )
+        return generation, seq
+
+    def upsert(self, model: ModelInfo) -> int:
+        """Insert or replace one entry
+
+        Returns:
+            Sequence number of the change
+        """
+        data = model.model_dump_json()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                seq = self._next_seq(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO registry_entries VALUES (?, ?, ?)",
+                    (model.file_path, data, seq)
+                )
+        return seq
+
+    def remove(self, file_path: str) -> int:
+        """Delete one entry, leaving a tombstone for readers applying changes
+
+        Returns:
+            Sequence number of the change
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                seq = self._next_seq(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO registry_entries VALUES (?, NULL, ?)",
+                    (file_path, seq)
+                )
+        return seq
+
+    def clear(self) -> None:
+        """Drop all entries and the scan time
+
+        Called once before the workers start, so that they do not serve
+        the library of a previous run as if it had just been scanned.
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM registry_entries")
+                conn.execute("DELETE FROM registry_meta WHERE key = 'scanned_at'")
+                # A new generation makes running readers drop their contents too
+                generation = int(self._meta(conn, "generation") or 0) + 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO registry_meta VALUES ('generation', ?)",
+                    (str(generation),)
+                )
+
+    def close(self) -> None:
+        """Close the connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -3,17 +3,52 @@
 import asyncio
 import json
 import logging
+import os
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import AsyncIterator
 
 from sd_model_manager.config import Config
+from sd_model_manager.lib import metrics
 from sd_model_manager.lib.errors import AppError
-from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.lib.file_utils import MODEL_FILE_EXTENSIONS
+from sd_model_manager.lib.log_aggregation import ErrorAggregator, ErrorGroup
+from sd_model_manager.registry.hash_index import sidecar_sha256
+from sd_model_manager.registry.models import (
+    ModelInfo,
+    model_id_for_hash,
+    model_id_for_inode,
+    model_id_for_path,
+)
 
 logger = logging.getLogger(__name__)
 
 
+CIVITAI_INFO_SUFFIX = ".civitai.info"
+
+SCAN_PHASE_SECONDS = metrics.histogram(
+    "sdmm_scan_phase_seconds", "Time spent per model scan phase", ("phase",)
+)
+SCAN_FILES = metrics.counter("sdmm_scan_files_total", "Model files processed by scans")
+SCAN_ERRORS = metrics.counter("sdmm_scan_errors_total", "Model files that failed to process")
+SCAN_FILES_PER_SECOND = metrics.gauge(
+    "sdmm_scan_files_per_second", "Processing rate of the last completed scan"
+)
+
+
+def civitai_info_path(file_path: Path) -> Path:
+    """Return the .civitai.info sidecar path for a model file
+
+    Args:
+        file_path: Path to model file
+
+    Returns:
+        Path of the sidecar next to the model
+    """
+    return file_path.parent / f"{file_path.name}{CIVITAI_INFO_SUFFIX}"
+
+
 class ModelScanError(AppError):
     """Model scanning error"""
 
@@ -32,7 +67,10 @@ class ModelScanner:
         """
         self.config = config
         self.base_path = Path(config.model_scan_dir)
-        self.supported_extensions = {".safetensors", ".ckpt", ".pt", ".pth", ".bin"}
+        self.supported_extensions = set(MODEL_FILE_EXTENSIONS)
+        # Per-signature error counts of the last completed scan (failed files
+        # and non-fatal warnings such as unreadable sidecars)
+        self.last_errors: list[ErrorGroup] = []
 
         # Model type detection patterns (case-insensitive)
         self.type_patterns = {
@@ -48,6 +86,15 @@ class ModelScanner:
             "Archive": ["archive"],
         }
 
+    @property
+    def last_failed_count(self) -> int:
+        """Number of files the last scan could not process at all
+
+        Warnings (e.g. a malformed sidecar) are in ``last_errors`` too, but
+        their model is still returned, so they are not counted here.
+        """
+        return sum(group.count for group in self.last_errors if group.kind == "process")
+
     async def scan(self) -> list[ModelInfo]:
         """Scan model directory and return list of discovered models
 
@@ -57,6 +104,76 @@ class ModelScanner:
         Raises:
             ModelScanError: If directory does not exist or cannot be accessed
         """
+        models = [model async for model in self.iter_models()]
+        logger.info("Model scan completed. Found %d models", len(models))
+        return models
+
+    async def iter_models(self) -> AsyncIterator[ModelInfo]:
+        """Yield models one by one as the files are processed
+
+        Unlike ``scan`` this does not hold the whole result in memory,
+        so callers can stream output for very large libraries.
+
+        Yields:
+            ModelInfo for each discovered model file
+
+        Raises:
+            ModelScanError: If directory does not exist or cannot be accessed
+        """
+        self._check_base_path()
+        logger.info("Starting model scan in directory: %s", self.base_path)
+
+        # Identical failures on a large share are collapsed: only the first few of
+        # each kind are logged in full, the rest are summarized when the scan ends
+        errors = ErrorAggregator(
+            logger,
+            max_logged=self.config.scan_error_log_limit,
+            max_samples=self.config.scan_error_samples
+        )
+        started = time.perf_counter()
+        processing = 0.0
+        files = 0
+        seen_ids: set[str] = set()
+        async for file_path in self._scan_files():
+            if files == 0:
+                SCAN_PHASE_SECONDS.labels("walk").observe(time.perf_counter() - started)
+            files += 1
+            file_started = time.perf_counter()
+            try:
+                model = await self._process_file(file_path, errors)
+            except Exception as e:
+                SCAN_ERRORS.inc()
+                # Record error but continue scanning
+                errors.record("process", file_path, e, "Error processing file %s: %s")
+                continue
+            finally:
+                processing += time.perf_counter() - file_started
+                SCAN_FILES.inc()
+            if model.id in seen_ids:
+                # Hardlinks (inode) or identical copies (hash) share a source;
+                # keep IDs unique by giving the later file its path ID
+                model.id = model_id_for_path(model.file_path)
+            seen_ids.add(model.id)
+            yield model
+
+        elapsed = time.perf_counter() - started
+        if files == 0:
+            SCAN_PHASE_SECONDS.labels("walk").observe(elapsed)
+        SCAN_PHASE_SECONDS.labels("process").observe(processing)
+        SCAN_PHASE_SECONDS.labels("total").observe(elapsed)
+        SCAN_FILES_PER_SECOND.set(files / elapsed if elapsed > 0 else 0.0)
+        errors.log_summary()
+        self.last_errors = errors.summary()
+        logger.info(
+            "Scanned %d files in %.2fs (%d errors)", files, elapsed, errors.total,
+            extra={
+                "path": str(self.base_path), "files": files, "duration": elapsed,
+                "errors": errors.total,
+            }
+        )
+
+    def _check_base_path(self) -> None:
+        """Raise ModelScanError unless the model directory is readable"""
         if not self.base_path.is_dir():
             raise ModelScanError(
                 f"Model directory not found or not a directory: {self.base_path}",
@@ -72,24 +189,32 @@ class ModelScanner:
                 details={"path": str(self.base_path), "error": str(e)}
             )
 
-        logger.info("Starting model scan in directory: %s", self.base_path)
+    async def scan_file(self, file_path: Path) -> ModelInfo:
+        """Build ModelInfo for a single model file without a full scan
 
-        models = []
-        async for file_path in self._scan_files():
-            try:
-                model_info = await self._process_file(file_path)
-                models.append(model_info)
-            except Exception as e:
-                # Log error but continue scanning
-                logger.error(
-                    "Error processing file %s: %s",
-                    file_path,
-                    str(e),
-                    exc_info=True
-                )
+        Used to register files that were just added to the library
+        (e.g. by a download) directly into the registry.
 
-        logger.info("Model scan completed. Found %d models", len(models))
-        return models
+        Args:
+            file_path: Path to model file
+
+        Returns:
+            ModelInfo object with extracted metadata
+        """
+        return await self._process_file(Path(file_path))
+
+    def detect_model_type(self, file_path: Path) -> str:
+        """Detect model type from the directory names in a path
+
+        Works for paths outside the library as well (e.g. import sources).
+
+        Args:
+            file_path: Path to model file
+
+        Returns:
+            Model type string (LoRA, Checkpoint, VAE, Embedding, Unknown)
+        """
+        return self._detect_model_type(Path(file_path))
 
     async def _scan_files(self) -> AsyncIterator[Path]:
         """Async generator for filesystem traversal
@@ -111,11 +236,14 @@ class ModelScanner:
         for file_path in files:
             yield file_path
 
-    async def _process_file(self, file_path: Path) -> ModelInfo:
+    async def _process_file(
+        self, file_path: Path, errors: ErrorAggregator | None = None
+    ) -> ModelInfo:
         """Process a single model file and extract metadata
 
         Args:
             file_path: Path to model file
+            errors: Collects non-fatal errors during a scan (logged directly if None)
 
         Returns:
             ModelInfo object with extracted metadata
@@ -138,12 +266,12 @@ class ModelScanner:
         category = self._detect_category(file_path)
 
         # Parse Civitai metadata if available
-        civitai_metadata = await self._parse_civitai_metadata(file_path)
+        civitai_metadata = await self._parse_civitai_metadata(file_path, errors)
 
         # Extract preview image URL from metadata
         preview_image_url = self._extract_preview_image_url(civitai_metadata)
 
-        return ModelInfo.from_file_path(
+        model = ModelInfo.from_file_path(
             file_path=str(file_path),
             model_type=model_type,
             category=category,
@@ -153,6 +281,25 @@ class ModelScanner:
             civitai_metadata=civitai_metadata,
             preview_image_url=preview_image_url
         )
+        model.id = self._model_id(model, stat)
+        return model
+
+    def _model_id(self, model: ModelInfo, stat: os.stat_result) -> str:
+        """Derive the model ID according to ``config.model_id_source``
+
+        ``path`` IDs are unique by construction. ``inode`` IDs survive
+        renames within a filesystem and ``hash`` IDs (taken from the
+        sidecar, never computed during a scan) survive moves and copies;
+        both fall back to the path ID when the source is unavailable.
+        """
+        source = self.config.model_id_source
+        if source == "inode" and stat.st_ino:
+            return model_id_for_inode(stat.st_dev, stat.st_ino)
+        if source == "hash":
+            sha256 = sidecar_sha256(model)
+            if sha256:
+                return model_id_for_hash(sha256)
+        return model.id
 
     def _detect_model_type(self, file_path: Path) -> str:
         """Detect model type from file path patterns
@@ -208,17 +355,19 @@ class ModelScanner:
         # Default to Active if no pattern matches
         return "Active"
 
-    async def _parse_civitai_metadata(self, file_path: Path) -> dict | None:
+    async def _parse_civitai_metadata(
+        self, file_path: Path, errors: ErrorAggregator | None = None
+    ) -> dict | None:
         """Parse .civitai.info metadata file if it exists
 
         Args:
             file_path: Path to model file
+            errors: Collects the parse failure during a scan (logged directly if None)
 
         Returns:
             Parsed JSON metadata dict or None if file doesn't exist or is invalid
         """
-        # Construct .civitai.info file path
-        metadata_path = file_path.parent / f"{file_path.name}.civitai.info"
+        metadata_path = civitai_info_path(file_path)
 
         # Check if file exists asynchronously (offload to thread pool)
         loop = asyncio.get_event_loop()
@@ -233,11 +382,18 @@ class ModelScanner:
             return metadata
         except (json.JSONDecodeError, OSError) as e:
             # Log warning but don't fail the scan
-            logger.warning(
-                "Failed to parse Civitai metadata for %s: %s",
-                file_path.name,
-                str(e)
-            )
+            if errors is not None:
+                errors.record(
+                    "civitai_metadata", metadata_path, e,
+                    "Failed to parse Civitai metadata %s: %s",
+                    level=logging.WARNING, exc_info=False
+                )
+            else:
+                logger.warning(
+                    "Failed to parse Civitai metadata for %s: %s",
+                    file_path.name,
+                    str(e)
+                )
             return None
 
     def _extract_preview_image_url(self, civitai_metadata: dict | None) -> str | None:
@@ -249,14 +405,26 @@ class ModelScanner:
         Returns:
             URL string of first preview image or None
         """
-        if not civitai_metadata:
-            return None
+        return extract_preview_image_url(civitai_metadata)
+
 
-        # Try to get first image URL
-        images = civitai_metadata.get("images", [])
-        if images and len(images) > 0:
-            first_image = images[0]
-            if isinstance(first_image, dict):
-                return first_image.get("url")
+def extract_preview_image_url(civitai_metadata: dict | None) -> str | None:
+    """Extract primary preview image URL from Civitai metadata
 
+    Args:
+        civitai_metadata: Parsed Civitai metadata dict
+
+    Returns:
+        URL string of first preview image or None
+    """
+    if not civitai_metadata:
         return None
+
+    # Try to get first image URL
+    images = civitai_metadata.get("images", [])
+    if images and len(images) > 0:
+        first_image = images[0]
+        if isinstance(first_image, dict):
+            return first_image.get("url")
+
+    return None
@@ -0,0 +1,331 @@
+"""Tensor-level inspection of safetensors files"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from sd_model_manager.lib.errors import AppError
+
+logger = logging.getLogger(__name__)
+
+# Bytes per element of each safetensors dtype
+DTYPE_SIZES: dict[str, int] = {
+    "F64": 8, "F32": 4, "F16": 2, "BF16": 2,
+    "F8_E4M3": 1, "F8_E5M2": 1,
+    "I64": 8, "I32": 4, "I16": 2, "I8": 1,
+    "U64": 8, "U32": 4, "U16": 2, "U8": 1,
+    "BOOL": 1,
+}
+
+# NumPy dtypes that can view safetensors data directly (BF16 is widened per chunk)
+_NUMPY_DTYPES: dict[str, str] = {
+    "F64": "<f8", "F32": "<f4", "F16": "<f2",
+    "I64": "<i8", "I32": "<i4", "I16": "<i2", "I8": "i1",
+    "U64": "<u8", "U32": "<u4", "U16": "<u2", "U8": "u1",
+    "BOOL": "u1",
+}
+
+# Safety limit for the JSON header (the format caps it at 100MB)
+MAX_HEADER_SIZE = 100 * 1024 * 1024
+
+# Elements per chunk when computing statistics (bounds temporary memory)
+STATS_CHUNK_ELEMENTS = 1 << 20
+
+# Module names up to and including an index ("input_blocks.1", "down_blocks_0")
+_INDEXED = re.compile(r"\D*?\d+")
+
+# Tensor name prefixes of checkpoint components, most specific first
+COMPONENT_PREFIXES: tuple[tuple[str, str], ...] = (
+    ("model_ema.", "ema"),
+    ("model.diffusion_model.", "unet"),
+    ("first_stage_model.", "vae"),
+    ("cond_stage_model.", "text_encoder"),
+    ("conditioner.", "text_encoder"),
+    ("text_encoders.", "text_encoder"),
+    ("lora_unet_", "unet"),
+    ("lora_te", "text_encoder"),
+    ("lora_vae_", "vae"),
+)
+
+
+class TensorInspectionError(AppError):
+    """The file cannot be inspected as safetensors"""
+
+    def __init__(self, message: str, details: Optional[dict[str, Any]] = None):
+        super().__init__(message, code="TENSOR_INSPECTION_ERROR", details=details)
+
+
+class TensorStats(BaseModel):
+    """Summary statistics of the values of one tensor"""
+
+    min: float
+    max: float
+    mean: float
+    std: float
+    zeros: int  # number of exactly-zero elements
+
+
+class TensorInfo(BaseModel):
+    """One tensor in a safetensors file"""
+
+    name: str
+    dtype: str
+    shape: list[int]
+    params: int
+    start: int  # absolute byte offset in the file
+    end: int  # exclusive
+    block: str
+    component: str
+    stats: TensorStats | None = None
+
+
+class GroupSummary(BaseModel):
+    """Tensor, parameter and byte counts of a group of tensors"""
+
+    tensors: int = 0
+    params: int = 0
+    bytes: int = 0
+
+    def add(self, tensor: TensorInfo) -> None:
+        self.tensors += 1
+        self.params += tensor.params
+        self.bytes += tensor.end - tensor.start
+
+
+class TensorReport(BaseModel):
+    """Inspection result of a safetensors file"""
+
+    file_path: str
+    file_size: int
+    header_size: int
+    metadata: dict[str, str]
+    tensor_count: int
+    total_params: int
+    dtypes: dict[str, GroupSummary]
+    components: dict[str, GroupSummary]  # unet / text_encoder / vae / ema / other
+    blocks: dict[str, GroupSummary]
+    has_ema: bool
+    tensors: list[TensorInfo]
+
+
+def _split_component(name: str) -> tuple[str, str]:
+    """Split a tensor name into its component and the rest of the name"""
+    for prefix, component in COMPONENT_PREFIXES:
+        if name.startswith(prefix):
+            return component, name[len(prefix):]
+    return "other", name
+
+
+def component_of(name: str) -> str:
+    """Checkpoint component a tensor belongs to (by name prefix)"""
+    return _split_component(name)[0]
+
+
+def block_of(name: str, depth: int = 1) -> str:
+    """Block of a tensor: its component and the first ``depth`` indexed modules
+
+    ``model.diffusion_model.input_blocks.1.0.proj.weight`` belongs to
+    ``unet.input_blocks.1`` (depth 1) or ``unet.input_blocks.1.0`` (depth 2).
+    LoRA names encode the module path with underscores and are grouped the
+    same way (``lora_unet_down_blocks_0_attentions_0_...`` ->
+    ``unet.down_blocks_0``). Names without an index use the module path.
+    """
+    component, rest = _split_component(name)
+    if name.startswith("lora_"):
+        module = rest.split(".")[0]
+    else:
+        module = rest.rpartition(".")[0] or rest
+    segments = _INDEXED.findall(module)
+    block = "".join(segments[:max(1, depth)]).strip("._") if segments else module
+    if component == "other":
+        return block or name
+    return f"{component}.{block}" if block else component
+
+
+def _product(shape: list[int]) -> int:
+    count = 1
+    for dim in shape:
+        count *= dim
+    return count
+
+
+def _tensor_stats(buffer: mmap.mmap, tensor: TensorInfo) -> TensorStats | None:
+    """Statistics over an mmap'd tensor in bounded chunks (requires NumPy)
+
+    Values are read through a zero-copy view of the mapping and widened to
+    float64 one chunk at a time, so temporary memory stays bounded however
+    large the tensor is. FP8 and empty tensors are skipped.
+    """
+    import numpy as np
+
+    if tensor.params == 0 or (tensor.dtype not in _NUMPY_DTYPES and tensor.dtype != "BF16"):
+        return None
+    dtype = np.dtype("<u2" if tensor.dtype == "BF16" else _NUMPY_DTYPES[tensor.dtype])
+    values = np.frombuffer(buffer, dtype=dtype, count=tensor.params, offset=tensor.start)
+
+    total = total_squares = 0.0
+    low, high = float("inf"), float("-inf")
+    zeros = 0
+    for begin in range(0, tensor.params, STATS_CHUNK_ELEMENTS):
+        chunk = values[begin:begin + STATS_CHUNK_ELEMENTS]
+        if tensor.dtype == "BF16":
+            chunk = (chunk.astype(np.uint32) << 16).view(np.float32)
+        # Accumulate in float64 so that F16 sums do not overflow
+        wide = chunk.astype(np.float64)
+        total += float(wide.sum())
+        total_squares += float(np.dot(wide, wide))
+        low = min(low, float(wide.min()))
+        high = max(high, float(wide.max()))
+        zeros += int(wide.size - np.count_nonzero(wide))
+    mean = total / tensor.params
+    variance = max(0.0, total_squares / tensor.params - mean * mean)
+    return TensorStats(min=low, max=high, mean=mean, std=variance ** 0.5, zeros=zeros)
+
+
+def inspect_safetensors(path: Path, stats: bool = False, depth: int = 1) -> TensorReport:
+    """Read the tensor layout of a safetensors file (blocking)
+
+    The file is memory-mapped: only the header is parsed, and tensor data
+    is touched only when ``stats`` is requested.
+
+    Args:
+        path: Path of the safetensors file
+        stats: Compute per-tensor statistics (requires NumPy)
+        depth: Indexed modules that make up a block (see ``block_of``)
+
+    Returns:
+        Tensor list with aggregates per dtype, component and block
+
+    Raises:
+        TensorInspectionError: Not a valid safetensors file, or NumPy is missing
+    """
+    path = Path(path)
+    details = {"file_path": str(path)}
+    if stats:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            raise TensorInspectionError(
+                "NumPy is required for tensor statistics; install sd-model-manager[tensors]",
+                details
+            ) from None
+
+    with path.open("rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size < 8:
+            raise TensorInspectionError("File is too small to be safetensors", details)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            (header_size,) = struct.unpack("<Q", buffer[:8])
+            if header_size > min(MAX_HEADER_SIZE, file_size - 8):
+                raise TensorInspectionError("Invalid safetensors header size", details)
+            try:
+                header = json.loads(buffer[8:8 + header_size])
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise TensorInspectionError(f"Invalid safetensors header: {e}", details) from e
+            if not isinstance(header, dict):
+                raise TensorInspectionError("Invalid safetensors header", details)
+
+            data_start = 8 + header_size
+            metadata = header.pop("__metadata__", None) or {}
+            tensors = []
+            for name, entry in header.items():
+                try:
+                    dtype = entry["dtype"]
+                    shape = [int(dim) for dim in entry["shape"]]
+                    begin, end = (int(offset) for offset in entry["data_offsets"])
+                except (KeyError, TypeError, ValueError) as e:
+                    raise TensorInspectionError(
+                        f"Invalid entry for tensor {name}", {**details, "error": str(e)}
+                    ) from e
+                params = _product(shape)
+                size = DTYPE_SIZES.get(dtype)
+                if (begin > end or data_start + end > file_size
+                        or (size is not None and end - begin != params * size)):
+                    raise TensorInspectionError(
+                        f"Invalid data offsets for tensor {name}", {**details, "dtype": dtype}
+                    )
+                tensors.append(TensorInfo(
+                    name=name, dtype=dtype, shape=shape, params=params,
+                    start=data_start + begin, end=data_start + end,
+                    block=block_of(name, depth), component=component_of(name)
+                ))
+
+            if stats:
+                for tensor in tensors:
+                    tensor.stats = _tensor_stats(buffer, tensor)
+
+    tensors.sort(key=lambda tensor: tensor.start)
+    dtypes: dict[str, GroupSummary] = {}
+    components: dict[str, GroupSummary] = {}
+    blocks: dict[str, GroupSummary] = {}
+    for tensor in tensors:
+        dtypes.setdefault(tensor.dtype, GroupSummary()).add(tensor)
+        components.setdefault(tensor.component, GroupSummary()).add(tensor)
+        blocks.setdefault(tensor.block, GroupSummary()).add(tensor)
+
+    return TensorReport(
+        file_path=str(path),
+        file_size=file_size,
+        header_size=header_size,
+        metadata={str(key): str(value) for key, value in metadata.items()},
+        tensor_count=len(tensors),
+        total_params=sum(tensor.params for tensor in tensors),
+        dtypes=dtypes,
+        components=components,
+        blocks=blocks,
+        has_ema="ema" in components,
+        tensors=tensors
+    )
+
+
+class TensorInspector:
+    """Caches inspection results by file fingerprint
+
+    Results are keyed by path, size, mtime and options, so a file that is
+    replaced or modified is inspected again while repeated requests for
+    an unchanged file are answered from memory.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """Initialize inspector
+
+        Args:
+            max_entries: Number of reports kept in memory
+        """
+        self.max_entries = max_entries
+        self._reports: OrderedDict[tuple, TensorReport] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def inspect(self, path: Path, stats: bool = False, depth: int = 1) -> TensorReport:
+        """Inspect a safetensors file, reusing the cached result when unchanged (blocking)
+
+        Raises:
+            TensorInspectionError: Not a valid safetensors file, or NumPy is missing
+            OSError: The file cannot be read
+        """
+        stat = Path(path).stat()
+        key = (str(path), stat.st_size, stat.st_mtime_ns, stats, depth)
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+                return report
+
+        report = inspect_safetensors(path, stats=stats, depth=depth)
+        logger.debug(
+            "Inspected %s: %d tensors, %d params", path, report.tensor_count, report.total_params
+        )
+        with self._lock:
+            self._reports[key] = report
+            while len(self._reports) > self.max_entries:
+                self._reports.popitem(last=False)
+        return report
@@ -0,0 +1,296 @@
+"""Thumbnails of local preview images for grid views"""
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Literal, Optional
+
+from sd_model_manager.lib.disk_cache import DiskCache
+from sd_model_manager.lib.errors import AppError
+from sd_model_manager.registry.models import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+ThumbnailFormat = Literal["webp", "jpeg"]
+
+MEDIA_TYPES: dict[str, str] = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Preview sidecars next to a model, most specific first: ``<stem>.preview.png``
+# is written by downloads and the Civitai Helper, ``<stem>.png`` by A1111
+PREVIEW_SUFFIXES = (
+    ".preview.png", ".preview.jpg", ".preview.jpeg", ".preview.webp",
+    ".png", ".jpg", ".jpeg", ".webp",
+)
+
+# Read size when hashing preview images
+_READ_CHUNK = 1024 * 1024
+
+
+class ThumbnailError(AppError):
+    """Thumbnails cannot be generated"""
+
+    def __init__(self, message: str, details: Optional[dict[str, Any]] = None):
+        super().__init__(message, code="THUMBNAIL_ERROR", details=details)
+
+
+@dataclass
+class Thumbnail:
+    """A generated thumbnail in the disk cache"""
+
+    path: Path
+    key: str  # content-addressed cache key, also used as the ETag
+    media_type: str
+
+
+def find_preview(model_path: Path) -> Path | None:
+    """Find the local preview image of a model file (blocking)
+
+    Args:
+        model_path: Path of the model file
+
+    Returns:
+        Path of the first existing preview sidecar, or None
+    """
+    model_path = Path(model_path)
+    for suffix in PREVIEW_SUFFIXES:
+        candidate = model_path.with_name(model_path.stem + suffix)
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def render_thumbnail(source: str, size: int, fmt: str, quality: int) -> bytes:
+    """Resize an image to fit in a ``size`` square (runs in a worker process)
+
+    Args:
+        source: Path of the source image
+        size: Maximum width and height in pixels
+        fmt: ``webp`` or ``jpeg``
+        quality: Encoder quality (1-100)
+
+    Returns:
+        Encoded thumbnail
+    """
+    import io
+
+    from PIL import Image
+
+    with Image.open(source) as image:
+        # Let the decoder downscale JPEGs while reading instead of decoding full size
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        if fmt == "jpeg":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        options: dict[str, Any] = {"quality": quality}
+        if fmt == "webp":
+            options["method"] = 4
+        else:
+            options["optimize"] = True
+        output = io.BytesIO()
+        image.save(output, format=fmt.upper(), **options)
+    return output.getvalue()
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        while chunk := f.read(_READ_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailService:
+    """Generates and caches thumbnails of local preview images
+
+    Resizing runs in a process pool so that decoding multi-MB PNGs
+    neither blocks the event loop nor contends for the GIL. Results are
+    stored in a size-bounded LRU disk cache under a content-addressed
+    key (digest of the source image, size and format), so identical
+    previews share one entry and a changed preview gets a new key. The
+    digest of each source is remembered by path/size/mtime so that it
+    is read only once while unchanged.
+    """
+
+    def __init__(
+        self,
+        cache: DiskCache,
+        workers: int = 2,
+        quality: int = 80,
+        executor: Executor | None = None
+    ):
+        """Initialize service
+
+        Args:
+            cache: Disk cache for encoded thumbnails
+            workers: Size of the process pool
+            quality: Encoder quality (1-100)
+            executor: Executor for resizing (default: a process pool created on first use)
+        """
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.quality = quality
+        self._executor = executor
+        self._owns_executor = executor is None
+        # (path, size, mtime_ns) -> digest of the source image
+        self._digests: dict[tuple[str, int, int], str] = {}
+        # Cache key -> thumbnail being generated (concurrent requests share it)
+        self._pending: dict[str, asyncio.Future] = {}
+        self._warm_task: asyncio.Task | None = None
+
+    @property
+    def available(self) -> bool:
+        """Whether Pillow is installed (``pip install sd-model-manager[thumbnails]``)"""
+        return importlib.util.find_spec("PIL") is not None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # spawn: forking a process that runs threads (log writer, loop monitor) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _source_key(self, model: ModelInfo, size: int, fmt: str) -> tuple[Path, str] | None:
+        """Find the preview and derive the cache key (blocking)"""
+        source = find_preview(Path(model.file_path))
+        if source is None:
+            return None
+        stat = source.stat()
+        fingerprint = (str(source), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(fingerprint)
+        if digest is None:
+            digest = self._digests[fingerprint] = _file_digest(source)
+        return source, f"{digest}-{size}.{fmt}"
+
+    async def get(
+        self, model: ModelInfo, size: int = 256, fmt: ThumbnailFormat = "webp"
+    ) -> Thumbnail | None:
+        """Return the thumbnail of a model, generating it on first request
+
+        Args:
+            model: Model whose preview to use
+            size: Maximum width and height in pixels
+            fmt: ``webp`` or ``jpeg``
+
+        Returns:
+            Cached thumbnail, or None if the model has no local preview
+
+        Raises:
+            ThumbnailError: Pillow is not installed or the preview cannot be decoded
+        """
+        found = await asyncio.to_thread(self._source_key, model, size, fmt)
+        if found is None:
+            return None
+        source, key = found
+        path = await asyncio.to_thread(self.cache.get, key)
+        if path is None:
+            path = await self._generate(source, key, size, fmt)
+        return Thumbnail(path=path, key=key, media_type=MEDIA_TYPES[fmt])
+
+    def get_cached(self, key: str) -> Thumbnail | None:
+        """Look up a thumbnail by its content-addressed key (blocking)"""
+        fmt = key.rpartition(".")[2]
+        if fmt not in MEDIA_TYPES:
+            return None
+        path = self.cache.get(key)
+        if path is None:
+            return None
+        return Thumbnail(path=path, key=key, media_type=MEDIA_TYPES[fmt])
+
+    async def _generate(self, source: Path, key: str, size: int, fmt: str) -> Path:
+        while (pending := self._pending.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The request generating it was cancelled (e.g. the client went
+                # away): take over the generation unless this one was cancelled too
+                current = asyncio.current_task()
+                if not pending.cancelled() or (current is not None and current.cancelling()):
+                    raise
+        if not self.available:
+            raise ThumbnailError(
+                "Pillow is not installed; install sd-model-manager[thumbnails]",
+                {"source": str(source)}
+            )
+
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        try:
+            data = await loop.run_in_executor(
+                self._get_executor(), render_thumbnail, str(source), size, fmt, self.quality
+            )
+            path = await asyncio.to_thread(self.cache.put, key, data)
+            logger.debug("Generated thumbnail %s from %s (%d bytes)", key, source, len(data))
+            future.set_result(path)
+            return path
+        except Exception as e:
+            error = e if isinstance(e, ThumbnailError) else ThumbnailError(
+                f"Failed to generate thumbnail: {e}", {"source": str(source)}
+            )
+            future.set_exception(error)
+            # Mark the exception as retrieved when nobody else is waiting for it
+            future.exception()
+            raise error from e
+        finally:
+            # Cancelled (or interrupted otherwise): release the waiters so they retry
+            if not future.done():
+                future.cancel()
+            del self._pending[key]
+
+    async def warm(
+        self, models: Iterable[ModelInfo], size: int = 256, fmt: ThumbnailFormat = "webp"
+    ) -> int:
+        """Generate missing thumbnails for models with local previews
+
+        Args:
+            models: Models to process
+            size: Maximum width and height in pixels
+            fmt: ``webp`` or ``jpeg``
+
+        Returns:
+            Number of thumbnails available afterwards
+        """
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def one(model: ModelInfo) -> bool:
+            async with semaphore:
+                try:
+                    return await self.get(model, size, fmt) is not None
+                except (ThumbnailError, OSError) as e:
+                    logger.warning("Thumbnail generation failed for %s: %s", model.file_path, e)
+                    return False
+
+        results = await asyncio.gather(*(one(model) for model in models))
+        count = sum(results)
+        logger.info("Thumbnails ready for %d of %d models", count, len(results))
+        return count
+
+    def schedule_warm(
+        self, models: Iterable[ModelInfo], size: int = 256, fmt: ThumbnailFormat = "webp"
+    ) -> None:
+        """Start ``warm`` in the background, replacing a previous run"""
+        if not self.available:
+            return
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+        self._warm_task = asyncio.create_task(self.warm(list(models), size, fmt))
+
+    async def close(self) -> None:
+        """Stop background generation and the process pool"""
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            try:
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+            self._warm_task = None
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,283 @@
+"""Scheduled checks for newer Civitai versions of installed models"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.lib.errors import DownloadError
+from sd_model_manager.lib.file_utils import atomic_write_text
+from sd_model_manager.registry.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ModelUpdateStatus(BaseModel):
+    """Update state of one Civitai model installed in the library"""
+
+    model_id: int
+    name: str | None = None
+    installed_version_ids: list[int]
+    latest_version_id: int | None = None
+    latest_version_name: str | None = None
+    checked_at: datetime | None = None
+    update_available: bool = False
+    file_paths: list[str]
+
+
+class UpdateCheckResult(BaseModel):
+    """Summary of a single update check run"""
+
+    installed: int = 0  # distinct Civitai models found in sidecars
+    stale: int = 0  # models due for a check
+    checked: int = 0  # models whose state was refreshed
+    not_modified: int = 0  # models answered by a 304
+    deferred: int = 0  # stale models left for the next run (request budget)
+    requests: int = 0
+    failed: int = 0
+    updates_available: int = 0
+
+
+class UpdateChecker:
+    """Polls Civitai for newer versions of the models in the registry
+
+    Model IDs and installed version IDs come from the ``.civitai.info``
+    sidecars already loaded into the registry. Only entries whose last
+    check is older than ``check_interval`` are polled, oldest first, in
+    batches of up to 100 IDs per ``/models`` request. Each run spends at
+    most ``max_requests`` requests so that a large library is spread over
+    several runs instead of exhausting the API tier; 5,000 models need 50
+    requests in total. Batches are sent with ``If-None-Match`` so that
+    unchanged results cost a 304 without a body. The last-seen version
+    per model and the batch ETags are persisted to ``state_path``.
+    """
+
+    def __init__(
+        self,
+        civitai_client: CivitaiClient,
+        registry: ModelRegistry,
+        state_path: Path | None = None,
+        check_interval: float = 24 * 3600,
+        batch_size: int = CivitaiClient.MAX_MODELS_PER_REQUEST,
+        max_requests: int | None = 20
+    ):
+        """Initialize checker
+
+        Args:
+            civitai_client: Client used for the batched model lookups
+            registry: Registry whose sidecar metadata lists installed models
+            state_path: JSON file persisting last-seen versions and ETags
+            check_interval: Seconds after which a model is checked again
+            batch_size: Number of model IDs per request
+            max_requests: Request budget per run (None for unlimited)
+        """
+        if not 1 <= batch_size <= CivitaiClient.MAX_MODELS_PER_REQUEST:
+            raise ValueError(
+                f"batch_size must be between 1 and {CivitaiClient.MAX_MODELS_PER_REQUEST}"
+            )
+        if max_requests is not None and max_requests < 1:
+            raise ValueError("max_requests must be positive")
+
+        self.civitai_client = civitai_client
+        self.registry = registry
+        self.state_path = Path(state_path) if state_path else None
+        self.check_interval = check_interval
+        self.batch_size = batch_size
+        self.max_requests = max_requests
+        self._models: dict[str, dict[str, Any]] = {}
+        self._etags: dict[str, str] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def installed_models(self) -> dict[int, tuple[set[int], list[str]]]:
+        """Collect Civitai model IDs from the registry's sidecar metadata
+
+        Returns:
+            Mapping of model ID to (installed version IDs, local file paths)
+        """
+        installed: dict[int, tuple[set[int], list[str]]] = {}
+        for model in self.registry.list():
+            metadata = model.civitai_metadata or {}
+            model_id = metadata.get("modelId")
+            if not isinstance(model_id, int):
+                continue
+            versions, paths = installed.setdefault(model_id, (set(), []))
+            if isinstance(metadata.get("id"), int):
+                versions.add(metadata["id"])
+            paths.append(model.file_path)
+        return installed
+
+    async def check(self, force: bool = False) -> UpdateCheckResult:
+        """Check stale models for new versions
+
+        Args:
+            force: Treat every installed model as stale
+
+        Returns:
+            Summary of the run
+        """
+        async with self._lock:
+            await self._ensure_loaded()
+            result = UpdateCheckResult()
+            installed = self.installed_models()
+            result.installed = len(installed)
+
+            stale = self._stale_ids(installed, force)
+            result.stale = len(stale)
+            batches = [
+                stale[i:i + self.batch_size] for i in range(0, len(stale), self.batch_size)
+            ]
+            if self.max_requests is not None and len(batches) > self.max_requests:
+                result.deferred = sum(len(batch) for batch in batches[self.max_requests:])
+                batches = batches[:self.max_requests]
+
+            if batches:
+                logger.info(
+                    "Checking %d of %d installed models for updates (%d requests)",
+                    len(stale) - result.deferred, len(installed), len(batches)
+                )
+            for batch in batches:
+                await self._check_batch(batch, result)
+                await asyncio.to_thread(self._save_state)
+
+            result.updates_available = sum(
+                status.update_available for status in self._statuses(installed)
+            )
+            logger.info(
+                "Update check completed: checked=%d, not_modified=%d, deferred=%d, "
+                "failed=%d, updates_available=%d",
+                result.checked, result.not_modified, result.deferred,
+                result.failed, result.updates_available
+            )
+            return result
+
+    async def statuses(self) -> list[ModelUpdateStatus]:
+        """Update state of every installed Civitai model"""
+        await self._ensure_loaded()
+        return self._statuses(self.installed_models())
+
+    async def run_periodically(self, interval: float) -> None:
+        """Run checks forever, sleeping ``interval`` seconds between runs
+
+        Runs are skipped until the registry has been populated by a scan.
+        Errors are logged and do not stop the loop.
+
+        Args:
+            interval: Seconds between runs
+        """
+        while True:
+            if self.registry.scanned_at is not None:
+                try:
+                    await self.check()
+                except Exception:
+                    logger.exception("Scheduled update check failed")
+            await asyncio.sleep(interval)
+
+    def _stale_ids(
+        self,
+        installed: dict[int, tuple[set[int], list[str]]],
+        force: bool
+    ) -> list[int]:
+        """Model IDs due for a check, never-checked first, then oldest"""
+        now = time.time()
+        due = []
+        for model_id in installed:
+            checked_at = self._models.get(str(model_id), {}).get("checked_at")
+            if force or checked_at is None or now - checked_at >= self.check_interval:
+                due.append((checked_at or 0.0, model_id))
+        due.sort()
+        return [model_id for _, model_id in due]
+
+    async def _check_batch(self, batch: list[int], result: UpdateCheckResult) -> None:
+        """Fetch one batch of models and record their latest versions"""
+        key = ",".join(map(str, sorted(batch)))
+        result.requests += 1
+        try:
+            items, etag = await self.civitai_client.get_models_by_ids(
+                batch, etag=self._etags.get(key)
+            )
+        except DownloadError as e:
+            # Leave state untouched so the batch is retried on the next run
+            logger.error("Update check failed for batch of %d: %s", len(batch), e.message)
+            result.failed += len(batch)
+            return
+
+        now = time.time()
+        if items is None:
+            for model_id in batch:
+                self._models.setdefault(str(model_id), {})["checked_at"] = now
+            result.not_modified += len(batch)
+            return
+
+        if etag:
+            self._etags[key] = etag
+        else:
+            self._etags.pop(key, None)
+
+        for item in items:
+            model_id = item.get("id")
+            if model_id not in batch:
+                continue
+            versions = item.get("modelVersions") or []
+            latest = versions[0] if versions else {}
+            self._models[str(model_id)] = {
+                "name": item.get("name"),
+                "latest_version_id": latest.get("id"),
+                "latest_version_name": latest.get("name"),
+                "checked_at": now,
+            }
+        # Models missing from the response were deleted or hidden on Civitai
+        for model_id in batch:
+            self._models.setdefault(str(model_id), {})["checked_at"] = now
+        result.checked += len(batch)
+
+    def _statuses(
+        self,
+        installed: dict[int, tuple[set[int], list[str]]]
+    ) -> list[ModelUpdateStatus]:
+        statuses = []
+        for model_id, (versions, paths) in sorted(installed.items()):
+            state = self._models.get(str(model_id), {})
+            latest = state.get("latest_version_id")
+            checked_at = state.get("checked_at")
+            statuses.append(ModelUpdateStatus(
+                model_id=model_id,
+                name=state.get("name"),
+                installed_version_ids=sorted(versions),
+                latest_version_id=latest,
+                latest_version_name=state.get("latest_version_name"),
+                checked_at=datetime.fromtimestamp(checked_at) if checked_at else None,
+                update_available=latest is not None and bool(versions) and latest not in versions,
+                file_paths=sorted(paths),
+            ))
+        return statuses
+
+    async def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._models, self._etags = await asyncio.to_thread(self._load_state)
+            self._loaded = True
+
+    def _load_state(self) -> tuple[dict[str, dict[str, Any]], dict[str, str]]:
+        """Load last-seen versions and ETags from disk"""
+        if self.state_path is None or not self.state_path.exists():
+            return {}, {}
+        try:
+            state = json.loads(self.state_path.read_text("utf-8"))
+            return state.get("models", {}), state.get("etags", {})
+        except (json.JSONDecodeError, OSError, AttributeError) as e:
+            logger.warning("Ignoring unreadable update state %s: %s", self.state_path, str(e))
+            return {}, {}
+
+    def _save_state(self) -> None:
+        """Persist last-seen versions and ETags to disk"""
+        if self.state_path is None:
+            return
+        atomic_write_text(
+            self.state_path, json.dumps({"models": self._models, "etags": self._etags})
+        )
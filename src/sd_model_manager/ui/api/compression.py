@@ -0,0 +1,176 @@
+"""レスポンスの圧縮（Accept-Encoding によるリクエストごとのネゴシエーション）
+
+gzip は標準ライブラリで常に使える。brotli は任意依存で、インストールされて
+いる場合だけ ``br`` を提示する（``pip install sd-model-manager[compression]``）。
+"""
+
+import asyncio
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # 任意依存
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# 優先順（同じ q 値ならサイズの小さくなる方）
+SUPPORTED_ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# これ以上の本文はスレッドで圧縮する（イベントループを止めないため）
+THREAD_MIN_BYTES = 64 * 1024
+
+# 圧縮する Content-Type（画像等の圧縮済みの形式は対象外）
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/css",
+                      "application/javascript")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding から使うエンコーディングを選ぶ（圧縮しない場合は None）
+
+    Args:
+        accept_encoding: Accept-Encoding ヘッダーの値
+
+    Returns:
+        ``br`` / ``gzip`` / None
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """指定したエンコーディングで圧縮
+
+    Args:
+        body: 圧縮するデータ
+        encoding: ``br`` または ``gzip``
+    """
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("brotli is not installed")
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime を固定して同じ内容からは同じバイト列を得る
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _header(headers: list[tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _add_vary(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    """Vary に Accept-Encoding を加える（既存のヘッダーがあれば値に追記）"""
+    vary = _header(headers, b"vary")
+    if vary is None:
+        return [*headers, (b"vary", b"Accept-Encoding")]
+    fields = {field.strip().lower() for field in vary.split(b",")}
+    if b"accept-encoding" in fields or b"*" in fields:
+        return headers
+    return [
+        (key, value + b", Accept-Encoding" if key.lower() == b"vary" else value)
+        for key, value in headers
+    ]
+
+
+class CompressionMiddleware:
+    """Accept-Encoding に応じて JSON 等のレスポンスを圧縮する ASGI ミドルウェア
+
+    本文が 1 回で送られるレスポンスのうち ``minimum_size`` 以上のものだけを
+    圧縮する。ストリーミング（SSE やファイル配信）と、エンドポイントが
+    圧縮済みで返したレスポンス（Content-Encoding 付き）はそのまま通す。
+    ``thread_min_size`` 以上の本文はスレッドで圧縮する。
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, thread_min_size: int = THREAD_MIN_BYTES):
+        """
+        Args:
+            app: ASGI アプリケーション
+            minimum_size: 圧縮する本文の最小サイズ（バイト）
+            thread_min_size: スレッドで圧縮する本文の最小サイズ（バイト）
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope["headers"], b"accept-encoding")
+        encoding = negotiate_encoding(accept.decode("latin-1") if accept else None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+                if (_header(headers, b"content-encoding") is not None
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    passthrough = True
+                    await send(message)
+                    return
+                # 本文を見てから圧縮するか決める
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+            if len(body) >= self.thread_min_size:
+                compressed = await asyncio.to_thread(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            headers = [
+                (key, value) for key, value in start.get("headers", [])
+                if key.lower() != b"content-length"
+            ]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+            ]
+            headers = _add_vary(headers)
+            await send({**start, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,257 @@
+"""ダウンロード関連ルーター"""
+
+import asyncio
+import logging
+import uuid
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Query, Request, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field
+
+from sd_model_manager.download.batch import BatchReport
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.download.history import DownloadHistoryPage, HistoryStatus
+from sd_model_manager.download.models import FileSelection, ModelVersionFiles
+from sd_model_manager.lib.errors import AppError, NotFoundError
+from sd_model_manager.ui.api.timing import TimedRoute, timed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+# プロセス内に保持する一括ダウンロードのレポート数（超えた分は完了済みの古いものから破棄。
+# マルチワーカー構成では破棄後も共有ストアから取得できる）
+MAX_BATCH_REPORTS = 100
+
+
+class DownloadRequest(BaseModel):
+    """ダウンロード開始リクエスト
+
+    ``files`` を指定すると、条件に合うバージョン内の全ファイルとプレビュー画像を
+    1 つのジョブとして並行ダウンロードする（省略時はメインファイルのみ）。
+    """
+
+    url: str
+    version_index: int = Field(default=0, ge=0)
+    files: Optional[FileSelection] = None
+    include_previews: bool = True
+
+
+class DownloadStartedResponse(BaseModel):
+    """ダウンロード開始レスポンス（進捗は /ws/download で購読）"""
+
+    job_id: str
+
+
+async def _run_model_download(
+    service: DownloadService,
+    download_request: DownloadRequest,
+    job_id: str
+) -> None:
+    """バックグラウンドでモデルをダウンロード（失敗は進捗イベントとログで通知）"""
+    try:
+        if download_request.files is not None:
+            group = await service.download_model_files(
+                download_request.url,
+                version_index=download_request.version_index,
+                selection=download_request.files,
+                include_previews=download_request.include_previews,
+                job_id=job_id
+            )
+            logger.info(
+                "Grouped download finished: job_id=%s, files=%d, succeeded=%s",
+                job_id, len(group.files), group.succeeded
+            )
+            return
+
+        result = await service.download_model(
+            download_request.url, version_index=download_request.version_index, job_id=job_id
+        )
+        if result.deduplicated:
+            logger.info(
+                "Download skipped, model already in library: job_id=%s, method=%s, path=%s",
+                job_id, result.dedup_method, result.existing_path
+            )
+    except AppError as e:
+        logger.error("Background download failed: job_id=%s, error=%s", job_id, e.message)
+
+
+@router.post("/api/download", response_model=DownloadStartedResponse, status_code=202)
+async def start_download(
+    download_request: DownloadRequest,
+    request: Request,
+    background_tasks: BackgroundTasks
+):
+    """Civitai モデルのライブラリへのダウンロードを開始"""
+    job_id = uuid.uuid4().hex
+    background_tasks.add_task(
+        _run_model_download,
+        request.app.state.download_service,
+        download_request,
+        job_id
+    )
+    logger.info("Download job queued: job_id=%s, url=%s", job_id, download_request.url)
+    return DownloadStartedResponse(job_id=job_id)
+
+
+class BatchDownloadRequest(BaseModel):
+    """一括ダウンロードのリクエスト"""
+
+    urls: list[str] = Field(min_length=1)
+    version_index: int = Field(default=0, ge=0)
+
+
+def _remember_report(reports: dict[str, BatchReport], report: BatchReport) -> None:
+    """レポートを保持し、上限を超えた分を完了済みの古い順に破棄（実行中のものは残す）"""
+    reports[report.batch_id] = report
+    excess = len(reports) - MAX_BATCH_REPORTS
+    if excess > 0:
+        finished = [batch_id for batch_id, kept in reports.items() if kept.finished]
+        for batch_id in finished[:excess]:
+            del reports[batch_id]
+
+
+@router.post("/api/download/batch", response_model=BatchReport, status_code=202)
+async def start_batch_download(
+    batch_request: BatchDownloadRequest,
+    request: Request,
+    background_tasks: BackgroundTasks
+):
+    """複数モデルの一括ダウンロードを開始
+
+    重複入力と不正な URL はこの時点で判定済みのレポートを返す。
+    進捗は ``GET /api/download/batch/{batch_id}`` で確認する。
+    """
+    importer = request.app.state.batch_importer
+    report = importer.create_report(batch_request.urls)
+    _remember_report(request.app.state.batch_reports, report)
+    if importer.report_store is not None:
+        await importer.report_store.save(report)
+    background_tasks.add_task(importer.run, report, batch_request.version_index)
+    logger.info(
+        "Batch download queued: batch_id=%s, items=%d", report.batch_id, len(report.items)
+    )
+    return report
+
+
+@router.get("/api/download/batch/{batch_id}", response_model=BatchReport)
+async def get_batch_download(batch_id: str, request: Request):
+    """一括ダウンロードの項目ごとの結果を取得"""
+    report = request.app.state.batch_reports.get(batch_id)
+    store = request.app.state.batch_importer.report_store
+    if report is None and store is not None:
+        # 別のワーカーが実行中・実行済みのバッチ
+        with timed("io"):
+            report = await store.load(batch_id)
+    if report is None:
+        raise NotFoundError(f"Batch not found: {batch_id}")
+    return report
+
+
+@router.get("/api/download/files", response_model=ModelVersionFiles)
+async def get_version_files(
+    request: Request,
+    url: str,
+    version_index: int = Query(default=0, ge=0)
+):
+    """モデルバージョンのファイル一覧（サイズ・形式・ハッシュ）を取得"""
+    client = request.app.state.download_service.civitai_client
+    with timed("civitai"):
+        return await client.get_version_files(url, version_index=version_index)
+
+
+class BandwidthLimits(BaseModel):
+    """帯域制限（バイト/秒、null は無制限）"""
+
+    global_limit: Optional[int] = Field(default=None, ge=0)
+    per_download_limit: Optional[int] = Field(default=None, ge=0)
+
+
+@router.get("/api/downloads/history", response_model=DownloadHistoryPage)
+async def get_download_history(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    status: Optional[HistoryStatus] = None,
+    model_id: Optional[int] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+):
+    """ダウンロード履歴を新しい順に取得（``next_cursor`` で次ページ）
+
+    ``since`` / ``until`` は開始時刻（UNIX 時刻）で絞り込む。
+    """
+    with timed("io"):
+        return await request.app.state.download_history.query(
+            limit=limit, cursor=cursor, status=status,
+            model_id=model_id, since=since, until=until
+        )
+
+
+@router.get("/api/download/bandwidth", response_model=BandwidthLimits)
+async def get_bandwidth_limits(request: Request):
+    """現在の帯域制限を取得"""
+    limiter = request.app.state.bandwidth_limiter
+    return BandwidthLimits(
+        global_limit=limiter.global_limit,
+        per_download_limit=limiter.per_download_limit
+    )
+
+
+@router.put("/api/download/bandwidth", response_model=BandwidthLimits)
+async def update_bandwidth_limits(limits: BandwidthLimits, request: Request):
+    """帯域制限を変更（実行中のダウンロードにも即時反映）"""
+    limiter = request.app.state.bandwidth_limiter
+    limiter.set_limits(limits.global_limit, limits.per_download_limit)
+    return BandwidthLimits(
+        global_limit=limiter.global_limit,
+        per_download_limit=limiter.per_download_limit
+    )
+
+
+async def _push_progress(websocket: WebSocket, subscription) -> None:
+    """購読したイベントを送信し続ける（送信に失敗したら終了）"""
+    try:
+        async for event in subscription:
+            await websocket.send_json(event.model_dump(mode="json"))
+    except (WebSocketDisconnect, RuntimeError, OSError) as e:
+        # 切断済みのソケットへの送信は実装により異なる例外になる
+        logger.debug("Progress push stopped: %s", e)
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """クライアントの切断を待つ（クライアントからのメッセージは読み捨てる）"""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    except (WebSocketDisconnect, RuntimeError) as e:
+        logger.debug("Progress subscriber receive stopped: %s", e)
+
+
+@router.websocket("/ws/download")
+async def download_progress_ws(websocket: WebSocket, job_id: Optional[str] = None):
+    """ダウンロード進捗をプッシュ配信する WebSocket エンドポイント
+
+    ``job_id`` クエリを指定するとそのジョブのみを配信する。
+    受信が遅いクライアントにはジョブごとの最新状態のみが届く。
+    イベントがない間に切断されても購読が残らないよう、受信側で切断を検知する。
+    """
+    bus = websocket.app.state.progress_bus
+    await websocket.accept()
+    logger.info("Progress subscriber connected: job_id=%s", job_id)
+
+    with bus.subscribe(job_id) as subscription:
+        sender = asyncio.create_task(_push_progress(websocket, subscription))
+        receiver = asyncio.create_task(_wait_for_disconnect(websocket))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # どちらのタスクも例外を内部で処理するため、結果を待たずに取り消す
+            # （接続自体の取り消し中に待つと、その取り消しを妨げる）
+            for task in (sender, receiver):
+                task.cancel()
+            logger.info(
+                "Progress subscriber disconnected: job_id=%s, conflated=%d",
+                job_id, subscription.conflated
+            )
@@ -2,8 +2,9 @@
 
 from datetime import datetime
 from fastapi import APIRouter
+from sd_model_manager.ui.api.timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/health")
@@ -0,0 +1,32 @@
+"""ローカルインポート関連ルーター"""
+
+import logging
+from fastapi import APIRouter, Request
+from pydantic import BaseModel, Field
+
+from sd_model_manager.download.import_service import ImportCategory
+from sd_model_manager.download.models import ImportResult
+from sd_model_manager.ui.api.timing import TimedRoute, timed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/import", tags=["import"], route_class=TimedRoute)
+
+
+class ImportRequest(BaseModel):
+    """POST /api/import のリクエスト"""
+
+    paths: list[str] = Field(min_length=1)
+    category: ImportCategory = "active"
+
+
+@router.post("", response_model=ImportResult)
+async def import_models(import_request: ImportRequest, request: Request):
+    """ローカル・NAS 上のファイルやディレクトリをライブラリへ取り込む
+
+    完了まで待機し、ファイルごとの結果（取り込み・省略・失敗）を返す。
+    """
+    with timed("io"):
+        return await request.app.state.import_service.import_paths(
+            import_request.paths, category=import_request.category
+        )
@@ -1,16 +1,81 @@
 """FastAPI アプリケーション構築（ファクトリパターン）"""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from sd_model_manager.config import Config
+from sd_model_manager.download.bandwidth import BandwidthLimiter
+from sd_model_manager.download.batch import BatchImporter, BatchReportStore
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.download.history import DownloadHistoryStore
+from sd_model_manager.download.import_service import ImportService
+from sd_model_manager.download.progress import ProgressBus
+from sd_model_manager.lib.disk_cache import DiskCache
+from sd_model_manager.lib.loop_monitor import LoopLagMonitor
+from sd_model_manager.lib.profiling import Profiler
+from sd_model_manager.registry.enrichment import CivitaiEnricher
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.preview_mirror import PreviewMirror
+from sd_model_manager.registry.registry_store import RegistryStore
+from sd_model_manager.registry.scanner import ModelScanner
+from sd_model_manager.registry.tensors import TensorInspector
+from sd_model_manager.registry.thumbnails import ThumbnailService
+from sd_model_manager.registry.update_checker import UpdateChecker
+from sd_model_manager.ui.api.compression import SUPPORTED_ENCODINGS, CompressionMiddleware
+from sd_model_manager.ui.api.download import router as download_router
 from sd_model_manager.ui.api.health import router as health_router
+from sd_model_manager.ui.api.imports import router as imports_router
+from sd_model_manager.ui.api.metrics import MetricsMiddleware
+from sd_model_manager.ui.api.metrics import router as metrics_router
+from sd_model_manager.ui.api.model_list_cache import ModelListCache
+from sd_model_manager.ui.api.models import router as models_router
+from sd_model_manager.ui.api.previews import router as previews_router
+from sd_model_manager.ui.api.profiling import ProfilingMiddleware
+from sd_model_manager.ui.api.profiling import router as profiling_router
+from sd_model_manager.ui.api.thumbnails import router as thumbnails_router
+from sd_model_manager.ui.api.timing import TimingMiddleware
 from sd_model_manager.lib.errors import register_error_handlers
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """バックグラウンドタスク（ループ遅延の監視・定期的な更新チェック・ハッシュ化・サムネイル生成）の起動・停止"""
+    config = app.state.config
+    monitor = None
+    if config.loop_monitor_enabled:
+        stall_threshold = config.loop_stall_threshold_ms
+        monitor = LoopLagMonitor(
+            interval=config.loop_monitor_interval_ms / 1000,
+            stall_threshold=stall_threshold / 1000 if stall_threshold is not None else None
+        )
+        monitor.start()
+    task = None
+    if config.update_check_enabled:
+        task = asyncio.create_task(
+            app.state.update_checker.run_periodically(config.update_check_poll_minutes * 60)
+        )
+        logger.info("Scheduled update checks every %.0f minutes", config.update_check_poll_minutes)
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+        await app.state.hash_index.close()
+        await app.state.thumbnail_service.close()
+        await app.state.preview_mirror.close()
+        if monitor is not None:
+            await monitor.stop()
+
+
 def create_app(config: Config | None = None) -> FastAPI:
     """FastAPI アプリケーション全体を構築するファクトリ関数
 
@@ -26,7 +91,8 @@ def create_app(config: Config | None = None) -> FastAPI:
     app = FastAPI(
         title="SD-Model-Manager API",
         version="0.1.0",
-        description="Stable Diffusion Model Manager API"
+        description="Stable Diffusion Model Manager API",
+        lifespan=lifespan
     )
 
     # CORS 設定
@@ -38,10 +104,127 @@ def create_app(config: Config | None = None) -> FastAPI:
         allow_headers=["*"],
     )
     logger.info("CORS middleware configured")
+    # プロファイリングは有効時のみミドルウェアと管理 API を登録（無効時のコストはゼロ）
+    profiler = None
+    if config.profiling_enabled:
+        profiler = Profiler(
+            config.log_dir / "profiles",
+            sample_interval=config.profiling_sample_interval_ms / 1000
+        )
+        app.add_middleware(ProfilingMiddleware, profiler=profiler)
+        logger.info("Profiling enabled (output: %s)", profiler.output_dir)
+    # 圧縮は計測の内側（Server-Timing・低速リクエストログに圧縮時間も含める）
+    if config.compression_min_bytes is not None:
+        app.add_middleware(CompressionMiddleware, minimum_size=config.compression_min_bytes)
+        logger.info("Response compression enabled (%s)", ", ".join(SUPPORTED_ENCODINGS))
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(TimingMiddleware, slow_threshold_ms=config.slow_request_threshold_ms)
+
+    # マルチワーカー構成では、レジストリとバッチの進捗を SQLite で共有し、
+    # プロセスごとに持つ API レート・帯域の上限はワーカー数で分け合う
+    workers = max(1, config.server_workers)
+    shared_db = config.shared_state_db
+    registry_store = RegistryStore(shared_db) if workers > 1 else None
+    report_store = BatchReportStore(shared_db) if workers > 1 else None
+
+    def per_worker(limit: int | None) -> int | None:
+        return max(1, limit // workers) if limit else limit
+
+    # 共有サービス（ルーターからは request.app.state 経由で参照）
+    app.state.config = config
+    app.state.profiler = profiler
+    app.state.model_registry = ModelRegistry(store=registry_store)
+    app.state.model_list_cache = ModelListCache(app.state.model_registry)
+    app.state.model_scanner = ModelScanner(config)
+    app.state.hash_index = HashIndex(cache_path=config.data_dir / "hash_cache.json")
+    app.state.thumbnail_service = ThumbnailService(
+        DiskCache(
+            config.data_dir / "thumbnails",
+            max_bytes=config.thumbnail_cache_max_mb * 1024 * 1024,
+            name="thumbnails"
+        ),
+        workers=config.thumbnail_workers,
+        quality=config.thumbnail_quality
+    )
+    app.state.tensor_inspector = TensorInspector()
+    app.state.preview_mirror = PreviewMirror(
+        DiskCache(
+            config.data_dir / "previews",
+            max_bytes=config.preview_mirror_max_mb * 1024 * 1024,
+            name="previews"
+        ),
+        concurrency=config.preview_mirror_concurrency,
+        max_retries=config.preview_mirror_retries,
+        max_file_bytes=config.preview_mirror_max_file_mb * 1024 * 1024
+    )
+    app.state.download_history = DownloadHistoryStore(config.data_dir / "download_history.db")
+    app.state.progress_bus = ProgressBus()
+    app.state.bandwidth_limiter = BandwidthLimiter(
+        global_limit=per_worker(config.download_bandwidth_limit),
+        per_download_limit=config.download_per_file_bandwidth_limit
+    )
+    civitai_client = CivitaiClient(
+        api_key=config.civitai_api_key,
+        requests_per_minute=per_worker(
+            CivitaiClient.AUTHENTICATED_REQUESTS_PER_MINUTE if config.civitai_api_key
+            else CivitaiClient.ANONYMOUS_REQUESTS_PER_MINUTE
+        )
+    )
+    app.state.download_service = DownloadService(
+        download_dir=config.download_dir,
+        civitai_client=civitai_client,
+        progress_bus=app.state.progress_bus,
+        bandwidth_limiter=app.state.bandwidth_limiter,
+        scanner=app.state.model_scanner,
+        registry=app.state.model_registry,
+        hash_index=app.state.hash_index,
+        history=app.state.download_history
+    )
+    app.state.batch_importer = BatchImporter(
+        app.state.download_service, report_store=report_store
+    )
+    # 挿入順（古い順）に保持し、上限は ui/api/download.py の MAX_BATCH_REPORTS
+    app.state.batch_reports = {}
+    app.state.import_service = ImportService(
+        scanner=app.state.model_scanner,
+        registry=app.state.model_registry,
+        hash_index=app.state.hash_index,
+        concurrency=config.import_concurrency
+    )
+    app.state.enricher = CivitaiEnricher(
+        civitai_client,
+        registry=app.state.model_registry,
+        concurrency=config.enrichment_concurrency,
+        batch_size=config.enrichment_batch_size,
+        state_path=config.data_dir / "enrichment_state.json",
+        hash_index=app.state.hash_index
+    )
+    app.state.update_checker = UpdateChecker(
+        civitai_client=civitai_client,
+        registry=app.state.model_registry,
+        state_path=config.data_dir / "update_state.json",
+        check_interval=config.update_check_interval_hours * 3600,
+        max_requests=config.update_check_max_requests
+    )
 
     # ルーター登録
     app.include_router(health_router)
     logger.info("Health router registered")
+    app.include_router(download_router)
+    logger.info("Download router registered")
+    app.include_router(imports_router)
+    logger.info("Import router registered")
+    app.include_router(models_router)
+    logger.info("Models router registered")
+    app.include_router(thumbnails_router)
+    logger.info("Thumbnails router registered")
+    app.include_router(previews_router)
+    logger.info("Previews router registered")
+    app.include_router(metrics_router)
+    logger.info("Metrics router registered")
+    if profiler is not None:
+        app.include_router(profiling_router)
+        logger.info("Profiling router registered")
 
     # エラーハンドラー登録
     register_error_handlers(app)
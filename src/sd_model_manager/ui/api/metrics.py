@@ -0,0 +1,59 @@
+"""メトリクス出力ルーターと HTTP 計測ミドルウェア"""
+
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from sd_model_manager.lib import metrics
+from sd_model_manager.ui.api.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "sdmm_http_request_duration_seconds", "HTTP request latency per route", ("method", "route")
+)
+HTTP_RESPONSES = metrics.counter(
+    "sdmm_http_responses_total", "HTTP responses per route and status",
+    ("method", "route", "status")
+)
+
+
+class MetricsMiddleware:
+    """ルートごとの HTTP レイテンシとステータスを記録する ASGI ミドルウェア
+
+    ラベルにはリクエストのパスではなくルートのテンプレート
+    （例: ``/api/download/batch/{batch_id}``）を使い、系列数を抑える。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, template).observe(time.perf_counter() - started)
+            HTTP_RESPONSES.labels(method, template, str(status)).inc()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus テキスト形式のメトリクス"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
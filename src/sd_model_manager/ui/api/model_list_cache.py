@@ -0,0 +1,112 @@
+"""モデル一覧レスポンスのキャッシュ
+
+一覧の JSON はモデルごとの断片（シリアライズ済みのバイト列）を連結して組み立てる。
+断片はモデルの内容が変わったときだけ作り直し、組み立てた本文・ETag・圧縮済みの
+本文はレジストリの ``version`` が変わるまで使い回す。変更のないポーリングは
+本文を作らずに 304 で返せる。
+
+ETag は断片ごとのダイジェストから作る。``version`` はプロセスごとのカウンターで
+ワーカー間・再起動後には一致しないため、ETag にはそのまま使わない。
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.ui.api.compression import compress
+
+
+@dataclass
+class ModelListBody:
+    """レジストリのある ``version`` に対応する一覧レスポンスの本文"""
+
+    version: int
+    body: bytes
+    etag: str
+    # エンコーディング -> 圧縮済みの本文（要求されたものだけ作る）
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def encode(self, encoding: Optional[str]) -> bytes:
+        """指定したエンコーディングの本文（None なら圧縮しない）"""
+        if encoding is None:
+            return self.body
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = compress(self.body, encoding)
+        return data
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match が ETag に一致するか（弱い比較）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class ModelListCache:
+    """``GET /api/models`` の本文をモデル単位の断片から組み立ててキャッシュ"""
+
+    def __init__(self, registry: ModelRegistry):
+        """
+        Args:
+            registry: 一覧の元になるレジストリ
+        """
+        self.registry = registry
+        # モデル ID -> (断片を作ったときのモデル, 断片, 断片のダイジェスト)
+        self._fragments: dict[str, tuple[ModelInfo, bytes, bytes]] = {}
+        self._current: Optional[ModelListBody] = None
+        self.fragments_built = 0
+
+    def _fragment(self, model: ModelInfo) -> tuple[ModelInfo, bytes, bytes]:
+        cached = self._fragments.get(model.id)
+        # スキャンは同じ内容でも新しいインスタンスを作るため、内容でも比較する
+        if cached is not None and (cached[0] is model or cached[0] == model):
+            return cached
+        fragment = model.model_dump_json().encode()
+        entry = (model, fragment, hashlib.blake2b(fragment, digest_size=16).digest())
+        self._fragments[model.id] = entry
+        self.fragments_built += 1
+        return entry
+
+    def get(self) -> ModelListBody:
+        """現在のレジストリの一覧レスポンス（変更がなければキャッシュを返す）"""
+        # scanned_at の参照で共有ストアの変更を反映してから version を見る
+        scanned_at = self.registry.scanned_at
+        current = self._current
+        if current is not None and current.version == self.registry.version:
+            return current
+
+        models = self.registry.list()
+        entries = [self._fragment(model) for model in models]
+        if len(self._fragments) > len(models):
+            ids = {model.id for model in models}
+            self._fragments = {
+                model_id: entry for model_id, entry in self._fragments.items()
+                if model_id in ids
+            }
+        tail = b"".join([
+            b'],"total_count":', str(len(models)).encode(),
+            b',"scanned_at":',
+            json.dumps(scanned_at.isoformat() if scanned_at else None).encode(),
+            b"}",
+        ])
+        # ModelsListResponse と同じ形（フィールド順も同じ）
+        body = b"".join([
+            b'{"success":true,"models":[', b",".join(entry[1] for entry in entries), tail
+        ])
+        # 本文全体ではなく断片のダイジェストを連結してハッシュする
+        digest = hashlib.blake2b(digest_size=16)
+        for entry in entries:
+            digest.update(entry[2])
+        digest.update(tail)
+        etag = f'"{digest.hexdigest()}"'
+        self._current = ModelListBody(version=self.registry.version, body=body, etag=etag)
+        return self._current
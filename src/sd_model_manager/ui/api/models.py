@@ -0,0 +1,235 @@
+"""モデルレジストリ関連ルーター"""
+
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from sd_model_manager.lib.errors import NotFoundError
+from sd_model_manager.lib.log_aggregation import ErrorGroup
+from sd_model_manager.registry.enrichment import EnrichmentResult
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.tensors import TensorInspectionError, TensorReport
+from sd_model_manager.registry.thumbnails import ThumbnailFormat
+from sd_model_manager.registry.update_checker import ModelUpdateStatus, UpdateCheckResult
+from sd_model_manager.ui.api.compression import THREAD_MIN_BYTES, negotiate_encoding
+from sd_model_manager.ui.api.model_list_cache import ModelListCache, etag_matches
+from sd_model_manager.ui.api.thumbnails import thumbnail_response
+from sd_model_manager.ui.api.timing import TimedRoute, timed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/models", tags=["models"], route_class=TimedRoute)
+
+
+class ModelsListResponse(BaseModel):
+    """GET /api/models のレスポンス"""
+
+    success: bool = True
+    models: list[ModelInfo]
+    total_count: int
+    scanned_at: Optional[datetime] = None
+
+
+class ScanResponse(BaseModel):
+    """POST /api/models/scan のレスポンス"""
+
+    success: bool
+    scanned_count: int
+    message: str
+    # 処理できなかった（一覧に含まれない）ファイル数と、同種のエラーごとの件数・サンプルパス。
+    # errors にはサイドカーの読み込み失敗などの警告も含まれるが、error_count には数えない
+    error_count: int = 0
+    errors: list[ErrorGroup] = []
+
+
+class UpdatesResponse(BaseModel):
+    """GET /api/models/updates のレスポンス"""
+
+    success: bool = True
+    updates: list[ModelUpdateStatus]
+    total_count: int
+    available_count: int
+
+
+async def _scan_into_registry(request: Request) -> list[ModelInfo]:
+    """フルスキャンを実行し、レジストリとハッシュインデックスを更新
+
+    ハッシュが不明なモデルのハッシュ化と、設定が有効ならプレビュー画像のミラーと
+    サムネイルの生成をバックグラウンドで開始する。
+    ミラー済みのプレビュー画像は登録前にローカルの URL に書き換える。
+    """
+    config = request.app.state.config
+    mirror = request.app.state.preview_mirror
+    with timed("scan"):
+        models = await request.app.state.model_scanner.scan()
+    if config.preview_mirror_enabled:
+        with timed("io"):
+            models = await asyncio.to_thread(mirror.rewrite, models)
+    with timed("registry"):
+        request.app.state.model_registry.replace_all(models)
+    hash_index = request.app.state.hash_index
+    with timed("io"):
+        # キャッシュ済みエントリごとに stat するため、イベントループの外で行う
+        unknown = await asyncio.to_thread(hash_index.rebuild, models)
+    if unknown and config.hash_index_concurrency > 0:
+        hash_index.schedule_hash_missing(unknown, config.hash_index_concurrency)
+    if config.preview_mirror_enabled:
+        mirror.schedule_sync(request.app.state.model_registry)
+    if config.thumbnail_pregenerate:
+        request.app.state.thumbnail_service.schedule_warm(
+            models, config.thumbnail_size, config.thumbnail_format
+        )
+    return models
+
+
+@router.get("", response_model=ModelsListResponse)
+async def list_models(request: Request):
+    """レジストリ内の全モデルを取得（未スキャンかつ空の場合は初回スキャン）
+
+    本文はレジストリが変わるまでキャッシュされ、``If-None-Match`` が ETag に
+    一致すれば 304 を返す。Accept-Encoding に応じて圧縮済みの本文を返す
+    （圧縮の設定と閾値は CompressionMiddleware と同じ）。
+    """
+    registry = request.app.state.model_registry
+    if registry.scanned_at is None and len(registry) == 0:
+        logger.info("Registry empty, triggering initial scan")
+        await _scan_into_registry(request)
+
+    cache: ModelListCache = request.app.state.model_list_cache
+    with timed("registry"):
+        listing = cache.get()
+    headers = {"ETag": listing.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), listing.etag):
+        return Response(status_code=304, headers=headers)
+
+    minimum_size = request.app.state.config.compression_min_bytes
+    encoding = None
+    if minimum_size is not None and len(listing.body) >= minimum_size:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    with timed("compress"):
+        if encoding is not None and len(listing.body) >= THREAD_MIN_BYTES:
+            # 大きな本文の初回圧縮でイベントループを止めない（2 回目以降はキャッシュを返す）
+            body = await asyncio.to_thread(listing.encode, encoding)
+        else:
+            body = listing.encode(encoding)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.post("/scan", response_model=ScanResponse)
+async def scan_models(request: Request):
+    """ファイルシステムを再スキャンしてレジストリを更新"""
+    models = await _scan_into_registry(request)
+    scanner = request.app.state.model_scanner
+    return ScanResponse(
+        success=True,
+        scanned_count=len(models),
+        message=f"Found {len(models)} models",
+        error_count=scanner.last_failed_count,
+        errors=scanner.last_errors
+    )
+
+
+@router.post("/enrich", response_model=EnrichmentResult)
+async def enrich_models(request: Request):
+    """サイドカーのないモデルをハッシュで Civitai に照会し、見つかればサイドカーを書き込む"""
+    registry = request.app.state.model_registry
+    if registry.scanned_at is None and len(registry) == 0:
+        await _scan_into_registry(request)
+    with timed("io"):
+        return await request.app.state.enricher.enrich(registry.list())
+
+
+@router.get("/updates", response_model=UpdatesResponse)
+async def list_updates(request: Request, available_only: bool = False):
+    """インストール済み Civitai モデルの更新状況（前回のチェック結果）を取得"""
+    with timed("io"):
+        statuses = await request.app.state.update_checker.statuses()
+    available = [status for status in statuses if status.update_available]
+    updates = available if available_only else statuses
+    return UpdatesResponse(
+        updates=updates,
+        total_count=len(updates),
+        available_count=len(available)
+    )
+
+
+@router.post("/updates/check", response_model=UpdateCheckResult)
+async def check_updates(request: Request, force: bool = False):
+    """古くなったモデルの更新チェックを実行（force で全モデルを対象）"""
+    registry = request.app.state.model_registry
+    if registry.scanned_at is None and len(registry) == 0:
+        await _scan_into_registry(request)
+    with timed("io"):
+        return await request.app.state.update_checker.check(force=force)
+
+
+# パス引数のルートは固定パス（/updates 等）より後に登録する
+@router.get("/{model_id}", response_model=ModelInfo)
+async def get_model(model_id: str, request: Request):
+    """ID でモデルを取得（ID はパスから導出され、再スキャンしても変わらない）"""
+    with timed("registry"):
+        model = request.app.state.model_registry.get(model_id)
+    if model is None:
+        raise NotFoundError(f"Model not found: {model_id}")
+    return model
+
+
+@router.get("/{model_id}/thumbnail")
+async def get_model_thumbnail(
+    model_id: str,
+    request: Request,
+    size: Optional[int] = Query(default=None, ge=32, le=1024),
+    format: Optional[ThumbnailFormat] = None
+):
+    """ローカルのプレビュー画像のサムネイル（初回のリクエストで生成）"""
+    config = request.app.state.config
+    with timed("registry"):
+        model = request.app.state.model_registry.get(model_id)
+    if model is None:
+        raise NotFoundError(f"Model not found: {model_id}")
+    with timed("thumbnail"):
+        thumbnail = await request.app.state.thumbnail_service.get(
+            model, size or config.thumbnail_size, format or config.thumbnail_format
+        )
+    if thumbnail is None:
+        raise NotFoundError(f"No local preview image: {model_id}")
+    return thumbnail_response(request, thumbnail, immutable=False)
+
+
+@router.get("/{model_id}/tensors", response_model=TensorReport)
+async def get_model_tensors(
+    model_id: str,
+    request: Request,
+    stats: bool = False,
+    depth: int = Query(default=1, ge=1, le=8),
+    include_tensors: bool = True
+):
+    """safetensors ファイルのテンソル一覧と集計（ヘッダーのみを読み、stats で値の統計も計算）
+
+    結果はファイルのサイズ・更新時刻ごとにキャッシュされる。
+    """
+    with timed("registry"):
+        model = request.app.state.model_registry.get(model_id)
+    if model is None:
+        raise NotFoundError(f"Model not found: {model_id}")
+    if Path(model.file_path).suffix.lower() != ".safetensors":
+        raise TensorInspectionError(
+            "Only safetensors files can be inspected", {"file_path": model.file_path}
+        )
+    try:
+        with timed("io"):
+            report = await asyncio.to_thread(
+                request.app.state.tensor_inspector.inspect, Path(model.file_path), stats, depth
+            )
+    except FileNotFoundError:
+        raise NotFoundError(f"Model file not found: {model.file_path}")
+    if not include_tensors:
+        report = report.model_copy(update={"tensors": []})
+    return report
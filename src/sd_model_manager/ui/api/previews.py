@@ -0,0 +1,57 @@
+"""ミラーしたプレビュー画像の配信ルーター
+
+キャッシュキーは元の URL のハッシュで、Civitai の画像 URL は内容ごとに
+異なるため immutable でキャッシュさせる。キャッシュから削除された画像は
+レジストリの Civitai メタデータから元の URL を探してリダイレクトする。
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, RedirectResponse
+
+from sd_model_manager.lib.errors import ConfigurationError, NotFoundError
+from sd_model_manager.registry.preview_mirror import (
+    MIRROR_PATH,
+    MirrorResult,
+    PreviewMirror,
+    media_type,
+)
+from sd_model_manager.ui.api.thumbnails import IMMUTABLE
+from sd_model_manager.ui.api.timing import TimedRoute, timed
+
+router = APIRouter(prefix=MIRROR_PATH, tags=["previews"], route_class=TimedRoute)
+
+
+@router.post("/mirror", response_model=MirrorResult)
+async def mirror_previews(request: Request):
+    """レジストリ内のリモートのプレビュー画像を取得し、ローカルの URL に書き換える
+
+    ``preview_mirror_enabled`` が無効の場合は取得せずにエラーを返す。
+    """
+    if not request.app.state.config.preview_mirror_enabled:
+        raise ConfigurationError(
+            "Preview mirror is disabled; set PREVIEW_MIRROR_ENABLED=true to enable it"
+        )
+    mirror: PreviewMirror = request.app.state.preview_mirror
+    with timed("io"):
+        return await mirror.sync(request.app.state.model_registry)
+
+
+@router.get("/{key}")
+async def get_preview(key: str, request: Request):
+    """ミラーしたプレビュー画像を取得"""
+    mirror: PreviewMirror = request.app.state.preview_mirror
+    with timed("io"):
+        path = await asyncio.to_thread(mirror.cache.get, key)
+    if path is None:
+        models = request.app.state.model_registry.list()
+        with timed("registry"):
+            source = await asyncio.to_thread(mirror.source_url, key, models)
+        if source is None:
+            raise NotFoundError(f"Preview not found: {key}")
+        return RedirectResponse(source, status_code=307)
+    return FileResponse(
+        path, media_type=media_type(key),
+        headers={"ETag": f'"{key}"', "Cache-Control": IMMUTABLE}
+    )
@@ -0,0 +1,110 @@
+"""プロファイリングの管理 API とリクエスト単位の計測ミドルウェア
+
+``profiling_enabled`` が有効な場合だけアプリに登録されるため、既定の構成では
+ルートもミドルウェアも存在せず、リクエスト処理への影響はない。
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Query, Request
+from pydantic import BaseModel
+
+from sd_model_manager.lib.profiling import PROFILE_MODES, ProfileMode, ProfileResult, Profiler
+from sd_model_manager.ui.api.timing import TimedRoute
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin/profile", tags=["admin"], route_class=TimedRoute)
+
+# リクエスト単位の計測を指示するヘッダー（値はモード名。それ以外の値は cprofile）
+PROFILE_HEADER = b"x-profile"
+# 計測結果の保存先を返すヘッダー
+PROFILE_OUTPUT_HEADER = b"x-profile-output"
+
+
+class ProfileResponse(BaseModel):
+    """プロファイリング結果のレスポンス"""
+
+    success: bool = True
+    name: str
+    mode: str
+    path: str
+    started_at: datetime
+    duration: float
+    samples: int
+
+    @classmethod
+    def from_result(cls, result: ProfileResult) -> "ProfileResponse":
+        return cls(
+            name=result.name, mode=result.mode, path=str(result.path),
+            started_at=result.started_at, duration=result.duration, samples=result.samples
+        )
+
+
+class ProfilingMiddleware:
+    """``X-Profile`` ヘッダー付きのリクエストを 1 件ずつ計測する ASGI ミドルウェア
+
+    cProfile はイベントループのスレッド全体を計測するため、計測中に並行して
+    処理された他のリクエストも結果に含まれる。別の計測が実行中の場合は
+    計測せずに通常どおり処理する。
+    """
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = dict(scope["headers"]).get(PROFILE_HEADER)
+        if value is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.profiler.active:
+            logger.warning("Profiling busy, serving %s unprofiled", scope["path"])
+            await self.app(scope, receive, send)
+            return
+
+        mode = value.decode("latin-1").strip().lower()
+        if mode not in PROFILE_MODES:
+            mode = "cprofile"
+        name = f"request-{scope['method']}-{scope['path']}"
+        with self.profiler.profile(name, mode) as result:
+
+            async def send_with_output(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((PROFILE_OUTPUT_HEADER, str(result.path).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_output)
+        logger.info("Request profile written: %s (%.1fms)", result.path, result.duration * 1000)
+
+
+@router.post("/scan", response_model=ProfileResponse)
+async def profile_scan(request: Request, mode: ProfileMode = "cprofile"):
+    """ライブラリのスキャンを 1 回計測（レジストリは更新しない）"""
+    profiler: Profiler = request.app.state.profiler
+    with profiler.profile("scan", mode) as result:
+        models = await request.app.state.model_scanner.scan()
+    logger.info("Scan profile written: %s (%d models)", result.path, len(models))
+    return ProfileResponse.from_result(result)
+
+
+@router.post("/window", response_model=ProfileResponse)
+async def profile_window(
+    request: Request,
+    seconds: float = Query(default=10.0, gt=0, le=300),
+    mode: ProfileMode = "sampling"
+):
+    """指定した時間だけプロセスの処理（バックグラウンドのダウンロード等を含む）を計測"""
+    profiler: Profiler = request.app.state.profiler
+    with profiler.profile(f"window-{seconds:g}s", mode) as result:
+        await asyncio.sleep(seconds)
+    logger.info("Window profile written: %s", result.path)
+    return ProfileResponse.from_result(result)
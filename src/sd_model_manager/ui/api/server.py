@@ -0,0 +1,119 @@
+"""API サーバーの起動設定（uvicorn）"""
+
+import copy
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI
+
+from sd_model_manager.config import Config
+from sd_model_manager.lib.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# ワーカープロセス・リロード時に uvicorn が読み込むアプリケーションファクトリ
+APP_FACTORY = "sd_model_manager.ui.api.server:create_worker_app"
+
+PACKAGE_DIR = Path(__file__).resolve().parents[2]
+
+
+def _available(module: str) -> bool:
+    """任意依存のモジュールがインストールされているか"""
+    return importlib.util.find_spec(module) is not None
+
+
+def _log_config() -> dict[str, Any]:
+    """標準出力を最小化した uvicorn のログ設定"""
+    import uvicorn
+
+    log_config = copy.deepcopy(uvicorn.config.LOGGING_CONFIG)
+    # アクセスログを無効化（ファイルのみに出力）
+    log_config["loggers"]["uvicorn.access"]["handlers"] = []
+    # エラーログをファイルのみに（起動メッセージは標準出力に出る）
+    log_config["loggers"]["uvicorn.error"]["handlers"] = []
+    return log_config
+
+
+def uvicorn_options(config: Config) -> dict[str, Any]:
+    """サーバーモードに応じた ``uvicorn.run`` の引数を構築
+
+    production はリロードなしで ``server_workers`` 個のワーカーを起動し、
+    インストールされていれば uvloop と httptools を使う。development は
+    単一プロセスでソースの変更を監視して自動リロードする。どちらの場合も
+    アプリはインポート文字列のファクトリで渡す（リロード・マルチワーカーの
+    必須条件）。
+
+    Args:
+        config: アプリケーション設定
+
+    Returns:
+        ``uvicorn.run`` のキーワード引数
+    """
+    options: dict[str, Any] = {
+        "host": config.host,
+        "port": config.port,
+        "factory": True,
+        "timeout_keep_alive": config.server_keep_alive,
+        "backlog": config.server_backlog,
+        "log_config": _log_config(),
+    }
+
+    if config.server_mode == "development":
+        options.update(reload=True, reload_dirs=[str(PACKAGE_DIR)])
+    else:
+        options.update(
+            reload=False,
+            workers=max(1, config.server_workers),
+            loop="uvloop" if _available("uvloop") else "asyncio",
+            http="httptools" if _available("httptools") else "h11",
+            access_log=False,
+        )
+    return options
+
+
+def create_worker_app() -> FastAPI:
+    """ワーカープロセスごとにロギングを設定してアプリを構築
+
+    設定は環境変数から読み込むため、CLI で上書きした値は起動前に
+    環境変数へ反映しておく必要がある（``cli.cmd_serve`` を参照）。
+    """
+    from sd_model_manager.ui.api.main import create_app
+
+    config = Config()
+    setup_logging(
+        log_level=config.log_level,
+        log_dir=config.log_dir,
+        log_max_bytes=config.log_max_bytes,
+        log_backup_count=config.log_backup_count,
+        log_format=config.log_format,
+        queue_size=config.log_queue_size,
+        overflow=config.log_overflow
+    )
+    return create_app(config)
+
+
+def run_server(config: Config) -> None:
+    """設定に従って uvicorn を起動（終了までブロック）
+
+    Args:
+        config: アプリケーション設定
+    """
+    import uvicorn
+
+    options = uvicorn_options(config)
+    if options.get("workers", 1) > 1:
+        from sd_model_manager.registry.registry_store import RegistryStore
+
+        # 前回の実行のレジストリ（スキャン時刻を含む）を引き継ぐと、ワーカーが初回の
+        # スキャンを省略して削除済みのファイルを返すため、起動前に空にする
+        store = RegistryStore(config.shared_state_db)
+        store.clear()
+        store.close()
+    logger.info(
+        "Starting uvicorn server at http://%s:%d (mode=%s, workers=%d, loop=%s, http=%s)",
+        config.host, config.port, config.server_mode, options.get("workers", 1),
+        options.get("loop", "auto"), options.get("http", "auto")
+    )
+    uvicorn.run(APP_FACTORY, **options)
@@ -0,0 +1,44 @@
+"""サムネイル配信ルーター
+
+サムネイルのキャッシュキーは元画像の内容から決まるため、キーを含む URL
+（``/api/thumbnails/{key}``）の内容は変わらず、immutable でキャッシュさせる。
+モデル ID の URL（``/api/models/{id}/thumbnail``）はプレビューの差し替えで
+内容が変わるため、ETag による再検証を必須にする。
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, Response
+
+from sd_model_manager.lib.errors import NotFoundError
+from sd_model_manager.registry.thumbnails import Thumbnail, ThumbnailService
+from sd_model_manager.ui.api.model_list_cache import etag_matches
+from sd_model_manager.ui.api.timing import TimedRoute, timed
+
+router = APIRouter(prefix="/api/thumbnails", tags=["thumbnails"], route_class=TimedRoute)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def thumbnail_response(request: Request, thumbnail: Thumbnail, immutable: bool) -> Response:
+    """サムネイルのレスポンス（If-None-Match が一致すれば 304）"""
+    headers = {
+        "ETag": f'"{thumbnail.key}"',
+        "Cache-Control": IMMUTABLE if immutable else "no-cache",
+        "Content-Location": f"{router.prefix}/{thumbnail.key}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(thumbnail.path, media_type=thumbnail.media_type, headers=headers)
+
+
+@router.get("/{key}")
+async def get_thumbnail(key: str, request: Request):
+    """キャッシュキーでサムネイルを取得（内容は不変）"""
+    service: ThumbnailService = request.app.state.thumbnail_service
+    with timed("io"):
+        thumbnail = await asyncio.to_thread(service.get_cached, key)
+    if thumbnail is None:
+        raise NotFoundError(f"Thumbnail not found: {key}")
+    return thumbnail_response(request, thumbnail, immutable=True)
@@ -0,0 +1,164 @@
+"""リクエストのフェーズ別計測（Server-Timing ヘッダーと低速リクエストログ）"""
+
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# 低速リクエストの専用ロガー（lib/logging_config で専用ファイルに出力）
+slow_logger = logging.getLogger("sd_model_manager.slow_requests")
+
+
+class RequestTimings:
+    """1 リクエスト内のフェーズごとの所要時間（ミリ秒）"""
+
+    __slots__ = ("durations",)
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+
+    def add(self, name: str, milliseconds: float) -> None:
+        """フェーズの所要時間を加算（同じフェーズが複数回あれば合計）"""
+        self.durations[name] = self.durations.get(name, 0.0) + milliseconds
+
+    def header_value(self, total_ms: float) -> str:
+        """Server-Timing ヘッダーの値"""
+        parts = [f"{name};dur={duration:.2f}" for name, duration in self.durations.items()]
+        parts.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """処理中のリクエストの計測（リクエスト外では None）"""
+    return _current.get()
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """ブロックの所要時間をリクエストのフェーズとして記録
+
+    リクエスト外（CLI 等）から呼ばれた場合は何もしない。
+
+    Args:
+        name: フェーズ名（例: ``registry``, ``scan``, ``io``）
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000)
+
+
+class TimedRoute(APIRoute):
+    """エンドポイント本体とそれ以外（検証・シリアライズ）を分けて計測するルート
+
+    エンドポイント関数の実行時間を ``endpoint``、ハンドラー全体からそれを
+    除いた時間（リクエストの検証とレスポンスのシリアライズ）を
+    ``serialize`` として記録する。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        # 依存関係の解析は functools.wraps の __wrapped__ から元のシグネチャを参照する
+        super().__init__(path, self._timed_call(endpoint), **kwargs)
+
+    @staticmethod
+    def _timed_call(call: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_async(*args: Any, **kwargs: Any) -> Any:
+                with timed("endpoint"):
+                    return await call(*args, **kwargs)
+            return timed_async
+
+        @functools.wraps(call)
+        def timed_sync(*args: Any, **kwargs: Any) -> Any:
+            with timed("endpoint"):
+                return call(*args, **kwargs)
+        return timed_sync
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timings = _current.get()
+            if timings is None:
+                return await handler(request)
+            started = time.perf_counter()
+            response = await handler(request)
+            elapsed = (time.perf_counter() - started) * 1000
+            timings.add("serialize", max(0.0, elapsed - timings.durations.get("endpoint", 0.0)))
+            return response
+
+        return timed_handler
+
+
+class TimingMiddleware:
+    """リクエストごとのフェーズ計測を行う ASGI ミドルウェア
+
+    レスポンスヘッダーの送信時点までの計測を ``Server-Timing`` ヘッダーとして
+    付与し、レスポンスの送信完了までの時間が閾値を超えたリクエストは
+    コンテキストとともに低速リクエストログへ記録する。計測はコンテキスト
+    変数への登録と時刻の取得のみで、常時有効にしておける。
+    """
+
+    def __init__(self, app, slow_threshold_ms: Optional[float] = 1000.0):
+        """
+        Args:
+            app: ASGI アプリケーション
+            slow_threshold_ms: 低速リクエストとして記録する閾値（None で記録しない）
+        """
+        self.app = app
+        self.slow_threshold_ms = slow_threshold_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.header_value(total_ms).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            if self.slow_threshold_ms is not None and total_ms >= self.slow_threshold_ms:
+                self._log_slow_request(scope, status, total_ms, timings)
+
+    @staticmethod
+    def _log_slow_request(scope, status: int, total_ms: float, timings: RequestTimings) -> None:
+        route = scope.get("route")
+        client = scope.get("client")
+        slow_logger.warning(
+            "Slow request: %s %s status=%d total=%.1fms phases=%s route=%s query=%s client=%s",
+            scope["method"], scope["path"], status, total_ms,
+            {name: round(duration, 2) for name, duration in timings.durations.items()},
+            getattr(route, "path", None), scope.get("query_string", b"").decode("latin-1"),
+            f"{client[0]}:{client[1]}" if client else None
+        )
@@ -0,0 +1,398 @@
+"""共通フィクスチャ: ローカルで動作する Civitai 代替サーバー・イベントループのブロック検出"""
+
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from sd_model_manager.lib.loop_monitor import BlockingCallDetector
+
+STREAM_CHUNK_SIZE = 64 * 1024
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class FakeCivitai:
+    """Civitai API の代替サーバー（オフラインテスト用）
+
+    127.0.0.1 の空きポートで uvicorn を起動し、実際の HTTP 通信で
+    クライアントを検証できるようにする。
+
+    以下の属性で実回線に近い条件や障害を再現できる（起動後も変更可能）:
+
+    - ``latency``: 各レスポンスを返すまでの遅延（秒）
+    - ``bandwidth``: ファイル配信の接続あたり帯域（バイト/秒、None で無制限）
+    - ``drop_after`` / ``drop_count``: ファイル配信を ``drop_after`` バイト送信後に
+      切断する（``drop_count`` 回まで）
+    - ``rate_limit_count`` / ``retry_after``: 次の N リクエストに 429 を返す
+
+    ``max_in_flight`` には同時に処理したリクエスト数の最大値を記録する。
+
+    ファイル配信は単一範囲の Range リクエストに対応する。``/models?ids=`` は
+    ETag を返し、``If-None-Match`` が一致すれば 304 を返す。
+    """
+
+    def __init__(self):
+        self.models: dict[str, dict] = {}
+        self.versions: list[dict] = []
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.latency = 0.0
+        self.bandwidth: int | None = None
+        self.drop_after: int | None = None
+        self.drop_count = 0
+        self.rate_limit_count = 0
+        self.retry_after: float | None = 1.0
+        self.dropped = 0
+        self.rate_limited = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+        self.port: int | None = None
+
+    @property
+    def base_url(self) -> str:
+        """サーバーのルート URL"""
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def api_url(self) -> str:
+        """CivitaiClient に渡す API ベース URL"""
+        return f"{self.base_url}/api/v1"
+
+    def add_version(self, version: dict) -> None:
+        """by-hash 検索の対象となるモデルバージョンを登録"""
+        self.versions.append(version)
+
+    def add_model(self, model_id: int = 42, model_type: str = "LORA") -> dict:
+        """モデル（本体ファイルとプレビュー画像付き）を登録"""
+        content = b"model weights %d " % model_id * 64
+        self.files[f"{model_id}/model.safetensors"] = content
+        self.files[f"{model_id}/preview.png"] = b"\x89PNG fake preview"
+        sha256 = hashlib.sha256(content).hexdigest().upper()
+        model = {
+            "id": model_id,
+            "name": f"Test Model {model_id}",
+            "type": model_type,
+            "nsfw": False,
+            "tags": ["test"],
+            "modelVersions": [{
+                "id": model_id * 10,
+                "name": "v1.0",
+                "downloadUrl": f"{self.base_url}/files/{model_id}/model.safetensors",
+                "files": [{
+                    "name": f"test_model_{model_id}.safetensors",
+                    "type": "Model",
+                    "primary": True,
+                    "hashes": {"SHA256": sha256, "AutoV2": sha256[:10]},
+                    "downloadUrl": f"{self.base_url}/files/{model_id}/model.safetensors",
+                }],
+                "images": [{"url": f"{self.base_url}/files/{model_id}/preview.png"}],
+            }],
+        }
+        self.models[str(model_id)] = model
+        return model
+
+    def add_version_file(
+        self,
+        model_id: int,
+        name: str,
+        file_type: str,
+        content: bytes,
+        metadata: dict | None = None
+    ) -> dict:
+        """登録済みモデルの最新バージョンにファイルを追加"""
+        self.files[f"{model_id}/{name}"] = content
+        sha256 = hashlib.sha256(content).hexdigest().upper()
+        file = {
+            "name": name,
+            "type": file_type,
+            "sizeKB": len(content) / 1024,
+            "metadata": metadata or {},
+            "hashes": {"SHA256": sha256, "AutoV2": sha256[:10]},
+            "downloadUrl": f"{self.base_url}/files/{model_id}/{name}",
+        }
+        self.models[str(model_id)]["modelVersions"][0]["files"].append(file)
+        return file
+
+    def add_file(self, name: str, size: int) -> bytes:
+        """指定サイズの配信用ファイルを登録"""
+        pattern = bytes(range(256))
+        content = (pattern * (size // len(pattern) + 1))[:size]
+        self.files[name] = content
+        return content
+
+    def _parse_range(self, header: str | None, size: int) -> tuple[int, int] | None:
+        """Range ヘッダーを (開始, 終了) に変換（終了は含む）。不正な場合は ValueError"""
+        if header is None:
+            return None
+        match = _RANGE_PATTERN.match(header.strip())
+        if match is None or match.groups() == ("", ""):
+            raise ValueError(header)
+        start, end = match.groups()
+        if start == "":
+            # 末尾 N バイト
+            return max(0, size - int(end)), size - 1
+        start = int(start)
+        end = size - 1 if end == "" else min(int(end), size - 1)
+        if start >= size or start > end:
+            raise ValueError(header)
+        return start, end
+
+    async def _stream(self, content: bytes):
+        """帯域制限と切断を適用しながらファイルを送信"""
+        drop_at = None
+        if self.drop_after is not None and self.drop_count > 0:
+            self.drop_count -= 1
+            self.dropped += 1
+            drop_at = self.drop_after
+
+        started = time.monotonic()
+        sent = 0
+        while sent < len(content):
+            chunk = content[sent:sent + STREAM_CHUNK_SIZE]
+            if drop_at is not None and sent + len(chunk) > drop_at:
+                yield chunk[:drop_at - sent]
+                raise ConnectionResetError("connection dropped by fake server")
+            yield chunk
+            sent += len(chunk)
+            if self.bandwidth:
+                delay = started + sent / self.bandwidth - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+    def _find_version(self, file_hash: str) -> dict | None:
+        file_hash = file_hash.upper()
+        for version in self.versions:
+            for file in version.get("files", []):
+                hashes = [h.upper() for h in (file.get("hashes") or {}).values()]
+                if file_hash in hashes:
+                    return version
+        return None
+
+    def create_app(self) -> FastAPI:
+        """代替サーバーの ASGI アプリを構築"""
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def record_requests(request: Request, call_next):
+            self.requests.append((request.method, request.url.path))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.rate_limit_count > 0:
+                    self.rate_limit_count -= 1
+                    self.rate_limited += 1
+                    headers = {}
+                    if self.retry_after is not None:
+                        headers["Retry-After"] = str(self.retry_after)
+                    return JSONResponse(
+                        {"error": "rate limited"}, status_code=429, headers=headers
+                    )
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.get("/api/v1/models")
+        async def list_models(request: Request):
+            ids = [
+                value for param in request.query_params.getlist("ids")
+                for value in param.split(",") if value
+            ]
+            items = [self.models[model_id] for model_id in ids if model_id in self.models]
+            body = json.dumps({"items": items, "metadata": {"totalItems": len(items)}})
+            etag = '"%s"' % hashlib.sha256(body.encode()).hexdigest()[:16]
+            if request.headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                return Response(status_code=304, headers={"ETag": etag})
+            return Response(body, media_type="application/json", headers={"ETag": etag})
+
+        @app.get("/api/v1/models/{model_id}")
+        async def get_model(model_id: str):
+            if model_id not in self.models:
+                return JSONResponse({"error": "not found"}, status_code=404)
+            return self.models[model_id]
+
+        @app.get("/api/v1/model-versions/by-hash/{file_hash}")
+        async def get_version_by_hash(file_hash: str):
+            version = self._find_version(file_hash)
+            if version is None:
+                return JSONResponse({"error": "not found"}, status_code=404)
+            return version
+
+        @app.post("/api/v1/model-versions/by-hash")
+        async def get_versions_by_hashes(request: Request):
+            hashes = await request.json()
+            found = []
+            for file_hash in hashes:
+                version = self._find_version(file_hash)
+                if version is not None and version not in found:
+                    found.append(version)
+            return found
+
+        @app.get("/files/{name:path}")
+        async def get_file(name: str, request: Request):
+            if name not in self.files:
+                return Response(status_code=404)
+            content = self.files[name]
+            size = len(content)
+            try:
+                byte_range = self._parse_range(request.headers.get("range"), size)
+            except ValueError:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+            headers = {"Accept-Ranges": "bytes"}
+            status_code = 200
+            if byte_range is not None:
+                start, end = byte_range
+                content = content[start:end + 1]
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                status_code = 206
+            headers["Content-Length"] = str(len(content))
+            return StreamingResponse(
+                self._stream(content),
+                status_code=status_code,
+                headers=headers,
+                media_type=mimetypes.guess_type(name)[0] or "application/octet-stream"
+            )
+
+        return app
+
+    def start(self) -> None:
+        """バックグラウンドスレッドでサーバーを起動"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(
+            self.create_app(), log_level="warning", lifespan="off", access_log=False
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [sock]}, daemon=True
+        )
+        self._thread.start()
+
+        deadline = time.monotonic() + 5.0
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake Civitai server failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """サーバーを停止"""
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+
+@pytest.fixture
+def fake_civitai():
+    """起動済みの Civitai 代替サーバー"""
+    server = FakeCivitai()
+    server.start()
+    yield server
+    server.stop()
+
+
+# ブロック検出の対象（API とスキャナー・レジストリのテスト）
+LOOP_GUARDED_PACKAGES = ("ui", "registry")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--max-loop-block-ms", type=float,
+        default=float(os.environ.get("SDMM_MAX_LOOP_BLOCK_MS", 0)) or None,
+        help="fail API/scanner tests whose code blocks an event loop longer than this "
+             "(env: SDMM_MAX_LOOP_BLOCK_MS)"
+    )
+
+
+@pytest.fixture(autouse=True)
+def loop_block_guard(request):
+    """``--max-loop-block-ms`` 指定時、ループを閾値以上ブロックしたテストを失敗させる
+
+    ループが実行するコールバック 1 回ごとの所要時間を計測し、閾値を超えたものを
+    ブロックしていた箇所のスタック付きで報告する。
+    """
+    limit = request.config.getoption("--max-loop-block-ms")
+    package = request.node.path.relative_to(os.path.dirname(__file__)).parts[0]
+    if not limit or package not in LOOP_GUARDED_PACKAGES:
+        yield
+        return
+
+    with BlockingCallDetector(limit / 1000) as detector:
+        yield
+    if detector.blocking_calls:
+        details = "\n\n".join(call.format() for call in detector.blocking_calls)
+        pytest.fail(
+            f"Event loop blocked for more than {limit:g}ms "
+            f"({len(detector.blocking_calls)} callbacks):\n{details}",
+            pytrace=False
+        )
+
+
+# ベンチマーク結果（test_download_benchmark.py が追加し、終了時に一覧表示する）
+BENCHMARK_RESULTS: list[dict] = []
+
+
+@pytest.fixture(scope="session")
+def benchmark_results() -> list[dict]:
+    """ベンチマーク結果の記録先"""
+    return BENCHMARK_RESULTS
+
+
+def pytest_terminal_summary(terminalreporter):
+    """ベンチマーク結果を表示し、指定があれば JSON に書き出す
+
+    ``SDMM_BENCHMARK_JSON`` に出力先パスを指定すると、回帰比較用に
+    結果を JSON で保存する。
+    """
+    if not BENCHMARK_RESULTS:
+        return
+
+    downloads = [result for result in BENCHMARK_RESULTS if "mb_per_second" in result]
+    if downloads:
+        terminalreporter.section("download benchmarks")
+        terminalreporter.write_line(
+            f"{'scenario':<24}{'MB/s':>10}{'CPU-s/GB':>10}"
+            f"{'lag max ms':>12}{'requests':>10}{'retries':>9}"
+        )
+        for result in downloads:
+            terminalreporter.write_line(
+                f"{result['scenario']:<24}{result['mb_per_second']:>10.1f}"
+                f"{result['cpu_seconds_per_gb']:>10.2f}{result['loop_lag_max_ms']:>12.1f}"
+                f"{result['requests']:>10}{result['retries']:>9}"
+            )
+
+    servers = [result for result in BENCHMARK_RESULTS if "requests_per_second" in result]
+    if servers:
+        terminalreporter.section("server load tests")
+        terminalreporter.write_line(
+            f"{'scenario':<24}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        )
+        for result in servers:
+            terminalreporter.write_line(
+                f"{result['scenario']:<24}{result['requests_per_second']:>10.0f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}"
+            )
+
+    output = os.environ.get("SDMM_BENCHMARK_JSON")
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(BENCHMARK_RESULTS, f, indent=2)
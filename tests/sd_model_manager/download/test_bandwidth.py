@@ -0,0 +1,139 @@
+"""帯域制御のテスト（ローカルサーバーに対する実測）"""
+
+import asyncio
+import time
+
+import pytest
+from sd_model_manager.download.bandwidth import BandwidthLimiter
+from sd_model_manager.download.download_service import DownloadService
+
+MIB = 1024 * 1024
+
+
+class ThroughputMeter:
+    """ウォームアップ後から完了までの定常スループットを計測
+
+    接続確立の固定コストや初期バーストを除外し、帯域制御の精度のみを評価する。
+    """
+
+    def __init__(self, warmup_bytes: int = 512 * 1024):
+        self.warmup_bytes = warmup_bytes
+        self.first: tuple[float, int] | None = None
+        self.last: tuple[float, int] | None = None
+        self._downloaded: dict[int, int] = {}
+
+    def callback(self):
+        key = len(self._downloaded)
+        self._downloaded[key] = 0
+
+        def on_progress(downloaded: int, total: int):
+            now = time.monotonic()
+            self._downloaded[key] = downloaded
+            received = sum(self._downloaded.values())
+            if self.first is None and received >= self.warmup_bytes:
+                self.first = (now, received)
+            self.last = (now, received)
+
+        return on_progress
+
+    @property
+    def throughput(self) -> float:
+        return (self.last[1] - self.first[1]) / (self.last[0] - self.first[0])
+
+
+@pytest.fixture
+def large_files(fake_civitai):
+    """代替サーバーに 2 MiB のファイルを 2 つ配置"""
+    fake_civitai.files["a.safetensors"] = b"a" * (2 * MIB)
+    fake_civitai.files["b.safetensors"] = b"b" * (2 * MIB)
+    return fake_civitai
+
+
+@pytest.mark.asyncio
+async def test_global_limit_caps_throughput(large_files, tmp_path):
+    """グローバル上限で実効スループットが制限されるテスト"""
+    cap = 4 * MIB
+    service = DownloadService(
+        tmp_path, bandwidth_limiter=BandwidthLimiter(global_limit=cap), progress_interval=0
+    )
+    meter = ThroughputMeter()
+
+    await service.download_file(
+        f"{large_files.base_url}/files/a.safetensors", "a.safetensors",
+        progress_callback=meter.callback(), chunk_size=64 * 1024
+    )
+
+    assert meter.throughput == pytest.approx(cap, rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_global_limit_is_shared_between_downloads(large_files, tmp_path):
+    """並行ダウンロードの合計がグローバル上限に収まるテスト"""
+    cap = 8 * MIB
+    service = DownloadService(
+        tmp_path, bandwidth_limiter=BandwidthLimiter(global_limit=cap), progress_interval=0
+    )
+    # 初期バースト（上限 × 0.1 秒分）を確実に除外する
+    meter = ThroughputMeter(warmup_bytes=1 * MIB)
+
+    await asyncio.gather(*(
+        service.download_file(
+            f"{large_files.base_url}/files/{name}", name,
+            progress_callback=meter.callback(), chunk_size=64 * 1024
+        )
+        for name in ["a.safetensors", "b.safetensors"]
+    ))
+
+    assert meter.throughput == pytest.approx(cap, rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_per_download_limit(large_files, tmp_path):
+    """ダウンロード単位の上限が適用されるテスト"""
+    cap = 4 * MIB
+    limiter = BandwidthLimiter(per_download_limit=cap)
+    service = DownloadService(tmp_path, bandwidth_limiter=limiter, progress_interval=0)
+    meter = ThroughputMeter()
+
+    await service.download_file(
+        f"{large_files.base_url}/files/a.safetensors", "a.safetensors",
+        progress_callback=meter.callback(), chunk_size=64 * 1024
+    )
+
+    assert meter.throughput == pytest.approx(cap, rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_limit_change_applies_to_running_download(large_files, tmp_path):
+    """実行中の制限変更が進行中のダウンロードに反映されるテスト"""
+    limiter = BandwidthLimiter(per_download_limit=1 * MIB)
+    service = DownloadService(tmp_path, bandwidth_limiter=limiter)
+
+    async def lift_limit():
+        await asyncio.sleep(0.2)
+        limiter.set_limits(None, 16 * MIB)
+
+    start = time.monotonic()
+    await asyncio.gather(
+        service.download_file(
+            f"{large_files.base_url}/files/a.safetensors", "a.safetensors", chunk_size=64 * 1024
+        ),
+        lift_limit()
+    )
+
+    # 1 MiB/s のままなら 2 秒かかる
+    assert time.monotonic() - start < 1.0
+
+
+def test_set_limits_rejects_negative_values():
+    """負の制限値は ValueError となるテスト"""
+    with pytest.raises(ValueError):
+        BandwidthLimiter(global_limit=-1)
+
+
+def test_zero_means_unlimited():
+    """0 は無制限として扱われるテスト"""
+    limiter = BandwidthLimiter(global_limit=0, per_download_limit=0)
+
+    assert limiter.global_limit is None
+    assert limiter.global_bucket is None
@@ -0,0 +1,120 @@
+"""一括インポートのテスト"""
+
+import asyncio
+
+import pytest
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.batch import BatchImporter, BatchReportStore, parse_batch_inputs
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.scanner import ModelScanner
+
+
+@pytest.fixture
+def importer(tmp_path, fake_civitai):
+    """代替サーバーを参照する BatchImporter"""
+    service = DownloadService(
+        download_dir=tmp_path / "downloads",
+        civitai_client=CivitaiClient(base_url=fake_civitai.api_url, requests_per_minute=6000),
+        scanner=ModelScanner(Config(_env_file=None, model_scan_dir=tmp_path / "models")),
+        registry=ModelRegistry()
+    )
+    return BatchImporter(service, resolver_concurrency=4, download_concurrency=1)
+
+
+def test_parse_batch_inputs_skips_blank_and_comment_lines():
+    """空行とコメント行を無視するテスト"""
+    lines = ["# models for node-3", "", "  https://civitai.com/models/1/a  ", "2", "   "]
+
+    assert parse_batch_inputs(lines) == ["https://civitai.com/models/1/a", "2"]
+
+
+def test_create_report_deduplicates_and_validates(importer):
+    """同じモデル ID の重複入力と不正な入力を事前に判定するテスト"""
+    report = importer.create_report([
+        "https://civitai.com/models/11/first", "not a model", "11", "12"
+    ])
+
+    statuses = [item.status for item in report.items]
+    assert statuses == ["pending", "failed", "duplicate", "pending"]
+    assert report.items[2].duplicate_of == 0
+    assert "Invalid Civitai URL" in report.items[1].error
+
+
+async def test_batch_downloads_each_model_once(importer, fake_civitai):
+    """重複を除いた各モデルが 1 回ずつダウンロードされるテスト"""
+    for model_id in (21, 22, 23):
+        fake_civitai.add_model(model_id, "LORA")
+    report = importer.create_report(["21", "22", "21", "23"])
+
+    await importer.run(report)
+
+    assert report.finished
+    assert report.summary() == {"downloaded": 3, "duplicate": 1}
+    assert fake_civitai.requests.count(("GET", "/api/v1/models/21")) == 1
+    assert all(item.bytes_downloaded > 0 for item in report.items if item.status == "downloaded")
+
+
+async def test_metadata_resolution_runs_ahead_of_downloads(importer, fake_civitai):
+    """メタデータの解決がダウンロードと並行して先行するテスト"""
+    for model_id in (31, 32, 33, 34):
+        fake_civitai.add_model(model_id, "LORA")
+    fake_civitai.latency = 0.1
+    report = importer.create_report(["31", "32", "33", "34"])
+
+    await importer.run(report)
+
+    downloads = sorted(report.items, key=lambda item: item.download_started_at)
+    # 2 件目のダウンロード開始前に全件の解決が終わっている
+    assert max(item.resolved_at for item in report.items) < downloads[1].download_started_at
+    assert report.summary() == {"downloaded": 4}
+
+
+async def test_failed_item_does_not_stop_batch(importer, fake_civitai):
+    """存在しないモデルがあっても残りを処理するテスト"""
+    fake_civitai.add_model(41, "LORA")
+    report = importer.create_report(["404", "41"])
+
+    await importer.run(report)
+
+    assert [item.status for item in report.items] == ["failed", "downloaded"]
+    assert report.items[0].error
+
+
+async def test_unexpected_download_errors_do_not_stall_batch(importer, fake_civitai):
+    """ダウンロード段の予期しない例外で全ワーカーが止まらず、バッチが完了するテスト"""
+    for model_id in range(51, 55):
+        fake_civitai.add_model(model_id, "LORA")
+
+    async def broken_download(*args, **kwargs):
+        raise RuntimeError("unexpected")
+
+    importer.download_service.download_model = broken_download
+    importer.queue_size = 1
+    report = importer.create_report([str(model_id) for model_id in range(51, 55)])
+
+    await asyncio.wait_for(importer.run(report), timeout=10)
+
+    assert report.finished
+    assert report.summary() == {"failed": 4}
+    assert report.items[0].error == "RuntimeError: unexpected"
+
+
+async def test_report_is_shared_through_store(importer, fake_civitai, tmp_path):
+    """ストアを指定すると別プロセスからも進捗と結果を参照できるテスト"""
+    fake_civitai.add_model(41, "LORA")
+    store = BatchReportStore(tmp_path / "state.db")
+    importer.report_store = store
+    report = importer.create_report(["41", "not a model"])
+
+    await importer.run(report)
+
+    reader = BatchReportStore(tmp_path / "state.db")
+    shared = await reader.load(report.batch_id)
+    assert shared == report
+    assert shared.summary() == {"downloaded": 1, "failed": 1}
+    assert await reader.load("missing") is None
+    store.close()
+    reader.close()
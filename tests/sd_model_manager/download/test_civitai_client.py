@@ -1,6 +1,9 @@
 """Civitai API クライアントのテスト"""
 
+import asyncio
+import httpx
 import pytest
+import respx
 from unittest.mock import AsyncMock, patch
 from sd_model_manager.download.civitai_client import CivitaiClient
 from sd_model_manager.lib.errors import DownloadError
@@ -107,3 +110,137 @@ async def test_get_model_metadata_api_error(civitai_client):
                      new=AsyncMock(side_effect=DownloadError("API Error"))):
         with pytest.raises(DownloadError):
             await civitai_client.get_model_metadata("123456")
+
+
+def test_rate_limit_sized_by_api_key():
+    """API キーの有無でレート上限が決まるテスト"""
+    anonymous = CivitaiClient(api_key=None)
+    authenticated = CivitaiClient(api_key="test_key")
+
+    assert anonymous.requests_per_minute == CivitaiClient.ANONYMOUS_REQUESTS_PER_MINUTE
+    assert authenticated.requests_per_minute == CivitaiClient.AUTHENTICATED_REQUESTS_PER_MINUTE
+    assert authenticated.rate_limiter.rate == pytest.approx(1.0)
+    # 初回の 1 分間に上限を超えて送らないよう、バーストは数リクエストに抑える
+    assert anonymous.rate_limiter.capacity == 1.0
+    assert authenticated.rate_limiter.capacity == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_model_data_retries_after_429():
+    """429 受信時に Retry-After に従ってリトライするテスト"""
+    # 停止明けのトークン補充を待たないよう高いレートを指定
+    civitai_client = CivitaiClient(api_key=None, requests_per_minute=6000)
+    call_count = 0
+
+    def side_effect(request):
+        nonlocal call_count
+        call_count += 1
+        if call_count == 1:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"id": 123456})
+
+    respx.get(f"{CivitaiClient.BASE_URL}/models/123456").mock(side_effect=side_effect)
+
+    data = await civitai_client.get_model_metadata("123456")
+    await civitai_client.close()
+
+    assert data["id"] == 123456
+    assert call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_model_data_gives_up_after_max_429_retries():
+    """429 が続く場合はリトライ上限後に DownloadError となるテスト"""
+    client = CivitaiClient(api_key=None, requests_per_minute=6000, max_rate_limit_retries=1)
+    route = respx.get(f"{CivitaiClient.BASE_URL}/models/123456").mock(
+        return_value=httpx.Response(429, headers={"retry-after": "0"})
+    )
+
+    with pytest.raises(DownloadError) as exc_info:
+        await client.get_model_metadata("123456")
+    await client.close()
+
+    assert "Rate limit exceeded" in str(exc_info.value)
+    assert exc_info.value.details["status_code"] == 429
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_identical_requests_are_coalesced(civitai_client):
+    """同時に発行された同一リクエストが 1 回の呼び出しに合流するテスト"""
+    async def slow_response(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"id": 123456})
+
+    route = respx.get(f"{CivitaiClient.BASE_URL}/models/123456").mock(side_effect=slow_response)
+
+    results = await asyncio.gather(
+        *(civitai_client.get_model_metadata("123456") for _ in range(5))
+    )
+    await civitai_client.close()
+
+    assert route.call_count == 1
+    assert all(result["id"] == 123456 for result in results)
+
+
+def test_retry_delay_prefers_retry_after_header(civitai_client):
+    """Retry-After ヘッダーの秒数が待機時間に反映されるテスト"""
+    response = httpx.Response(429, headers={"retry-after": "30"})
+
+    delay = civitai_client._retry_delay(response, attempt=0)
+
+    assert 30.0 <= delay <= 33.0
+
+
+def test_retry_delay_uses_exponential_backoff_without_header(civitai_client):
+    """Retry-After がない場合は指数バックオフになるテスト"""
+    response = httpx.Response(429)
+
+    first = civitai_client._retry_delay(response, attempt=0)
+    third = civitai_client._retry_delay(response, attempt=2)
+
+    assert CivitaiClient.BACKOFF_BASE_SECONDS <= first < third
+
+
+@pytest.mark.asyncio
+async def test_get_model_version_by_hash(fake_civitai):
+    """ハッシュからモデルバージョンを取得するテスト（未登録は None）"""
+    fake_civitai.add_version({"id": 1, "files": [{"hashes": {"SHA256": "ABC123"}}]})
+    client = CivitaiClient(base_url=fake_civitai.api_url, requests_per_minute=6000)
+
+    found = await client.get_model_version_by_hash("abc123")
+    missing = await client.get_model_version_by_hash("FFFFFF")
+    await client.close()
+
+    assert found["id"] == 1
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_get_version_files_lists_all_files(fake_civitai):
+    """バージョン内の全ファイルをサイズ・形式・精度付きで取得できるテスト"""
+    fake_civitai.add_model(7, "Checkpoint")
+    fake_civitai.add_version_file(
+        7, "pruned.safetensors", "Pruned Model", b"p" * 2048,
+        metadata={"fp": "fp16", "size": "pruned", "format": "SafeTensor"}
+    )
+    fake_civitai.add_version_file(7, "config.yaml", "Config", b"model: {}")
+    client = CivitaiClient(base_url=fake_civitai.api_url, requests_per_minute=6000)
+
+    version_files = await client.get_version_files("7")
+
+    assert version_files.model_type == "Checkpoint"
+    assert [file.name for file in version_files.files] == [
+        "test_model_7.safetensors", "pruned.safetensors", "config.yaml"
+    ]
+    pruned = version_files.files[1]
+    assert pruned.size_bytes == 2048
+    assert pruned.precision == "fp16"
+    assert pruned.size_variant == "pruned"
+    assert pruned.format == "SafeTensor"
+    assert pruned.hashes["SHA256"]
+    assert version_files.files[0].primary
+    assert version_files.preview_urls == [f"{fake_civitai.base_url}/files/7/preview.png"]
@@ -0,0 +1,228 @@
+"""ダウンロード性能ベンチマーク（ローカルの Civitai 代替サーバーに対する実測）
+
+ネットワークに接続せずに、スループット（MB/s）、CPU 時間（CPU 秒/GB）、
+イベントループの遅延、リトライ時の挙動を計測する。結果はテスト終了時に
+一覧表示され、各値が下限・上限を外れた場合はテストが失敗する。
+
+ベンチマークは既定の ``pytest`` では実行されず、``pytest -m benchmark`` で
+実行する。代替サーバー自体の動作確認とリトライの挙動のテストは常に実行される。
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.lib.loop_monitor import LoopLagMonitor
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.scanner import ModelScanner
+
+MIB = 1024 * 1024
+LARGE_FILE_MB = int(os.environ.get("SDMM_BENCHMARK_LARGE_MB", "64"))
+
+# 回帰判定の閾値（ループバック通信で余裕を持って満たせる値）
+MIN_MB_PER_SECOND = 20.0
+MAX_CPU_SECONDS_PER_GB = 60.0
+MAX_LOOP_LAG_MS = 500.0
+
+
+async def measure(scenario: str, server, results: list[dict], run, expected_files: int = 1):
+    """ダウンロード処理を実行して計測結果を記録
+
+    CPU 時間はイベントループのスレッドのみを計測し、同一プロセス内で動く
+    代替サーバーの負荷を含めない。
+
+    Args:
+        scenario: シナリオ名
+        server: 代替サーバー
+        results: 結果の記録先
+        run: ダウンロードを実行し、転送したバイト数を返すコルーチン関数
+        expected_files: 成功時のファイル取得リクエスト数（リトライ数の算出用）
+
+    Returns:
+        記録した結果
+    """
+    server.requests.clear()
+    monitor = LoopLagMonitor(interval=0.005, stall_threshold=None)
+    monitor.start()
+    try:
+        cpu_started = time.thread_time()
+        started = time.perf_counter()
+        total_bytes = await run()
+        elapsed = time.perf_counter() - started
+        cpu = time.thread_time() - cpu_started
+    finally:
+        await monitor.stop()
+
+    file_requests = sum(1 for _, path in server.requests if path.startswith("/files/"))
+    result = {
+        "scenario": scenario,
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "mb_per_second": total_bytes / MIB / elapsed,
+        "cpu_seconds_per_gb": cpu / (total_bytes / 1024 ** 3),
+        "loop_lag_max_ms": monitor.max_lag * 1000,
+        "requests": len(server.requests),
+        "retries": file_requests - expected_files,
+    }
+    results.append(result)
+    return result
+
+
+def assert_within_budget(result: dict) -> None:
+    """計測結果が回帰判定の閾値内であることを確認"""
+    assert result["mb_per_second"] >= MIN_MB_PER_SECOND, result
+    assert result["cpu_seconds_per_gb"] <= MAX_CPU_SECONDS_PER_GB, result
+    assert result["loop_lag_max_ms"] <= MAX_LOOP_LAG_MS, result
+
+
+@pytest.fixture
+def service(tmp_path):
+    """計測用の DownloadService（進捗サンプリングは既定値）"""
+    return DownloadService(download_dir=tmp_path)
+
+
+@pytest.mark.benchmark
+async def test_single_download_throughput(service, fake_civitai, benchmark_results):
+    """単一ファイルのダウンロード性能"""
+    content = fake_civitai.add_file("single.safetensors", 16 * MIB)
+
+    async def run():
+        path = await service.download_file(
+            f"{fake_civitai.base_url}/files/single.safetensors", "single.safetensors"
+        )
+        assert path.stat().st_size == len(content)
+        return len(content)
+
+    result = await measure("single 16MiB", fake_civitai, benchmark_results, run)
+
+    assert result["retries"] == 0
+    assert_within_budget(result)
+
+
+@pytest.mark.benchmark
+async def test_concurrent_download_throughput(service, fake_civitai, benchmark_results):
+    """複数ファイルを同時にダウンロードした場合の合計性能"""
+    names = [f"concurrent_{i}.safetensors" for i in range(4)]
+    for name in names:
+        fake_civitai.add_file(name, 8 * MIB)
+
+    async def run():
+        paths = await asyncio.gather(*(
+            service.download_file(f"{fake_civitai.base_url}/files/{name}", name)
+            for name in names
+        ))
+        return sum(path.stat().st_size for path in paths)
+
+    result = await measure(
+        "concurrent 4x8MiB", fake_civitai, benchmark_results, run, expected_files=len(names)
+    )
+
+    assert result["bytes"] == len(names) * 8 * MIB
+    assert_within_budget(result)
+
+
+@pytest.mark.benchmark
+async def test_large_download_throughput(service, fake_civitai, benchmark_results):
+    """大きなファイルのダウンロード性能（SDMM_BENCHMARK_LARGE_MB で変更可能）"""
+    size = LARGE_FILE_MB * MIB
+    fake_civitai.add_file("large.safetensors", size)
+
+    async def run():
+        path = await service.download_file(
+            f"{fake_civitai.base_url}/files/large.safetensors", "large.safetensors"
+        )
+        return path.stat().st_size
+
+    result = await measure(f"large {LARGE_FILE_MB}MiB", fake_civitai, benchmark_results, run)
+
+    assert result["bytes"] == size
+    assert_within_budget(result)
+
+
+@pytest.mark.benchmark
+async def test_dropped_connection_is_retried(service, fake_civitai, benchmark_results):
+    """転送途中で切断された場合のリトライ挙動"""
+    content = fake_civitai.add_file("flaky.safetensors", 8 * MIB)
+    fake_civitai.latency = 0.01
+    fake_civitai.drop_after = 2 * MIB
+    fake_civitai.drop_count = 1
+
+    async def run():
+        path = await service.download_file(
+            f"{fake_civitai.base_url}/files/flaky.safetensors", "flaky.safetensors"
+        )
+        assert path.read_bytes() == content
+        return len(content)
+
+    result = await measure("dropped connection", fake_civitai, benchmark_results, run)
+
+    assert fake_civitai.dropped == 1
+    assert result["retries"] == 1
+
+
+async def test_rate_limited_metadata_request_is_retried(tmp_path, fake_civitai):
+    """API が 429 を返した場合に Retry-After 後に再試行する挙動
+
+    転送量がごく小さく性能値には意味がないため、ベンチマークとしては計測しない。
+    """
+    fake_civitai.add_model(42, "LORA")
+    fake_civitai.rate_limit_count = 1
+    fake_civitai.retry_after = 0
+    service = DownloadService(
+        download_dir=tmp_path / "downloads",
+        civitai_client=CivitaiClient(base_url=fake_civitai.api_url, requests_per_minute=6000),
+        scanner=ModelScanner(Config(_env_file=None, model_scan_dir=tmp_path / "models")),
+        registry=ModelRegistry()
+    )
+
+    result = await service.download_model("42")
+    await service.civitai_client.close()
+
+    assert Path(result.file_path).exists()
+    assert fake_civitai.rate_limited == 1
+    assert fake_civitai.requests.count(("GET", "/api/v1/models/42")) == 2
+    # モデル本体とプレビュー画像の 2 ファイルを 1 回ずつ取得する
+    assert sum(1 for _, path in fake_civitai.requests if path.startswith("/files/")) == 2
+
+
+async def test_fake_server_serves_byte_ranges(fake_civitai):
+    """代替サーバーが Range リクエストに 206 で応答するテスト"""
+    content = fake_civitai.add_file("ranged.bin", 1000)
+
+    async with httpx.AsyncClient() as client:
+        partial = await client.get(
+            f"{fake_civitai.base_url}/files/ranged.bin", headers={"Range": "bytes=100-199"}
+        )
+        suffix = await client.get(
+            f"{fake_civitai.base_url}/files/ranged.bin", headers={"Range": "bytes=-10"}
+        )
+        invalid = await client.get(
+            f"{fake_civitai.base_url}/files/ranged.bin", headers={"Range": "bytes=2000-"}
+        )
+
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == "bytes 100-199/1000"
+    assert partial.content == content[100:200]
+    assert suffix.content == content[-10:]
+    assert invalid.status_code == 416
+
+
+async def test_fake_server_limits_bandwidth(fake_civitai):
+    """代替サーバーの帯域制限が効くテスト"""
+    fake_civitai.add_file("slow.bin", 512 * 1024)
+    fake_civitai.bandwidth = 2 * MIB
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{fake_civitai.base_url}/files/slow.bin")
+    elapsed = time.perf_counter() - started
+
+    assert len(response.content) == 512 * 1024
+    assert elapsed >= 0.2
@@ -1,11 +1,19 @@
 """ダウンロードサービスのテスト"""
 
+import json
 import pytest
 import respx
 import httpx
 from pathlib import Path
+from sd_model_manager.config import Config
+from sd_model_manager.download.civitai_client import CivitaiClient
 from sd_model_manager.download.download_service import DownloadService
-from sd_model_manager.lib.errors import DownloadError
+from sd_model_manager.download.models import FileSelection
+from sd_model_manager.download.progress import ProgressBus
+from sd_model_manager.lib.errors import ConfigurationError, DownloadError
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.scanner import ModelScanner
 
 
 @pytest.fixture
@@ -150,3 +158,326 @@ async def test_download_with_retry(download_service, tmp_path):
     assert result.exists()
     assert result.read_bytes() == mock_content
     assert call_count == 3
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_publishes_progress_events(tmp_path):
+    """ダウンロード進捗がバスに配信されるテスト"""
+    bus = ProgressBus()
+    subscription = bus.subscribe()
+    service = DownloadService(download_dir=tmp_path, progress_bus=bus, progress_interval=0)
+
+    mock_content = b"x" * 32768
+    respx.get("https://example.com/model.safetensors").mock(return_value=httpx.Response(
+        200,
+        content=mock_content,
+        headers={"content-length": str(len(mock_content))}
+    ))
+
+    await service.download_file(
+        "https://example.com/model.safetensors", "model.safetensors", job_id="job-1"
+    )
+
+    events = await subscription.get()
+    assert len(events) == 1  # 同一ジョブのイベントは最新のみに集約される
+    assert events[0].job_id == "job-1"
+    assert events[0].status == "completed"
+    assert events[0].downloaded_bytes == len(mock_content)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_failure_publishes_failed_event(tmp_path):
+    """全リトライ失敗時に failed イベントが配信されるテスト"""
+    bus = ProgressBus()
+    subscription = bus.subscribe()
+    service = DownloadService(download_dir=tmp_path, progress_bus=bus)
+
+    respx.get("https://example.com/model.safetensors").mock(return_value=httpx.Response(404))
+
+    with pytest.raises(DownloadError):
+        await service.download_file(
+            "https://example.com/model.safetensors", "model.safetensors", max_retries=1
+        )
+
+    events = await subscription.get()
+    assert events[0].status == "failed"
+    assert "404" in events[0].error
+
+
+@pytest.fixture
+def library_service(tmp_path, fake_civitai):
+    """ライブラリ配置用に構成した DownloadService"""
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models")
+    registry = ModelRegistry()
+    service = DownloadService(
+        download_dir=tmp_path / "downloads",
+        civitai_client=CivitaiClient(base_url=fake_civitai.api_url, requests_per_minute=6000),
+        scanner=ModelScanner(config),
+        registry=registry,
+        hash_index=HashIndex()
+    )
+    return service, registry
+
+
+@pytest.fixture
+def existing_copy(library_service, fake_civitai, tmp_path):
+    """同じ内容のモデルが別名でライブラリに存在する状態"""
+    service, _ = library_service
+    model = fake_civitai.add_model(42, "LORA")
+    existing = tmp_path / "models" / "archive" / "loras" / "renamed.safetensors"
+    existing.parent.mkdir(parents=True)
+    existing.write_bytes(fake_civitai.files["42/model.safetensors"])
+    sha256 = model["modelVersions"][0]["files"][0]["hashes"]["SHA256"]
+    service.hash_index.add(sha256, existing, existing.stat().st_size)
+    return existing
+
+
+@pytest.mark.asyncio
+async def test_download_model_hardlinks_existing_copy(library_service, existing_copy, fake_civitai):
+    """既存の同一ファイルがある場合は転送せずハードリンクするテスト"""
+    service, registry = library_service
+
+    result = await service.download_model("42")
+    await service.civitai_client.close()
+
+    assert result.deduplicated is True
+    assert result.dedup_method == "hardlink"
+    assert result.existing_path == str(existing_copy)
+    assert result.bytes_downloaded == 0
+    assert ("GET", "/files/42/model.safetensors") not in fake_civitai.requests
+
+    linked = Path(result.file_path)
+    assert linked.parent.name == "loras" and "active" in linked.parts
+    assert linked.stat().st_ino == existing_copy.stat().st_ino
+    assert Path(f"{linked}.civitai.info").exists()
+    assert registry.get_by_path(str(linked)) is not None
+
+
+@pytest.mark.asyncio
+async def test_download_model_falls_back_to_alias(
+    library_service, existing_copy, fake_civitai, monkeypatch
+):
+    """リンクできない場合はレジストリ上のエイリアスとなるテスト"""
+    service, _ = library_service
+
+    def fail_link(src, dst):
+        raise OSError("Invalid cross-device link")
+
+    monkeypatch.setattr("sd_model_manager.download.download_service.os.link", fail_link)
+    monkeypatch.setattr("sd_model_manager.download.download_service.reflink", lambda s, d: False)
+
+    result = await service.download_model("42")
+    await service.civitai_client.close()
+
+    assert result.dedup_method == "alias"
+    assert result.file_path == str(existing_copy)
+    assert result.model.file_path == str(existing_copy)
+    assert not (existing_copy.parents[2] / "active" / "loras" / "test_model_42.safetensors").exists()
+
+
+@pytest.mark.asyncio
+async def test_downloaded_model_is_indexed_for_later_dedup(library_service, fake_civitai):
+    """ダウンロードしたモデルがインデックスに登録され、再要求時は転送しないテスト"""
+    service, _ = library_service
+    fake_civitai.add_model(42, "LORA")
+
+    first = await service.download_model("42")
+    fake_civitai.requests.clear()
+    second = await service.download_model("42")
+    await service.civitai_client.close()
+
+    assert first.deduplicated is False
+    assert second.deduplicated is True
+    assert second.file_path == first.file_path
+    assert ("GET", "/files/42/model.safetensors") not in fake_civitai.requests
+
+
+@pytest.mark.asyncio
+async def test_download_model_places_file_in_library(library_service, fake_civitai, tmp_path):
+    """モデル種別に応じたライブラリ内に保存され、レジストリに登録されるテスト"""
+    service, registry = library_service
+    fake_civitai.add_model(42, "LORA")
+
+    result = await service.download_model("42")
+    await service.civitai_client.close()
+    model_info = result.model
+
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    model_path = lora_dir / "test_model_42.safetensors"
+    assert model_path.read_bytes() == fake_civitai.files["42/model.safetensors"]
+    assert not (lora_dir / "test_model_42.safetensors.part").exists()
+
+    sidecar = json.loads((lora_dir / "test_model_42.safetensors.civitai.info").read_text())
+    assert sidecar["modelId"] == 42
+    assert sidecar["model"]["type"] == "LORA"
+    assert (lora_dir / "test_model_42.preview.png").read_bytes() == b"\x89PNG fake preview"
+
+    assert model_info.model_type == "LoRA"
+    assert model_info.civitai_metadata["id"] == 420
+    assert registry.get_by_path(str(model_path)) == model_info
+    assert not (tmp_path / "downloads").exists()
+    assert result.deduplicated is False
+    assert result.bytes_downloaded == len(fake_civitai.files["42/model.safetensors"])
+
+
+@pytest.mark.asyncio
+async def test_download_model_refuses_to_overwrite_different_file(
+    library_service, fake_civitai, tmp_path
+):
+    """同名で内容の異なるファイルがライブラリにある場合は上書きせずに失敗するテスト"""
+    service, _ = library_service
+    fake_civitai.add_model(42, "LORA")
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True, exist_ok=True)
+    existing = lora_dir / "test_model_42.safetensors"
+    existing.write_bytes(b"another model with the same name")
+
+    with pytest.raises(DownloadError, match="already exists") as exc_info:
+        await service.download_model("42")
+    await service.civitai_client.close()
+
+    assert exc_info.value.details["existing_path"] == str(existing)
+    assert existing.read_bytes() == b"another model with the same name"
+    assert ("GET", "/files/42/model.safetensors") not in fake_civitai.requests
+    assert sorted(p.name for p in lora_dir.iterdir()) == ["test_model_42.safetensors"]
+
+
+@pytest.mark.asyncio
+async def test_download_model_files_skips_colliding_file(library_service, model_package, tmp_path):
+    """一括取得でも同名の別ファイルは上書きせず、そのファイルのみ失敗とするテスト"""
+    service, _ = library_service
+    checkpoint_dir = service.library_path_for("Checkpoint", "model.yaml").parent
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    (checkpoint_dir / "model.yaml").write_text("existing: true")
+
+    result = await service.download_model_files("9", include_previews=False)
+    await service.civitai_client.close()
+
+    statuses = {file.name: file.status for file in result.files}
+    assert statuses.pop("model.yaml") == "failed"
+    assert set(statuses.values()) == {"downloaded"}
+    assert (checkpoint_dir / "model.yaml").read_text() == "existing: true"
+
+
+@pytest.mark.asyncio
+async def test_download_model_maps_civitai_types(library_service, fake_civitai, tmp_path):
+    """Civitai の種別ごとに保存先ディレクトリが決まるテスト"""
+    service, _ = library_service
+
+    assert service.library_path_for("Checkpoint", "a.safetensors") == \
+        tmp_path / "models" / "active" / "checkpoints" / "a.safetensors"
+    assert service.library_path_for("TextualInversion", "e.pt") == \
+        tmp_path / "models" / "active" / "embeddings" / "e.pt"
+    assert service.library_path_for("Poses", "p.zip") == \
+        tmp_path / "models" / "active" / "other" / "p.zip"
+    # パス区切りを含むファイル名はライブラリ外に出ない
+    assert service.library_path_for("LORA", "../../evil.safetensors") == \
+        tmp_path / "models" / "active" / "loras" / "evil.safetensors"
+
+
+@pytest.mark.asyncio
+async def test_failed_download_leaves_no_partial_file(download_service, tmp_path):
+    """失敗したダウンロードは一時ファイルも最終ファイルも残さないテスト"""
+    with respx.mock:
+        respx.get("https://example.com/model.safetensors").mock(return_value=httpx.Response(500))
+
+        with pytest.raises(DownloadError):
+            await download_service.download_file(
+                "https://example.com/model.safetensors", "model.safetensors", max_retries=1
+            )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_download_model_requires_scanner(tmp_path):
+    """スキャナー未設定では download_model が ConfigurationError となるテスト"""
+    service = DownloadService(download_dir=tmp_path, civitai_client=CivitaiClient())
+
+    with pytest.raises(ConfigurationError):
+        await service.download_model("42")
+
+
+@pytest.fixture
+def model_package(fake_civitai):
+    """本体・fp16 版・VAE・設定ファイルを含むモデルバージョン"""
+    fake_civitai.add_model(9, "Checkpoint")
+    fake_civitai.add_version_file(
+        9, "model_fp16.safetensors", "Pruned Model", b"half" * 4096,
+        metadata={"fp": "fp16", "format": "SafeTensor"}
+    )
+    fake_civitai.add_version_file(9, "model.vae.safetensors", "VAE", b"vae" * 1024)
+    fake_civitai.add_version_file(9, "model.yaml", "Config", b"model: {}")
+    return fake_civitai
+
+
+@pytest.mark.asyncio
+async def test_download_model_files_fetches_package_in_one_job(
+    library_service, model_package, tmp_path
+):
+    """バージョン内の全ファイルとプレビューを 1 ジョブで取得するテスト"""
+    service, registry = library_service
+    bus = ProgressBus()
+    service.progress_bus = bus
+    service.progress_interval = 0
+    subscription = bus.subscribe(job_id="group-1")
+
+    result = await service.download_model_files("9", job_id="group-1")
+
+    library = tmp_path / "models" / "active"
+    assert result.succeeded
+    assert {Path(file.file_path) for file in result.files} == {
+        library / "checkpoints" / "test_model_9.safetensors",
+        library / "checkpoints" / "model_fp16.safetensors",
+        library / "vae" / "model.vae.safetensors",
+        library / "checkpoints" / "model.yaml",
+    }
+    assert result.previews == [str(library / "checkpoints" / "test_model_9.preview.png")]
+    # 設定ファイルはモデルとして登録しない
+    assert len(result.models) == 3
+    assert len(registry) == 3
+    assert (library / "checkpoints" / "model_fp16.safetensors.civitai.info").exists()
+
+    [event] = await subscription.get()
+    assert event.status == "completed"
+    assert event.downloaded_bytes == event.total_bytes == result.bytes_downloaded
+
+
+@pytest.mark.asyncio
+async def test_download_model_files_applies_selection(library_service, model_package):
+    """種別・精度の条件で取得するファイルを選べるテスト"""
+    service, _ = library_service
+
+    result = await service.download_model_files(
+        "9",
+        selection=FileSelection(types=["pruned model"], precisions=["FP16"]),
+        include_previews=False
+    )
+
+    assert [file.name for file in result.files] == ["model_fp16.safetensors"]
+    assert result.previews == []
+
+
+@pytest.mark.asyncio
+async def test_download_model_files_rejects_empty_selection(library_service, model_package):
+    """条件に合うファイルがない場合はエラーとなるテスト"""
+    service, _ = library_service
+
+    with pytest.raises(DownloadError, match="No files"):
+        await service.download_model_files("9", selection=FileSelection(formats=["GGUF"]))
+
+
+@pytest.mark.asyncio
+async def test_download_model_files_continues_after_file_failure(library_service, model_package):
+    """1 ファイルの失敗で他のファイルの取得が中断しないテスト"""
+    service, _ = library_service
+    del model_package.files["9/model.yaml"]
+
+    result = await service.download_model_files("9", max_retries=1, include_previews=False)
+
+    statuses = {file.name: file.status for file in result.files}
+    assert statuses.pop("model.yaml") == "failed"
+    assert set(statuses.values()) == {"downloaded"}
+    assert not result.succeeded
@@ -0,0 +1,132 @@
+"""ダウンロード履歴ストアのテスト"""
+
+import httpx
+import pytest
+import respx
+
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.download.history import DownloadHistoryStore, history_entry
+from sd_model_manager.lib.errors import DownloadError
+
+
+@pytest.fixture
+def store(tmp_path):
+    """一時ディレクトリ上の履歴ストア"""
+    store = DownloadHistoryStore(tmp_path / "history.db")
+    yield store
+    store.close()
+
+
+def test_history_entry_computes_throughput():
+    """経過時間とスループットが計算されるテスト"""
+    entry = history_entry("https://example.com/a", 0.0, "completed", bytes_transferred=1000)
+
+    assert entry.duration > 0
+    assert entry.throughput == pytest.approx(1000 / entry.duration)
+
+
+def test_store_uses_wal_mode(store):
+    """WAL モードで開かれるテスト"""
+    store.record_sync(history_entry("https://example.com/a", 0.0, "completed"))
+
+    mode = store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_query_paginates_newest_first(store):
+    """キーセットページネーションで全件を重複なく取得できるテスト"""
+    for i in range(7):
+        store.record_sync(history_entry(f"https://example.com/{i}", float(i), "completed"))
+
+    urls = []
+    cursor = None
+    while True:
+        page = store.query_sync(limit=3, cursor=cursor)
+        urls.extend(item.url for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert urls == [f"https://example.com/{i}" for i in reversed(range(7))]
+
+
+def test_query_filters(store):
+    """ステータス・モデル ID・期間で絞り込めるテスト"""
+    store.record_sync(history_entry("https://example.com/a", 10.0, "completed", model_id=1))
+    store.record_sync(history_entry("https://example.com/b", 20.0, "failed", model_id=1))
+    store.record_sync(history_entry("https://example.com/c", 30.0, "completed", model_id=2))
+
+    assert [e.url for e in store.query_sync(status="completed").items] == [
+        "https://example.com/c", "https://example.com/a"
+    ]
+    assert [e.url for e in store.query_sync(model_id=1).items] == [
+        "https://example.com/b", "https://example.com/a"
+    ]
+    assert [e.url for e in store.query_sync(since=15.0, until=30.0).items] == [
+        "https://example.com/b"
+    ]
+
+
+@pytest.mark.parametrize("filters, index", [
+    ({"status": "failed"}, "idx_history_status"),
+    ({"model_id": 1}, "idx_history_model_id"),
+    ({"since": 0.0, "until": 1.0}, "idx_history_started_at"),
+])
+def test_filtered_queries_use_indexes(store, filters, index):
+    """絞り込みがインデックスを使用するテスト（件数が増えても全走査しない）"""
+    conn = store._connect()
+    conn.executemany(
+        "INSERT INTO download_history (started_at, finished_at, url, model_id, status) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(float(i), float(i), "u", i % 100, "failed" if i % 10 else "completed")
+         for i in range(2000)]
+    )
+    conn.execute("ANALYZE")
+
+    columns = {"status": "status = ?", "model_id": "model_id = ?",
+               "since": "started_at >= ?", "until": "started_at < ?"}
+    where = " AND ".join(columns[key] for key in filters)
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM download_history WHERE {where} "
+        "ORDER BY id DESC LIMIT 51",
+        list(filters.values())
+    ).fetchall()
+
+    assert any(index in row[-1] for row in plan)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_service_records_retries(tmp_path, store):
+    """リトライを経て成功したダウンロードが履歴に記録されるテスト"""
+    service = DownloadService(download_dir=tmp_path, history=store)
+    responses = iter([httpx.Response(500), httpx.Response(200, content=b"x" * 100)])
+    respx.get("https://example.com/model.safetensors").mock(
+        side_effect=lambda request: next(responses)
+    )
+
+    await service.download_file("https://example.com/model.safetensors", "model.safetensors")
+
+    [entry] = (await store.query()).items
+    assert entry.status == "completed"
+    assert entry.retries == 1
+    assert entry.bytes == 100
+    assert entry.filename == "model.safetensors"
+    assert entry.file_path == str(tmp_path / "model.safetensors")
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_service_records_failures(tmp_path, store):
+    """失敗したダウンロードがエラー内容とともに記録されるテスト"""
+    service = DownloadService(download_dir=tmp_path, history=store)
+    respx.get("https://example.com/model.safetensors").mock(return_value=httpx.Response(404))
+
+    with pytest.raises(DownloadError):
+        await service.download_file(
+            "https://example.com/model.safetensors", "model.safetensors", max_retries=2
+        )
+
+    [entry] = (await store.query(status="failed")).items
+    assert entry.retries == 1
+    assert "404" in entry.error
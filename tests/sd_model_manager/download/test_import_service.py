@@ -0,0 +1,183 @@
+"""ローカルインポートサービスのテスト"""
+
+import hashlib
+import json
+
+import pytest
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.import_service import ImportService
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.scanner import ModelScanner
+
+
+@pytest.fixture
+def library(tmp_path):
+    """空のライブラリを対象にした ImportService"""
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models")
+    (tmp_path / "models").mkdir()
+    registry = ModelRegistry()
+    service = ImportService(
+        scanner=ModelScanner(config), registry=registry, hash_index=HashIndex(), concurrency=2
+    )
+    return service, registry
+
+
+@pytest.fixture
+def share(tmp_path):
+    """サイドカー付きのモデルを含む共有フォルダ"""
+    root = tmp_path / "share"
+    (root / "loras").mkdir(parents=True)
+    (root / "checkpoints").mkdir()
+    (root / "loras" / "style.safetensors").write_bytes(b"lora weights" * 100)
+    (root / "loras" / "style.preview.png").write_bytes(b"\x89PNG")
+    (root / "loras" / "style.txt").write_text("trigger words")
+    (root / "loras" / "stylish.safetensors").write_bytes(b"other lora" * 100)
+    (root / "checkpoints" / "base.ckpt").write_bytes(b"checkpoint" * 100)
+    return root
+
+
+async def test_import_directory_places_files_by_type(library, share, tmp_path):
+    """ディレクトリ内のモデルが種別ごとのディレクトリへ取り込まれるテスト"""
+    service, registry = library
+
+    result = await service.import_paths([share])
+
+    assert {item.file_path for item in result.imported} == {
+        str(tmp_path / "models" / "active" / "loras" / "style.safetensors"),
+        str(tmp_path / "models" / "active" / "loras" / "stylish.safetensors"),
+        str(tmp_path / "models" / "active" / "checkpoints" / "base.ckpt"),
+    }
+    assert result.failed == []
+    assert len(registry) == 3
+    assert result.bytes_copied == sum(item.bytes_copied for item in result.imported)
+
+
+async def test_import_copies_sidecars_and_hashes(library, share, tmp_path):
+    """サイドカーが一緒に取り込まれ、SHA256 がインデックスに登録されるテスト"""
+    service, _ = library
+    source = share / "loras" / "style.safetensors"
+
+    result = await service.import_paths([source])
+
+    [imported] = result.imported
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    assert sorted(imported.sidecars) == [
+        str(lora_dir / "style.preview.png"), str(lora_dir / "style.txt")
+    ]
+    expected = hashlib.sha256(source.read_bytes()).hexdigest().upper()
+    assert imported.sha256 == expected
+    assert service.hash_index.lookup(expected) == lora_dir / "style.safetensors"
+    assert imported.model.model_type == "LoRA"
+
+
+async def test_import_uses_civitai_type_from_sidecar(library, tmp_path):
+    """.civitai.info のモデル種別で配置先を決めるテスト"""
+    service, registry = library
+    source = tmp_path / "usb" / "detail.safetensors"
+    source.parent.mkdir()
+    source.write_bytes(b"vae weights")
+    (tmp_path / "usb" / "detail.safetensors.civitai.info").write_text(
+        json.dumps({"model": {"type": "VAE"}, "files": []})
+    )
+
+    result = await service.import_paths([source], category="archive")
+
+    destination = tmp_path / "models" / "archive" / "vae" / "detail.safetensors"
+    assert result.imported[0].file_path == str(destination)
+    assert (destination.parent / "detail.safetensors.civitai.info").exists()
+    assert registry.get_by_path(str(destination)).category == "Archive"
+
+
+async def test_import_skips_known_hash_and_existing_names(library, share):
+    """同一ハッシュ・同名ファイルは取り込まずに省略するテスト"""
+    service, _ = library
+    first = await service.import_paths([share / "loras" / "style.safetensors"])
+
+    duplicate = share / "loras" / "copy_of_style.safetensors"
+    duplicate.write_bytes((share / "loras" / "style.safetensors").read_bytes())
+    second = await service.import_paths([
+        share / "loras" / "style.safetensors", duplicate
+    ])
+
+    reasons = {item.source_path: item.reason for item in second.skipped}
+    assert reasons == {
+        str(share / "loras" / "style.safetensors"): "exists",
+        str(duplicate): "duplicate",
+    }
+    assert second.imported == []
+    existing = first.imported[0].file_path
+    assert not (share.parent / "models" / "active" / "loras" / duplicate.name).exists()
+    assert all(item.existing_path == existing for item in second.skipped)
+
+
+async def test_files_inside_library_are_registered_in_place(library, tmp_path):
+    """ライブラリ内のファイルはコピーせずに登録するテスト"""
+    service, registry = library
+    in_library = tmp_path / "models" / "active" / "loras" / "manual.safetensors"
+    in_library.parent.mkdir(parents=True)
+    in_library.write_bytes(b"copied by hand")
+
+    result = await service.import_paths([in_library])
+
+    assert result.imported[0].method == "in_place"
+    assert result.imported[0].bytes_copied == 0
+    assert registry.get_by_path(str(in_library)) is not None
+
+
+async def test_invalid_paths_are_reported(library, tmp_path):
+    """存在しないパスやモデル以外のファイルは失敗として報告するテスト"""
+    service, _ = library
+    note = tmp_path / "readme.txt"
+    note.write_text("not a model")
+
+    result = await service.import_paths([tmp_path / "missing", note])
+
+    assert [item.source_path for item in result.failed] == [
+        str(tmp_path / "missing"), str(note)
+    ]
+
+
+async def test_concurrent_imports_to_same_destination_do_not_clobber(library, tmp_path):
+    """同じ配置先になる取り込みが並行しても、一方だけが配置されるテスト"""
+    service, _ = library
+    sources = []
+    for name in ["a", "b"]:
+        directory = tmp_path / name / "loras"
+        directory.mkdir(parents=True)
+        source = directory / "lora.safetensors"
+        source.write_bytes(name.encode() * 4096)
+        sources.append(source)
+
+    result = await service.import_paths(sources)
+
+    [imported] = result.imported
+    [skipped] = result.skipped
+    assert skipped.reason == "exists"
+    destination = tmp_path / "models" / "active" / "loras" / "lora.safetensors"
+    assert skipped.existing_path == imported.file_path == str(destination)
+    winner = next(source for source in sources if str(source) == imported.source_path)
+    assert destination.read_bytes() == winner.read_bytes()
+    assert [path.name for path in destination.parent.iterdir()] == ["lora.safetensors"]
+
+
+async def test_sidecars_of_other_models_with_same_prefix_are_ignored(library, tmp_path):
+    """``foo.bar.safetensors`` の付随ファイルを ``foo.safetensors`` の取り込みで拾わないテスト"""
+    service, _ = library
+    share = tmp_path / "share" / "loras"
+    share.mkdir(parents=True)
+    for name in [
+        "foo.safetensors", "foo.safetensors.civitai.info", "foo.preview.1.png", "foo.yaml",
+        "foo.bar.safetensors.civitai.info", "foo.bar.preview.png", "foo.notes.md",
+    ]:
+        (share / name).write_bytes(b"x")
+
+    result = await service.import_paths([share / "foo.safetensors"])
+
+    [imported] = result.imported
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    assert sorted(imported.sidecars) == [
+        str(lora_dir / name)
+        for name in ["foo.preview.1.png", "foo.safetensors.civitai.info", "foo.yaml"]
+    ]
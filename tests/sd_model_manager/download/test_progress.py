@@ -0,0 +1,135 @@
+"""進捗サンプリングと配信のテスト"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sd_model_manager.download.progress import ProgressBus, ProgressEvent, ProgressTracker
+
+
+class FakeClock:
+    """テスト用の手動時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_event(job_id: str, downloaded: int, status: str = "downloading") -> ProgressEvent:
+    return ProgressEvent(
+        job_id=job_id,
+        filename="model.safetensors",
+        status=status,
+        downloaded_bytes=downloaded,
+        total_bytes=100,
+        timestamp=datetime.now()
+    )
+
+
+def test_tracker_samples_at_fixed_interval():
+    """チャンクごとの更新がサンプリング間隔に間引かれるテスト"""
+    clock = FakeClock()
+    updates = []
+    tracker = ProgressTracker(
+        "job", "model.safetensors", callback=lambda d, t: updates.append(d),
+        interval=1.0, clock=clock
+    )
+
+    # 0.1 秒ごとに 1000 バイトずつ、2 秒間更新
+    for i in range(1, 21):
+        clock.now = i * 0.1
+        tracker.update(i * 1000, 20000)
+    tracker.finish()
+
+    # 1 秒ごとのサンプル 2 回 + 完了時 1 回
+    assert len(updates) == 3
+    assert updates[-1] == 20000
+
+
+def test_tracker_computes_throughput_and_eta():
+    """スループットと ETA の計算テスト"""
+    clock = FakeClock()
+    tracker = ProgressTracker("job", "model.safetensors", interval=1.0, clock=clock)
+
+    clock.now = 1.0
+    tracker.update(1000, 10000)
+
+    assert tracker.bytes_per_second == pytest.approx(1000.0)
+    assert tracker.eta_seconds == pytest.approx(9.0)
+
+
+def test_tracker_smooths_throughput():
+    """スループットが指数移動平均で平滑化されるテスト"""
+    clock = FakeClock()
+    tracker = ProgressTracker("job", "model.safetensors", interval=1.0, smoothing=0.5, clock=clock)
+
+    clock.now = 1.0
+    tracker.update(1000, 0)
+    clock.now = 2.0
+    tracker.update(4000, 0)
+
+    # 瞬間値 3000 と前回値 1000 の平均
+    assert tracker.bytes_per_second == pytest.approx(2000.0)
+    assert tracker.eta_seconds is None  # 合計サイズ不明
+
+
+def test_tracker_publishes_to_bus():
+    """トラッカーがバスに開始・完了イベントを配信するテスト"""
+    clock = FakeClock()
+    bus = ProgressBus()
+    published = []
+    bus.publish = published.append
+    tracker = ProgressTracker("job", "model.safetensors", bus=bus, interval=1.0, clock=clock)
+
+    clock.now = 1.0
+    tracker.update(50, 100)
+    tracker.finish("failed", error="boom")
+
+    assert [event.status for event in published] == ["downloading", "failed"]
+    assert published[-1].error == "boom"
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_receives_conflated_events():
+    """遅い購読者にはジョブごとの最新イベントのみが届くテスト"""
+    bus = ProgressBus()
+    subscription = bus.subscribe()
+
+    for downloaded in range(10, 110, 10):
+        bus.publish(make_event("a", downloaded))
+    bus.publish(make_event("b", 5))
+
+    events = await subscription.get()
+
+    assert {(e.job_id, e.downloaded_bytes) for e in events} == {("a", 100), ("b", 5)}
+    assert subscription.conflated == 9
+
+
+@pytest.mark.asyncio
+async def test_subscription_filters_by_job_id():
+    """job_id 指定の購読は他ジョブのイベントを受け取らないテスト"""
+    bus = ProgressBus()
+    subscription = bus.subscribe("a")
+
+    bus.publish(make_event("b", 10))
+    bus.publish(make_event("a", 20))
+
+    events = await asyncio.wait_for(subscription.get(), timeout=1.0)
+    assert [e.job_id for e in events] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_new_subscriber_receives_snapshot_of_running_jobs():
+    """新規購読者は実行中ジョブの最新状態を受け取るテスト"""
+    bus = ProgressBus()
+    bus.publish(make_event("running", 40))
+    bus.publish(make_event("done", 100, status="completed"))
+
+    with bus.subscribe() as subscription:
+        events = await subscription.get()
+        assert bus.subscriber_count == 1
+
+    assert [e.job_id for e in events] == ["running"]
+    assert bus.subscriber_count == 0
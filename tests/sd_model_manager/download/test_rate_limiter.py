@@ -0,0 +1,90 @@
+"""トークンバケットのテスト"""
+
+import pytest
+from sd_model_manager.download.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """テスト用の手動時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_sleep(monkeypatch):
+    """asyncio.sleep を時計の前進に置き換えるフィクスチャ"""
+    clock = FakeClock()
+
+    async def sleep(delay):
+        clock.now += delay
+
+    monkeypatch.setattr("sd_model_manager.download.rate_limiter.asyncio.sleep", sleep)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_acquire_within_capacity_does_not_wait(fake_sleep):
+    """容量内の取得は待機しないテスト"""
+    bucket = TokenBucket(rate=1.0, capacity=5, clock=fake_sleep)
+
+    for _ in range(5):
+        assert await bucket.acquire() == 0.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_paces_at_refill_rate(fake_sleep):
+    """容量を使い切った後は補充レートで待機するテスト"""
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=fake_sleep)
+
+    await bucket.acquire()
+    waited = await bucket.acquire()
+
+    assert waited == pytest.approx(0.5)
+    assert fake_sleep.now == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_acquire_larger_than_capacity(fake_sleep):
+    """容量を超える取得は分割して待機するテスト"""
+    bucket = TokenBucket(rate=10.0, capacity=10, clock=fake_sleep)
+
+    waited = await bucket.acquire(30)
+
+    assert waited == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_pause_blocks_until_deadline(fake_sleep):
+    """pause 中は取得がブロックされ、トークンも破棄されるテスト"""
+    bucket = TokenBucket(rate=1.0, capacity=10, clock=fake_sleep)
+
+    bucket.pause(3.0)
+    await bucket.acquire()
+
+    # 停止期間の分は補充されず、停止明けから補充レートで再開する
+    assert fake_sleep.now == pytest.approx(4.0)
+    await bucket.acquire()
+    assert fake_sleep.now == pytest.approx(5.0)
+
+
+@pytest.mark.asyncio
+async def test_configure_changes_rate(fake_sleep):
+    """実行中にレートを変更できるテスト"""
+    bucket = TokenBucket(rate=1.0, capacity=1, clock=fake_sleep)
+
+    await bucket.acquire()
+    bucket.configure(rate=4.0)
+    waited = await bucket.acquire()
+
+    assert bucket.rate == 4.0
+    assert waited == pytest.approx(0.25)
+
+
+def test_invalid_rate_raises():
+    """不正なレートは ValueError となるテスト"""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
@@ -0,0 +1,83 @@
+"""LRU ディスクキャッシュのテスト"""
+
+import os
+
+from sd_model_manager.lib.disk_cache import DiskCache
+
+
+def test_put_and_get(tmp_path):
+    """保存したエントリをキーで取得できるテスト"""
+    cache = DiskCache(tmp_path, max_bytes=1000)
+
+    path = cache.put("abcdef", b"data")
+
+    assert path.read_bytes() == b"data"
+    assert cache.get("abcdef") == path
+    assert cache.get("missing") is None
+    assert cache.total_bytes == 4
+
+
+def test_put_file_registers_temp_file(tmp_path):
+    """一時ファイルに書き込んだ内容をエントリとして登録でき、一時ファイルは読み込まれないテスト"""
+    cache = DiskCache(tmp_path, max_bytes=1000)
+    part = cache.temp_path("abcdef")
+    part.write_bytes(b"streamed")
+    assert DiskCache(tmp_path, max_bytes=1000).total_bytes == 0
+
+    path = cache.put_file("abcdef", part)
+
+    assert not part.exists()
+    assert cache.get("abcdef") == path
+    assert path.read_bytes() == b"streamed"
+    assert cache.total_bytes == 8
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """上限を超えると最も長く使われていないエントリから削除するテスト"""
+    cache = DiskCache(tmp_path, max_bytes=25)
+    cache.put("aa1", b"x" * 10)
+    cache.put("bb2", b"x" * 10)
+    cache.get("aa1")  # aa1 を最近使ったことにする
+
+    cache.put("cc3", b"x" * 10)
+
+    assert cache.get("bb2") is None
+    assert not cache.path("bb2").exists()
+    assert cache.get("aa1") is not None
+    assert cache.get("cc3") is not None
+    assert cache.total_bytes == 20
+
+
+def test_lru_order_survives_restart(tmp_path):
+    """再起動後もファイルの mtime から LRU の順序を復元するテスト"""
+    cache = DiskCache(tmp_path, max_bytes=25)
+    old = cache.put("aa1", b"x" * 10)
+    cache.put("bb2", b"x" * 10)
+    os.utime(old, ns=(1, 1))
+
+    reopened = DiskCache(tmp_path, max_bytes=25)
+    assert reopened.total_bytes == 20
+    reopened.put("cc3", b"x" * 10)
+
+    assert reopened.get("aa1") is None
+    assert reopened.get("bb2") is not None
+
+
+def test_entry_larger_than_budget_is_kept(tmp_path):
+    """上限より大きいエントリでも直前に保存したものは残すテスト"""
+    cache = DiskCache(tmp_path, max_bytes=5)
+    cache.put("aa1", b"x" * 3)
+
+    cache.put("bb2", b"x" * 10)
+
+    assert cache.get("aa1") is None
+    assert cache.get("bb2") is not None
+
+
+def test_externally_deleted_entry_is_forgotten(tmp_path):
+    """外部から削除されたエントリは見つからない扱いになるテスト"""
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.put("aa1", b"data").unlink()
+
+    assert cache.get("aa1") is None
+    assert cache.total_bytes == 0
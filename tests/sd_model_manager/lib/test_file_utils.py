@@ -0,0 +1,80 @@
+"""ファイル操作ユーティリティのテスト"""
+
+import hashlib
+import os
+
+import pytest
+
+from sd_model_manager.lib import file_utils
+from sd_model_manager.lib.file_utils import copy_file
+
+
+@pytest.fixture
+def source(tmp_path):
+    """複数バッファにまたがるサイズのコピー元"""
+    path = tmp_path / "source.safetensors"
+    path.write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+    return path
+
+
+def test_copy_file_copies_and_hashes(source, tmp_path):
+    """内容が一致し、SHA256 が同時に計算されるテスト"""
+    dst = tmp_path / "copy.safetensors"
+
+    method, sha256 = copy_file(source, dst, buffer_size=1024 * 1024)
+
+    assert method in ("reflink", "copy_file_range", "stream")
+    assert dst.read_bytes() == source.read_bytes()
+    assert sha256 == hashlib.sha256(source.read_bytes()).hexdigest().upper()
+
+
+@pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="copy_file_range unavailable")
+def test_copy_file_uses_copy_file_range_without_reflink(source, tmp_path, monkeypatch):
+    """reflink できない場合は copy_file_range を使うテスト"""
+    monkeypatch.setattr(file_utils, "_clone", lambda src_fd, dst_fd: False)
+    dst = tmp_path / "copy.safetensors"
+
+    method, sha256 = copy_file(source, dst, buffer_size=1024 * 1024)
+
+    assert method == "copy_file_range"
+    assert dst.read_bytes() == source.read_bytes()
+    assert sha256 == hashlib.sha256(source.read_bytes()).hexdigest().upper()
+
+
+def test_copy_file_falls_back_to_streaming(source, tmp_path, monkeypatch):
+    """カーネル内コピーが使えない場合はストリーミングでコピーするテスト"""
+    monkeypatch.setattr(file_utils, "_clone", lambda src_fd, dst_fd: False)
+    monkeypatch.setattr(file_utils, "_kernel_copy", lambda *args: False)
+    dst = tmp_path / "copy.safetensors"
+
+    method, sha256 = copy_file(source, dst, compute_hash=False, buffer_size=1024 * 1024)
+
+    assert method == "stream"
+    assert sha256 is None
+    assert dst.read_bytes() == source.read_bytes()
+
+
+def test_copy_file_does_not_overwrite_existing(source, tmp_path):
+    """コピー先が存在する場合は上書きも削除もしないテスト"""
+    dst = tmp_path / "existing.safetensors"
+    dst.write_bytes(b"keep")
+
+    with pytest.raises(FileExistsError):
+        copy_file(source, dst)
+
+    assert dst.read_bytes() == b"keep"
+
+
+def test_copy_file_removes_partial_copy_on_error(source, tmp_path, monkeypatch):
+    """コピー途中の失敗時にコピー先を削除するテスト"""
+    def failing_copy(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(file_utils, "_clone", lambda src_fd, dst_fd: False)
+    monkeypatch.setattr(file_utils, "_kernel_copy", failing_copy)
+    dst = tmp_path / "copy.safetensors"
+
+    with pytest.raises(OSError, match="disk full"):
+        copy_file(source, dst)
+
+    assert not dst.exists()
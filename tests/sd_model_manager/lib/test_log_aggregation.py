@@ -0,0 +1,61 @@
+"""エラーログ集約のテスト"""
+
+import logging
+
+from sd_model_manager.lib.log_aggregation import ErrorAggregator, error_signature
+
+
+def test_signature_ignores_path_and_numbers(tmp_path):
+    """パスと数値だけが異なるエラーは同じシグネチャになるテスト"""
+    first = tmp_path / "a.safetensors"
+    second = tmp_path / "sub" / "b.safetensors"
+
+    assert error_signature(
+        "process", OSError(f"[Errno 5] I/O error at byte 10: '{first}'"), first
+    ) == error_signature(
+        "process", OSError(f"[Errno 5] I/O error at byte 20: '{second}'"), second
+    )
+    assert error_signature("process", OSError("x"), first) != error_signature(
+        "process", ValueError("x"), first
+    )
+
+
+def test_only_first_occurrences_are_logged(caplog):
+    """シグネチャごとに最初の N 件だけを個別に出力するテスト"""
+    logger = logging.getLogger("test_log_aggregation")
+    errors = ErrorAggregator(logger, max_logged=2, max_samples=3)
+
+    with caplog.at_level(logging.WARNING, logger="test_log_aggregation"):
+        for index in range(10):
+            try:
+                raise OSError(f"cannot read /share/m{index}.safetensors")
+            except OSError as e:
+                errors.record("process", f"/share/m{index}.safetensors", e, "Error %s: %s")
+        errors.record("sidecar", "/share/x.info", ValueError("bad json"), "Bad %s: %s",
+                      level=logging.WARNING, exc_info=False)
+
+    individual = [r for r in caplog.records if r.getMessage().startswith("Error ")]
+    assert len(individual) == 2
+    assert all(r.exc_info for r in individual)
+    assert errors.total == 11
+
+    groups = errors.summary()
+    assert [(g.kind, g.count) for g in groups] == [("process", 10), ("sidecar", 1)]
+    assert groups[0].error_type == "OSError"
+    assert groups[0].message == "cannot read /share/m0.safetensors"
+    assert groups[0].sample_paths == [f"/share/m{index}.safetensors" for index in range(3)]
+
+
+def test_log_summary_emits_one_line_per_signature(caplog):
+    """要約がシグネチャごとに件数とサンプルを 1 行で出力するテスト"""
+    logger = logging.getLogger("test_log_aggregation_summary")
+    errors = ErrorAggregator(logger, max_logged=0)
+    for index in range(3):
+        errors.record("process", f"/m{index}", OSError("denied"), "Error %s: %s")
+
+    with caplog.at_level(logging.WARNING, logger="test_log_aggregation_summary"):
+        errors.log_summary()
+
+    assert [r.getMessage() for r in caplog.records] == [
+        "3 x process OSError: denied (e.g. /m0, /m1, /m2)"
+    ]
@@ -1,9 +1,18 @@
 """ログ設定のテスト"""
 
 import logging
+import logging.handlers
 from pathlib import Path
 import pytest
-from sd_model_manager.lib.logging_config import setup_logging, get_logger
+import json
+import queue
+
+from sd_model_manager.lib.logging_config import (
+    BoundedQueueHandler,
+    flush_logging,
+    get_logger,
+    setup_logging,
+)
 
 
 def test_setup_logging_creates_log_directory(tmp_path):
@@ -50,6 +59,7 @@ def test_setup_logging_with_info_level(tmp_path):
     logger = logging.getLogger("test_info")
     logger.info("Info message")
     logger.debug("Debug message")  # これは出力されないはず
+    flush_logging()
 
     log_file = log_dir / "app.log"
     content = log_file.read_text()
@@ -75,6 +85,7 @@ def test_setup_logging_writes_to_file(tmp_path):
     logger = logging.getLogger("test_file_write")
     test_message = "This is a test log message"
     logger.info(test_message)
+    flush_logging()
 
     log_file = log_dir / "app.log"
     content = log_file.read_text()
@@ -82,3 +93,71 @@ def test_setup_logging_writes_to_file(tmp_path):
     assert test_message in content
     assert "test_file_write" in content
     assert "INFO" in content
+
+
+def test_setup_logging_writes_slow_requests_to_dedicated_file(tmp_path):
+    """低速リクエストログが専用ファイルと app.log の両方に書き込まれることを確認"""
+    log_dir = tmp_path / "logs"
+
+    setup_logging(log_dir=log_dir)
+
+    logging.getLogger("sd_model_manager.slow_requests").warning("Slow request: GET /api/models")
+    logging.getLogger("test_other").warning("unrelated warning")
+    flush_logging()
+
+    slow_log = (log_dir / "slow_requests.log").read_text()
+    assert "Slow request: GET /api/models" in slow_log
+    assert "unrelated warning" not in slow_log
+    assert "Slow request: GET /api/models" in (log_dir / "app.log").read_text()
+
+
+def test_setup_logging_routes_records_through_queue(tmp_path):
+    """ロガーにはキューへ渡すハンドラーだけが付き、書き込みは別スレッドで行われることを確認"""
+    setup_logging(log_dir=tmp_path / "logs")
+
+    handlers = logging.getLogger().handlers
+    assert len(handlers) == 1
+    assert isinstance(handlers[0], logging.handlers.QueueHandler)
+
+
+def test_setup_logging_json_format_includes_extra_fields(tmp_path):
+    """JSON 形式では 1 行 1 レコードで extra= のフィールドも出力されることを確認"""
+    log_dir = tmp_path / "logs"
+    setup_logging(log_dir=log_dir, log_format="json")
+
+    logging.getLogger("test_json").info(
+        "Downloaded %s", "a.safetensors",
+        extra={"model_id": 42, "path": Path("/models/a.safetensors"), "duration": 1.5}
+    )
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("test_json").exception("Failed")
+    flush_logging()
+
+    lines = (log_dir / "app.log").read_text(encoding="utf-8").splitlines()
+    entries = [json.loads(line) for line in lines]
+    downloaded = next(e for e in entries if e["message"] == "Downloaded a.safetensors")
+    assert downloaded["logger"] == "test_json"
+    assert downloaded["level"] == "INFO"
+    assert downloaded["model_id"] == 42
+    assert downloaded["path"] == "/models/a.safetensors"
+    assert downloaded["duration"] == 1.5
+    failed = next(e for e in entries if e["message"] == "Failed")
+    assert "ValueError: boom" in failed["exc_info"]
+
+
+@pytest.mark.parametrize("overflow, kept", [("drop_new", "first"), ("drop_oldest", "second")])
+def test_queue_handler_overflow_policy(overflow, kept):
+    """キューが満杯のときに指定した方針でレコードを捨てることを確認"""
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, overflow=overflow)
+    logger = logging.getLogger(f"test_overflow_{overflow}")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    logger.warning("first")
+    logger.warning("second")
+
+    assert handler.dropped == 1
+    assert log_queue.get_nowait().getMessage() == kept
@@ -0,0 +1,68 @@
+"""イベントループの遅延監視・ブロッキング検出のテスト"""
+
+import asyncio
+import logging
+import time
+
+from sd_model_manager.lib import metrics
+from sd_model_manager.lib.loop_monitor import BlockingCallDetector, LoopLagMonitor
+
+
+def block_loop(seconds: float) -> None:
+    """ループのスレッドで同期的に待つ（ブロッキング呼び出しの再現）"""
+    time.sleep(seconds)
+
+
+async def blocking_coroutine(seconds: float) -> None:
+    await asyncio.sleep(0)
+    block_loop(seconds)
+    await asyncio.sleep(0)
+
+
+async def test_monitor_records_lag_and_logs_stall_stack(caplog):
+    """閾値を超えた停止を記録し、ブロックしている箇所のスタックをログに残すテスト"""
+    lag_count = metrics.REGISTRY.get("sdmm_event_loop_lag_seconds")._default.count
+    monitor = LoopLagMonitor(interval=0.01, stall_threshold=0.05)
+
+    with caplog.at_level(logging.WARNING, logger="sd_model_manager.lib.loop_monitor"):
+        monitor.start()
+        await asyncio.sleep(0.03)
+        await blocking_coroutine(0.2)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    assert monitor.stalls == 1
+    assert monitor.max_lag >= 0.1
+    assert metrics.REGISTRY.get("sdmm_event_loop_lag_seconds")._default.count > lag_count
+    stall_logs = [r.getMessage() for r in caplog.records if "Event loop blocked" in r.getMessage()]
+    assert len(stall_logs) == 1
+    assert "block_loop" in stall_logs[0]
+
+
+async def test_monitor_without_blocking_reports_no_stalls(caplog):
+    """ブロックがなければ停止を記録しないテスト"""
+    monitor = LoopLagMonitor(interval=0.01, stall_threshold=0.2)
+
+    with caplog.at_level(logging.WARNING, logger="sd_model_manager.lib.loop_monitor"):
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    assert monitor.stalls == 0
+    assert not [r for r in caplog.records if "Event loop blocked" in r.getMessage()]
+
+
+def test_detector_reports_blocking_callback_with_stack():
+    """閾値を超えたコールバックをコルーチン名・スタック付きで記録するテスト"""
+    original_run = asyncio.Handle._run
+
+    with BlockingCallDetector(threshold=0.05) as detector:
+        asyncio.run(blocking_coroutine(0.15))
+        asyncio.run(blocking_coroutine(0.0))
+
+    assert asyncio.Handle._run is original_run
+    assert len(detector.blocking_calls) == 1
+    call = detector.blocking_calls[0]
+    assert call.duration >= 0.15
+    assert "blocking_coroutine" in call.description
+    assert "block_loop" in call.stack
@@ -0,0 +1,65 @@
+"""メトリクス計測のテスト"""
+
+import pytest
+
+from sd_model_manager.lib.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_and_gauge_render_in_text_format(registry):
+    """カウンターとゲージが Prometheus テキスト形式で出力されるテスト"""
+    requests = registry.counter("test_requests_total", "Requests", ("status",))
+    active = registry.gauge("test_active", "Active jobs")
+
+    requests.labels("200").inc()
+    requests.labels(status="200").inc(2)
+    requests.labels("404").inc()
+    active.inc(3)
+    active.dec()
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_requests_total counter" in lines
+    assert 'test_requests_total{status="200"} 3' in lines
+    assert 'test_requests_total{status="404"} 1' in lines
+    assert "test_active 2" in lines
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    """ヒストグラムのバケットが累積値（上限を含む）で出力されるテスト"""
+    latency = registry.histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{le="1"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_sum 3.65" in lines
+    assert "test_seconds_count 4" in lines
+
+
+def test_label_values_are_escaped(registry):
+    """ラベル値の引用符と改行がエスケープされるテスト"""
+    registry.counter("test_total", "Test", ("path",)).labels('a"b\nc').inc()
+
+    assert 'test_total{path="a\\"b\\nc"} 1' in registry.render()
+
+
+def test_wrong_label_count_is_rejected(registry):
+    """ラベル数が合わない場合はエラーとなるテスト"""
+    metric = registry.counter("test_total", "Test", ("a", "b"))
+
+    with pytest.raises(ValueError):
+        metric.labels("only-one")
+
+
+def test_registering_same_name_returns_existing_metric(registry):
+    """同名のメトリクスを再登録すると既存のものが返るテスト"""
+    first = registry.counter("test_total", "Test")
+
+    assert registry.counter("test_total", "Test") is first
@@ -0,0 +1,69 @@
+"""プロファイリングのテスト"""
+
+import json
+import pstats
+import time
+
+import pytest
+
+from sd_model_manager.lib.profiling import Profiler, ProfilingBusyError
+
+
+def busy_work(seconds: float) -> None:
+    """指定時間 CPU を使う"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_cprofile_writes_pstats(tmp_path):
+    """cprofile モードがブロック内の呼び出しを pstats に書き出すテスト"""
+    profiler = Profiler(tmp_path / "profiles")
+
+    with profiler.profile("unit test", "cprofile") as result:
+        busy_work(0.01)
+
+    assert result.path.parent == tmp_path / "profiles"
+    assert result.path.name.endswith("-unit-test.pstats")
+    assert result.duration > 0
+    functions = {name for _, _, name in pstats.Stats(str(result.path)).stats}
+    assert "busy_work" in functions
+
+
+def test_sampling_writes_speedscope(tmp_path):
+    """sampling モードが speedscope 形式のサンプルを書き出すテスト"""
+    profiler = Profiler(tmp_path, sample_interval=0.001)
+
+    with profiler.profile("window", "sampling") as result:
+        busy_work(0.1)
+
+    data = json.loads(result.path.read_text())
+    assert result.path.name.endswith(".speedscope.json")
+    assert data["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert result.samples > 0
+    frames = data["shared"]["frames"]
+    sampled = [
+        frames[index]["name"]
+        for profile in data["profiles"]
+        for stack in profile["samples"]
+        for index in stack
+    ]
+    assert "busy_work" in sampled
+    for profile in data["profiles"]:
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+
+
+def test_concurrent_profiles_are_rejected(tmp_path):
+    """計測中に別の計測を開始すると ProfilingBusyError となるテスト"""
+    profiler = Profiler(tmp_path)
+
+    with profiler.profile("outer"):
+        assert profiler.active
+        with pytest.raises(ProfilingBusyError):
+            with profiler.profile("inner"):
+                pass
+
+    assert not profiler.active
+    with profiler.profile("after"):
+        pass
@@ -0,0 +1,176 @@
+"""Tests for hash-based Civitai enrichment against a local stand-in server"""
+
+import hashlib
+import json
+
+import pytest
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.registry.enrichment import CivitaiEnricher
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.scanner import ModelScanner
+
+
+def sha256_upper(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest().upper()
+
+
+class TestCivitaiEnricher:
+    """Test suite for CivitaiEnricher"""
+
+    @pytest.fixture
+    def model_dir(self, tmp_path):
+        """Create a library with two known and one unknown model"""
+        lora_dir = tmp_path / "models" / "active" / "loras"
+        lora_dir.mkdir(parents=True)
+        (lora_dir / "known_a.safetensors").write_bytes(b"known model a")
+        (lora_dir / "known_b.safetensors").write_bytes(b"known model b")
+        (lora_dir / "unknown.safetensors").write_bytes(b"unknown model")
+        return tmp_path / "models"
+
+    @pytest.fixture
+    def civitai(self, fake_civitai):
+        """Stand-in server that knows two of the models"""
+        for model_id, content in [(1, b"known model a"), (2, b"known model b")]:
+            fake_civitai.add_version({
+                "id": 100 + model_id,
+                "modelId": model_id,
+                "name": f"v{model_id}",
+                "files": [{"name": "model.safetensors", "hashes": {"SHA256": sha256_upper(content)}}],
+                "images": [{"url": f"https://example.com/{model_id}.jpg"}],
+            })
+        return fake_civitai
+
+    @pytest.fixture
+    async def scanned(self, model_dir):
+        """Scanner output and a populated registry"""
+        config = Config()
+        config.model_scan_dir = model_dir
+        models = await ModelScanner(config).scan()
+        registry = ModelRegistry()
+        registry.replace_all(models)
+        return models, registry
+
+    @pytest.mark.asyncio
+    async def test_enrich_writes_sidecars_and_updates_registry(self, civitai, scanned, model_dir):
+        """Test matched models get a sidecar and an enriched registry entry"""
+        models, registry = scanned
+        client = CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+        enricher = CivitaiEnricher(client, registry=registry, concurrency=2, batch_size=2)
+
+        result = await enricher.enrich(models)
+        await client.close()
+
+        assert result.candidates == 3
+        assert result.hashed == 3
+        assert result.matched == 2
+        assert result.not_found == 1
+
+        sidecar = model_dir / "active" / "loras" / "known_a.safetensors.civitai.info"
+        assert json.loads(sidecar.read_text())["modelId"] == 1
+        assert not (model_dir / "active" / "loras" / "unknown.safetensors.civitai.info").exists()
+
+        enriched = registry.get_by_path(str(model_dir / "active" / "loras" / "known_b.safetensors"))
+        assert enriched.civitai_metadata["modelId"] == 2
+        assert enriched.preview_image_url == "https://example.com/2.jpg"
+
+        # Two batches of at most two hashes each
+        lookups = [r for r in civitai.requests if r == ("POST", "/api/v1/model-versions/by-hash")]
+        assert len(lookups) == 2
+
+    @pytest.mark.asyncio
+    async def test_identical_copies_in_one_batch_are_all_matched(self, civitai, model_dir):
+        """Test files sharing a hash are each matched instead of overwriting each other"""
+        copy = model_dir / "active" / "loras" / "known_a_copy.safetensors"
+        copy.write_bytes(b"known model a")
+        config = Config()
+        config.model_scan_dir = model_dir
+        models = await ModelScanner(config).scan()
+        client = CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+
+        result = await CivitaiEnricher(client, batch_size=10).enrich(models)
+        await client.close()
+
+        assert result.candidates == 4
+        assert result.matched == 3
+        assert result.not_found == 1
+        assert json.loads(copy.with_name(copy.name + ".civitai.info").read_text())["modelId"] == 1
+
+    @pytest.mark.asyncio
+    async def test_enriched_models_are_picked_up_by_next_scan(self, civitai, scanned, model_dir):
+        """Test written sidecars are parsed by the scanner"""
+        models, _ = scanned
+        client = CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+        await CivitaiEnricher(client).enrich(models)
+        await client.close()
+
+        config = Config()
+        config.model_scan_dir = model_dir
+        rescanned = await ModelScanner(config).scan()
+
+        with_metadata = [m for m in rescanned if m.civitai_metadata is not None]
+        assert len(with_metadata) == 2
+
+    @pytest.mark.asyncio
+    async def test_enrich_resumes_from_state_file(self, civitai, scanned, tmp_path):
+        """Test a second run skips known misses without hashing or querying"""
+        models, _ = scanned
+        state_path = tmp_path / "state" / "enrichment.json"
+        client = CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+
+        await CivitaiEnricher(client, state_path=state_path).enrich(models)
+        civitai.requests.clear()
+
+        result = await CivitaiEnricher(client, state_path=state_path).enrich(models)
+        await client.close()
+
+        # Matched models now have sidecars; the unknown one is a cached miss
+        assert result.candidates == 1
+        assert result.hashed == 0
+        assert result.skipped == 1
+        assert civitai.requests == []
+
+    @pytest.mark.asyncio
+    async def test_enrich_reuses_hash_index_cache(self, civitai, scanned, tmp_path):
+        """Test files hashed by the hash index are not hashed again, and new hashes are saved"""
+        models, _ = scanned
+        cache_path = tmp_path / "data" / "hash_cache.json"
+        hash_index = HashIndex(cache_path=cache_path)
+        await hash_index.hash_missing(models[:1])
+        client = CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+
+        result = await CivitaiEnricher(client, hash_index=hash_index).enrich(models)
+        await client.close()
+
+        assert result.hashed == 2
+        assert result.matched == 2
+        assert set(json.loads(cache_path.read_text())) == {m.file_path for m in models}
+
+    @pytest.mark.asyncio
+    async def test_enrich_skips_models_with_sidecars(self, civitai, scanned, model_dir):
+        """Test models that already have a sidecar are not candidates"""
+        models, _ = scanned
+        sidecar = model_dir / "active" / "loras" / "unknown.safetensors.civitai.info"
+        sidecar.write_text("{ invalid json }")
+        client = CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+
+        result = await CivitaiEnricher(client).enrich(models)
+        await client.close()
+
+        assert result.candidates == 2
+        assert sidecar.read_text() == "{ invalid json }"
+
+    @pytest.mark.asyncio
+    async def test_enrich_counts_lookup_failures(self, scanned):
+        """Test lookup errors are counted without aborting the run"""
+        models, _ = scanned
+        # Nothing listens on port 9; every lookup fails with a network error
+        client = CivitaiClient(base_url="http://127.0.0.1:9/api/v1", requests_per_minute=6000)
+
+        result = await CivitaiEnricher(client, batch_size=10).enrich(models)
+        await client.close()
+
+        assert result.failed == 3
+        assert result.matched == 0
@@ -0,0 +1,89 @@
+"""Tests for the library hash index"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from sd_model_manager.registry.hash_index import HashIndex
+from sd_model_manager.registry.models import ModelInfo
+
+
+def make_model(path: Path, civitai_metadata: dict | None = None) -> ModelInfo:
+    return ModelInfo.from_file_path(
+        file_path=str(path),
+        model_type="LoRA",
+        category="Active",
+        file_size=path.stat().st_size,
+        modified_time=datetime.now(),
+        civitai_metadata=civitai_metadata,
+    )
+
+
+def sha256_upper(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest().upper()
+
+
+class TestHashIndex:
+    """Test suite for HashIndex"""
+
+    @pytest.fixture
+    def model_file(self, tmp_path):
+        path = tmp_path / "a.safetensors"
+        path.write_bytes(b"model a")
+        return path
+
+    def test_lookup_by_sha256_and_autov2(self, model_file):
+        """Test lookups accept full SHA256 and AutoV2 in any case"""
+        index = HashIndex()
+        sha256 = sha256_upper(b"model a")
+        index.add(sha256.lower(), model_file, model_file.stat().st_size)
+
+        assert index.lookup(sha256) == model_file
+        assert index.lookup(sha256[:10].lower()) == model_file
+        assert index.lookup("0" * 64) is None
+
+    def test_lookup_drops_stale_entries(self, model_file):
+        """Test entries whose file changed size or vanished are ignored"""
+        index = HashIndex()
+        sha256 = sha256_upper(b"model a")
+        index.add(sha256, model_file, model_file.stat().st_size)
+
+        model_file.write_bytes(b"changed contents")
+
+        assert index.lookup(sha256) is None
+        assert len(index) == 0
+
+    def test_rebuild_uses_sidecar_hashes(self, model_file, tmp_path):
+        """Test sidecar hashes are indexed without hashing the file"""
+        other = tmp_path / "b.safetensors"
+        other.write_bytes(b"model b")
+        metadata = {"files": [
+            {"name": "a.safetensors", "hashes": {"SHA256": "AB" * 32}},
+            {"name": "a-pruned.safetensors", "hashes": {"SHA256": "CD" * 32}},
+        ]}
+
+        index = HashIndex()
+        unknown = index.rebuild([make_model(model_file, metadata), make_model(other)])
+
+        assert index.lookup("AB" * 32) == model_file
+        assert index.lookup("CD" * 32) is None
+        assert [m.filename for m in unknown] == ["b.safetensors"]
+
+    @pytest.mark.asyncio
+    async def test_hash_missing_persists_cache(self, model_file, tmp_path):
+        """Test computed hashes are cached and reused by a new index"""
+        cache_path = tmp_path / "data" / "hash_cache.json"
+        models = [make_model(model_file)]
+
+        index = HashIndex(cache_path=cache_path)
+        unknown = index.rebuild(models)
+        assert await index.hash_missing(unknown) == 1
+        assert index.lookup(sha256_upper(b"model a")) == model_file
+
+        reloaded = HashIndex(cache_path=cache_path)
+        assert reloaded.rebuild(models) == []
+        assert json.loads(cache_path.read_text())[str(model_file)]["sha256"] == \
+            sha256_upper(b"model a")
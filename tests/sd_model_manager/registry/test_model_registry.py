@@ -0,0 +1,71 @@
+"""Tests for the in-memory model registry"""
+
+from datetime import datetime
+
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+
+
+def make_model(file_path: str) -> ModelInfo:
+    return ModelInfo.from_file_path(
+        file_path=file_path,
+        model_type="LoRA",
+        category="Active",
+        file_size=1,
+        modified_time=datetime(2024, 1, 1),
+    )
+
+
+def test_replace_all_and_list():
+    """Test a scan result replaces the registry contents"""
+    registry = ModelRegistry()
+    registry.replace_all([make_model("/m/a.safetensors"), make_model("/m/b.safetensors")])
+
+    assert len(registry) == 2
+    assert [m.filename for m in registry.list()] == ["a.safetensors", "b.safetensors"]
+
+
+def test_upsert_replaces_entry_with_same_path():
+    """Test upsert updates an existing entry in place and bumps the version"""
+    registry = ModelRegistry()
+    registry.replace_all([make_model("/m/a.safetensors")])
+    version = registry.version
+
+    updated = make_model("/m/a.safetensors").model_copy(update={"civitai_metadata": {"id": 1}})
+    registry.upsert(updated)
+
+    assert len(registry) == 1
+    assert registry.get_by_path("/m/a.safetensors").civitai_metadata == {"id": 1}
+    assert registry.version > version
+
+
+def test_get_by_id_and_remove():
+    """Test lookup by ID and removal"""
+    registry = ModelRegistry()
+    model = make_model("/m/a.safetensors")
+    registry.upsert(model)
+
+    assert registry.get(model.id) == model
+    assert registry.remove("/m/a.safetensors") == model
+    assert registry.get(model.id) is None
+    assert registry.remove("/m/a.safetensors") is None
+
+
+def test_ids_are_derived_from_path():
+    """Test the same path always yields the same ID and different paths differ"""
+    assert make_model("/m/a.safetensors").id == make_model("/m/a.safetensors").id
+    assert make_model("/m/a.safetensors").id != make_model("/m/b.safetensors").id
+
+
+def test_id_index_follows_upsert_with_new_id():
+    """Test the ID index drops the old ID when an entry is replaced under a new one"""
+    registry = ModelRegistry()
+    original = make_model("/m/a.safetensors")
+    registry.replace_all([original, make_model("/m/b.safetensors")])
+
+    renamed = original.model_copy(update={"id": "content-id"})
+    registry.upsert(renamed)
+
+    assert registry.get(original.id) is None
+    assert registry.get("content-id") == renamed
+    assert registry.get(make_model("/m/b.safetensors").id).filename == "b.safetensors"
@@ -0,0 +1,188 @@
+"""Tests for the preview image mirror against a local stand-in image server"""
+
+from datetime import datetime
+
+import pytest
+
+from sd_model_manager.lib.disk_cache import DiskCache
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.preview_mirror import PreviewMirror, media_type, preview_key
+
+
+def model_with_preview(name: str, url: str | None) -> ModelInfo:
+    return ModelInfo.from_file_path(
+        file_path=f"/models/active/loras/{name}.safetensors",
+        model_type="LoRA",
+        category="Active",
+        file_size=1,
+        modified_time=datetime(2024, 1, 1),
+        civitai_metadata={"images": [{"url": url}]} if url else None,
+        preview_image_url=url
+    )
+
+
+class TestPreviewMirror:
+    """Test suite for PreviewMirror"""
+
+    @pytest.fixture
+    def images(self, fake_civitai):
+        """Stand-in server with five preview images"""
+        urls = []
+        for i in range(5):
+            fake_civitai.files[f"images/{i}.jpeg"] = b"\xff\xd8 image %d" % i
+            urls.append(f"{fake_civitai.base_url}/files/images/{i}.jpeg")
+        return urls
+
+    @pytest.fixture
+    def mirror(self, tmp_path):
+        return PreviewMirror(
+            DiskCache(tmp_path / "previews", max_bytes=1024 * 1024),
+            concurrency=2, max_retries=2, backoff=0.01
+        )
+
+    def test_preview_key_keeps_extension(self):
+        """Test keys hash the URL and keep a known image extension"""
+        key = preview_key("https://image.civitai.com/abc/width=450/1234.jpeg")
+
+        assert key.endswith(".jpeg")
+        assert media_type(key) == "image/jpeg"
+        assert preview_key("https://example.com/image?id=1") == preview_key(
+            "https://example.com/image?id=1")
+        assert media_type(preview_key("https://example.com/image")) == "application/octet-stream"
+
+    @pytest.mark.asyncio
+    async def test_mirror_fetches_once_with_bounded_concurrency(self, fake_civitai, images, mirror):
+        """Test each image is fetched once and no more than N requests run at a time"""
+        fake_civitai.latency = 0.05
+
+        result = await mirror.mirror(images + images[:2])
+
+        assert (result.requested, result.fetched, result.failed) == (5, 5, 0)
+        assert fake_civitai.max_in_flight <= 2
+        assert mirror.cache.path(preview_key(images[0])).read_bytes() == b"\xff\xd8 image 0"
+
+        again = await mirror.mirror(images)
+        assert (again.cached, again.fetched) == (5, 0)
+        assert len(fake_civitai.requests) == 5
+
+    @pytest.mark.asyncio
+    async def test_mirror_retries_rate_limits(self, fake_civitai, images, mirror):
+        """Test 429 responses are retried with backoff"""
+        fake_civitai.rate_limit_count = 2
+        fake_civitai.retry_after = 0
+
+        result = await mirror.mirror(images[:1])
+
+        assert result.fetched == 1
+        assert fake_civitai.rate_limited == 2
+
+    @pytest.mark.asyncio
+    async def test_mirror_retries_dropped_connections(self, fake_civitai, mirror):
+        """Test transport errors are retried"""
+        fake_civitai.files["images/large.png"] = b"x" * 200_000
+        fake_civitai.drop_after = 1000
+        fake_civitai.drop_count = 1
+
+        result = await mirror.mirror([f"{fake_civitai.base_url}/files/images/large.png"])
+
+        assert result.fetched == 1
+        assert fake_civitai.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_image_is_not_retried(self, fake_civitai, mirror):
+        """Test a 404 fails immediately"""
+        result = await mirror.mirror([f"{fake_civitai.base_url}/files/images/missing.png"])
+
+        assert result.failed == 1
+        assert len(fake_civitai.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_non_media_response_is_rejected(self, fake_civitai, mirror):
+        """Test responses that are not images or videos are not cached or retried"""
+        fake_civitai.files["images/login.html"] = b"<html>sign in</html>"
+        url = f"{fake_civitai.base_url}/files/images/login.html"
+
+        result = await mirror.mirror([url])
+
+        assert result.failed == 1
+        assert len(fake_civitai.requests) == 1
+        assert mirror.cache.get(preview_key(url)) is None
+
+    @pytest.mark.asyncio
+    async def test_oversized_image_is_rejected(self, fake_civitai, tmp_path):
+        """Test images over max_file_bytes are dropped without leaving partial files"""
+        fake_civitai.files["images/huge.png"] = b"x" * 5000
+        mirror = PreviewMirror(
+            DiskCache(tmp_path / "previews", max_bytes=1024 * 1024), max_file_bytes=1000
+        )
+
+        result = await mirror.mirror([f"{fake_civitai.base_url}/files/images/huge.png"])
+
+        assert result.failed == 1
+        assert len(fake_civitai.requests) == 1
+        assert [p for p in (tmp_path / "previews").rglob("*") if p.is_file()] == []
+
+    @pytest.mark.asyncio
+    async def test_body_over_limit_is_rejected_while_streaming(self, fake_civitai, tmp_path):
+        """Test the size limit holds even when Content-Length is not trusted"""
+        fake_civitai.files["images/huge.png"] = b"x" * 5000
+        mirror = PreviewMirror(
+            DiskCache(tmp_path / "previews", max_bytes=1024 * 1024), max_file_bytes=1000
+        )
+        url = f"{fake_civitai.base_url}/files/images/huge.png"
+        real_store = mirror._store
+
+        async def store_without_length(response, url):
+            del response.headers["content-length"]
+            return await real_store(response, url)
+
+        mirror._store = store_without_length
+
+        result = await mirror.mirror([url])
+
+        assert result.failed == 1
+        assert [p for p in (tmp_path / "previews").rglob("*") if p.is_file()] == []
+
+    @pytest.mark.asyncio
+    async def test_sync_rewrites_registry_entries(self, images, mirror):
+        """Test mirrored previews point at the local endpoint"""
+        registry = ModelRegistry()
+        registry.replace_all([
+            model_with_preview("a", images[0]),
+            model_with_preview("b", images[1]),
+            model_with_preview("local", None),
+        ])
+
+        result = await mirror.sync(registry)
+
+        assert result.rewritten == 2
+        urls = [model.preview_image_url for model in registry.list()]
+        assert urls == [f"/api/previews/{preview_key(images[0])}",
+                        f"/api/previews/{preview_key(images[1])}", None]
+        # The source is found from the metadata, also by another mirror instance
+        fresh = PreviewMirror(mirror.cache)
+        assert fresh.source_url(preview_key(images[1]), registry.list()) == images[1]
+        assert fresh.source_url(preview_key(images[2]), registry.list()) is None
+
+    @pytest.mark.asyncio
+    async def test_rewrite_only_cached_previews(self, images, mirror):
+        """Test rewrite leaves previews that are not mirrored yet"""
+        await mirror.mirror(images[:1])
+
+        models = mirror.rewrite([model_with_preview("a", images[0]),
+                                 model_with_preview("b", images[1])])
+
+        assert models[0].preview_image_url.startswith("/api/previews/")
+        assert models[1].preview_image_url == images[1]
+
+    @pytest.mark.asyncio
+    async def test_eviction_budget_is_respected(self, fake_civitai, tmp_path):
+        """Test the cache stays within its byte budget"""
+        for i in range(4):
+            fake_civitai.files[f"images/big{i}.png"] = b"x" * 1000
+        mirror = PreviewMirror(DiskCache(tmp_path / "previews", max_bytes=2500))
+
+        await mirror.mirror(f"{fake_civitai.base_url}/files/images/big{i}.png" for i in range(4))
+
+        assert mirror.cache.total_bytes <= 2500
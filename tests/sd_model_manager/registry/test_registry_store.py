@@ -0,0 +1,157 @@
+"""Tests for the registry store shared between worker processes"""
+
+from datetime import datetime
+
+import pytest
+
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.registry_store import RegistryStore
+
+
+def make_model(file_path: str) -> ModelInfo:
+    return ModelInfo.from_file_path(
+        file_path=file_path,
+        model_type="LoRA",
+        category="Active",
+        file_size=1,
+        modified_time=datetime(2024, 1, 1),
+    )
+
+
+def test_scan_in_one_worker_is_visible_in_another(tmp_path):
+    """Test registries on separate connections converge through the store"""
+    first = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    second = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    model = make_model("/m/a.safetensors")
+
+    first.replace_all([model, make_model("/m/b.safetensors")])
+
+    assert len(second) == 2
+    assert second.scanned_at == first.scanned_at
+    assert second.get(model.id) == model
+
+
+def test_incremental_changes_are_shared(tmp_path):
+    """Test upserts and removals propagate and bump the reader's version"""
+    first = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    second = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    first.replace_all([make_model("/m/a.safetensors")])
+    second.list()
+    version = second.version
+
+    first.upsert(make_model("/m/c.safetensors"))
+    first.remove("/m/a.safetensors")
+
+    assert [m.file_path for m in second.list()] == ["/m/c.safetensors"]
+    assert second.version > version
+
+
+def test_unchanged_store_is_not_reloaded(tmp_path):
+    """Test reads do not reload when no other process wrote"""
+    registry = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    registry.replace_all([make_model("/m/a.safetensors")])
+    registry.list()
+    version = registry.version
+
+    registry.list()
+    registry.get_by_path("/m/a.safetensors")
+
+    assert registry.version == version
+
+
+def test_changes_are_read_as_row_deltas(tmp_path):
+    """Test a reader gets only the rows changed since its last position"""
+    writer = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    reader_store = RegistryStore(tmp_path / "state.db")
+    writer.replace_all([make_model(f"/m/{i}.safetensors") for i in range(5)])
+    initial = reader_store.changes(0, 0)
+    assert initial.full and len(initial.models) == 5
+
+    writer.upsert(make_model("/m/new.safetensors"))
+    writer.remove("/m/0.safetensors")
+    delta = reader_store.changes(initial.generation, initial.seq)
+
+    assert not delta.full
+    assert [m.file_path for m in delta.models] == ["/m/new.safetensors"]
+    assert delta.removed == ["/m/0.safetensors"]
+    assert reader_store.changes(delta.generation, delta.seq) is None
+
+
+def test_write_between_reads_is_not_skipped(tmp_path, monkeypatch):
+    """Test a commit landing while changes() is reading is returned by the next call"""
+    writer = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    reader_store = RegistryStore(tmp_path / "state.db")
+    writer.replace_all([make_model("/m/a.safetensors")])
+    initial = reader_store.changes(0, 0)
+    writer.upsert(make_model("/m/b.safetensors"))
+
+    meta = RegistryStore._meta
+    interleaved = []
+
+    def meta_with_write(conn, key):
+        # Commit another change right before the reader queries the sequence
+        if conn is reader_store._conn and key == "seq" and not interleaved:
+            interleaved.append(key)
+            writer.upsert(make_model("/m/c.safetensors"))
+        return meta(conn, key)
+
+    monkeypatch.setattr(RegistryStore, "_meta", staticmethod(meta_with_write))
+    delta = reader_store.changes(initial.generation, initial.seq)
+    monkeypatch.setattr(RegistryStore, "_meta", staticmethod(meta))
+
+    assert interleaved
+    assert [m.file_path for m in delta.models] == ["/m/b.safetensors"]
+    following = reader_store.changes(delta.generation, delta.seq)
+    assert [m.file_path for m in following.models] == ["/m/c.safetensors"]
+
+
+def test_store_is_checked_at_most_once_per_interval(tmp_path, monkeypatch):
+    """Test reads within the sync interval do not query the store"""
+    clock = [100.0]
+    monkeypatch.setattr(
+        "sd_model_manager.registry.model_registry.time.monotonic", lambda: clock[0]
+    )
+    writer = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    reader = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=1.0)
+    writer.replace_all([make_model("/m/a.safetensors")])
+    assert len(reader) == 1
+
+    writer.upsert(make_model("/m/b.safetensors"))
+    clock[0] += 0.5
+    assert len(reader) == 1
+
+    clock[0] += 0.6
+    assert len(reader) == 2
+
+
+def test_own_writes_are_not_read_back(tmp_path):
+    """Test a registry's own writes do not make it reload its contents"""
+    registry = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    registry.replace_all([make_model("/m/a.safetensors")])
+    registry.upsert(make_model("/m/b.safetensors"))
+    version = registry.version
+
+    registry.list()
+
+    assert registry.version == version
+    assert registry._seq == RegistryStore(tmp_path / "state.db").changes(0, 0).seq
+
+
+@pytest.mark.parametrize("running", [False, True])
+def test_clear_drops_previous_run(tmp_path, running):
+    """Test clearing the store forgets entries and the scan time of a previous run"""
+    previous = ModelRegistry(store=RegistryStore(tmp_path / "state.db"), sync_interval=0)
+    previous.replace_all([make_model("/m/a.safetensors")])
+    if running:
+        assert len(previous) == 1
+
+    store = RegistryStore(tmp_path / "state.db")
+    store.clear()
+    store.close()
+    registry = previous if running else ModelRegistry(
+        store=RegistryStore(tmp_path / "state.db"), sync_interval=0
+    )
+
+    assert len(registry) == 0
+    assert registry.scanned_at is None
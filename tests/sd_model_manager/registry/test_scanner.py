@@ -440,3 +440,98 @@ class TestModelScanner:
         # Should find the model in the real directory
         assert len(models) == 1
         assert "test_model" in models[0].filename
+
+
+@pytest.mark.asyncio
+async def test_scan_aggregates_repeated_sidecar_errors(tmp_path, caplog):
+    """Repeated sidecar errors are logged a few times and summarized in the result"""
+    import logging
+
+    lora_dir = tmp_path / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    for index in range(20):
+        (lora_dir / f"m{index}.safetensors").write_text("model")
+        (lora_dir / f"m{index}.safetensors.civitai.info").write_text("{broken")
+    config = Config(model_scan_dir=tmp_path, scan_error_log_limit=3, scan_error_samples=2)
+    scanner = ModelScanner(config)
+
+    with caplog.at_level(logging.WARNING, logger="sd_model_manager.registry.scanner"):
+        models = await scanner.scan()
+
+    assert len(models) == 20
+    individual = [r for r in caplog.records if "Failed to parse" in r.getMessage()]
+    assert len(individual) == 3
+    assert len(scanner.last_errors) == 1
+    group = scanner.last_errors[0]
+    assert group.kind == "civitai_metadata"
+    assert group.error_type == "JSONDecodeError"
+    assert group.count == 20
+    assert len(group.sample_paths) == 2
+    assert any(r.getMessage().startswith("20 x civitai_metadata") for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_inode_ids_survive_rename_and_stay_unique_for_hardlinks(tmp_path):
+    """Inode-derived IDs survive renames; hardlinked copies still get distinct IDs"""
+    lora_dir = tmp_path / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    original = lora_dir / "a.safetensors"
+    original.write_text("model")
+    scanner = ModelScanner(Config(model_scan_dir=tmp_path, model_id_source="inode"))
+
+    [before] = await scanner.scan()
+    original.rename(lora_dir / "renamed.safetensors")
+    [after] = await scanner.scan()
+    (lora_dir / "linked.safetensors").hardlink_to(lora_dir / "renamed.safetensors")
+    linked = await scanner.scan()
+
+    assert after.id == before.id
+    assert len({model.id for model in linked}) == 2
+    assert before.id in {model.id for model in linked}
+
+
+@pytest.mark.asyncio
+async def test_upserted_hardlink_does_not_take_over_inode_id(tmp_path):
+    """A hardlink registered via scan_file + upsert gets its path ID, like in a full scan"""
+    from sd_model_manager.registry.model_registry import ModelRegistry
+    from sd_model_manager.registry.models import model_id_for_path
+
+    lora_dir = tmp_path / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    original = lora_dir / "a.safetensors"
+    original.write_text("model")
+    scanner = ModelScanner(Config(model_scan_dir=tmp_path, model_id_source="inode"))
+    registry = ModelRegistry()
+    registry.replace_all(await scanner.scan())
+    [before] = registry.list()
+
+    linked = lora_dir / "linked.safetensors"
+    linked.hardlink_to(original)
+    registry.upsert(await scanner.scan_file(linked))
+
+    assert registry.get(before.id).file_path == str(original)
+    assert registry.get_by_path(str(linked)).id == model_id_for_path(str(linked))
+    assert len({model.id for model in registry.list()}) == 2
+    # Re-registering the original keeps its inode ID
+    registry.upsert(await scanner.scan_file(original))
+    assert registry.get_by_path(str(original)).id == before.id
+
+
+@pytest.mark.asyncio
+async def test_hash_ids_come_from_sidecar(tmp_path):
+    """Hash-derived IDs use the sidecar SHA256 and fall back to the path ID"""
+    from sd_model_manager.registry.models import model_id_for_hash, model_id_for_path
+
+    lora_dir = tmp_path / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    (lora_dir / "a.safetensors").write_text("model")
+    (lora_dir / "a.safetensors.civitai.info").write_text(
+        '{"files": [{"name": "a.safetensors", "hashes": {"SHA256": "ABCDEF"}}]}'
+    )
+    (lora_dir / "b.safetensors").write_text("model")
+    scanner = ModelScanner(Config(model_scan_dir=tmp_path, model_id_source="hash"))
+
+    models = {model.filename: model for model in await scanner.scan()}
+
+    assert models["a.safetensors"].id == model_id_for_hash("abcdef")
+    assert models["b.safetensors"].id == model_id_for_path(str(lora_dir / "b.safetensors"))
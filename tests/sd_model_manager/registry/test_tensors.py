@@ -0,0 +1,162 @@
+"""Tests for safetensors tensor inspection"""
+
+import importlib.util
+import json
+import os
+import struct
+
+import pytest
+
+from sd_model_manager.registry.tensors import (
+    TensorInspectionError,
+    TensorInspector,
+    block_of,
+    component_of,
+    inspect_safetensors,
+)
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def f32(*values: float) -> bytes:
+    return struct.pack(f"<{len(values)}f", *values)
+
+
+def f16(*values: float) -> bytes:
+    return struct.pack(f"<{len(values)}e", *values)
+
+
+def bf16(*values: float) -> bytes:
+    # Upper half of each float32
+    return b"".join(f32(value)[2:] for value in values)
+
+
+def write_safetensors(path, tensors: dict, metadata: dict | None = None):
+    """Write a safetensors file from {name: (dtype, shape, data)}"""
+    header = {}
+    offset = 0
+    for name, (dtype, shape, data) in tensors.items():
+        header[name] = {"dtype": dtype, "shape": shape,
+                        "data_offsets": [offset, offset + len(data)]}
+        offset += len(data)
+    if metadata:
+        header["__metadata__"] = metadata
+    encoded = json.dumps(header).encode()
+    path.write_bytes(struct.pack("<Q", len(encoded)) + encoded
+                     + b"".join(data for _, _, data in tensors.values()))
+    return 8 + len(encoded)
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    """Checkpoint with UNet, text encoder, VAE and EMA weights"""
+    path = tmp_path / "model.safetensors"
+    write_safetensors(path, {
+        "model.diffusion_model.input_blocks.1.0.proj.weight": ("F16", [2, 2], f16(1, 2, 3, 4)),
+        "model.diffusion_model.input_blocks.1.0.proj.bias": ("F16", [2], f16(0, 0)),
+        "model.diffusion_model.out.2.weight": ("F32", [3], f32(-1, 0, 1)),
+        "cond_stage_model.transformer.text_model.final_layer_norm.weight":
+            ("BF16", [2], bf16(0.5, 1.5)),
+        "first_stage_model.encoder.down.0.block.1.conv1.weight": ("F32", [1], f32(2)),
+        "model_ema.decay": ("F32", [], f32(0.9999)),
+    }, metadata={"format": "pt"})
+    return path
+
+
+def test_component_and_block_names():
+    """Test tensors are grouped by component and indexed module"""
+    assert block_of("model.diffusion_model.input_blocks.1.0.proj.weight") == (
+        "unet.input_blocks.1")
+    assert block_of("model.diffusion_model.input_blocks.1.0.proj.weight", depth=2) == (
+        "unet.input_blocks.1.0")
+    assert block_of("lora_unet_down_blocks_0_attentions_0_proj_in.lora_down.weight") == (
+        "unet.down_blocks_0")
+    assert block_of("lora_te_text_model_encoder_layers_11_mlp_fc1.alpha") == (
+        "text_encoder.text_model_encoder_layers_11")
+    assert block_of("cond_stage_model.transformer.text_model.final_layer_norm.weight") == (
+        "text_encoder.transformer.text_model.final_layer_norm")
+    assert block_of("logit_scale") == "logit_scale"
+    assert component_of("model_ema.decay") == "ema"
+    assert component_of("embedding.weight") == "other"
+
+
+def test_inspect_lists_tensors_and_aggregates(checkpoint):
+    """Test shapes, byte ranges and per-dtype/component/block totals"""
+    report = inspect_safetensors(checkpoint)
+
+    assert report.tensor_count == 6
+    assert report.total_params == 4 + 2 + 3 + 2 + 1 + 1
+    assert report.metadata == {"format": "pt"}
+    assert report.has_ema
+
+    first = report.tensors[0]
+    assert first.name == "model.diffusion_model.input_blocks.1.0.proj.weight"
+    assert first.shape == [2, 2]
+    assert first.start == 8 + report.header_size
+    assert first.end - first.start == 8
+    assert report.tensors[-1].end == report.file_size
+
+    assert report.dtypes["F16"].params == 6
+    assert report.dtypes["BF16"].bytes == 4
+    assert report.components["unet"].params == 9
+    assert report.components["text_encoder"].params == 2
+    assert report.blocks["unet.input_blocks.1"].tensors == 2
+    assert report.blocks["unet.out.2"].params == 3
+
+
+@pytest.mark.parametrize("content", [
+    b"tiny",
+    struct.pack("<Q", 1 << 40) + b"{}",
+    struct.pack("<Q", 4) + b"nope",
+    struct.pack("<Q", 2) + b"[]",
+])
+def test_invalid_files_raise(tmp_path, content):
+    """Test malformed files are reported as inspection errors"""
+    path = tmp_path / "broken.safetensors"
+    path.write_bytes(content)
+
+    with pytest.raises(TensorInspectionError):
+        inspect_safetensors(path)
+
+
+def test_mismatched_offsets_raise(tmp_path):
+    """Test data offsets must match the dtype and shape"""
+    path = tmp_path / "broken.safetensors"
+    write_safetensors(path, {"weight": ("F32", [4], f32(1, 2))})
+
+    with pytest.raises(TensorInspectionError, match="offsets"):
+        inspect_safetensors(path)
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="NumPy is not installed")
+def test_stats_over_mmap(checkpoint):
+    """Test per-tensor statistics for F32, F16 and BF16 data"""
+    tensors = {t.name: t for t in inspect_safetensors(checkpoint, stats=True).tensors}
+
+    out = tensors["model.diffusion_model.out.2.weight"].stats
+    assert (out.min, out.max, out.mean, out.zeros) == (-1.0, 1.0, 0.0, 1)
+    assert out.std == pytest.approx((2 / 3) ** 0.5)
+    proj = tensors["model.diffusion_model.input_blocks.1.0.proj.weight"].stats
+    assert proj.mean == pytest.approx(2.5)
+    norm = tensors["cond_stage_model.transformer.text_model.final_layer_norm.weight"].stats
+    assert (norm.min, norm.max) == (0.5, 1.5)
+
+
+@pytest.mark.skipif(HAS_NUMPY, reason="NumPy is installed")
+def test_stats_without_numpy_raise(checkpoint):
+    """Test a clear error when statistics need NumPy"""
+    with pytest.raises(TensorInspectionError, match="NumPy"):
+        inspect_safetensors(checkpoint, stats=True)
+
+
+def test_inspector_caches_by_fingerprint(checkpoint):
+    """Test unchanged files are served from cache and changed files re-read"""
+    inspector = TensorInspector()
+    report = inspector.inspect(checkpoint)
+    assert inspector.inspect(checkpoint) is report
+
+    write_safetensors(checkpoint, {"weight": ("F32", [1], f32(1))})
+    stat = checkpoint.stat()
+    os.utime(checkpoint, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert inspector.inspect(checkpoint).tensor_count == 1
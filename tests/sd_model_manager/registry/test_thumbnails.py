@@ -0,0 +1,158 @@
+"""Tests for local preview thumbnails"""
+
+import asyncio
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from sd_model_manager.lib.disk_cache import DiskCache
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry import thumbnails
+from sd_model_manager.registry.thumbnails import ThumbnailError, ThumbnailService, find_preview
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+requires_pillow = pytest.mark.skipif(not HAS_PILLOW, reason="Pillow is not installed")
+
+
+def make_model(path) -> ModelInfo:
+    path.write_bytes(b"model")
+    return ModelInfo.from_file_path(
+        file_path=str(path), model_type="LoRA", category="Active",
+        file_size=5, modified_time=datetime(2024, 1, 1)
+    )
+
+
+def write_image(path, size=(800, 600), color=(200, 30, 30)):
+    from PIL import Image
+
+    Image.new("RGB", size, color).save(path)
+
+
+@pytest.fixture
+def service(tmp_path):
+    executor = ThreadPoolExecutor(max_workers=2)
+    service = ThumbnailService(
+        DiskCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024), executor=executor
+    )
+    yield service
+    executor.shutdown()
+
+
+def test_find_preview_prefers_preview_sidecar(tmp_path):
+    """Test .preview.png wins over a same-stem image"""
+    model = tmp_path / "lora.safetensors"
+    (tmp_path / "lora.png").write_bytes(b"a1111")
+    assert find_preview(model) == tmp_path / "lora.png"
+
+    (tmp_path / "lora.preview.png").write_bytes(b"preview")
+    assert find_preview(model) == tmp_path / "lora.preview.png"
+    assert find_preview(tmp_path / "other.safetensors") is None
+
+
+async def test_model_without_preview_has_no_thumbnail(service, tmp_path):
+    """Test models without a local preview return None"""
+    model = make_model(tmp_path / "lora.safetensors")
+
+    assert await service.get(model) is None
+
+
+@pytest.mark.skipif(HAS_PILLOW, reason="Pillow is installed")
+async def test_missing_pillow_raises(service, tmp_path):
+    """Test a clear error when Pillow is not installed"""
+    model = make_model(tmp_path / "lora.safetensors")
+    (tmp_path / "lora.preview.png").write_bytes(b"png")
+
+    with pytest.raises(ThumbnailError):
+        await service.get(model)
+
+
+@requires_pillow
+async def test_generates_and_caches_thumbnail(service, tmp_path):
+    """Test a thumbnail is resized, cached and reused"""
+    from PIL import Image
+
+    model = make_model(tmp_path / "lora.safetensors")
+    write_image(tmp_path / "lora.preview.png")
+
+    thumbnail = await service.get(model, size=128, fmt="webp")
+    again = await service.get(model, size=128, fmt="webp")
+
+    assert thumbnail.media_type == "image/webp"
+    assert again.key == thumbnail.key
+    with Image.open(thumbnail.path) as image:
+        assert image.format == "WEBP"
+        assert max(image.size) == 128
+    assert service.get_cached(thumbnail.key).path == thumbnail.path
+
+
+@requires_pillow
+async def test_changed_preview_gets_new_key(service, tmp_path):
+    """Test keys are content-addressed and identical previews share one entry"""
+    first = make_model(tmp_path / "a.safetensors")
+    second = make_model(tmp_path / "b.safetensors")
+    write_image(tmp_path / "a.preview.png")
+    write_image(tmp_path / "b.preview.png")
+
+    key_a = (await service.get(first, fmt="jpeg")).key
+    assert (await service.get(second, fmt="jpeg")).key == key_a
+
+    write_image(tmp_path / "a.preview.png", color=(0, 0, 255))
+    assert (await service.get(first, fmt="jpeg")).key != key_a
+
+
+@requires_pillow
+async def test_warm_generates_missing_thumbnails(service, tmp_path):
+    """Test background warming covers models with previews only"""
+    models = [make_model(tmp_path / f"m{i}.safetensors") for i in range(3)]
+    write_image(tmp_path / "m0.preview.png")
+    write_image(tmp_path / "m1.png")
+
+    assert await service.warm(models) == 2
+    assert service.cache.total_bytes > 0
+
+
+@requires_pillow
+async def test_undecodable_preview_raises(service, tmp_path):
+    """Test a broken preview image reports a thumbnail error"""
+    model = make_model(tmp_path / "lora.safetensors")
+    (tmp_path / "lora.preview.png").write_bytes(b"not an image")
+
+    with pytest.raises(ThumbnailError):
+        await service.get(model)
+
+
+async def test_waiter_takes_over_when_generating_request_is_cancelled(
+    service, tmp_path, monkeypatch
+):
+    """Test cancelling the first request does not leave concurrent waiters hanging"""
+    release = threading.Event()
+    calls = []
+
+    def render(source, size, fmt, quality):
+        calls.append(source)
+        if len(calls) == 1:
+            release.wait(5)
+        return b"thumbnail"
+
+    monkeypatch.setattr(thumbnails, "render_thumbnail", render)
+    monkeypatch.setattr(ThumbnailService, "available", True)
+    source = tmp_path / "lora.preview.png"
+    try:
+        first = asyncio.create_task(service._generate(source, "key.webp", 128, "webp"))
+        while not calls:
+            await asyncio.sleep(0.01)
+        second = asyncio.create_task(service._generate(source, "key.webp", 128, "webp"))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        path = await asyncio.wait_for(second, timeout=5)
+    finally:
+        release.set()
+
+    assert first.cancelled()
+    assert path.read_bytes() == b"thumbnail"
+    assert len(calls) == 2
+    assert service._pending == {}
@@ -0,0 +1,131 @@
+"""Tests for the Civitai update checker against a local stand-in server"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.registry.update_checker import UpdateChecker
+
+
+def installed_model(model_id: int, version_id: int) -> ModelInfo:
+    """Registry entry whose sidecar points at a Civitai model version"""
+    return ModelInfo.from_file_path(
+        file_path=f"/models/active/loras/model_{model_id}.safetensors",
+        model_type="LoRA",
+        category="Active",
+        file_size=1,
+        modified_time=datetime.now(),
+        civitai_metadata={"id": version_id, "modelId": model_id, "name": "v1.0"}
+    )
+
+
+class TestUpdateChecker:
+    """Test suite for UpdateChecker"""
+
+    @pytest.fixture
+    def registry(self):
+        """Registry with three Civitai models and one local-only file"""
+        registry = ModelRegistry()
+        models = [installed_model(model_id, model_id * 10) for model_id in (1, 2, 3)]
+        models.append(ModelInfo.from_file_path(
+            file_path="/models/active/loras/local.safetensors",
+            model_type="LoRA",
+            category="Active",
+            file_size=1,
+            modified_time=datetime.now()
+        ))
+        registry.replace_all(models)
+        return registry
+
+    @pytest.fixture
+    def civitai(self, fake_civitai):
+        """Stand-in server where model 2 has published a newer version"""
+        for model_id in (1, 2, 3):
+            fake_civitai.add_model(model_id)
+        fake_civitai.models["2"]["modelVersions"].insert(0, {"id": 21, "name": "v2.0"})
+        return fake_civitai
+
+    @pytest.fixture
+    def client(self, civitai):
+        return CivitaiClient(base_url=civitai.api_url, requests_per_minute=6000)
+
+    @pytest.mark.asyncio
+    async def test_check_flags_models_with_newer_versions(self, civitai, client, registry):
+        """Test one batched request yields per-model update flags"""
+        checker = UpdateChecker(client, registry)
+
+        result = await checker.check()
+        statuses = {status.model_id: status for status in await checker.statuses()}
+
+        assert result.installed == 3
+        assert result.checked == 3
+        assert result.requests == 1
+        assert result.updates_available == 1
+        assert civitai.requests.count(("GET", "/api/v1/models")) == 1
+        assert statuses[2].update_available
+        assert statuses[2].latest_version_id == 21
+        assert statuses[2].latest_version_name == "v2.0"
+        assert not statuses[1].update_available
+        assert statuses[1].installed_version_ids == [10]
+
+    @pytest.mark.asyncio
+    async def test_only_stale_models_are_polled(self, civitai, client, registry):
+        """Test a second run within the interval sends no requests"""
+        checker = UpdateChecker(client, registry, check_interval=3600)
+        await checker.check()
+        civitai.requests.clear()
+
+        result = await checker.check()
+
+        assert result.stale == 0
+        assert result.requests == 0
+        assert civitai.requests == []
+
+    @pytest.mark.asyncio
+    async def test_unchanged_batch_is_answered_with_304(self, civitai, client, registry, tmp_path):
+        """Test the stored ETag turns an unchanged re-check into a 304"""
+        state_path = tmp_path / "update_state.json"
+        await UpdateChecker(client, registry, state_path=state_path).check()
+
+        # A fresh checker resumes from the persisted state
+        checker = UpdateChecker(client, registry, state_path=state_path)
+        result = await checker.check(force=True)
+
+        assert result.not_modified == 3
+        assert civitai.not_modified == 1
+        assert [s.model_id for s in await checker.statuses() if s.update_available] == [2]
+        assert json.loads(state_path.read_text())["models"]["2"]["latest_version_id"] == 21
+
+    @pytest.mark.asyncio
+    async def test_request_budget_defers_remaining_models(self, civitai, client, registry):
+        """Test models beyond the request budget are checked on the next run"""
+        checker = UpdateChecker(client, registry, batch_size=1, max_requests=2)
+
+        first = await checker.check()
+        second = await checker.check()
+
+        assert (first.requests, first.checked, first.deferred) == (2, 2, 1)
+        assert (second.requests, second.checked, second.deferred) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_next_run(self, civitai, client, registry):
+        """Test a failed lookup leaves the models stale"""
+        civitai.rate_limit_count = 10
+        civitai.retry_after = 0
+        checker = UpdateChecker(client, registry)
+        client.max_rate_limit_retries = 0
+
+        result = await checker.check()
+        statuses = await checker.statuses()
+
+        assert result.failed == 3
+        assert all(status.checked_at is None for status in statuses)
+
+    def test_rejects_batches_larger_than_the_api_limit(self, registry):
+        """Test the batch size is capped at the API page size"""
+        with pytest.raises(ValueError):
+            UpdateChecker(CivitaiClient(), registry, batch_size=101)
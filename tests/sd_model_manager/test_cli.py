@@ -0,0 +1,185 @@
+"""CLI のテスト"""
+
+import csv
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from sd_model_manager import cli
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+# コマンドの起動（モジュール読み込み）にかけてよい時間（マイクロ秒）
+IMPORT_BUDGET_US = 100_000
+
+
+def test_batch_import_reads_url_file(tmp_path):
+    """URL ファイルと引数の両方から入力を集めるテスト"""
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text("# comment\n101\nhttps://civitai.com/models/102/x\n\n")
+    args = cli.build_parser().parse_args(["batch-import", "100", "-f", str(url_file)])
+
+    assert cli._read_batch_inputs(args) == ["100", "101", "https://civitai.com/models/102/x"]
+
+
+def test_batch_import_without_urls_fails(tmp_path, monkeypatch, capsys):
+    """URL が 1 件もない場合は終了コード 2 となるテスト"""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+
+    assert cli.main(["batch-import"]) == 2
+    assert "No URLs given" in capsys.readouterr().err
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """新しいインタプリタでコードを実行（インポート状況を汚さないため）"""
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+        capture_output=True, text=True, check=True
+    )
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """LoRA 2 つ（1 つはサイドカー付き）を含むライブラリ"""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    (lora_dir / "a.safetensors").write_bytes(b"model a")
+    (lora_dir / "b.safetensors").write_bytes(b"model b")
+    (lora_dir / "b.safetensors.civitai.info").write_text('{"id": 20, "modelId": 2}')
+    return tmp_path / "models"
+
+
+def command_import_us(argv: list[str], excluded: tuple[str, ...] = ()) -> int:
+    """コマンドの実行中に読み込んだモジュールの合計時間（-X importtime、マイクロ秒）
+
+    インタプリタ自体の起動時の読み込みは含めない。``excluded`` のパッケージは
+    （その配下で読み込んだモジュールを含めて）合計から除く。
+    """
+    result = run_python(
+        "import sys; sys.stderr.write('--start--\\n'); "
+        f"from sd_model_manager import cli; cli.main({argv!r})",
+        "-X", "importtime"
+    )
+    _, _, command_imports = result.stderr.partition("--start--\n")
+    entries = []
+    for line in command_imports.splitlines():
+        _, found, fields = line.partition("import time:")
+        if not found:
+            continue
+        _, total, name = fields.split("|")
+        if total.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            entries.append((depth, name.strip(), int(total)))
+
+    # 親は子の後に出力されるため、逆順にたどって祖先が除外済みかを判定する
+    startup_us = 0
+    ancestors: list[bool] = []
+    for depth, name, total in reversed(entries):
+        ancestors = ancestors[:depth]
+        skip = name.split(".")[0] in excluded
+        if depth == 0:
+            startup_us += total
+        if skip and not any(ancestors):
+            startup_us -= total
+        ancestors.append(skip)
+    return startup_us
+
+
+def test_scan_help_stays_under_startup_budget(tmp_path, monkeypatch):
+    """scan --help の実行で読み込むモジュールが 100ms 未満に収まるテスト"""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+
+    startup_us = command_import_us(["scan", "--help"])
+
+    assert startup_us < IMPORT_BUDGET_US, f"scan --help imports took {startup_us / 1000:.1f}ms"
+
+
+def test_scan_imports_stay_under_startup_budget(tmp_path, monkeypatch):
+    """scan の実行で読み込むモジュールが pydantic 以外で 100ms 未満に収まるテスト
+
+    設定とモデル情報に必須の pydantic / pydantic-settings は除いて計測する。
+    """
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+    (tmp_path / "models").mkdir()
+
+    startup_us = command_import_us(
+        ["scan", "--dir", str(tmp_path / "models")],
+        excluded=("pydantic", "pydantic_core", "pydantic_settings")
+    )
+
+    assert startup_us < IMPORT_BUDGET_US, f"scan imports took {startup_us / 1000:.1f}ms"
+
+
+def test_cli_entry_does_not_import_web_stack():
+    """パーサー構築までに Web スタックや pydantic を読み込まないテスト"""
+    result = run_python(
+        "import sys; from sd_model_manager import cli; cli.build_parser(); "
+        "print(' '.join(sorted(sys.modules)))"
+    )
+
+    loaded = set(result.stdout.split())
+    assert not loaded & {"fastapi", "uvicorn", "starlette", "pydantic", "pydantic_settings"}
+
+
+def test_hash_command_stays_lightweight(tmp_path):
+    """hash は pydantic を読み込まずに SHA256 と AutoV2 を出力するテスト"""
+    model = tmp_path / "model.safetensors"
+    model.write_bytes(b"weights")
+    sha256 = hashlib.sha256(b"weights").hexdigest().upper()
+
+    result = run_python(
+        "import sys; from sd_model_manager import cli; "
+        f"code = cli.main(['hash', {str(tmp_path)!r}]); "
+        "print('pydantic' in sys.modules, code)"
+    )
+
+    assert result.stdout.splitlines() == [f"{sha256}  {sha256[:10]}  {model}", "False 0"]
+
+
+def test_scan_json_streams_one_model_per_line(library, capsys):
+    """scan --json が 1 行 1 モデルの JSON を出力するテスト"""
+    assert cli.main(["scan", "--dir", str(library), "--json"]) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    models = sorted((json.loads(line) for line in lines), key=lambda m: m["filename"])
+    assert [m["filename"] for m in models] == ["a.safetensors", "b.safetensors"]
+    assert models[1]["civitai_metadata"]["modelId"] == 2
+
+
+def test_scan_missing_directory_fails(tmp_path, monkeypatch, capsys):
+    """存在しないディレクトリのスキャンは終了コード 1 となるテスト"""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+
+    assert cli.main(["scan", "--dir", str(tmp_path / "missing")]) == 1
+    assert "Scan failed" in capsys.readouterr().err
+
+
+def test_export_csv_includes_civitai_ids(library, tmp_path):
+    """export --format csv がサイドカーの ID を含めて書き出すテスト"""
+    output = tmp_path / "library.csv"
+
+    assert cli.main(["export", "--dir", str(library), "--format", "csv", "-o", str(output)]) == 0
+
+    rows = {row["filename"]: row for row in csv.DictReader(output.open(encoding="utf-8"))}
+    assert rows["b.safetensors"]["civitai_model_id"] == "2"
+    assert rows["b.safetensors"]["civitai_version_id"] == "20"
+    assert rows["a.safetensors"]["civitai_model_id"] == ""
+
+
+def test_scan_profile_writes_pstats(library, tmp_path, capsys):
+    """scan --profile cprofile がスキャンの pstats を log_dir に書き出すテスト"""
+    import pstats
+
+    assert cli.main(["scan", "--dir", str(library), "--profile", "cprofile"]) == 0
+
+    profiles = list((tmp_path / "logs" / "profiles").glob("*-scan.pstats"))
+    assert len(profiles) == 1
+    assert str(profiles[0]) in capsys.readouterr().err
+    functions = {name for _, _, name in pstats.Stats(str(profiles[0])).stats}
+    assert "iter_models" in functions
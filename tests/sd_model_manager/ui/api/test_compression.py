@@ -0,0 +1,126 @@
+"""レスポンス圧縮のテスト"""
+
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from sd_model_manager.ui.api import compression
+from sd_model_manager.ui.api.compression import (
+    SUPPORTED_ENCODINGS,
+    CompressionMiddleware,
+    compress,
+    negotiate_encoding,
+)
+
+
+def make_client(thread_min_size: int = compression.THREAD_MIN_BYTES) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, thread_min_size=thread_min_size)
+
+    @app.get("/large")
+    async def large():
+        return {"items": ["model"] * 100}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"x" * 200
+            yield b"y" * 200
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/vary")
+    async def vary():
+        return JSONResponse({"items": ["model"] * 100}, headers={"Vary": "Origin"})
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("z" * 200)
+
+    return TestClient(app)
+
+
+def test_negotiate_encoding():
+    """q 値と対応状況に応じてエンコーディングを選ぶテスト"""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("*") == SUPPORTED_ENCODINGS[0]
+    assert negotiate_encoding("br") == ("br" if "br" in SUPPORTED_ENCODINGS else None)
+
+
+def test_compress_gzip_is_deterministic():
+    """同じ内容からは同じ gzip のバイト列が得られるテスト"""
+    data = b"payload" * 100
+
+    assert compress(data, "gzip") == compress(data, "gzip")
+    assert gzip.decompress(compress(data, "gzip")) == data
+
+
+def test_large_json_is_compressed():
+    """閾値以上の JSON レスポンスが圧縮されるテスト"""
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == {"items": ["model"] * 100}
+
+
+def test_small_and_unaccepted_responses_are_not_compressed():
+    """閾値未満・Accept-Encoding なしのレスポンスは圧縮しないテスト"""
+    client = make_client()
+
+    assert "content-encoding" not in client.get(
+        "/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get(
+        "/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streaming_responses_pass_through():
+    """ストリーミングのレスポンスはそのまま送るテスト"""
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == b"x" * 200 + b"y" * 200
+
+
+def test_plain_text_is_compressed():
+    """テキストのレスポンスも圧縮されるテスト"""
+    response = make_client().get("/text", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "z" * 200
+
+
+def test_existing_vary_header_is_extended():
+    """既存の Vary ヘッダーに Accept-Encoding を追記し、重複させないテスト"""
+    response = make_client().get("/vary", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers.get_list("vary") == ["Origin, Accept-Encoding"]
+
+
+def test_large_bodies_are_compressed_in_a_thread(monkeypatch):
+    """thread_min_size 以上の本文だけをスレッドで圧縮するテスト"""
+    offloaded = []
+    to_thread = compression.asyncio.to_thread
+
+    async def record(func, *args):
+        offloaded.append(len(args[0]))
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(compression.asyncio, "to_thread", record)
+    client = make_client(thread_min_size=500)
+
+    large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    text = client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+    assert large.json() == {"items": ["model"] * 100}
+    assert text.headers["content-encoding"] == "gzip"
+    assert offloaded == [len(large.content)]
@@ -0,0 +1,253 @@
+"""ダウンロード関連エンドポイントのテスト"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.download.batch import BatchReport
+from sd_model_manager.download.history import history_entry
+from sd_model_manager.download.progress import ProgressBus, ProgressEvent
+from sd_model_manager.ui.api import download as download_api
+from sd_model_manager.ui.api.download import download_progress_ws
+from sd_model_manager.ui.api.main import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """ダウンロード先を一時ディレクトリにしたアプリケーション"""
+    config = Config(
+        _env_file=None,
+        download_dir=tmp_path / "downloads",
+        model_scan_dir=tmp_path / "models",
+        data_dir=tmp_path / "data"
+    )
+    return create_app(config)
+
+
+def test_progress_websocket_streams_running_jobs(app):
+    """WebSocket 接続時に実行中ジョブの進捗が配信されるテスト"""
+    app.state.progress_bus.publish(ProgressEvent(
+        job_id="job-1",
+        filename="model.safetensors",
+        status="downloading",
+        downloaded_bytes=50,
+        total_bytes=100,
+        bytes_per_second=10.0,
+        eta_seconds=5.0,
+        timestamp=datetime.now()
+    ))
+    client = TestClient(app)
+
+    with client.websocket_connect("/ws/download?job_id=job-1") as websocket:
+        payload = websocket.receive_json()
+
+    assert payload["job_id"] == "job-1"
+    assert payload["downloaded_bytes"] == 50
+    assert payload["eta_seconds"] == 5.0
+
+
+class FakeWebSocket:
+    """切断・送信失敗を再現する WebSocket の代役"""
+
+    def __init__(self, bus: ProgressBus, fail_send: bool = False):
+        self.app = SimpleNamespace(state=SimpleNamespace(progress_bus=bus))
+        self.fail_send = fail_send
+        self.disconnected = asyncio.Event()
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send_json(self, data):
+        if self.fail_send:
+            raise RuntimeError("Cannot call send once a close message has been sent")
+        self.sent.append(data)
+
+
+def progress_event(job_id: str) -> ProgressEvent:
+    return ProgressEvent(
+        job_id=job_id, filename="model.safetensors", status="downloading",
+        downloaded_bytes=1, total_bytes=2, timestamp=datetime.now()
+    )
+
+
+@pytest.mark.asyncio
+async def test_progress_websocket_releases_subscription_on_idle_disconnect():
+    """イベントがない間に切断されても購読が解除されるテスト"""
+    bus = ProgressBus()
+    websocket = FakeWebSocket(bus)
+    handler = asyncio.create_task(download_progress_ws(websocket))
+    await asyncio.sleep(0)
+    assert bus.subscriber_count == 1
+
+    websocket.disconnected.set()
+    await asyncio.wait_for(handler, timeout=1)
+
+    assert bus.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_progress_websocket_stops_on_send_failure():
+    """送信に失敗したら例外を漏らさず終了するテスト"""
+    bus = ProgressBus()
+    websocket = FakeWebSocket(bus, fail_send=True)
+    handler = asyncio.create_task(download_progress_ws(websocket))
+    await asyncio.sleep(0)
+
+    bus.publish(progress_event("job-1"))
+    await asyncio.wait_for(handler, timeout=1)
+
+    assert bus.subscriber_count == 0
+
+
+def test_bandwidth_limits_can_be_changed_at_runtime(app):
+    """帯域制限を API から取得・変更できるテスト"""
+    client = TestClient(app)
+
+    assert client.get("/api/download/bandwidth").json() == {
+        "global_limit": None, "per_download_limit": None
+    }
+
+    response = client.put(
+        "/api/download/bandwidth", json={"global_limit": 1048576, "per_download_limit": None}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["global_limit"] == 1048576
+    assert app.state.bandwidth_limiter.global_bucket.rate == 1048576
+
+
+def test_bandwidth_limits_reject_negative_values(app):
+    """負の帯域制限はバリデーションエラーとなるテスト"""
+    client = TestClient(app)
+
+    response = client.put("/api/download/bandwidth", json={"global_limit": -1})
+
+    assert response.status_code == 422
+
+
+def test_downloaded_model_is_listed_without_scan(tmp_path, fake_civitai):
+    """ダウンロード完了したモデルが再スキャンなしで一覧に表示されるテスト"""
+    config = Config(
+        _env_file=None,
+        download_dir=tmp_path / "downloads",
+        model_scan_dir=tmp_path / "models",
+        data_dir=tmp_path / "data"
+    )
+    app = create_app(config)
+    app.state.download_service.civitai_client = CivitaiClient(
+        base_url=fake_civitai.api_url, requests_per_minute=6000
+    )
+    # 初回アクセス時のスキャン対象を用意し、登録済み状態にする
+    (tmp_path / "models").mkdir()
+    client = TestClient(app)
+    assert client.get("/api/models").json()["total_count"] == 0
+
+    fake_civitai.add_model(7, "Checkpoint")
+    scans_before = app.state.model_registry.scanned_at
+
+    response = client.post("/api/download", json={"url": "7"})
+    assert response.status_code == 202
+    assert response.json()["job_id"]
+
+    payload = client.get("/api/models").json()
+    assert payload["total_count"] == 1
+    assert payload["models"][0]["model_type"] == "Checkpoint"
+    assert payload["models"][0]["file_path"].endswith("active/checkpoints/test_model_7.safetensors")
+    assert app.state.model_registry.scanned_at == scans_before
+
+
+def test_download_history_is_paginated(app):
+    """ダウンロード履歴を新しい順にページ単位で取得できるテスト"""
+    store = app.state.download_history
+    for i in range(5):
+        store.record_sync(history_entry(
+            f"https://example.com/{i}", 1000.0 + i, "completed", model_id=i
+        ))
+    client = TestClient(app)
+
+    first = client.get("/api/downloads/history", params={"limit": 3}).json()
+    second = client.get(
+        "/api/downloads/history", params={"limit": 3, "cursor": first["next_cursor"]}
+    ).json()
+
+    assert [item["url"] for item in first["items"]] == [
+        "https://example.com/4", "https://example.com/3", "https://example.com/2"
+    ]
+    assert [item["model_id"] for item in second["items"]] == [1, 0]
+    assert second["next_cursor"] is None
+
+
+def test_download_history_rejects_unknown_status(app):
+    """未知のステータスでの絞り込みはバリデーションエラーとなるテスト"""
+    client = TestClient(app)
+
+    response = client.get("/api/downloads/history", params={"status": "paused"})
+
+    assert response.status_code == 422
+
+
+def test_version_files_endpoint_lists_files(app, fake_civitai):
+    """バージョンのファイル一覧を取得できるテスト"""
+    fake_civitai.add_model(5, "LORA")
+    app.state.download_service.civitai_client = CivitaiClient(
+        base_url=fake_civitai.api_url, requests_per_minute=6000
+    )
+    client = TestClient(app)
+
+    response = client.get("/api/download/files", params={"url": "5"})
+
+    assert response.status_code == 200
+    assert response.json()["files"][0]["name"] == "test_model_5.safetensors"
+
+
+def test_batch_download_reports_items(app, fake_civitai):
+    """一括ダウンロードを開始し、項目ごとの結果を取得できるテスト"""
+    config = app.state.config
+    config.model_scan_dir.mkdir(parents=True, exist_ok=True)
+    fake_civitai.add_model(61, "LORA")
+    app.state.download_service.civitai_client = CivitaiClient(
+        base_url=fake_civitai.api_url, requests_per_minute=6000
+    )
+    client = TestClient(app)
+
+    response = client.post("/api/download/batch", json={"urls": ["61", "61"]})
+
+    assert response.status_code == 202
+    batch_id = response.json()["batch_id"]
+    report = client.get(f"/api/download/batch/{batch_id}").json()
+    assert report["finished"]
+    assert [item["status"] for item in report["items"]] == ["downloaded", "duplicate"]
+
+
+def test_batch_reports_are_bounded(monkeypatch):
+    """保持するレポート数が上限を超えると、完了済みの古いものから破棄されるテスト"""
+    monkeypatch.setattr(download_api, "MAX_BATCH_REPORTS", 2)
+    reports: dict[str, BatchReport] = {}
+    running = BatchReport(batch_id="running", items=[])
+    download_api._remember_report(reports, running)
+    for batch_id in ["done-1", "done-2", "done-3"]:
+        download_api._remember_report(
+            reports, BatchReport(batch_id=batch_id, items=[], finished=True)
+        )
+
+    assert list(reports) == ["running", "done-3"]
+
+
+def test_unknown_batch_returns_404(app):
+    """存在しないバッチ ID は 404 となるテスト"""
+    client = TestClient(app)
+
+    response = client.get("/api/download/batch/missing")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "NOT_FOUND"
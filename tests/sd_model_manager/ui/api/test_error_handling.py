@@ -1,7 +1,9 @@
 """FastAPI エラーハンドリングのテスト"""
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sd_model_manager.lib.errors import AppError, NotFoundError, register_error_handlers
 from sd_model_manager.ui.api.main import create_app
 
 
@@ -19,3 +21,29 @@ def test_404_error_handler(client):
     assert response.status_code == 404
     data = response.json()
     assert data["error"]["code"] == "NOT_FOUND"
+
+
+def test_app_errors_use_their_status_code():
+    """NotFoundError は 404、その他の AppError は 400 で同じ形式となるテスト"""
+    app = FastAPI()
+    register_error_handlers(app)
+
+    @app.get("/missing")
+    async def missing():
+        raise NotFoundError("Model not found: x", {"model_id": "x"})
+
+    @app.get("/invalid")
+    async def invalid():
+        raise AppError("Invalid request")
+
+    client = TestClient(app)
+    missing_response = client.get("/missing")
+    invalid_response = client.get("/invalid")
+
+    assert missing_response.status_code == 404
+    assert missing_response.json() == {
+        "error": {"code": "NOT_FOUND", "message": "Model not found: x",
+                  "details": {"model_id": "x"}}
+    }
+    assert invalid_response.status_code == 400
+    assert invalid_response.json()["error"]["code"] == "APP_ERROR"
@@ -0,0 +1,35 @@
+"""インポートエンドポイントのテスト"""
+
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.ui.api.main import create_app
+
+
+def test_import_endpoint_adds_models_to_listing(tmp_path):
+    """取り込んだモデルが再スキャンなしで一覧に表示されるテスト"""
+    (tmp_path / "models").mkdir()
+    source = tmp_path / "nas" / "loras" / "shared.safetensors"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b"shared lora")
+    config = Config(
+        _env_file=None, model_scan_dir=tmp_path / "models", data_dir=tmp_path / "data"
+    )
+    client = TestClient(create_app(config))
+    client.get("/api/models")  # 初回スキャン（空のライブラリ）
+
+    response = client.post("/api/import", json={"paths": [str(tmp_path / "nas")]})
+
+    assert response.status_code == 200
+    assert response.json()["imported"][0]["file_path"].endswith("active/loras/shared.safetensors")
+    assert client.get("/api/models").json()["total_count"] == 1
+
+
+def test_import_endpoint_requires_paths(tmp_path):
+    """パスが空の場合はバリデーションエラーとなるテスト"""
+    config = Config(_env_file=None, data_dir=tmp_path / "data")
+    client = TestClient(create_app(config))
+
+    response = client.post("/api/import", json={"paths": []})
+
+    assert response.status_code == 422
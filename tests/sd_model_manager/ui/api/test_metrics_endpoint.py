@@ -0,0 +1,86 @@
+"""メトリクスエンドポイントのテスト"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.download.download_service import DownloadService
+from sd_model_manager.lib import metrics
+from sd_model_manager.ui.api.main import create_app
+
+
+def sample(name: str, labels: str = "") -> float:
+    """既定レジストリの出力からサンプル値を取得（なければ 0）"""
+    prefix = f"{name}{labels} "
+    for line in metrics.REGISTRY.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+@pytest.fixture
+def client(tmp_path):
+    """1 ファイルのライブラリを持つアプリケーションのクライアント"""
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    (lora_dir / "a.safetensors").write_bytes(b"lora")
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models",
+                    download_dir=tmp_path / "dl", data_dir=tmp_path / "data")
+    return TestClient(create_app(config))
+
+
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    """/metrics が Prometheus のテキスト形式で応答するテスト"""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE sdmm_http_request_duration_seconds histogram" in response.text
+
+
+def test_http_latency_is_labelled_by_route_template(client):
+    """HTTP レイテンシがルートのテンプレートごとに記録されるテスト"""
+    labels = '{method="GET",route="/api/download/batch/{batch_id}",status="404"}'
+    before = sample("sdmm_http_responses_total", labels)
+
+    client.get("/api/download/batch/first")
+    client.get("/api/download/batch/second")
+
+    assert sample("sdmm_http_responses_total", labels) == before + 2
+
+
+def test_scan_records_files_and_phases(client):
+    """スキャンでファイル数とフェーズ別の時間が記録されるテスト"""
+    files_before = sample("sdmm_scan_files_total")
+    runs_before = sample("sdmm_scan_phase_seconds_count", '{phase="total"}')
+
+    client.post("/api/models/scan")
+
+    assert sample("sdmm_scan_files_total") == files_before + 1
+    assert sample("sdmm_scan_phase_seconds_count", '{phase="total"}') == runs_before + 1
+    assert sample("sdmm_scan_phase_seconds_count", '{phase="walk"}') >= 1
+
+
+async def test_download_and_api_requests_are_recorded(tmp_path, fake_civitai):
+    """ダウンロード量と API リクエストのステータスが記録されるテスト"""
+    fake_civitai.add_model(7)
+    content = fake_civitai.add_file("metrics.safetensors", 4096)
+    client = CivitaiClient(base_url=fake_civitai.api_url, requests_per_minute=6000)
+    service = DownloadService(download_dir=tmp_path, civitai_client=client)
+    bytes_before = sample("sdmm_download_bytes_total")
+    ok_before = sample("sdmm_civitai_responses_total", '{status="200"}')
+    completed_before = sample("sdmm_downloads_total", '{status="completed"}')
+
+    await client.get_model_metadata("7")
+    await service.download_file(
+        f"{fake_civitai.base_url}/files/metrics.safetensors", "metrics.safetensors"
+    )
+
+    assert sample("sdmm_download_bytes_total") == bytes_before + len(content)
+    assert sample("sdmm_civitai_responses_total", '{status="200"}') == ok_before + 1
+    assert sample("sdmm_downloads_total", '{status="completed"}') == completed_before + 1
+    assert sample("sdmm_downloads_active") == 0
+    assert sample(
+        "sdmm_civitai_request_duration_seconds_count", '{endpoint="/models/{id}"}'
+    ) >= 1
@@ -0,0 +1,104 @@
+"""モデル一覧レスポンスのキャッシュのテスト"""
+
+import json
+from datetime import datetime
+
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.models import ModelInfo
+from sd_model_manager.ui.api.model_list_cache import ModelListCache, etag_matches
+from sd_model_manager.ui.api.models import ModelsListResponse
+
+
+def make_model(file_path: str, **updates) -> ModelInfo:
+    model = ModelInfo.from_file_path(
+        file_path=file_path,
+        model_type="LoRA",
+        category="Active",
+        file_size=1,
+        modified_time=datetime(2024, 1, 1, 12, 30, 15, 123456),
+    )
+    return model.model_copy(update=updates) if updates else model
+
+
+def test_body_matches_pydantic_serialization():
+    """連結した本文が ModelsListResponse のシリアライズと同じになるテスト"""
+    registry = ModelRegistry()
+    models = [make_model("/m/a.safetensors", civitai_metadata={"id": 1, "name": "ä"}),
+              make_model("/m/b.safetensors")]
+    registry.replace_all(models)
+
+    body = ModelListCache(registry).get().body
+
+    expected = ModelsListResponse(
+        models=models, total_count=2, scanned_at=registry.scanned_at
+    ).model_dump_json()
+    assert json.loads(body) == json.loads(expected)
+    assert body == expected.encode()
+
+
+def test_body_is_reused_until_registry_changes():
+    """レジストリが変わるまで同じ本文を返すテスト"""
+    registry = ModelRegistry()
+    registry.replace_all([make_model("/m/a.safetensors")])
+    cache = ModelListCache(registry)
+
+    first = cache.get()
+    assert cache.get() is first
+
+    registry.upsert(make_model("/m/b.safetensors"))
+    second = cache.get()
+    assert second is not first
+    assert second.etag != first.etag
+
+
+def test_only_changed_models_are_reserialized():
+    """再スキャンで内容が変わらないモデルの断片は作り直さないテスト"""
+    registry = ModelRegistry()
+    registry.replace_all([make_model("/m/a.safetensors"), make_model("/m/b.safetensors")])
+    cache = ModelListCache(registry)
+    cache.get()
+    assert cache.fragments_built == 2
+
+    # 同じ内容の新しいインスタンス（再スキャン）と、1 件だけ変更
+    registry.replace_all([
+        make_model("/m/a.safetensors"),
+        make_model("/m/b.safetensors", civitai_metadata={"id": 2}),
+    ])
+    listing = cache.get()
+
+    assert cache.fragments_built == 3
+    assert json.loads(listing.body)["models"][1]["civitai_metadata"] == {"id": 2}
+
+
+def test_removed_models_are_dropped():
+    """削除されたモデルが一覧と断片のキャッシュから消えるテスト"""
+    registry = ModelRegistry()
+    registry.replace_all([make_model("/m/a.safetensors"), make_model("/m/b.safetensors")])
+    cache = ModelListCache(registry)
+    cache.get()
+
+    registry.remove("/m/a.safetensors")
+    payload = json.loads(cache.get().body)
+
+    assert [model["filename"] for model in payload["models"]] == ["b.safetensors"]
+    assert payload["total_count"] == 1
+    assert len(cache._fragments) == 1
+
+
+def test_encoded_body_is_cached():
+    """圧縮済みの本文がエンコーディングごとにキャッシュされるテスト"""
+    registry = ModelRegistry()
+    registry.replace_all([make_model("/m/a.safetensors")])
+    listing = ModelListCache(registry).get()
+
+    assert listing.encode("gzip") is listing.encode("gzip")
+    assert listing.encode(None) is listing.body
+
+
+def test_etag_matches():
+    """If-None-Match の一覧・弱い ETag・ワイルドカードを比較できるテスト"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
@@ -0,0 +1,338 @@
+"""モデルレジストリ関連エンドポイントのテスト"""
+
+import hashlib
+import importlib.util
+import json
+import struct
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.download.civitai_client import CivitaiClient
+from sd_model_manager.registry.scanner import ModelScanner
+from sd_model_manager.ui.api.main import create_app
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """LoRA を 1 つ含むライブラリ"""
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    (lora_dir / "test_lora.safetensors").write_bytes(b"lora")
+    return tmp_path / "models"
+
+
+@pytest.fixture
+def client(model_dir, tmp_path):
+    """ライブラリを指定したアプリケーションのクライアント"""
+    config = Config(_env_file=None, model_scan_dir=model_dir, download_dir=tmp_path / "dl",
+                    data_dir=tmp_path / "data")
+    return TestClient(create_app(config))
+
+
+def test_list_models_triggers_initial_scan(client):
+    """初回の一覧取得でスキャンが実行されるテスト"""
+    response = client.get("/api/models")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total_count"] == 1
+    assert payload["models"][0]["filename"] == "test_lora.safetensors"
+    assert payload["scanned_at"] is not None
+
+
+def test_scan_endpoint_refreshes_registry(client, model_dir):
+    """スキャンエンドポイントで新しいファイルが反映されるテスト"""
+    client.get("/api/models")
+    (model_dir / "active" / "loras" / "new_lora.safetensors").write_bytes(b"new")
+
+    response = client.post("/api/models/scan")
+
+    assert response.json()["scanned_count"] == 2
+    assert client.get("/api/models").json()["total_count"] == 2
+
+
+def test_scan_endpoint_returns_error_summary(client, model_dir):
+    """スキャン結果に同種のエラーごとの件数とサンプルパスが含まれるテスト"""
+    lora_dir = model_dir / "active" / "loras"
+    for name in ["test_lora", "broken"]:
+        (lora_dir / f"{name}.safetensors").write_bytes(b"lora")
+        (lora_dir / f"{name}.safetensors.civitai.info").write_text("not json")
+
+    payload = client.post("/api/models/scan").json()
+
+    assert payload["scanned_count"] == 2
+    # 壊れたサイドカーは警告のみで、モデル自体は一覧に含まれる
+    assert payload["error_count"] == 0
+    [group] = payload["errors"]
+    assert group["kind"] == "civitai_metadata"
+    assert group["count"] == 2
+    assert len(group["sample_paths"]) == 2
+
+
+
+def test_scan_error_count_counts_only_failed_files(client, model_dir, monkeypatch):
+    """error_count は処理できなかったファイルのみを数えるテスト"""
+    lora_dir = model_dir / "active" / "loras"
+    (lora_dir / "test_lora.safetensors.civitai.info").write_text("not json")
+    (lora_dir / "unreadable.safetensors").write_bytes(b"lora")
+    process_file = ModelScanner._process_file
+
+    async def failing(self, file_path, errors=None):
+        if file_path.name == "unreadable.safetensors":
+            raise OSError("unreadable")
+        return await process_file(self, file_path, errors)
+
+    monkeypatch.setattr(ModelScanner, "_process_file", failing)
+
+    payload = client.post("/api/models/scan").json()
+
+    assert payload["scanned_count"] == 1
+    assert payload["error_count"] == 1
+    assert sorted(group["kind"] for group in payload["errors"]) == ["civitai_metadata", "process"]
+
+
+def test_scan_hashes_models_without_sidecars_in_background(model_dir, tmp_path):
+    """サイドカーのないモデルがスキャン後にハッシュ化され、キャッシュに保存されるテスト"""
+    config = Config(_env_file=None, model_scan_dir=model_dir, download_dir=tmp_path / "dl",
+                    data_dir=tmp_path / "data")
+    cache_path = tmp_path / "data" / "hash_cache.json"
+
+    with TestClient(create_app(config)) as client:
+        client.post("/api/models/scan")
+        deadline = time.monotonic() + 5
+        while not cache_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        hash_index = client.app.state.hash_index
+
+        sha256 = hashlib.sha256(b"lora").hexdigest().upper()
+        lora = model_dir / "active" / "loras" / "test_lora.safetensors"
+        assert hash_index.lookup(sha256) == lora
+        assert json.loads(cache_path.read_text())[str(lora)]["sha256"] == sha256
+
+
+def test_enrich_endpoint_writes_sidecars_and_shares_hash_cache(client, model_dir, tmp_path,
+                                                               fake_civitai):
+    """enrich がサイドカーを書き込み、計算したハッシュを HashIndex のキャッシュに保存するテスト"""
+    sha256 = hashlib.sha256(b"lora").hexdigest().upper()
+    fake_civitai.add_version({
+        "id": 11, "modelId": 1, "name": "v1",
+        "files": [{"name": "test_lora.safetensors", "hashes": {"SHA256": sha256}}],
+    })
+    client.app.state.enricher.civitai_client = CivitaiClient(
+        base_url=fake_civitai.api_url, requests_per_minute=6000
+    )
+
+    result = client.post("/api/models/enrich").json()
+
+    lora = model_dir / "active" / "loras" / "test_lora.safetensors"
+    assert (result["candidates"], result["matched"]) == (1, 1)
+    assert json.loads(lora.with_name(lora.name + ".civitai.info").read_text())["modelId"] == 1
+    [model] = client.get("/api/models").json()["models"]
+    assert model["civitai_metadata"]["id"] == 11
+    cache = json.loads((tmp_path / "data" / "hash_cache.json").read_text())
+    assert cache[str(lora)]["sha256"] == sha256
+
+
+def test_scan_missing_directory_returns_error(tmp_path):
+    """スキャン対象が存在しない場合はエラーレスポンスとなるテスト"""
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "missing",
+                    data_dir=tmp_path / "data")
+    client = TestClient(create_app(config))
+
+    response = client.post("/api/models/scan")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "MODEL_SCAN_ERROR"
+
+
+def test_updates_endpoint_lists_installed_civitai_models(client, model_dir):
+    """更新状況エンドポイントがサイドカーのモデルを返すテスト"""
+    sidecar = model_dir / "active" / "loras" / "test_lora.safetensors.civitai.info"
+    sidecar.write_text('{"id": 10, "modelId": 1, "name": "v1.0"}', encoding="utf-8")
+    client.get("/api/models")
+
+    payload = client.get("/api/models/updates").json()
+
+    assert payload["total_count"] == 1
+    assert payload["available_count"] == 0
+    assert payload["updates"][0]["model_id"] == 1
+    assert payload["updates"][0]["checked_at"] is None
+    assert client.get("/api/models/updates?available_only=true").json()["total_count"] == 0
+
+
+def test_get_model_by_id_is_stable_across_rescans(client):
+    """モデル ID が再スキャンで変わらず、ID で詳細を取得できるテスト"""
+    model_id = client.get("/api/models").json()["models"][0]["id"]
+    client.post("/api/models/scan")
+
+    response = client.get(f"/api/models/{model_id}")
+
+    assert response.status_code == 200
+    assert response.json()["filename"] == "test_lora.safetensors"
+    assert client.get("/api/models").json()["models"][0]["id"] == model_id
+
+
+def test_get_unknown_model_returns_404(client):
+    """存在しない ID は 404 となるテスト"""
+    client.get("/api/models")
+
+    response = client.get("/api/models/unknown")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "NOT_FOUND"
+
+
+def test_list_models_returns_304_for_matching_etag(client):
+    """ETag が一致する一覧の再取得は本文なしの 304 となるテスト"""
+    response = client.get("/api/models")
+    etag = response.headers["etag"]
+
+    cached = client.get("/api/models", headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+
+def test_list_models_etag_changes_after_rescan(client, model_dir):
+    """レジストリが変わると ETag が変わり、古い ETag では本文が返るテスト"""
+    etag = client.get("/api/models").headers["etag"]
+    (model_dir / "active" / "loras" / "new_lora.safetensors").write_bytes(b"new")
+    client.post("/api/models/scan")
+
+    response = client.get("/api/models", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["total_count"] == 2
+
+
+def _client_with_compression(model_dir, tmp_path, compression_min_bytes):
+    config = Config(_env_file=None, model_scan_dir=model_dir, download_dir=tmp_path / "dl",
+                    data_dir=tmp_path / "data", compression_min_bytes=compression_min_bytes)
+    return TestClient(create_app(config))
+
+
+def test_list_models_is_gzip_compressed_when_accepted(model_dir, tmp_path):
+    """Accept-Encoding: gzip の場合は圧縮した本文を返すテスト"""
+    client = _client_with_compression(model_dir, tmp_path, 0)
+    plain = client.get("/api/models", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/models", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == plain.json()
+
+
+@pytest.mark.parametrize("compression_min_bytes", [None, 1024 * 1024])
+def test_list_models_is_not_compressed_when_disabled_or_small(model_dir, tmp_path,
+                                                             compression_min_bytes):
+    """圧縮が無効、または本文が閾値未満の場合は圧縮しないテスト"""
+    client = _client_with_compression(model_dir, tmp_path, compression_min_bytes)
+
+    response = client.get("/api/models", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json()["total_count"] == 1
+
+
+def test_list_models_compresses_large_body_in_thread(model_dir, tmp_path, monkeypatch):
+    """大きな本文の圧縮はイベントループ外のスレッドで行うテスト"""
+    import asyncio
+
+    from sd_model_manager.ui.api import models as models_api
+    from sd_model_manager.ui.api.model_list_cache import ModelListBody
+
+    monkeypatch.setattr(models_api, "THREAD_MIN_BYTES", 0)
+    encode = ModelListBody.encode
+    on_loop = []
+
+    def recording_encode(self, encoding):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return encode(self, encoding)
+
+    monkeypatch.setattr(ModelListBody, "encode", recording_encode)
+    client = _client_with_compression(model_dir, tmp_path, 0)
+
+    response = client.get("/api/models", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert on_loop == [False]
+
+
+def test_thumbnail_without_local_preview_returns_404(client):
+    """ローカルのプレビュー画像がないモデルのサムネイルは 404 となるテスト"""
+    model_id = client.get("/api/models").json()["models"][0]["id"]
+
+    response = client.get(f"/api/models/{model_id}/thumbnail")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "NOT_FOUND"
+    assert client.get("/api/thumbnails/unknown.webp").status_code == 404
+
+
+@pytest.mark.skipif(importlib.util.find_spec("PIL") is None, reason="Pillow is not installed")
+def test_thumbnail_is_served_with_etag_and_immutable_url(client, model_dir):
+    """サムネイルが ETag 付きで返り、キャッシュキーの URL は immutable となるテスト"""
+    from PIL import Image
+
+    Image.new("RGB", (1024, 768), (10, 20, 30)).save(
+        model_dir / "active" / "loras" / "test_lora.preview.png"
+    )
+    model_id = client.get("/api/models").json()["models"][0]["id"]
+
+    response = client.get(f"/api/models/{model_id}/thumbnail?size=64&format=jpeg")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    cached = client.get(f"/api/models/{model_id}/thumbnail?size=64&format=jpeg",
+                        headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    immutable = client.get(response.headers["content-location"])
+    assert immutable.status_code == 200
+    assert "immutable" in immutable.headers["cache-control"]
+    assert immutable.content == response.content
+
+
+def test_tensors_endpoint_lists_safetensors_layout(client, model_dir):
+    """テンソル一覧エンドポイントがヘッダーの内容と集計を返すテスト"""
+    header = json.dumps({
+        "lora_unet_down_blocks_0_attentions_0_proj_in.alpha": {
+            "dtype": "F32", "shape": [], "data_offsets": [0, 4]},
+        "lora_te_text_model_encoder_layers_0_mlp_fc1.lora_down.weight": {
+            "dtype": "F16", "shape": [2, 2], "data_offsets": [4, 12]},
+    }).encode()
+    (model_dir / "active" / "loras" / "test_lora.safetensors").write_bytes(
+        struct.pack("<Q", len(header)) + header + b"\x00" * 12
+    )
+    model_id = client.get("/api/models").json()["models"][0]["id"]
+
+    payload = client.get(f"/api/models/{model_id}/tensors").json()
+
+    assert payload["tensor_count"] == 2
+    assert payload["total_params"] == 5
+    assert payload["components"]["text_encoder"]["params"] == 4
+    assert payload["dtypes"]["F16"]["bytes"] == 8
+    assert payload["has_ema"] is False
+    summary = client.get(f"/api/models/{model_id}/tensors?include_tensors=false").json()
+    assert summary["tensors"] == []
+
+
+def test_tensors_endpoint_rejects_invalid_file(client):
+    """safetensors として読めないファイルはエラーレスポンスとなるテスト"""
+    model_id = client.get("/api/models").json()["models"][0]["id"]
+
+    response = client.get(f"/api/models/{model_id}/tensors")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "TENSOR_INSPECTION_ERROR"
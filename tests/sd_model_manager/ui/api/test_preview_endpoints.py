@@ -0,0 +1,92 @@
+"""ミラーしたプレビュー画像のエンドポイントのテスト"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.registry.preview_mirror import PreviewMirror, preview_key
+from sd_model_manager.ui.api.main import create_app
+
+
+@pytest.fixture
+def preview_url(fake_civitai):
+    """代替サーバーで配信するプレビュー画像の URL"""
+    fake_civitai.files["images/preview.jpeg"] = b"\xff\xd8 preview"
+    return f"{fake_civitai.base_url}/files/images/preview.jpeg"
+
+
+@pytest.fixture
+def client(tmp_path, preview_url):
+    """サイドカーがリモートのプレビュー画像を参照するライブラリのクライアント"""
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True)
+    (lora_dir / "test_lora.safetensors").write_bytes(b"lora")
+    (lora_dir / "test_lora.safetensors.civitai.info").write_text(
+        json.dumps({"id": 10, "modelId": 1, "images": [{"url": preview_url}]}), encoding="utf-8"
+    )
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models",
+                    download_dir=tmp_path / "dl", data_dir=tmp_path / "data",
+                    preview_mirror_enabled=True, thumbnail_pregenerate=False)
+    # lifespan を通して、スキャン後に始まるバックグラウンドのミラーを終了時に停止する
+    with TestClient(create_app(config)) as client:
+        yield client
+
+
+def test_mirror_rewrites_preview_url(client, fake_civitai, preview_url):
+    """ミラー後の一覧ではプレビュー画像の URL がローカルを指すテスト"""
+    client.get("/api/models")
+
+    # スキャン後に始まったバックグラウンドのミラーと重なっても取得は 1 回
+    result = client.post("/api/previews/mirror").json()
+    [model] = client.get("/api/models").json()["models"]
+
+    assert result["failed"] == 0
+    assert fake_civitai.requests == [("GET", "/files/images/preview.jpeg")]
+    assert model["preview_image_url"] == f"/api/previews/{preview_key(preview_url)}"
+    response = client.get(model["preview_image_url"])
+    assert response.status_code == 200
+    assert response.content == b"\xff\xd8 preview"
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_rescan_keeps_local_preview_url(client, preview_url):
+    """再スキャン後もミラー済みのプレビュー画像はローカルの URL のままのテスト"""
+    client.get("/api/models")
+    client.post("/api/previews/mirror")
+
+    client.post("/api/models/scan")
+
+    [model] = client.get("/api/models").json()["models"]
+    assert model["preview_image_url"] == f"/api/previews/{preview_key(preview_url)}"
+
+
+def test_evicted_preview_redirects_to_source(client, preview_url):
+    """キャッシュから削除された画像は、ミラーしたプロセス以外でも元の URL へリダイレクトするテスト"""
+    client.get("/api/models")
+    client.post("/api/previews/mirror")
+    key = preview_key(preview_url)
+    mirror = client.app.state.preview_mirror
+    mirror.cache.path(key).unlink()
+    # 別のワーカー・再起動後のプロセスに相当する、何も取得していないインスタンス
+    client.app.state.preview_mirror = PreviewMirror(mirror.cache)
+
+    response = client.get(f"/api/previews/{key}", follow_redirects=False)
+
+    assert response.status_code == 307
+    assert response.headers["location"] == preview_url
+    assert client.get("/api/previews/unknown.jpeg").status_code == 404
+
+
+def test_mirror_is_rejected_when_disabled(tmp_path, fake_civitai, preview_url):
+    """preview_mirror_enabled が無効の場合は POST /api/previews/mirror を受け付けないテスト"""
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models",
+                    download_dir=tmp_path / "dl", data_dir=tmp_path / "data")
+
+    response = TestClient(create_app(config)).post("/api/previews/mirror")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "CONFIGURATION_ERROR"
+    assert fake_civitai.requests == []
@@ -0,0 +1,70 @@
+"""プロファイリング管理 API・リクエスト計測のテスト"""
+
+import pstats
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.ui.api.main import create_app
+
+
+def make_client(tmp_path, **overrides) -> TestClient:
+    """1 ファイルのライブラリを持つアプリケーションのクライアント"""
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True, exist_ok=True)
+    (lora_dir / "a.safetensors").write_bytes(b"lora")
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models",
+                    download_dir=tmp_path / "dl", data_dir=tmp_path / "data",
+                    log_dir=tmp_path / "logs", **overrides)
+    return TestClient(create_app(config))
+
+
+def test_profiling_disabled_by_default(tmp_path):
+    """既定では管理 API もヘッダーによる計測も無効なテスト"""
+    client = make_client(tmp_path)
+
+    assert client.post("/api/admin/profile/scan").status_code == 404
+    response = client.get("/health", headers={"X-Profile": "cprofile"})
+    assert "x-profile-output" not in response.headers
+    assert not (tmp_path / "logs" / "profiles").exists()
+
+
+def test_profile_scan_endpoint(tmp_path):
+    """スキャンの計測結果が log_dir/profiles に書き出されるテスト"""
+    client = make_client(tmp_path, profiling_enabled=True)
+
+    response = client.post("/api/admin/profile/scan", params={"mode": "cprofile"})
+
+    assert response.status_code == 200
+    path = Path(response.json()["path"])
+    assert path.parent == tmp_path / "logs" / "profiles"
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "scan" in functions
+
+
+def test_profile_window_endpoint(tmp_path):
+    """指定時間のサンプリング結果が speedscope 形式で書き出されるテスト"""
+    client = make_client(tmp_path, profiling_enabled=True, profiling_sample_interval_ms=1.0)
+
+    response = client.post("/api/admin/profile/window", params={"seconds": 0.05})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "sampling"
+    assert body["samples"] > 0
+    assert body["path"].endswith("-window-0.05s.speedscope.json")
+
+
+def test_request_profiled_by_header(tmp_path):
+    """X-Profile ヘッダー付きのリクエストだけが計測されるテスト"""
+    client = make_client(tmp_path, profiling_enabled=True)
+
+    plain = client.get("/api/models")
+    profiled = client.get("/api/models", headers={"X-Profile": "cprofile"})
+
+    assert "x-profile-output" not in plain.headers
+    path = Path(profiled.headers["x-profile-output"])
+    assert path.name.endswith("-request-GET-api-models.pstats")
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "list_models" in functions
@@ -0,0 +1,120 @@
+"""サーバーモードの負荷試験（development と production の比較）
+
+``python -m sd_model_manager serve`` を別プロセスで起動し、``/health`` に
+同時接続で負荷をかけてスループットとレイテンシを計測する。結果は
+ダウンロードのベンチマークと同じくテスト終了時に一覧表示される。
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+SRC_DIR = Path(__file__).resolve().parents[4] / "src"
+TOTAL_REQUESTS = int(os.environ.get("SDMM_BENCHMARK_REQUESTS", "1000"))
+CONCURRENCY = 32
+# 1 コアの環境ではワーカーを増やしても速くならないため CPU 数に合わせる
+PRODUCTION_WORKERS = max(1, min(2, os.cpu_count() or 1))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(tmp_path: Path, args: list[str]) -> tuple[subprocess.Popen, str]:
+    """サーバーを起動し、応答するまで待つ"""
+    port = free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(SRC_DIR),
+        "LOG_DIR": str(tmp_path / "logs"),
+        "DATA_DIR": str(tmp_path / "data"),
+        "MODEL_SCAN_DIR": str(tmp_path / "models"),
+        "DOWNLOAD_DIR": str(tmp_path / "downloads"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "sd_model_manager", "serve", "--port", str(port), *args],
+        env=env, cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30.0
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return process, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Server did not start: {args}")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def load_test(url: str) -> dict:
+    """Keep-Alive 接続で同時に負荷をかけ、スループットとレイテンシを計測"""
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(TOTAL_REQUESTS))
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/health")
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": errors,
+    }
+
+
+@pytest.mark.parametrize("mode, args", [
+    ("development", ["--reload"]),
+    ("production", ["--workers", str(PRODUCTION_WORKERS)]),
+])
+async def test_serve_mode_load(tmp_path, benchmark_results, mode, args):
+    """各サーバーモードが負荷下でエラーなく応答するテスト"""
+    process, url = await asyncio.to_thread(start_server, tmp_path, args)
+    try:
+        await load_test(url)  # ウォームアップ（全ワーカーの起動完了を待つ）
+        result = await load_test(url)
+    finally:
+        await asyncio.to_thread(stop_server, process)
+
+    benchmark_results.append({
+        "scenario": f"serve {mode}",
+        "requests": TOTAL_REQUESTS,
+        **result,
+    })
+    assert result["errors"] == 0
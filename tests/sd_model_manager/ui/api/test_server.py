@@ -0,0 +1,84 @@
+"""サーバー起動設定のテスト"""
+
+from datetime import datetime
+
+import uvicorn
+
+from sd_model_manager.config import Config
+from sd_model_manager.registry.model_registry import ModelRegistry
+from sd_model_manager.registry.registry_store import RegistryStore
+from sd_model_manager.ui.api import server
+from sd_model_manager.ui.api.main import create_app
+
+
+def test_production_options_disable_reload(monkeypatch):
+    """production モードはリロードなし・マルチワーカー・uvloop/httptools となるテスト"""
+    monkeypatch.setattr(server, "_available", lambda module: True)
+    config = Config(_env_file=None, server_workers=4, server_keep_alive=30, server_backlog=4096)
+
+    options = server.uvicorn_options(config)
+
+    assert options["reload"] is False
+    assert options["workers"] == 4
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["timeout_keep_alive"] == 30
+    assert options["backlog"] == 4096
+    assert options["factory"] is True
+
+
+def test_production_options_fall_back_without_optional_deps(monkeypatch):
+    """uvloop/httptools がない環境では標準実装を使うテスト"""
+    monkeypatch.setattr(server, "_available", lambda module: False)
+
+    options = server.uvicorn_options(Config(_env_file=None))
+
+    assert options["loop"] == "asyncio"
+    assert options["http"] == "h11"
+
+
+def test_development_options_enable_reload():
+    """development モードは単一プロセスで自動リロードするテスト"""
+    options = server.uvicorn_options(Config(_env_file=None, server_mode="development"))
+
+    assert options["reload"] is True
+    assert "workers" not in options
+    assert options["reload_dirs"] == [str(server.PACKAGE_DIR)]
+
+
+def test_multi_worker_app_shares_state(tmp_path):
+    """マルチワーカー構成ではレジストリ等を共有ストアに置き、上限を分け合うテスト"""
+    config = Config(
+        _env_file=None, server_workers=2, data_dir=tmp_path / "data",
+        download_bandwidth_limit=1000
+    )
+
+    state = create_app(config).state
+
+    assert state.model_registry.store is not None
+    assert state.batch_importer.report_store is not None
+    assert state.bandwidth_limiter.global_limit == 500
+    assert state.download_service.civitai_client.requests_per_minute == 5
+
+
+def test_single_worker_app_keeps_state_in_memory(tmp_path):
+    """単一ワーカーでは共有ストアを使わないテスト"""
+    state = create_app(Config(_env_file=None, data_dir=tmp_path / "data")).state
+
+    assert state.model_registry.store is None
+    assert state.batch_importer.report_store is None
+
+
+
+def test_multi_worker_start_clears_previous_registry(tmp_path, monkeypatch):
+    """マルチワーカーの起動前に前回の実行の共有レジストリを空にするテスト"""
+    config = Config(_env_file=None, server_workers=2, data_dir=tmp_path / "data")
+    previous = RegistryStore(config.shared_state_db)
+    previous.replace_all([], datetime(2024, 1, 1))
+    previous.close()
+    monkeypatch.setattr(uvicorn, "run", lambda *args, **kwargs: None)
+
+    server.run_server(config)
+
+    registry = ModelRegistry(store=RegistryStore(config.shared_state_db))
+    assert registry.scanned_at is None
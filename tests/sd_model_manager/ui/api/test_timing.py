@@ -0,0 +1,76 @@
+"""リクエスト計測（Server-Timing・低速リクエストログ）のテスト"""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sd_model_manager.config import Config
+from sd_model_manager.ui.api.main import create_app
+from sd_model_manager.ui.api.timing import current_timings, timed
+
+
+def make_client(tmp_path, **overrides) -> TestClient:
+    """1 ファイルのライブラリを持つアプリケーションのクライアント"""
+    lora_dir = tmp_path / "models" / "active" / "loras"
+    lora_dir.mkdir(parents=True, exist_ok=True)
+    (lora_dir / "a.safetensors").write_bytes(b"lora")
+    config = Config(_env_file=None, model_scan_dir=tmp_path / "models",
+                    download_dir=tmp_path / "dl", data_dir=tmp_path / "data", **overrides)
+    return TestClient(create_app(config))
+
+
+def phases(header: str) -> dict[str, float]:
+    """Server-Timing ヘッダーをフェーズ名と所要時間の辞書に変換"""
+    result = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        result[name] = float(duration)
+    return result
+
+
+def test_server_timing_header_contains_phases(tmp_path):
+    """モデル一覧のレスポンスにフェーズ別の Server-Timing が付与されるテスト"""
+    client = make_client(tmp_path)
+
+    response = client.get("/api/models")
+
+    assert response.status_code == 200
+    timing = phases(response.headers["server-timing"])
+    assert {"scan", "registry", "endpoint", "serialize", "total"} <= timing.keys()
+    assert timing["total"] >= timing["endpoint"] >= timing["registry"]
+
+
+def test_slow_request_is_logged(tmp_path, caplog):
+    """閾値を超えたリクエストが低速リクエストログに記録されるテスト"""
+    client = make_client(tmp_path, slow_request_threshold_ms=0.0)
+
+    with caplog.at_level(logging.WARNING, logger="sd_model_manager.slow_requests"):
+        client.get("/health?verbose=1")
+
+    records = [r for r in caplog.records if r.name == "sd_model_manager.slow_requests"]
+    assert len(records) == 1
+    message = records[0].getMessage()
+    assert "GET /health" in message
+    assert "status=200" in message
+    assert "query=verbose=1" in message
+
+
+@pytest.mark.parametrize("threshold", [None, 60_000.0])
+def test_fast_request_is_not_logged(tmp_path, caplog, threshold):
+    """閾値未満・無効時は低速リクエストログに記録されないテスト"""
+    client = make_client(tmp_path, slow_request_threshold_ms=threshold)
+
+    with caplog.at_level(logging.WARNING, logger="sd_model_manager.slow_requests"):
+        response = client.get("/health")
+
+    assert "server-timing" in response.headers
+    assert not [r for r in caplog.records if r.name == "sd_model_manager.slow_requests"]
+
+
+def test_timed_outside_request_is_noop():
+    """リクエスト外での timed() は何も記録しないテスト"""
+    with timed("registry"):
+        pass
+
+    assert current_timings() is None